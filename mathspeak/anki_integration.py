@@ -22,9 +22,13 @@ import shutil
 # Add mathspeak to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from mathspeak.core.engine import MathematicalTTSEngine
+from mathspeak.core.engine import MathematicalTTSEngine, ProcessedExpression
+from mathspeak.core.math_spans import find_math_spans
 from mathspeak.core.voice_manager import VoiceManager
 
+# Anki's own [latex]...[/latex] tags; TeX delimiters are found by find_math_spans
+ANKI_LATEX_TAG = re.compile(r'\[latex\](.+?)\[/latex\]', re.DOTALL)
+
 
 class AnkiMathSpeakIntegration:
     """Integrate MathSpeak with Anki cards"""
@@ -120,26 +124,24 @@ class AnkiMathSpeakIntegration:
         
         cards_with_math = []
         
-        # LaTeX pattern matchers
-        latex_patterns = [
-            r'\$([^$]+)\$',  # Inline math $...$
-            r'\$\$([^$]+)\$\$',  # Display math $$...$$
-            r'\\\[([^\]]+)\\\]',  # Display math \[...\]
-            r'\\\(([^\)]+)\\\)',  # Inline math \(...\)
-            r'\[latex\]([^\[]+)\[/latex\]',  # Anki LaTeX tags
-        ]
-        
         for note_id, fields, tags, deck_id, deck_name in results:
             # Parse fields (front and back of card)
             field_list = fields.split('\x1f')
             
             for i, field in enumerate(field_list):
-                # Find all math expressions in field
-                math_expressions = []
-                
-                for pattern in latex_patterns:
-                    matches = re.findall(pattern, field, re.DOTALL)
-                    math_expressions.extend(matches)
+                # Find all math expressions in field, in field order; a %
+                # in a field is a percent sign, and math inside a [latex]
+                # tag belongs to the tag
+                tags_found = [(match.start(), match.end(), match.group(1))
+                              for match in ANKI_LATEX_TAG.finditer(field)]
+                found = [(start, content) for start, _, content in tags_found]
+                found.extend(
+                    (span.start, span.content)
+                    for span in find_math_spans(field, comments=False)
+                    if not any(start <= span.start < end for start, end, _ in tags_found)
+                )
+                math_expressions = [content for _, content in sorted(found)
+                                    if content.strip()]
                 
                 if math_expressions:
                     cards_with_math.append({
@@ -156,14 +158,48 @@ class AnkiMathSpeakIntegration:
         print(f"Found {len(cards_with_math)} fields with mathematical expressions")
         return cards_with_math
     
+    def _audio_filename(self, card: Dict, index: int, expr: str) -> str:
+        """Unique audio filename for an expression of a card"""
+        expr_hash = hashlib.md5(expr.encode()).hexdigest()[:8]
+        return f"{self.audio_prefix}{card['note_id']}_{index}_{expr_hash}.{self.audio_format}"
+    
+    def process_cards(self, cards: List[Dict],
+                      output_dir: Optional[Path] = None) -> Dict[str, ProcessedExpression]:
+        """
+        Process the math of many cards as one batch
+        
+        Expressions whose audio already exists are skipped, and each
+        distinct expression is processed once however many cards use it.
+        
+        Args:
+            cards: Cards from extract_math_from_cards
+            output_dir: Directory the audio files go to (default: Anki media)
+            
+        Returns:
+            Processed expression for each expression that needs audio
+        """
+        output_dir = Path(output_dir) if output_dir is not None else self.media_dir
+        
+        expressions = []
+        for card in cards:
+            for i, expr in enumerate(card['math_expressions']):
+                if not (output_dir / self._audio_filename(card, i, expr)).exists():
+                    expressions.append(expr)
+        
+        expressions = list(dict.fromkeys(expressions))
+        return dict(zip(expressions, self.engine.process_many(expressions)))
+    
     async def generate_audio_for_card(self, card: Dict, 
-                                     output_dir: Optional[Path] = None) -> List[str]:
+                                     output_dir: Optional[Path] = None,
+                                     processed: Optional[Dict[str, ProcessedExpression]] = None
+                                     ) -> List[str]:
         """
         Generate audio files for mathematical expressions in a card
         
         Args:
             card: Card dictionary from extract_math_from_cards
             output_dir: Directory to save audio files (default: Anki media)
+            processed: Expressions already processed by process_cards
             
         Returns:
             List of generated audio filenames
@@ -178,8 +214,7 @@ class AnkiMathSpeakIntegration:
         
         for i, expr in enumerate(card['math_expressions']):
             # Generate unique filename based on expression
-            expr_hash = hashlib.md5(expr.encode()).hexdigest()[:8]
-            audio_filename = f"{self.audio_prefix}{card['note_id']}_{i}_{expr_hash}.{self.audio_format}"
+            audio_filename = self._audio_filename(card, i, expr)
             audio_path = output_dir / audio_filename
             
             # Skip if already exists
@@ -190,7 +225,10 @@ class AnkiMathSpeakIntegration:
             
             try:
                 # Process expression
-                result = self.engine.process_latex(expr)
+                if processed and expr in processed:
+                    result = processed[expr]
+                else:
+                    result = self.engine.process_latex(expr)
                 
                 # Generate audio
                 success = await self.engine.speak_expression(
@@ -297,6 +335,9 @@ class AnkiMathSpeakIntegration:
             print("No cards with mathematical expressions found")
             return stats
         
+        # Process the math of every card as one batch
+        processed = self.process_cards(cards)
+        
         # Process each card
         async def process_all():
             for card in cards:
@@ -304,7 +345,7 @@ class AnkiMathSpeakIntegration:
                 
                 try:
                     # Generate audio
-                    audio_files = await self.generate_audio_for_card(card)
+                    audio_files = await self.generate_audio_for_card(card, processed=processed)
                     
                     if audio_files:
                         stats['audio_generated'] += len(audio_files)
@@ -379,9 +420,11 @@ class AnkiMathSpeakIntegration:
             audio_files = []
             
             # Generate all audio
+            processed = self.process_cards(cards, temp_path)
+            
             async def generate_all():
                 for card in cards:
-                    files = await self.generate_audio_for_card(card, temp_path)
+                    files = await self.generate_audio_for_card(card, temp_path, processed)
                     audio_files.extend(files)
             
             asyncio.run(generate_all())
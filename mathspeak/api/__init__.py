@@ -1,5 +1,6 @@
 """MathSpeak REST API"""
 
 from .server import app, run_server
+from .prefork import PreforkConfig, run_prefork
 
-__all__ = ['app', 'run_server']
\ No newline at end of file
+__all__ = ['app', 'run_server', 'PreforkConfig', 'run_prefork']
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+API Executor Layer
+==================
+
+Runs CPU-bound text processing and TTS synthesis off the event loop, on
+separate bounded pools, so one slow expression cannot stall every other
+client and WebSocket.
+
+Each pool admits a limited number of requests (running plus queued).
+When it is full, new interactive requests are rejected immediately with
+ExecutorBusy, which the API turns into 429 Too Many Requests; a pool that
+is not running raises ExecutorUnavailable (503). Background work such as
+batch jobs waits for a free slot instead.
+
+Configuration comes from ExecutorConfig, by default read from the
+environment:
+
+- MATHSPEAK_TEXT_POOL / MATHSPEAK_TTS_POOL: "thread" or "process"
+- MATHSPEAK_TEXT_WORKERS / MATHSPEAK_TTS_WORKERS: pool sizes
+- MATHSPEAK_TEXT_QUEUE / MATHSPEAK_TTS_QUEUE: admitted requests per pool
+"""
+
+import os
+import asyncio
+import logging
+import functools
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+# ===========================
+# Errors
+# ===========================
+
+class ExecutorBusy(Exception):
+    """Raised when a pool has no free slot for a new request"""
+
+    def __init__(self, pool: str, limit: int):
+        self.pool = pool
+        self.limit = limit
+        super().__init__(f"Server busy: {pool} queue is full ({limit} requests in flight)")
+
+
+class ExecutorUnavailable(Exception):
+    """Raised when a pool is not running or has broken"""
+    pass
+
+# ===========================
+# Configuration
+# ===========================
+
+@dataclass
+class ExecutorConfig:
+    """Pool sizes, queue limits and pool kinds for the API"""
+    text_mode: str = "thread"
+    text_workers: int = 4
+    text_queue_depth: int = 32
+    tts_mode: str = "thread"
+    tts_workers: int = 2
+    tts_queue_depth: int = 8
+
+    @classmethod
+    def from_env(cls) -> 'ExecutorConfig':
+        """Build a config, overriding defaults from MATHSPEAK_* variables"""
+        config = cls()
+        for attr, var, cast in (
+            ('text_mode', 'MATHSPEAK_TEXT_POOL', str),
+            ('text_workers', 'MATHSPEAK_TEXT_WORKERS', int),
+            ('text_queue_depth', 'MATHSPEAK_TEXT_QUEUE', int),
+            ('tts_mode', 'MATHSPEAK_TTS_POOL', str),
+            ('tts_workers', 'MATHSPEAK_TTS_WORKERS', int),
+            ('tts_queue_depth', 'MATHSPEAK_TTS_QUEUE', int),
+        ):
+            if var in os.environ:
+                try:
+                    setattr(config, attr, cast(os.environ[var]))
+                except ValueError:
+                    logger.warning(f"Ignoring invalid {var}={os.environ[var]!r}")
+        return config
+
+# ===========================
+# Process Pool Workers
+# ===========================
+
+_worker_engine = None
+
+def _init_text_worker() -> None:
+    """Build one engine per worker process, before any request arrives"""
+    global _worker_engine
+    from ..core.engine import MathematicalTTSEngine
+    _worker_engine = MathematicalTTSEngine(enable_caching=True)
+
+def _process_in_worker(latex: str, context_value: Optional[str],
+                       deadline_seconds: Optional[float]):
+    """Run process_latex on the worker process's engine"""
+    from ..core.engine import MathematicalContext
+    context = MathematicalContext(context_value) if context_value else None
+    return _worker_engine.process_latex(latex, force_context=context, deadline=deadline_seconds)
+
+def _process_many_in_worker(expressions: List[str], context_value: Optional[str],
+                            deadline_seconds: Optional[float]):
+    """Run process_many on the worker process's engine"""
+    from ..core.engine import MathematicalContext
+    context = MathematicalContext(context_value) if context_value else None
+    return _worker_engine.process_many(expressions, force_context=context,
+                                       deadline=deadline_seconds, parallel=False)
+
+# ===========================
+# Bounded Executor
+# ===========================
+
+class BoundedExecutor:
+    """Thread or process pool with a limit on admitted requests"""
+
+    def __init__(self, name: str, workers: int, max_pending: int,
+                 mode: str = "thread",
+                 initializer: Optional[Callable] = None):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown pool mode: {mode}")
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.mode = mode
+        self.initializer = initializer
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def start(self) -> None:
+        """Create the pool; called once at application startup"""
+        if self._executor is not None:
+            return
+        if self.mode == "process":
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=self.initializer
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix=f"mathspeak-{self.name}"
+            )
+        self._slots = asyncio.Semaphore(self.max_pending)
+        logger.info(f"{self.name} pool started: {self.workers} {self.mode} workers, "
+                    f"{self.max_pending} admitted requests")
+
+    async def run(self, func: Callable, *args, wait: bool = False) -> Any:
+        """
+        Run func(*args) on the pool.
+
+        Args:
+            func: Function to run; must be picklable in process mode
+            *args: Arguments for func
+            wait: Wait for a free slot instead of raising ExecutorBusy
+
+        Returns:
+            Result of func
+
+        Raises:
+            ExecutorBusy: If the pool is full and wait is False
+            ExecutorUnavailable: If the pool is not running or broke
+        """
+        if self._executor is None:
+            raise ExecutorUnavailable(f"{self.name} pool is not running")
+
+        if not wait and self._slots.locked():
+            self.rejected += 1
+            raise ExecutorBusy(self.name, self.max_pending)
+
+        async with self._slots:
+            self.in_flight += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self._executor, functools.partial(func, *args)
+                )
+            except BrokenProcessPool as e:
+                raise ExecutorUnavailable(f"{self.name} pool is broken: {e}") from e
+            finally:
+                self.in_flight -= 1
+                self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Current load of the pool"""
+        return {
+            'mode': self.mode,
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'in_flight': self.in_flight,
+            'completed': self.completed,
+            'rejected': self.rejected,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work and release the pool"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+# ===========================
+# Executor Layer
+# ===========================
+
+class ExecutorLayer:
+    """Separate pools for text processing and TTS synthesis"""
+
+    def __init__(self, config: Optional[ExecutorConfig] = None):
+        self.config = config or ExecutorConfig.from_env()
+        self.text = BoundedExecutor(
+            "text", self.config.text_workers, self.config.text_queue_depth,
+            mode=self.config.text_mode,
+            initializer=_init_text_worker if self.config.text_mode == "process" else None
+        )
+        self.tts = BoundedExecutor(
+            "tts", self.config.tts_workers, self.config.tts_queue_depth,
+            mode=self.config.tts_mode
+        )
+
+    def start(self) -> None:
+        self.text.start()
+        self.tts.start()
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.text.shutdown(wait=wait)
+        self.tts.shutdown(wait=wait)
+
+    async def process_latex(self, engine, latex: str, force_context=None,
+                            deadline=None, wait: bool = False):
+        """
+        Run engine.process_latex on the text pool.
+
+        In process mode each worker uses its own engine built at pool
+        startup, and only the expression, context and remaining deadline
+        are sent across.
+        """
+        if self.text.mode == "process":
+            remaining = deadline.remaining() if deadline is not None else None
+            context_value = force_context.value if force_context else None
+            return await self.text.run(
+                _process_in_worker, latex, context_value, remaining, wait=wait
+            )
+        return await self.text.run(
+            functools.partial(engine.process_latex, latex,
+                              force_context=force_context, deadline=deadline),
+            wait=wait
+        )
+
+    async def process_many(self, engine, expressions: List[str], force_context=None,
+                           deadline_seconds: Optional[float] = None, wait: bool = False):
+        """
+        Run engine.process_many on the text pool.
+
+        The batch takes one slot and runs on one worker, so a large batch
+        cannot crowd out interactive requests; each expression gets
+        deadline_seconds from when its processing starts.
+        """
+        if self.text.mode == "process":
+            context_value = force_context.value if force_context else None
+            return await self.text.run(
+                _process_many_in_worker, expressions, context_value, deadline_seconds, wait=wait
+            )
+        return await self.text.run(
+            functools.partial(engine.process_many, expressions, force_context=force_context,
+                              deadline=deadline_seconds, parallel=False),
+            wait=wait
+        )
+
+    async def synthesize(self, func: Callable, *args, wait: bool = False) -> Any:
+        """Run a TTS synthesis call on the TTS pool"""
+        return await self.tts.run(func, *args, wait=wait)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'text': self.text.stats(), 'tts': self.tts.stats()}
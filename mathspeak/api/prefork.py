@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Pre-fork API Serving
+====================
+
+Production serving mode that runs N uvicorn workers on one listening
+socket. The parent binds the socket and builds the engine, pattern
+registry, domain vocabularies and expression cache once, then forks the
+workers, which share that state copy-on-write instead of each paying the
+warm-up cost. The parent supervises the workers: it replaces workers that
+exit, recycles them after a request or memory threshold, and shuts them
+down gracefully on SIGTERM/SIGINT. SIGHUP recycles all workers.
+
+Settings come from PreforkConfig, by default read from the environment:
+
+- MATHSPEAK_WORKERS: worker processes (0 = one per CPU)
+- MATHSPEAK_MAX_REQUESTS: recycle a worker after this many requests (0 = never)
+- MATHSPEAK_MAX_REQUESTS_JITTER: random extra requests, so workers do not
+  all recycle at once
+- MATHSPEAK_MAX_MEMORY_MB: recycle a worker whose peak RSS exceeds this (0 = never)
+- MATHSPEAK_GRACEFUL_TIMEOUT: seconds workers get to finish on shutdown
+- MATHSPEAK_PRELOAD: build shared state in the parent (default 1)
+- MATHSPEAK_PRELOAD_DOMAINS: domain processors to build with it, as a
+  comma-separated list or "all" (default none; workers then load each
+  domain the first time they route an expression to it)
+
+Rate limiting (see server.rate_limiter_from_env) is configured by
+MATHSPEAK_RATE_LIMIT and MATHSPEAK_RATE_LIMIT_WINDOW. With more than one
+worker and no MATHSPEAK_RATE_LIMIT_DB, the workers share a SQLite file in
+the temp directory, so a client's limit holds across all of them.
+
+Pre-forking relies on os.fork and is only available on POSIX systems.
+"""
+
+import os
+import gc
+import time
+import random
+import signal
+import socket
+import logging
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# ===========================
+# Configuration
+# ===========================
+
+@dataclass
+class PreforkConfig:
+    """Worker count, recycling thresholds and startup options"""
+    host: str = "0.0.0.0"
+    port: int = 8000
+    workers: int = 0
+    max_requests: int = 0
+    max_requests_jitter: int = 0
+    max_memory_mb: int = 0
+    graceful_timeout: float = 30.0
+    preload: bool = True
+    preload_domains: str = ""
+    log_level: str = "info"
+
+    @classmethod
+    def from_env(cls, **overrides) -> 'PreforkConfig':
+        """Build a config from MATHSPEAK_* variables, then apply overrides"""
+        config = cls()
+        for attr, var, cast in (
+            ('workers', 'MATHSPEAK_WORKERS', int),
+            ('max_requests', 'MATHSPEAK_MAX_REQUESTS', int),
+            ('max_requests_jitter', 'MATHSPEAK_MAX_REQUESTS_JITTER', int),
+            ('max_memory_mb', 'MATHSPEAK_MAX_MEMORY_MB', int),
+            ('graceful_timeout', 'MATHSPEAK_GRACEFUL_TIMEOUT', float),
+            ('preload', 'MATHSPEAK_PRELOAD', lambda v: v.lower() in ('1', 'true', 'yes')),
+            ('preload_domains', 'MATHSPEAK_PRELOAD_DOMAINS', str),
+        ):
+            if var in os.environ:
+                try:
+                    setattr(config, attr, cast(os.environ[var]))
+                except ValueError:
+                    logger.warning(f"Ignoring invalid {var}={os.environ[var]!r}")
+        for attr, value in overrides.items():
+            if value is not None:
+                setattr(config, attr, value)
+        return config
+
+    @property
+    def worker_count(self) -> int:
+        """Configured workers, with 0 meaning one per CPU"""
+        return self.workers if self.workers > 0 else (os.cpu_count() or 1)
+
+# ===========================
+# Worker Process
+# ===========================
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB"""
+    import resource
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class MemoryRecycleMiddleware:
+    """ASGI middleware asking the worker to exit once it uses too much memory"""
+
+    CHECK_EVERY = 100  # requests between RSS checks
+
+    def __init__(self, app, server, max_memory_mb: int):
+        self.app = app
+        self.server = server
+        self.max_memory_mb = max_memory_mb
+        self.requests = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            self.requests += 1
+            if self.requests % self.CHECK_EVERY == 0 and _peak_rss_mb() > self.max_memory_mb:
+                logger.info(f"Worker {os.getpid()} exceeded {self.max_memory_mb} MB, recycling")
+                self.server.should_exit = True
+        await self.app(scope, receive, send)
+
+
+def _run_worker(sock: socket.socket, config: PreforkConfig) -> None:
+    """Serve the API on the inherited socket until asked to exit"""
+    import uvicorn
+    from .server import app
+
+    limit = None
+    if config.max_requests > 0:
+        limit = config.max_requests + random.randint(0, max(0, config.max_requests_jitter))
+
+    uvicorn_config = uvicorn.Config(
+        app,
+        lifespan="on",
+        log_level=config.log_level,
+        limit_max_requests=limit,
+        timeout_graceful_shutdown=config.graceful_timeout,
+    )
+    server = uvicorn.Server(uvicorn_config)
+    if config.max_memory_mb > 0:
+        uvicorn_config.load()
+        uvicorn_config.loaded_app = MemoryRecycleMiddleware(
+            uvicorn_config.loaded_app, server, config.max_memory_mb
+        )
+    server.run(sockets=[sock])
+
+# ===========================
+# Supervisor
+# ===========================
+
+class PreforkServer:
+    """Parent process that binds, warms up, forks and supervises workers"""
+
+    def __init__(self, config: Optional[PreforkConfig] = None):
+        self.config = config or PreforkConfig.from_env()
+        self.workers: Dict[int, float] = {}  # pid -> start time
+        self.socket: Optional[socket.socket] = None
+        self._stopping = False
+
+    def run(self) -> None:
+        """Serve until SIGTERM/SIGINT"""
+        if not hasattr(os, "fork"):
+            raise RuntimeError("Pre-fork serving requires a POSIX system")
+
+        self.socket = socket.create_server((self.config.host, self.config.port), backlog=2048)
+        self.socket.set_inheritable(True)
+
+        # Set before the app is imported, here or in the workers
+        if os.environ.get("MATHSPEAK_RATE_LIMIT", "0") not in ("", "0") \
+                and self.config.worker_count > 1:
+            os.environ.setdefault("MATHSPEAK_RATE_LIMIT_DB", os.path.join(
+                tempfile.gettempdir(), f"mathspeak_rate_limit_{self.config.port}.db"))
+
+        if self.config.preload:
+            self._preload()
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_hup)
+
+        logger.info(f"Pre-fork server on {self.config.host}:{self.config.port} "
+                    f"with {self.config.worker_count} workers")
+        for _ in range(self.config.worker_count):
+            self._spawn()
+
+        try:
+            self._supervise()
+        finally:
+            self._stop_workers()
+            self.socket.close()
+
+    def _preload(self) -> None:
+        """Build shared state before forking"""
+        from .server import preload_app_state
+
+        start = time.time()
+        preload_app_state(self.config.preload_domains)
+        # Keep long-lived warm objects out of the collector's generations,
+        # so workers do not touch (and copy) their pages during GC
+        gc.collect()
+        if hasattr(gc, "freeze"):
+            gc.freeze()
+        logger.info(f"Shared state preloaded in {time.time() - start:.2f}s")
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            # Worker: restore default signal handling, then serve
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGHUP, signal.SIG_DFL)
+            random.seed()
+            code = 0
+            try:
+                _run_worker(self.socket, self.config)
+            except Exception:
+                logger.exception("Worker crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = time.time()
+        logger.info(f"Started worker {pid}")
+
+    def _supervise(self) -> None:
+        """Replace workers as they exit, until asked to stop"""
+        while not self._stopping:
+            try:
+                pid, status = os.waitpid(-1, 0)
+            except ChildProcessError:
+                if not self._stopping:
+                    self._spawn()
+                continue
+            except InterruptedError:
+                continue
+
+            if pid in self.workers:
+                started = self.workers.pop(pid)
+                logger.info(f"Worker {pid} exited with status {status} "
+                            f"after {time.time() - started:.0f}s")
+                if not self._stopping:
+                    # Back off if workers die straight after starting
+                    if time.time() - started < 1.0:
+                        time.sleep(1.0)
+                    self._spawn()
+
+    def _stop_workers(self) -> None:
+        for pid in list(self.workers):
+            self._signal(pid, signal.SIGTERM)
+
+        deadline = time.time() + self.config.graceful_timeout
+        while self.workers and time.time() < deadline:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                time.sleep(0.1)
+            else:
+                self.workers.pop(pid, None)
+
+        for pid in list(self.workers):
+            logger.warning(f"Worker {pid} did not stop in time, killing it")
+            self._signal(pid, signal.SIGKILL)
+        self.workers.clear()
+
+    def _signal(self, pid: int, sig: int) -> None:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            self.workers.pop(pid, None)
+
+    def _handle_stop(self, signum, frame) -> None:
+        logger.info("Shutting down pre-fork server...")
+        self._stopping = True
+        for pid in list(self.workers):
+            self._signal(pid, signal.SIGTERM)
+
+    def _handle_hup(self, signum, frame) -> None:
+        # Each worker finishes its requests and exits; the supervisor loop
+        # replaces it with a fresh one
+        logger.info("Recycling all workers")
+        for pid in list(self.workers):
+            self._signal(pid, signal.SIGTERM)
+
+
+def run_prefork(config: Optional[PreforkConfig] = None) -> None:
+    """Run the API with pre-forked workers"""
+    PreforkServer(config).run()
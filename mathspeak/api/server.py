@@ -9,18 +9,20 @@ streaming, and WebSocket support.
 """
 
 import os
+import math
 import asyncio
 import tempfile
 import uuid
 import time
 import logging
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
-from contextlib import asynccontextmanager
+from collections import deque
+from contextlib import aclosing, asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, validator, Field
 import uvicorn
@@ -28,8 +30,11 @@ import uvicorn
 # Import MathSpeak components
 from ..core.engine import MathematicalTTSEngine, MathematicalContext
 from ..core.voice_manager import VoiceManager
-from ..core.security import SecurityConfig
+from ..core.security import RateLimiter, SecurityConfig
 from ..utils.user_errors import format_error
+from ..utils.timeout import Deadline
+from ..utils.rate_limit_store import MemoryRateLimitStore, SQLiteRateLimitStore
+from .executors import ExecutorLayer, ExecutorBusy, ExecutorUnavailable
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +49,7 @@ class MathExpression(BaseModel):
     context: Optional[str] = Field(None, description="Mathematical context")
     format: Optional[str] = Field("mp3", description="Audio output format")
     speed: Optional[float] = Field(1.0, ge=0.5, le=2.0, description="Speech speed multiplier")
+    timeout: Optional[float] = Field(None, gt=0, le=60.0, description="Processing deadline in seconds")
     
     @validator('expression')
     def validate_expression(cls, v):
@@ -85,6 +91,7 @@ class ProcessingResponse(BaseModel):
     processing_time: float
     audio_url: Optional[str] = None
     unknown_commands: List[str] = []
+    partial: bool = False
 
 
 class BatchJobResponse(BaseModel):
@@ -101,6 +108,8 @@ class HealthResponse(BaseModel):
     version: str
     engine: str
     cache_stats: Optional[Dict[str, Any]] = None
+    audio_cache_stats: Optional[Dict[str, Any]] = None
+    executor_stats: Optional[Dict[str, Any]] = None
 
 
 # ===========================
@@ -112,23 +121,204 @@ class AppState:
     def __init__(self):
         self.engine: Optional[MathematicalTTSEngine] = None
         self.voice_manager: Optional[VoiceManager] = None
+        self.executors: Optional[ExecutorLayer] = None
         self.batch_jobs: Dict[str, Dict] = {}
         self.temp_dir = Path(tempfile.gettempdir()) / "mathspeak_api"
         self.temp_dir.mkdir(exist_ok=True)
+        # Server-wide processing SLA; requests may ask for a shorter one
+        self.processing_deadline: float = 10.0
 
 app_state = AppState()
 
+
+def request_deadline(seconds: Optional[float] = None) -> Deadline:
+    """Create the processing deadline for a request as it arrives"""
+    if seconds is None:
+        return Deadline(app_state.processing_deadline)
+    return Deadline(min(seconds, app_state.processing_deadline))
+
+
+async def process_expression(expression: str,
+                             context: Optional[MathematicalContext],
+                             deadline: Deadline,
+                             wait: bool = False):
+    """Run process_latex on the text pool, keeping the event loop free"""
+    if not app_state.executors:
+        raise ExecutorUnavailable("Executor layer not initialized")
+    return await app_state.executors.process_latex(
+        app_state.engine, expression, force_context=context,
+        deadline=deadline, wait=wait
+    )
+
+
+async def process_expressions(expressions: List[str],
+                              context: Optional[MathematicalContext],
+                              deadline_seconds: float,
+                              wait: bool = False):
+    """Run process_many on the text pool as one job"""
+    if not app_state.executors:
+        raise ExecutorUnavailable("Executor layer not initialized")
+    return await app_state.executors.process_many(
+        app_state.engine, expressions, force_context=context,
+        deadline_seconds=deadline_seconds, wait=wait
+    )
+
+
+# Voice the TTS engines are asked for
+DEFAULT_VOICE = "en-US-AriaNeural"
+
+
+def synthesize_audio(result, audio_file: Path, speed: float = 1.0) -> Path:
+    """Generate audio for a processed expression; runs on the TTS pool"""
+    return synthesize_text(result.processed, audio_file, speed)
+
+
+def synthesize_text(text: str, audio_file: Path, speed: float = 1.0) -> Path:
+    """
+    Generate audio for spoken text; runs on the TTS pool.
+    
+    Goes through the engine's TTS manager, so speech that was synthesized
+    before with the same voice and rate is copied from the audio cache.
+    """
+    if not app_state.engine:
+        raise RuntimeError("Engine not initialized")
+    success = asyncio.run(app_state.engine.tts_manager.synthesize(
+        text=text,
+        output_file=str(audio_file),
+        voice=DEFAULT_VOICE,
+        rate=f"{round((speed - 1.0) * 100):+d}%"
+    ))
+    if not success:
+        raise RuntimeError("Speech synthesis failed")
+    return audio_file
+
+
+# Sentences synthesizing at once for one /speak/stream response
+STREAM_SENTENCES_IN_FLIGHT = 3
+
+
+async def synthesize_sentence(text: str, speed: float, wait: bool = True) -> bytes:
+    """Synthesize one sentence on the TTS pool and return its audio"""
+    audio_file = app_state.temp_dir / f"stream_{uuid.uuid4().hex}.mp3"
+    try:
+        await app_state.executors.synthesize(synthesize_text, text, audio_file, speed, wait=wait)
+        return audio_file.read_bytes()
+    finally:
+        audio_file.unlink(missing_ok=True)
+
+
+async def stream_sentence_audio(sentences: List[str], speed: float = 1.0,
+                                in_flight: int = STREAM_SENTENCES_IN_FLIGHT):
+    """
+    Yield the audio of each sentence, in order, as soon as it is ready.
+
+    Up to in_flight sentences synthesize concurrently, so the sentences
+    after the first are usually ready by the time it has been sent. Only
+    the first sentence is admitted without waiting (and may raise
+    ExecutorBusy); later ones wait for a slot, since the response has
+    started by then. Closing the generator cancels pending synthesis.
+    """
+    if not app_state.executors:
+        raise ExecutorUnavailable("Executor layer not initialized")
+    
+    queued = iter(enumerate(sentences))
+    pending = deque()
+    
+    def fill():
+        for index, sentence in queued:
+            pending.append(asyncio.ensure_future(
+                synthesize_sentence(sentence, speed, wait=index > 0)
+            ))
+            if len(pending) >= in_flight:
+                return
+    
+    try:
+        fill()
+        while pending:
+            audio = await pending.popleft()
+            fill()
+            yield audio
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def overload_error(error: Exception) -> HTTPException:
+    """Map executor backpressure to 429 (queue full) or 503 (unavailable)"""
+    if isinstance(error, ExecutorBusy):
+        return HTTPException(status_code=429, detail=str(error), headers={"Retry-After": "1"})
+    return HTTPException(status_code=503, detail=str(error))
+
+# ===========================
+# Rate Limiting
+# ===========================
+
+def rate_limiter_from_env() -> Optional[RateLimiter]:
+    """
+    The per-client limiter configured by MATHSPEAK_RATE_LIMIT (requests per
+    MATHSPEAK_RATE_LIMIT_WINDOW seconds, default 60), or None when unset or
+    0. With MATHSPEAK_RATE_LIMIT_DB the buckets are kept in that SQLite
+    file, so every worker process using it enforces one shared limit;
+    otherwise each process limits on its own.
+    """
+    max_requests = int(os.environ.get("MATHSPEAK_RATE_LIMIT", "0") or 0)
+    if max_requests <= 0:
+        return None
+    window = float(os.environ.get("MATHSPEAK_RATE_LIMIT_WINDOW", "60"))
+    db_path = os.environ.get("MATHSPEAK_RATE_LIMIT_DB")
+    store = SQLiteRateLimitStore(Path(db_path)) if db_path else None
+    return RateLimiter(max_requests, window, store=store)
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware answering 429 to clients, keyed by address, that are
+    over their request rate. Health checks are never limited. Checks
+    against a shared store wait on other workers' writes, so they run in
+    a thread rather than on the event loop.
+    """
+    
+    EXEMPT_PATHS = frozenset({"/", "/health"})
+    
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] not in self.EXEMPT_PATHS:
+            client = scope.get("client")
+            key = client[0] if client else "unknown"
+            if isinstance(self.limiter.store, MemoryRateLimitStore):
+                allowed, retry_after = self.limiter.check(key)
+            else:
+                allowed, retry_after = await asyncio.to_thread(self.limiter.check, key)
+            if not allowed:
+                response = JSONResponse(
+                    {"detail": "Rate limit exceeded"},
+                    status_code=429,
+                    headers={
+                        "Retry-After": str(math.ceil(retry_after)),
+                        "X-RateLimit-Limit": str(self.limiter.max_requests),
+                    }
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
 # ===========================
 # Lifespan Management
 # ===========================
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Manage application lifespan"""
-    # Startup
-    logger.info("Starting MathSpeak API server...")
+def preload_app_state(domains: str = "") -> None:
+    """
+    Build the engine, pattern registry and expression cache, plus the
+    processors of the given domains ("all" or comma-separated names; other
+    domains load when first routed to). Called by the pre-fork server in
+    the parent process so workers share them copy-on-write; otherwise
+    called at startup.
+    """
+    from ..domains import DOMAIN_REGISTRY
     
-    # Initialize engine
     app_state.voice_manager = VoiceManager()
     app_state.engine = MathematicalTTSEngine(
         voice_manager=app_state.voice_manager,
@@ -136,12 +326,38 @@ async def lifespan(app: FastAPI):
         security_config=SecurityConfig(max_processing_time=30.0)
     )
     
+    names = list(DOMAIN_REGISTRY) if domains.strip() == "all" else domains.split(",")
+    for domain_name in filter(None, (name.strip() for name in names)):
+        try:
+            context = MathematicalContext(domain_name)
+        except ValueError:
+            logger.warning(f"No context routes to domain {domain_name!r}; not preloading it")
+            continue
+        app_state.engine.get_domain_processor(context)
+    
     logger.info("MathSpeak engine initialized")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Manage application lifespan"""
+    # Startup
+    logger.info("Starting MathSpeak API server...")
+    
+    # Initialize engine, unless the pre-fork parent already did
+    if app_state.engine is None:
+        preload_app_state()
+    
+    # Pools for CPU-bound text processing and TTS synthesis
+    app_state.executors = ExecutorLayer()
+    app_state.executors.start()
     
     yield
     
     # Shutdown
     logger.info("Shutting down MathSpeak API server...")
+    if app_state.executors:
+        app_state.executors.shutdown(wait=False)
     if app_state.engine:
         app_state.engine.shutdown()
     
@@ -163,6 +379,11 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Per-client rate limiting, added first so CORS headers wrap its 429s
+rate_limiter = rate_limiter_from_env()
+if rate_limiter is not None:
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
 # CORS middleware for web integration
 app.add_middleware(
     CORSMiddleware,
@@ -186,17 +407,23 @@ async def root():
 async def health_check():
     """Health check endpoint"""
     cache_stats = None
+    audio_cache_stats = None
     if app_state.engine:
         try:
             cache_stats = app_state.engine._get_cache_stats()
         except:
             pass
+        audio_cache = app_state.engine.tts_manager.audio_cache
+        if audio_cache is not None:
+            audio_cache_stats = audio_cache.get_stats()
     
     return HealthResponse(
         status="healthy",
         version="1.0.0",
         engine="ready" if app_state.engine else "not initialized",
-        cache_stats=cache_stats
+        cache_stats=cache_stats,
+        audio_cache_stats=audio_cache_stats,
+        executor_stats=app_state.executors.stats() if app_state.executors else None
     )
 
 
@@ -206,23 +433,16 @@ async def speak_math(expr: MathExpression):
     if not app_state.engine:
         raise HTTPException(status_code=503, detail="Engine not initialized")
     
+    deadline = request_deadline(expr.timeout)
+    
     try:
         # Process expression
         context = MathematicalContext(expr.context) if expr.context else None
-        result = app_state.engine.process_latex(
-            expr.expression,
-            force_context=context
-        )
+        result = await process_expression(expr.expression, context, deadline)
         
         # Generate audio
         audio_file = app_state.temp_dir / f"speech_{uuid.uuid4().hex}.mp3"
-        
-        # For now, return a placeholder since we need the actual TTS integration
-        # In production, this would call the TTS engine
-        # await app_state.voice_manager.generate_audio(result, audio_file, speed=expr.speed)
-        
-        # Placeholder: create empty file
-        audio_file.write_text("Audio would be here")
+        await app_state.executors.synthesize(synthesize_audio, result, audio_file, expr.speed)
         
         return FileResponse(
             path=audio_file,
@@ -230,10 +450,13 @@ async def speak_math(expr: MathExpression):
             filename=f"mathspeak_{int(time.time())}.{expr.format}",
             headers={
                 "X-Processing-Time": str(result.processing_time),
-                "X-Context": result.context
+                "X-Context": result.context,
+                "X-Partial": str(result.partial).lower()
             }
         )
         
+    except (ExecutorBusy, ExecutorUnavailable) as e:
+        raise overload_error(e)
     except Exception as e:
         logger.error(f"Error processing expression: {e}")
         error_msg = format_error(e, verbose=False, use_emoji=False)
@@ -246,21 +469,23 @@ async def speak_math_text(expr: MathExpression):
     if not app_state.engine:
         raise HTTPException(status_code=503, detail="Engine not initialized")
     
+    deadline = request_deadline(expr.timeout)
+    
     try:
         # Process expression
         context = MathematicalContext(expr.context) if expr.context else None
-        result = app_state.engine.process_latex(
-            expr.expression,
-            force_context=context
-        )
+        result = await process_expression(expr.expression, context, deadline)
         
         return ProcessingResponse(
             text=result.processed,
             context=result.context,
             processing_time=result.processing_time,
-            unknown_commands=result.unknown_commands
+            unknown_commands=result.unknown_commands,
+            partial=result.partial
         )
         
+    except (ExecutorBusy, ExecutorUnavailable) as e:
+        raise overload_error(e)
     except Exception as e:
         logger.error(f"Error processing expression: {e}")
         error_msg = format_error(e, verbose=False, use_emoji=False)
@@ -269,28 +494,37 @@ async def speak_math_text(expr: MathExpression):
 
 @app.post("/speak/stream")
 async def speak_math_stream(expr: MathExpression):
-    """Stream audio as it's generated"""
+    """Stream audio sentence by sentence as it is synthesized"""
     if not app_state.engine:
         raise HTTPException(status_code=503, detail="Engine not initialized")
     
+    deadline = request_deadline(expr.timeout)
+    
+    # Process and synthesize the first sentence before the response starts,
+    # so backpressure can still set the status
+    audio = None
+    first = b""
+    error = None
+    try:
+        context = MathematicalContext(expr.context) if expr.context else None
+        result = await process_expression(expr.expression, context, deadline)
+        sentences = [s for s in result.sentences if s.strip()] or [result.processed]
+        audio = stream_sentence_audio(sentences, expr.speed)
+        first = await audio.__anext__()
+    except (ExecutorBusy, ExecutorUnavailable) as e:
+        raise overload_error(e)
+    except Exception as e:
+        error = e
+    
     async def audio_generator():
         try:
-            # Process expression
-            context = MathematicalContext(expr.context) if expr.context else None
-            result = app_state.engine.process_latex(
-                expr.expression,
-                force_context=context
-            )
+            if error is not None:
+                raise error
             
-            # In production, this would stream actual audio chunks
-            # For now, yield text in chunks
-            text = result.processed
-            chunk_size = 50
-            
-            for i in range(0, len(text), chunk_size):
-                chunk = text[i:i + chunk_size]
-                yield chunk.encode()
-                await asyncio.sleep(0.1)  # Simulate streaming delay
+            async with aclosing(audio):
+                yield first
+                async for chunk in audio:
+                    yield chunk
                 
         except Exception as e:
             logger.error(f"Streaming error: {e}")
@@ -408,9 +642,8 @@ async def websocket_endpoint(websocket: WebSocket):
                 if context:
                     context = MathematicalContext(context)
                 
-                result = app_state.engine.process_latex(
-                    expression,
-                    force_context=context
+                result = await process_expression(
+                    expression, context, request_deadline(data.get("timeout"))
                 )
                 
                 # Send back result
@@ -422,6 +655,12 @@ async def websocket_endpoint(websocket: WebSocket):
                     "unknown_commands": result.unknown_commands
                 })
                 
+            except (ExecutorBusy, ExecutorUnavailable) as e:
+                await websocket.send_json({
+                    "type": "error",
+                    "status": overload_error(e).status_code,
+                    "error": str(e)
+                })
             except Exception as e:
                 error_msg = format_error(e, verbose=False, use_emoji=False)
                 await websocket.send_json({
@@ -445,28 +684,38 @@ async def process_batch_job(job_id: str, expressions: List[MathExpression]):
     job = app_state.batch_jobs[job_id]
     
     try:
+        # Expressions sharing a context and timeout are processed together
+        groups: Dict[Tuple[Optional[str], Optional[float]], List[int]] = {}
         for i, expr in enumerate(expressions):
+            groups.setdefault((expr.context, expr.timeout), []).append(i)
+        
+        for (context_value, timeout), indices in groups.items():
             try:
-                # Process expression
-                context = MathematicalContext(expr.context) if expr.context else None
-                result = app_state.engine.process_latex(
-                    expr.expression,
-                    force_context=context
+                # Each expression gets the request deadline from when it starts
+                deadline_seconds = request_deadline(timeout).seconds
+                context = MathematicalContext(context_value) if context_value else None
+                results = await process_expressions(
+                    [expressions[i].expression for i in indices], context,
+                    deadline_seconds, wait=True
                 )
                 
-                job["results"].append({
-                    "index": i,
-                    "text": result.processed,
-                    "context": result.context,
-                    "processing_time": result.processing_time
-                })
+                for i, result in zip(indices, results):
+                    job["results"].append({
+                        "index": i,
+                        "text": result.processed,
+                        "context": result.context,
+                        "processing_time": result.processing_time
+                    })
                 
             except Exception as e:
-                job["errors"].append({
-                    "index": i,
-                    "error": str(e)
-                })
+                for i in indices:
+                    job["errors"].append({
+                        "index": i,
+                        "error": str(e)
+                    })
         
+        job["results"].sort(key=lambda r: r["index"])
+        job["errors"].sort(key=lambda r: r["index"])
         job["status"] = "completed"
         
     except Exception as e:
@@ -75,7 +75,11 @@ def _load_components():
         ClarificationInjector,
     )
     
-    from .patterns_v2 import MathSpeechProcessor
+    from .patterns_v2 import (
+        MathSpeechProcessor,
+        get_shared_processor,
+        reload_shared_processor,
+    )
     # PatternProcessor is legacy - use MathSpeechProcessor
     PatternProcessor = MathSpeechProcessor
     
@@ -94,7 +98,7 @@ def create_engine(
     
     Args:
         enable_caching: Enable expression caching
-        enable_all_domains: Load all available domain processors
+        enable_all_domains: Route expressions to the enabled domain processors
         config_path: Path to configuration file
     
     Returns:
@@ -109,7 +113,7 @@ def create_engine(
     voice_manager = VoiceManager()
     context_memory = ContextMemory()
     natural_language = NaturalLanguageProcessor()
-    pattern_processor = PatternProcessor()
+    pattern_processor = get_shared_processor()
     
     # Create engine
     engine = MathematicalTTSEngine(
@@ -121,41 +125,26 @@ def create_engine(
     engine.context_memory = context_memory
     engine.pattern_processor = pattern_processor
     
-    # Load domain processors if requested
+    # Route to domain processors if requested
     if enable_all_domains:
         app_config = Config(config_dir=config_path)
         _load_domain_processors(engine, app_config)
+    else:
+        engine.enabled_domains = set()
     
     return engine
 
 def _load_domain_processors(engine: 'MathematicalTTSEngine', config: 'Config') -> None:
-    """Load enabled domain processors into engine"""
-    try:
-        # Import domain processors
-        from ..domains import (
-            TopologyProcessor,
-            ComplexAnalysisProcessor,
-            NumericalAnalysisProcessor,
-        )
-        
-        # Map of domain names to processor classes
-        domain_map = {
-            "topology": TopologyProcessor,
-            "complex_analysis": ComplexAnalysisProcessor,
-            "numerical_analysis": NumericalAnalysisProcessor,
-        }
-        
-        # Load enabled domains
-        for domain_name in config.domains.enabled_domains:
-            if domain_name in domain_map:
-                try:
-                    processor_class = domain_map[domain_name]
-                    engine.domain_processors[MathematicalContext(domain_name)] = processor_class()
-                    logger.info(f"Loaded {domain_name} processor")
-                except Exception as e:
-                    logger.error(f"Failed to load {domain_name} processor: {e}")
-    except ImportError as e:
-        logger.warning(f"Some domain processors not available: {e}")
+    """Route the engine to the enabled domains, each loaded on first use"""
+    from ..domains import is_domain_available
+    
+    enabled = set()
+    for domain_name in config.domains.enabled_domains:
+        if is_domain_available(domain_name):
+            enabled.add(domain_name)
+        else:
+            logger.warning(f"Domain processor not available: {domain_name}")
+    engine.enabled_domains = enabled
 
 # Lazy loading for main exports
 def __getattr__(name: str):
@@ -208,6 +197,8 @@ def __getattr__(name: str):
         # Pattern components
         'PatternProcessor': 'patterns',
         'MathSpeechProcessor': 'patterns',
+        'get_shared_processor': 'patterns_v2',
+        'reload_shared_processor': 'patterns_v2',
     }
     
     if name in component_map:
@@ -259,6 +250,8 @@ __all__ = [
     # Patterns
     'PatternProcessor',
     'MathSpeechProcessor',
+    'get_shared_processor',
+    'reload_shared_processor',
     
     # Convenience
     'create_engine',
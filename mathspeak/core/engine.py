@@ -15,8 +15,10 @@ Features:
 - Comprehensive error handling
 """
 
+import os
 import re
 import json
+import bisect
 import time
 import asyncio
 import logging
@@ -26,18 +28,26 @@ from typing import Dict, List, Optional, Tuple, Union, Set, Any, Callable
 from dataclasses import dataclass, field
 from collections import defaultdict, OrderedDict
 import hashlib
-# from concurrent.futures import ThreadPoolExecutor  # Currently unused
+import dataclasses
+import threading
+import concurrent.futures
 try:
     import edge_tts
 except ImportError:
     edge_tts = None
 
 # Import pattern processor v2
-from .patterns_v2 import process_math_to_speech, AudienceLevel
+from .patterns_v2 import process_math_to_speech, get_shared_processor, AudienceLevel
 
 # Import security validator
 from .security import LaTeXSecurityValidator, SecurityConfig, SecurityViolation
 
+# Import structural analysis (nesting, fractions, big operators)
+from .structure import FRACTIONS, INTEGRALS, LIMITS, analyze_structure
+
+# Import request deadlines
+from ..utils.timeout import Deadline, ProcessingTimeout, run_with_deadline
+
 # Import voice manager (would be from .voice_manager in package structure)
 # from .voice_manager import VoiceManager, VoiceRole, SpeechSegment, SpeedProfile
 
@@ -57,6 +67,15 @@ class ProcessedExpression:
     segments: List['SpeechSegment']
     processing_time: float
     unknown_commands: List[str] = field(default_factory=list)
+    partial: bool = False  # True if the processing budget ran out
+    sentences: List[str] = field(default_factory=list)  # processed split for synthesis
+    
+    def cache_size(self) -> int:
+        """Approximate cache footprint in bytes, close to the pickled size"""
+        # Segments and sentences usually split the processed text between them
+        return (200 + len(self.original) + len(self.context) + 2 * len(self.processed)
+                + len(self.segments) * (200 + len(self.processed) // max(1, len(self.segments)))
+                + 20 * len(self.unknown_commands) + 20 * len(self.sentences))
 
 @dataclass
 class PerformanceMetrics:
@@ -66,10 +85,17 @@ class PerformanceMetrics:
     cache_hits: int = 0
     cache_misses: int = 0
     unknown_commands_found: int = 0
+    # Time spent in, and expressions routed to, each domain processor
+    domain_time: Dict[str, float] = field(default_factory=dict)
+    domain_calls: Dict[str, int] = field(default_factory=dict)
     
     @property
     def tokens_per_second(self) -> float:
         return self.tokens_processed / max(self.total_time, 0.001)
+    
+    def record_domain(self, domain: str, elapsed: float) -> None:
+        self.domain_time[domain] = self.domain_time.get(domain, 0.0) + elapsed
+        self.domain_calls[domain] = self.domain_calls.get(domain, 0) + 1
 
 # ===========================
 # Mathematical Context Detection
@@ -160,6 +186,31 @@ class ContextDetector:
                 if pattern.search(text):
                     scores[context] += indicators['weight'] * 1.5  # Symbols are stronger indicators
         
+        return self._best_context(scores)
+    
+    def detect_contexts(self, texts: List[str]) -> List[Tuple[MathematicalContext, float]]:
+        """Detect the context of many texts, searching for each indicator once
+        
+        Gives the same results as calling detect_context on every text.
+        """
+        batch = _TextBatch(texts)
+        lowered = _TextBatch([text.lower() for text in texts])
+        scores = [defaultdict(float) for _ in texts]
+        
+        for context, indicators in self.context_indicators.items():
+            for keyword in indicators['keywords']:
+                for index in lowered.containing(keyword):
+                    scores[index][context] += indicators['weight']
+            
+            for pattern in indicators['compiled_symbols']:
+                for index in batch.matching(pattern):
+                    scores[index][context] += indicators['weight'] * 1.5
+        
+        return [self._best_context(text_scores) for text_scores in scores]
+    
+    def _best_context(self, scores: Dict[MathematicalContext, float]
+                      ) -> Tuple[MathematicalContext, float]:
+        """Pick the context with the highest indicator score"""
         if not scores:
             return MathematicalContext.GENERAL, 0.0
         
@@ -174,6 +225,48 @@ class ContextDetector:
         
         return best_context[0], confidence
 
+class _TextBatch:
+    """Many texts joined into one string, so a pattern is searched for once
+    
+    Texts are separated by a NUL character, which none of the indicators
+    can match, so every match lies within a single text.
+    """
+    
+    SEPARATOR = '\x00'
+    
+    def __init__(self, texts: List[str]):
+        self.joined = self.SEPARATOR.join(texts)
+        self.starts = []
+        position = 0
+        for text in texts:
+            self.starts.append(position)
+            position += len(text) + 1
+    
+    def _next_text(self, index: int) -> int:
+        """Start of the text after index, or the end of the batch"""
+        return self.starts[index + 1] if index + 1 < len(self.starts) else len(self.joined)
+    
+    def containing(self, literal: str) -> List[int]:
+        """Indices of the texts that contain literal"""
+        found = []
+        position = self.joined.find(literal)
+        while position != -1:
+            index = bisect.bisect_right(self.starts, position) - 1
+            found.append(index)
+            # One occurrence per text is enough
+            position = self.joined.find(literal, self._next_text(index))
+        return found
+    
+    def matching(self, pattern: re.Pattern) -> List[int]:
+        """Indices of the texts pattern.search finds a match in"""
+        found = []
+        match = pattern.search(self.joined)
+        while match is not None:
+            index = bisect.bisect_right(self.starts, match.start()) - 1
+            found.append(index)
+            match = pattern.search(self.joined, self._next_text(index))
+        return found
+
 # ===========================
 # Unknown LaTeX Tracker
 # ===========================
@@ -372,6 +465,62 @@ class NaturalLanguageEnhancer:
         
         return text
 
+# ===========================
+# Canonical Form
+# ===========================
+
+# Spacing commands, matched together with escaped backslashes so that the
+# "\\," in "a \\, b" is read as a line break followed by a comma
+_SPACING_COMMAND = re.compile(r'\\(\\|[,;:!]|q?quad(?![a-zA-Z]))')
+_HORIZONTAL_SPACE = re.compile(r'[ \t\f\v]+')
+
+
+def _spacing_replacement(match: re.Match) -> str:
+    command = match.group(1)
+    if command == '\\':
+        return '\\\\'
+    return '' if command == '!' else ' '
+
+
+def canonicalize_latex(latex: str) -> str:
+    """
+    Reduce LaTeX to a canonical form for cache keys.
+    
+    Removes $ delimiters and spacing commands (\\, \\; \\: \\! \\quad
+    \\qquad) and collapses whitespace, so x^2, $x^2$ and x^2\\, share a
+    key. Only rewrites that preprocessing makes as well are made: scripts
+    keep their braces and spacing, since the pattern rules read x^{2} and
+    x ^ 2 differently from x^2. Line breaks are kept, since % comments run to the
+    end of the line.
+    """
+    text = latex.replace('$', '')
+    if '\\' in text:
+        text = _SPACING_COMMAND.sub(_spacing_replacement, text)
+    lines = (_HORIZONTAL_SPACE.sub(' ', line).strip() for line in text.splitlines())
+    return '\n'.join(line for line in lines if line)
+
+# ===========================
+# Audience Level Detection
+# ===========================
+
+# Complexity indicators for audience level detection
+AUDIENCE_INDICATORS = {
+    level: [re.compile(indicator, re.IGNORECASE) for indicator in indicators]
+    for level, indicators in {
+        AudienceLevel.HIGH_SCHOOL: [r'solve', r'find', r'calculate', r'x\s*=', r'factor', r'simplify'],
+        AudienceLevel.UNDERGRADUATE: [r'derivative', r'matrix', r'continuous'],
+        AudienceLevel.GRADUATE: [r'topology', r'manifold', r'hausdorff', r'compact'],
+        AudienceLevel.RESEARCH: [r'lemma', r'theorem', r'conjecture', r'proof', r'corollary', r'proposition'],
+    }.items()
+}
+
+# Commands that indicate an audience level, read from the text's structure
+# rather than searched for: each group counts once however often it occurs
+AUDIENCE_COMMANDS = {
+    AudienceLevel.UNDERGRADUATE: [LIMITS, frozenset(INTEGRALS), FRACTIONS],
+    AudienceLevel.GRADUATE: [frozenset({'forall'}), frozenset({'exists'})],
+}
+
 # ===========================
 # Main TTS Engine
 # ===========================
@@ -396,8 +545,9 @@ class MathematicalTTSEngine:
         self.security_validator = LaTeXSecurityValidator(security_config)
         self.enable_security = kwargs.get('enable_security', True)
         
-        # Pattern processor v2 is now used directly via process_math_to_speech
-        # No need to initialize anything here
+        # Pattern processor v2 is shared process-wide; building it here keeps
+        # pattern compilation off the first request's latency
+        self.pattern_processor = get_shared_processor()
         
         # Performance optimization
         self.enable_caching = enable_caching
@@ -407,10 +557,14 @@ class MathematicalTTSEngine:
         self.enable_caching = enable_caching
         self.max_cache_size = 1000
         
+        # Worker threads for process_many, started on first use
+        self.batch_workers = kwargs.get('batch_workers', min(4, os.cpu_count() or 1))
+        self._batch_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._batch_pool_lock = threading.Lock()
+        
         if enable_caching:
             try:
                 import sys
-                import os
                 # Add the mathspeak directory to path for imports
                 current_dir = os.path.dirname(os.path.abspath(__file__))
                 mathspeak_dir = os.path.dirname(current_dir)
@@ -428,9 +582,17 @@ class MathematicalTTSEngine:
             self.expression_cache = {}
             self._use_advanced_cache = False
         
-        # Initialize TTS engine manager
+        # Initialize TTS engine manager, reusing audio already synthesized
         from .tts_engines import TTSEngineManager
-        self.tts_manager = TTSEngineManager(prefer_offline=self.prefer_offline_tts)
+        audio_cache = kwargs.get('audio_cache')
+        if audio_cache is None and enable_caching:
+            try:
+                from ..utils.audio_cache import get_audio_cache
+                audio_cache = get_audio_cache()
+            except Exception as e:
+                logger.warning(f"Failed to initialize audio cache: {e}")
+        self.tts_manager = TTSEngineManager(prefer_offline=self.prefer_offline_tts,
+                                            audio_cache=audio_cache)
         
         # Configuration
         self.config = self._load_config(config_path) if config_path else {}
@@ -438,11 +600,46 @@ class MathematicalTTSEngine:
         # Performance metrics
         self.metrics = PerformanceMetrics()
         
-        # Mathematical processors (would import from domain modules)
+        # Domain processors by context. Entries placed here are used as is;
+        # any other registered domain is imported and built the first time
+        # an expression is routed to it. enabled_domains limits routing to
+        # the named domains (None routes to all of them).
         self.domain_processors: Dict[MathematicalContext, Any] = {}
+        self.enabled_domains: Optional[Set[str]] = kwargs.get('enabled_domains')
+        self._unavailable_domains: Set[MathematicalContext] = set()
         
         logger.info("Mathematical TTS Engine initialized")
     
+    def get_domain_processor(self, context: MathematicalContext) -> Optional[Any]:
+        """Get the processor for a context, loading its domain on first use
+        
+        Returns None for contexts without a domain processor (general,
+        algebra), for domains not enabled, and for domains that failed to
+        load.
+        """
+        processor = self.domain_processors.get(context)
+        if processor is not None or context in self._unavailable_domains:
+            return processor
+        if self.enabled_domains is not None and context.value not in self.enabled_domains:
+            return None
+        
+        from ..domains import get_domain_processor, is_domain_available
+        if not is_domain_available(context.value):
+            return None
+        try:
+            processor = get_domain_processor(context.value)
+        except Exception as e:
+            logger.error(f"Failed to load {context.value} processor: {e}")
+            self._unavailable_domains.add(context)
+            return None
+        self.domain_processors[context] = processor
+        return processor
+    
+    def _needs_domain_vocabulary(self, text: str) -> bool:
+        """Whether text uses a LaTeX command the general patterns do not speak"""
+        known = get_shared_processor().commands
+        return any(command not in known for command in re.findall(r'\\([a-zA-Z]+)', text))
+    
     def _load_config(self, config_path: Path) -> Dict[str, Any]:
         """Load engine configuration"""
         try:
@@ -455,20 +652,25 @@ class MathematicalTTSEngine:
     def process_latex(self, 
                       latex: str, 
                       force_context: Optional[MathematicalContext] = None,
-                      show_progress: bool = False) -> ProcessedExpression:
-        """Process LaTeX expression into speech segments"""
+                      show_progress: bool = False,
+                      deadline: Optional[Union[float, Deadline]] = None) -> ProcessedExpression:
+        """Process LaTeX expression into speech segments
+        
+        Args:
+            latex: LaTeX expression to process
+            force_context: Override the detected mathematical context
+            show_progress: Show a progress indicator for long expressions
+            deadline: Per-request deadline, either seconds from now or a
+                utils.timeout.Deadline. It is checked between stages and
+                between pattern rules; if it runs out the result is partial
+                and flagged as such.
+                Defaults to ProcessingTimeout for the expression length.
+        """
         start_time = time.time()
         
         # Validate input
         if not latex or not latex.strip():
-            return ProcessedExpression(
-                original=latex,
-                processed="No mathematical expression provided.",
-                context="empty",
-                segments=[],
-                processing_time=0.0,
-                unknown_commands=[]
-            )
+            return self._empty_result(latex)
         
         # Initialize progress tracking
         progress = None
@@ -477,38 +679,183 @@ class MathematicalTTSEngine:
             progress = ProgressIndicator(total=6, description="Processing LaTeX")
             progress.start()
         
-        # Check cache
-        cache_key = self._get_cache_key(latex, force_context)
+        audience_level = self._detect_audience_level(latex)
+        
+        # Check cache; inputs that differ only in notation the pipeline
+        # ignores share an entry through the canonical form
+        cache_key = self._get_cache_key(canonicalize_latex(latex), force_context, audience_level)
         if self.enable_caching:
             cached = self._get_from_cache(cache_key)
             if cached:
                 self.metrics.cache_hits += 1
                 if progress:
                     progress.finish("Loaded from cache")
+                if cached.original != latex:
+                    cached = dataclasses.replace(cached, original=latex)
                 return cached
         
         self.metrics.cache_misses += 1
         
+        return self._process_miss(latex, latex, audience_level, cache_key,
+                                  force_context, deadline, start_time, progress)
+    
+    def process_many(self,
+                     expressions: List[str],
+                     force_context: Optional[MathematicalContext] = None,
+                     deadline: Optional[Union[float, Deadline]] = None,
+                     parallel: bool = True) -> List[ProcessedExpression]:
+        """Process a batch of LaTeX expressions into speech segments
+        
+        Returns the same results as calling process_latex on each
+        expression, in input order, but does the shared work once per batch:
+        expressions with the same canonical form are processed once, the
+        cache is checked for all of them in one pass, security validation
+        and context and audience detection run as batched steps over the
+        misses, and the remaining stages run on the engine's worker pool.
+        
+        Errors are per expression: one that fails validation or processing
+        gets the same error result process_latex returns for it, and the
+        rest of the batch is unaffected.
+        
+        Args:
+            expressions: LaTeX expressions to process
+            force_context: Override the detected mathematical context
+            deadline: Deadline for each expression, as for process_latex;
+                a utils.timeout.Deadline is shared by the whole batch
+            parallel: Process misses on the worker pool; False processes
+                them on the calling thread, e.g. inside a pool worker
+        """
+        results: List[Optional[ProcessedExpression]] = [None] * len(expressions)
+        
+        # Inputs to process, with empty inputs answered directly
+        pending: Dict[int, str] = {}
+        for index, latex in enumerate(expressions):
+            if not latex or not latex.strip():
+                results[index] = self._empty_result(latex)
+            else:
+                pending[index] = latex
+        
+        # Group inputs by cache key, so each is processed once
+        levels = self._detect_audience_levels(list(pending.values()))
+        audience_levels = dict(zip(pending, levels))
+        groups: Dict[str, List[int]] = {}
+        for index, latex in pending.items():
+            cache_key = self._get_cache_key(canonicalize_latex(latex), force_context,
+                                            audience_levels[index])
+            groups.setdefault(cache_key, []).append(index)
+        
+        # One pass over the cache
+        misses = []
+        for cache_key, indices in groups.items():
+            cached = self._get_from_cache(cache_key) if self.enable_caching else None
+            if cached:
+                self.metrics.cache_hits += len(indices)
+                self._fill_results(results, indices, expressions, cached)
+            else:
+                # Duplicates within the batch are served by the one result
+                self.metrics.cache_misses += 1
+                self.metrics.cache_hits += len(indices) - 1
+                misses.append(cache_key)
+        
+        # Security validation of the misses
+        jobs = []
+        for cache_key in misses:
+            index = groups[cache_key][0]
+            latex = pending[index]
+            if self.enable_security:
+                try:
+                    latex = self.security_validator.validate_and_sanitize(latex)
+                except SecurityViolation as e:
+                    for duplicate in groups[cache_key]:
+                        results[duplicate] = self._security_error(expressions[duplicate], e)
+                    continue
+                except Exception as e:
+                    logger.error(f"Error validating LaTeX: {e}", exc_info=True)
+                    self._fill_results(results, groups[cache_key], expressions,
+                                       self._error_result(expressions[index], e, [], time.time()))
+                    continue
+            jobs.append((cache_key, index, latex))
+        
+        # Context detection of the misses
+        if force_context:
+            detected = [(force_context, 1.0)] * len(jobs)
+        else:
+            detected = self.context_detector.detect_contexts([latex for _, _, latex in jobs])
+        
+        def run(job: Tuple[str, int, str], context: Tuple[MathematicalContext, float]
+                ) -> ProcessedExpression:
+            cache_key, index, latex = job
+            return self._process_miss(expressions[index], latex, audience_levels[index], cache_key,
+                                      force_context, deadline, time.time(),
+                                      validated=True, detected=context)
+        
+        # The remaining stages, on the worker pool
+        if parallel and len(jobs) > 1 and self.batch_workers > 1:
+            processed = self._get_batch_pool().map(run, jobs, detected)
+        else:
+            processed = map(run, jobs, detected)
+        for (cache_key, _, _), result in zip(jobs, processed):
+            self._fill_results(results, groups[cache_key], expressions, result)
+        
+        return results
+    
+    def _fill_results(self, results: List[Optional[ProcessedExpression]], indices: List[int],
+                      expressions: List[str], result: ProcessedExpression) -> None:
+        """Give every input in indices the result, with its own original text"""
+        for index in indices:
+            if result.original != expressions[index]:
+                results[index] = dataclasses.replace(result, original=expressions[index])
+            else:
+                results[index] = result
+    
+    def _get_batch_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        """Worker pool for process_many, started on first use"""
+        with self._batch_pool_lock:
+            if self._batch_pool is None:
+                self._batch_pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.batch_workers, thread_name_prefix="mathspeak-batch"
+                )
+            return self._batch_pool
+    
+    def _empty_result(self, latex: str) -> ProcessedExpression:
+        """Result for an empty input"""
+        return ProcessedExpression(
+            original=latex,
+            processed="No mathematical expression provided.",
+            context="empty",
+            segments=[],
+            processing_time=0.0,
+            unknown_commands=[]
+        )
+    
+    def _process_miss(self,
+                      original_latex: str,
+                      latex: str,
+                      audience_level: AudienceLevel,
+                      cache_key: str,
+                      force_context: Optional[MathematicalContext],
+                      deadline: Optional[Union[float, Deadline]],
+                      start_time: float,
+                      progress: Optional[Any] = None,
+                      validated: bool = False,
+                      detected: Optional[Tuple[MathematicalContext, float]] = None
+                      ) -> ProcessedExpression:
+        """Run the processing stages for an expression not in the cache
+        
+        process_many passes validated=True and the detected context for
+        expressions it already validated and detected as a batch.
+        """
         # Initialize unknown_commands to avoid UnboundLocalError
         unknown_commands = []
         
         try:
             # Step 0: Security validation
-            if self.enable_security:
+            if self.enable_security and not validated:
                 try:
                     # Validate and sanitize the input
                     latex = self.security_validator.validate_and_sanitize(latex)
                 except SecurityViolation as e:
-                    # Return a safe error message
-                    logger.warning(f"Security violation: {e}")
-                    error_result = ProcessedExpression(
-                        original=latex[:100] + "..." if len(latex) > 100 else latex,
-                        processed=f"Security error: {str(e)}",
-                        context="error",
-                        segments=[],
-                        processing_time=0.0,
-                        unknown_commands=[]
-                    )
+                    error_result = self._security_error(original_latex, e)
                     if progress:
                         progress.finish("Security error")
                     return error_result
@@ -517,27 +864,23 @@ class MathematicalTTSEngine:
             if progress:
                 progress.set_progress(1)
             
-            import sys
-            import os
-            # Add the mathspeak directory to path for imports
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            mathspeak_dir = os.path.dirname(current_dir)
-            if mathspeak_dir not in sys.path:
-                sys.path.insert(0, mathspeak_dir)
-            from utils.timeout import timeout_with_fallback
-            context, confidence = timeout_with_fallback(
-                lambda: self.context_detector.detect_context(latex),
-                timeout_seconds=5.0,
-                fallback=(MathematicalContext.GENERAL, 0.0),
-                operation="context detection"
+            deadline = Deadline.coerce(
+                deadline, ProcessingTimeout.get_timeout(len(latex), "process")
             )
+            budget = deadline.fork()
+            
+            if detected is None:
+                detected = run_with_deadline(
+                    lambda: self.context_detector.detect_context(latex),
+                    budget,
+                    fallback=(MathematicalContext.GENERAL, 0.0),
+                    operation="context detection"
+                )
+            context, confidence = detected
             
             if force_context:
                 context = force_context
             
-            # Detect audience level based on text complexity
-            audience_level = self._detect_audience_level(latex)
-            
             logger.debug(f"Detected context: {context.value} (confidence: {confidence:.2f})")
             logger.debug(f"Detected audience level: {audience_level.value}")
             
@@ -545,13 +888,28 @@ class MathematicalTTSEngine:
             if progress:
                 progress.set_progress(2)
             
-            processed_text = timeout_with_fallback(
+            processed_text = run_with_deadline(
                 lambda: self._preprocess_latex(latex),
-                timeout_seconds=3.0,
+                budget,
                 fallback=latex,
                 operation="preprocessing"
             )
             
+            # Domain vocabulary, only for expressions using commands the
+            # general patterns have no rule for; everything else reads
+            # exactly as the general patterns speak it
+            domain_processor = (self.get_domain_processor(context)
+                                if self._needs_domain_vocabulary(processed_text) else None)
+            if domain_processor is not None:
+                domain_start = time.perf_counter()
+                processed_text = run_with_deadline(
+                    lambda: domain_processor.process(processed_text),
+                    budget,
+                    fallback=processed_text,
+                    operation=f"{context.value} processing"
+                )
+                self.metrics.record_domain(context.value, time.perf_counter() - domain_start)
+            
             # Step 3: Extract unknown commands
             if progress:
                 progress.set_progress(3)
@@ -567,9 +925,9 @@ class MathematicalTTSEngine:
                 progress.set_progress(4)
             
             # Use the new pattern processor with audience level
-            processed_text = timeout_with_fallback(
-                lambda: process_math_to_speech(processed_text, audience_level),
-                timeout_seconds=5.0,
+            processed_text = run_with_deadline(
+                lambda: process_math_to_speech(processed_text, audience_level, budget),
+                budget,
                 fallback=processed_text,
                 operation="pattern processing"
             )
@@ -595,20 +953,28 @@ class MathematicalTTSEngine:
             
             # Create result
             result = ProcessedExpression(
-                original=latex,
+                original=original_latex,
                 processed=processed_text,
                 context=context.value,
                 segments=segments,
                 processing_time=time.time() - start_time,
-                unknown_commands=unknown_commands
+                unknown_commands=unknown_commands,
+                partial=budget.exhausted,
+                sentences=sentences
             )
             
+            if result.partial:
+                logger.warning(
+                    f"Processing budget of {budget.seconds}s exhausted "
+                    f"at {budget.exhausted_at or 'stage boundary'}; returning partial result"
+                )
+            
             # Update metrics
             self.metrics.tokens_processed += len(latex.split())
             self.metrics.total_time += result.processing_time
             
-            # Cache result
-            if self.enable_caching:
+            # Never cache partial results
+            if self.enable_caching and not result.partial:
                 self._add_to_cache(cache_key, result)
             
             if progress:
@@ -621,26 +987,45 @@ class MathematicalTTSEngine:
             if progress:
                 progress.finish("Processing failed")
             
-            # Return safe fallback with better error message
-            error_msg = "I encountered an error processing this mathematical expression. "
-            if "timeout" in str(e).lower():
-                error_msg += "The expression was too complex and timed out. "
-            elif unknown_commands:
-                error_msg += f"Unknown LaTeX commands were found: {', '.join(unknown_commands[:3])}. "
-            else:
-                error_msg += "Please check the LaTeX syntax. "
-            
-            return ProcessedExpression(
-                original=latex,
-                processed=error_msg,
-                context="error",
-                segments=[],
-                processing_time=time.time() - start_time
-            )
+            return self._error_result(original_latex, e, unknown_commands, start_time)
+    
+    def _security_error(self, original_latex: str, error: SecurityViolation) -> ProcessedExpression:
+        """Safe result for an expression that failed security validation"""
+        logger.warning(f"Security violation: {error}")
+        return ProcessedExpression(
+            original=original_latex[:100] + "..." if len(original_latex) > 100 else original_latex,
+            processed=f"Security error: {str(error)}",
+            context="error",
+            segments=[],
+            processing_time=0.0,
+            unknown_commands=[]
+        )
+    
+    def _error_result(self, original_latex: str, error: Exception,
+                      unknown_commands: List[str], start_time: float) -> ProcessedExpression:
+        """Safe fallback result for an expression whose processing failed"""
+        # Return safe fallback with better error message
+        error_msg = "I encountered an error processing this mathematical expression. "
+        if "timeout" in str(error).lower():
+            error_msg += "The expression was too complex and timed out. "
+        elif unknown_commands:
+            error_msg += f"Unknown LaTeX commands were found: {', '.join(unknown_commands[:3])}. "
+        else:
+            error_msg += "Please check the LaTeX syntax. "
+        
+        return ProcessedExpression(
+            original=original_latex,
+            processed=error_msg,
+            context="error",
+            segments=[],
+            processing_time=time.time() - start_time
+        )
     
-    def _get_cache_key(self, latex: str, context: Optional[MathematicalContext]) -> str:
-        """Generate cache key for expression"""
-        content = f"{latex}:{context.value if context else 'auto'}"
+    def _get_cache_key(self, latex: str, context: Optional[MathematicalContext],
+                       audience_level: Optional[AudienceLevel] = None) -> str:
+        """Generate cache key for a canonical expression"""
+        content = (f"{latex}:{context.value if context else 'auto'}:"
+                   f"{audience_level.value if audience_level else 'auto'}")
         return hashlib.md5(content.encode()).hexdigest()
     
     def _get_cache_stats(self) -> Dict[str, Any]:
@@ -725,22 +1110,41 @@ class MathematicalTTSEngine:
     
     def _detect_audience_level(self, text: str) -> AudienceLevel:
         """Detect audience level based on text complexity"""
-        # Look for complexity indicators
-        complexity_indicators = {
-            AudienceLevel.HIGH_SCHOOL: [r'solve', r'find', r'calculate', r'x\s*=', r'factor', r'simplify'],
-            AudienceLevel.UNDERGRADUATE: [r'\\lim', r'\\int', r'derivative', r'matrix', r'\\frac', r'continuous'],
-            AudienceLevel.GRADUATE: [r'\\forall', r'\\exists', r'topology', r'manifold', r'hausdorff', r'compact'],
-            AudienceLevel.RESEARCH: [r'lemma', r'theorem', r'conjecture', r'proof', r'corollary', r'proposition'],
-        }
-        
         # Count matches for each level
         scores = {level: 0 for level in AudienceLevel}
         
-        for level, indicators in complexity_indicators.items():
+        for level, indicators in AUDIENCE_INDICATORS.items():
             for indicator in indicators:
-                if re.search(indicator, text, re.IGNORECASE):
+                if indicator.search(text):
                     scores[level] += 1
+        self._score_audience_commands(text, scores)
+        
+        return self._audience_from_scores(scores)
+    
+    def _detect_audience_levels(self, texts: List[str]) -> List[AudienceLevel]:
+        """Detect the audience level of many texts, searching for each indicator once"""
+        batch = _TextBatch(texts)
+        scores = [{level: 0 for level in AudienceLevel} for _ in texts]
+        
+        for level, indicators in AUDIENCE_INDICATORS.items():
+            for indicator in indicators:
+                for index in batch.matching(indicator):
+                    scores[index][level] += 1
+        for text, text_scores in zip(texts, scores):
+            self._score_audience_commands(text, text_scores)
         
+        return [self._audience_from_scores(text_scores) for text_scores in scores]
+    
+    def _score_audience_commands(self, text: str, scores: Dict[AudienceLevel, int]) -> None:
+        """Add the command indicators found in text's structure to scores"""
+        commands = analyze_structure(text).commands
+        for level, groups in AUDIENCE_COMMANDS.items():
+            for names in groups:
+                if any(name in commands for name in names):
+                    scores[level] += 1
+    
+    def _audience_from_scores(self, scores: Dict[AudienceLevel, int]) -> AudienceLevel:
+        """Pick the audience level with the most complexity indicators"""
         # Find the level with highest score
         max_score = max(scores.values())
         if max_score == 0:
@@ -870,7 +1274,17 @@ class MathematicalTTSEngine:
                 'cache_hit_rate': self.metrics.cache_hits / max(self.metrics.cache_hits + self.metrics.cache_misses, 1),
                 'unknown_commands': self.metrics.unknown_commands_found,
             },
+            'domains': {
+                domain: {
+                    'expressions': calls,
+                    'total_time': self.metrics.domain_time[domain],
+                    'avg_time': self.metrics.domain_time[domain] / calls,
+                }
+                for domain, calls in self.metrics.domain_calls.items()
+            },
             'cache': self._get_cache_stats(),
+            'audio_cache': (self.tts_manager.audio_cache.get_stats()
+                            if self.tts_manager.audio_cache is not None else None),
             'unknown_commands': self.unknown_tracker.get_session_summary(),
         }
     
@@ -880,6 +1294,10 @@ class MathematicalTTSEngine:
     
     def shutdown(self) -> None:
         """Clean shutdown of engine"""
+        if self._batch_pool is not None:
+            self._batch_pool.shutdown(cancel_futures=True)
+            self._batch_pool = None
+        
         self.save_unknown_commands()
         
         # Save cache to disk
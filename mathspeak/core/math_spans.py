@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Math Span Scanner
+=================
+
+Finds the math in LaTeX source in one pass: $...$, $$...$$, \\(...\\),
+\\[...\\] and the equation, align and gather environments (starred or
+not). Escaped dollars (\\$) and percent signs (\\%) are text, and % starts
+a comment that runs to the end of the line.
+
+The scanner is incremental: it is fed the source a chunk at a time and
+returns each span as soon as its closing delimiter arrives, holding back
+only the unfinished span (or a trailing $ or \\begin{... that might
+still grow into a longer delimiter). iter_math_spans uses it to stream the spans of a file of
+any size with bounded memory; it scans bytes, so offsets are byte
+offsets, and the encoding must be ASCII-compatible (UTF-8, Latin-1).
+Every reader of LaTeX in the package finds its math here, so they all
+agree on what is math.
+
+A span left open for more than max_span characters, e.g. after a stray
+$, is given up: its opening delimiter is read as text and scanning goes
+on right after it.
+"""
+
+import contextlib
+import re
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Pattern, Union
+
+# Bytes read per chunk by iter_math_spans
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+# Longest span kept while waiting for its closing delimiter
+MAX_SPAN_LENGTH = 100_000
+
+_TOKEN_PATTERN = (
+    r'\\(?P<env_side>begin|end)\{(?P<env>equation|align|gather)\*?\}'
+    r'|(?P<delim>\\[()\[\]])'
+    r'|(?P<escape>\\[$%\\])'
+    r'|(?P<dollar>\$\$?)'
+    r'|(?P<comment>%)'
+)
+_TOKEN = re.compile(_TOKEN_PATTERN)
+_BYTES_TOKEN = re.compile(_TOKEN_PATTERN.encode('ascii'))
+
+# Length of the longest token, \begin{equation*}
+_MAX_TOKEN = len(r'\begin{equation*}')
+
+# Tokens starting with a backslash; a trailing proper prefix of one may
+# still grow into it
+_BACKSLASH_TOKENS = [
+    f'\\{side}{{{env}{star}}}'
+    for side in ('begin', 'end')
+    for env in ('equation', 'align', 'gather')
+    for star in ('', '*')
+] + ['\\(', '\\)', '\\[', '\\]', '\\$', '\\%', '\\\\']
+
+# Kind and closing delimiter of each opening delimiter
+_OPENERS = {
+    '$': ('inline', '$'),
+    '$$': ('display', '$$'),
+    '\\(': ('inline', '\\)'),
+    '\\[': ('display', '\\]'),
+}
+
+
+@dataclass
+class MathSpan:
+    """A math span found in LaTeX source"""
+    content: str  # Between the delimiters, not stripped
+    kind: str     # inline, display, equation, align or gather
+    start: int    # Offset of the opening delimiter
+    end: int      # Offset just past the closing delimiter
+
+
+class MathSpanScanner:
+    """Incremental scanner for the math spans of LaTeX source
+
+    Feed it str or, with binary=True, bytes; spans carry content of the
+    same type and offsets counted in characters or bytes respectively.
+    With comments=False a % is text, as in sources that are not TeX files
+    (HTML flashcard fields, for one).
+    """
+
+    def __init__(self, binary: bool = False, max_span: int = MAX_SPAN_LENGTH,
+                 comments: bool = True):
+        self.binary = binary
+        self.max_span = max_span
+        self.comments = comments
+        self._token = _BYTES_TOKEN if binary else _TOKEN
+        self._newline = b'\n' if binary else '\n'
+        self._backslash = b'\\' if binary else '\\'
+        self._dollar = b'$' if binary else '$'
+        self._prefixes = ([token.encode('ascii') for token in _BACKSLASH_TOKENS]
+                          if binary else _BACKSLASH_TOKENS)
+        self._buffer = b'' if binary else ''
+        self._base = 0  # Offset of the buffer's first character
+        self._pos = 0   # Scan position in the buffer
+        # Scanned text of the open span, which ends where the buffer starts
+        self._spill = []
+        self._spilled = 0
+        self._in_comment = False
+        # Open span: (kind, closing delimiter, start, content start);
+        # offsets are absolute
+        self._open = None
+        if binary:
+            self._openers = {key.encode('ascii'): (kind, closer.encode('ascii'))
+                             for key, (kind, closer) in _OPENERS.items()}
+        else:
+            self._openers = _OPENERS
+
+    @property
+    def position(self) -> int:
+        """Offset up to which the input has been scanned"""
+        return self._base + self._pos
+
+    @property
+    def open_start(self) -> Optional[int]:
+        """Offset of the span waiting for its closing delimiter, if any"""
+        return self._open[2] if self._open is not None else None
+
+    def feed(self, data) -> List[MathSpan]:
+        """Scan the next chunk of source; returns the spans it completed"""
+        self._buffer += data
+        return self._scan(final=False)
+
+    def close(self) -> List[MathSpan]:
+        """Finish scanning; returns the spans completed by the end of input"""
+        return self._scan(final=True)
+
+    def _scan(self, final: bool) -> List[MathSpan]:
+        spans = []
+        # Tokens starting at or after hold (an absolute offset) may still
+        # be incomplete
+        hold = self._base + (len(self._buffer) if final else self._hold(self._buffer))
+
+        while True:
+            # _close_span and _give_up may move the buffer's start
+            buffer = self._buffer
+            if self._in_comment:
+                newline = buffer.find(self._newline, self._pos)
+                if newline == -1:
+                    self._pos = len(buffer)
+                    if final:
+                        self._in_comment = False
+                    else:
+                        break
+                else:
+                    self._pos = newline + 1
+                    self._in_comment = False
+                    continue
+
+            match = self._token.search(buffer, self._pos)
+            if match is not None and not final and self._may_grow(match, buffer):
+                hold = min(hold, self._base + match.start())
+            if match is None or self._base + match.start() >= hold:
+                # Everything before hold has been scanned
+                if self._open is not None and (final or self._overlong(hold - self._base)):
+                    self._give_up()
+                    continue
+                if not final:
+                    self._pos = max(self._pos, hold - self._base)
+                break
+            if self._open is not None and self._overlong(match.start()):
+                self._give_up()
+                continue
+
+            self._pos = match.end()
+            kind = match.lastgroup
+            if kind == 'escape':
+                continue
+            if kind == 'comment':
+                self._in_comment = self.comments
+            elif self._open is None:
+                self._open_span(match, kind)
+            else:
+                span = self._close_span(match, kind)
+                if span is not None:
+                    spans.append(span)
+
+        # Scanned text of an open span is set aside, so that feeding a long
+        # span costs the size of each chunk rather than of the whole span;
+        # other scanned text is dropped
+        buffer = self._buffer
+        if self._open is not None:
+            start = max(self._open[2] - self._base, 0)
+            if self._pos > start:
+                self._spill.append(buffer[start:self._pos])
+                self._spilled += self._pos - start
+        if self._pos > 0:
+            self._buffer = buffer[self._pos:]
+            self._base += self._pos
+            self._pos = 0
+        return spans
+
+    def _unspill(self) -> int:
+        """Put the set-aside text back in the buffer; returns the shift"""
+        shift = self._spilled
+        if shift:
+            self._buffer = self._buffer[:0].join(self._spill) + self._buffer
+            self._base -= shift
+            self._pos += shift
+            self._spill = []
+            self._spilled = 0
+        return shift
+
+    def _hold(self, buffer) -> int:
+        """Start of a trailing backslash sequence that may grow into a token"""
+        index = buffer.find(self._backslash, max(self._pos, len(buffer) - _MAX_TOKEN))
+        while index != -1:
+            tail = buffer[index:]
+            if any(len(token) > len(tail) and token.startswith(tail) for token in self._prefixes):
+                return index
+            index = buffer.find(self._backslash, index + 1)
+        return len(buffer)
+
+    def _may_grow(self, match: re.Match, buffer) -> bool:
+        """Whether a $ ending the input may still become $$"""
+        if match.end() != len(buffer) or match.group() != self._dollar:
+            return False
+        # Inside $...$ the first $ of $$ closes anyway
+        return self._open is None or self._open[1] != self._dollar
+
+    def _open_span(self, match: re.Match, kind: str) -> None:
+        token = match.group()
+        start = self._base + match.start()
+        if kind == 'env':
+            if match.group('env_side') in ('begin', b'begin'):
+                env = match.group('env')
+                # \begin{align*} closes with \end{align*}
+                closer = (b'\\end' if self.binary else '\\end') + token[len('\\begin'):]
+                name = env.decode('ascii') if self.binary else env
+                self._open = (name, closer, start, self._base + match.end())
+        elif token in self._openers:
+            name, closer = self._openers[token]
+            self._open = (name, closer, start, self._base + match.end())
+
+    def _close_span(self, match: re.Match, kind: str) -> Optional[MathSpan]:
+        name, closer, start, content_start = self._open
+        token = match.group()
+        if token != closer and not (kind == 'dollar' and closer in ('$', b'$')):
+            return None
+        close_start = match.start() + self._unspill()
+        if token != closer:
+            # $a$$b$ is two inline spans: the first $ of $$ closes
+            self._pos = close_start + 1
+        close_end = close_start + len(closer)
+        self._open = None
+        content = self._buffer[content_start - self._base:close_start]
+        return MathSpan(content=content, kind=name, start=start, end=self._base + close_end)
+
+    def _overlong(self, position: int) -> bool:
+        """Whether a closing delimiter at buffer position comes too late"""
+        return self._base + position - self._open[2] > self.max_span
+
+    def _give_up(self) -> None:
+        """Read the open span's delimiter as text and scan on after it"""
+        self._unspill()
+        self._pos = self._open[3] - self._base
+        self._open = None
+        self._in_comment = False
+
+
+def find_math_spans(text: str, max_span: int = MAX_SPAN_LENGTH,
+                    comments: bool = True) -> List[MathSpan]:
+    """All math spans of a LaTeX string, with character offsets"""
+    scanner = MathSpanScanner(max_span=max_span, comments=comments)
+    return scanner.feed(text) + scanner.close()
+
+
+def iter_outside_math(text: str, separator: Pattern,
+                      spans: Optional[List[MathSpan]] = None) -> Iterator[re.Match]:
+    """
+    The matches of separator that fall outside the math of text.
+
+    A sentence boundary inside $a. b$ is not a boundary. spans are the
+    text's math spans if already found; they are found otherwise.
+    """
+    if spans is None:
+        spans = find_math_spans(text)
+    span_index = 0
+    for match in separator.finditer(text):
+        # Skip spans ending before the match; the next one may contain it
+        while span_index < len(spans) and spans[span_index].end <= match.start():
+            span_index += 1
+        if span_index == len(spans) or spans[span_index].start >= match.end():
+            yield match
+
+
+def split_outside_math(text: str, separator: Pattern,
+                       spans: Optional[List[MathSpan]] = None) -> List[str]:
+    """Split text at the matches of separator that fall outside its math"""
+    parts = []
+    last = 0
+    for match in iter_outside_math(text, separator, spans):
+        parts.append(text[last:match.start()])
+        last = match.end()
+    parts.append(text[last:])
+    return parts
+
+
+def iter_math_spans(source: Union[str, Path, BinaryIO],
+                    chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    encoding: str = 'utf-8',
+                    max_span: int = MAX_SPAN_LENGTH) -> Iterator[MathSpan]:
+    """
+    Stream the math spans of a LaTeX file, with byte offsets.
+
+    Args:
+        source: Path of the file, or an open binary file or mmap
+        chunk_size: Bytes read at a time
+        encoding: Encoding the span contents are decoded with
+        max_span: Longest span kept while waiting for its closing delimiter
+
+    Yields:
+        Spans in document order, with str content
+    """
+    scanner = MathSpanScanner(binary=True, max_span=max_span)
+    if isinstance(source, (str, Path)):
+        stream = open(source, 'rb')
+    else:
+        stream = contextlib.nullcontext(source)
+    with stream as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            for span in scanner.feed(chunk):
+                yield replace(span, content=span.content.decode(encoding, errors='replace'))
+    for span in scanner.close():
+        yield replace(span, content=span.content.decode(encoding, errors='replace'))
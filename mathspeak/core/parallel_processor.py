@@ -8,16 +8,20 @@ Enables parallel processing of large documents and multiple expressions.
 
 import asyncio
 import concurrent.futures
+import functools
 import multiprocessing
 import logging
 import time
-from typing import List, Dict, Any, Tuple, Optional, Callable
-from dataclasses import dataclass
+from collections import deque
+from collections.abc import Sized
+from itertools import islice
+from typing import List, Dict, Any, Tuple, Optional, Callable, Iterable, Iterator, BinaryIO, Union
+from dataclasses import dataclass, replace
 from pathlib import Path
-import re
 from tqdm import tqdm
 
-from .engine import MathematicalTTSEngine, ProcessedExpression
+from .engine import MathematicalTTSEngine, MathematicalContext, ProcessedExpression
+from .math_spans import DEFAULT_CHUNK_SIZE, MathSpan, find_math_spans, iter_math_spans
 
 
 logger = logging.getLogger(__name__)
@@ -43,32 +47,132 @@ class ProcessingResult:
 
 
 class ParallelProcessor:
-    """Processes multiple expressions in parallel"""
+    """
+    Processes multiple expressions on a persistent worker pool.
+    
+    Tasks are sent to the pool in chunks and results come back in task
+    order. Two modes are available:
+    
+    - "process": a process pool; each worker builds its engine once in the
+      pool initializer and keeps it for every chunk. Pattern processing is
+      pure Python, so this is the mode that uses several cores.
+    - "thread": a thread pool sharing one engine. Cheap to start, so it
+      suits small batches, but the GIL keeps it on roughly one core.
+    
+    "auto" picks threads for batches below AUTO_PROCESS_THRESHOLD tasks
+    (or a single worker) and processes otherwise.
+    """
+    
+    AUTO_PROCESS_THRESHOLD = 256  # tasks needed to amortize process startup
+    MAX_CHUNK_SIZE = 64
     
     def __init__(self, 
                  num_workers: Optional[int] = None,
                  use_multiprocessing: bool = False,
-                 show_progress: bool = True):
+                 show_progress: bool = True,
+                 mode: Optional[str] = None,
+                 chunk_size: Optional[int] = None,
+                 engine_options: Optional[Dict[str, Any]] = None):
         """
         Initialize parallel processor.
         
         Args:
             num_workers: Number of workers (None for auto)
-            use_multiprocessing: Use multiprocessing instead of threading
+            use_multiprocessing: Shorthand for mode="process"
             show_progress: Show progress bar
+            mode: "thread", "process" or "auto" (default "thread", or
+                "process" if use_multiprocessing is set)
+            chunk_size: Tasks per dispatched chunk (None for auto)
+            engine_options: Keyword arguments for each MathematicalTTSEngine
         """
         self.num_workers = num_workers or multiprocessing.cpu_count()
-        self.use_multiprocessing = use_multiprocessing
+        self.mode = mode or ("process" if use_multiprocessing else "thread")
+        if self.mode not in ("thread", "process", "auto"):
+            raise ValueError(f"Unknown processing mode: {self.mode}")
+        self.use_multiprocessing = self.mode == "process"
         self.show_progress = show_progress
+        self.chunk_size = chunk_size
+        self.engine_options = engine_options or {}
+        
+        # Pools and the thread-mode engine are created on first use and
+        # reused until shutdown
+        self._engine: Optional[MathematicalTTSEngine] = None
+        self._thread_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._process_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+    
+    def resolve_mode(self, task_count: Optional[int]) -> str:
+        """Pool mode used for a batch of task_count tasks"""
+        if self.mode != "auto":
+            return self.mode
+        if self.num_workers == 1:
+            return "thread"
+        if task_count is not None and task_count < self.AUTO_PROCESS_THRESHOLD:
+            return "thread"
+        return "process"
+    
+    def _chunk_size_for(self, task_count: Optional[int]) -> int:
+        if self.chunk_size:
+            return self.chunk_size
+        if task_count is None:
+            return self.MAX_CHUNK_SIZE
+        # About four chunks per worker keeps workers busy until the end
+        return max(1, min(self.MAX_CHUNK_SIZE, task_count // (self.num_workers * 4)))
+    
+    def _pool_for(self, mode: str) -> Tuple[concurrent.futures.Executor, Callable]:
+        """Executor and chunk function for a mode, starting the pool if needed"""
+        if mode == "process":
+            if self._process_pool is None:
+                self._process_pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.num_workers,
+                    initializer=_init_worker,
+                    initargs=(self.engine_options,)
+                )
+            return self._process_pool, _process_chunk
         
-        # Create engine pool
-        self.engines = []
-        self._initialize_engines()
+        if self._thread_pool is None:
+            self._engine = MathematicalTTSEngine(**self.engine_options)
+            self._thread_pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.num_workers, thread_name_prefix="mathspeak-parallel"
+            )
+        return self._thread_pool, functools.partial(_run_chunk, self._engine)
     
-    def _initialize_engines(self):
-        """Initialize processing engines"""
-        for _ in range(self.num_workers):
-            self.engines.append(MathematicalTTSEngine())
+    def _dispatch(self, tasks: Iterable[ProcessingTask]
+                  ) -> Iterator[Tuple[List[ProcessingTask], concurrent.futures.Future]]:
+        """
+        Submit tasks in chunks, yielding (chunk, future) pairs in task order.
+        
+        At most two chunks per worker are in flight, so long or lazy task
+        streams are not materialized up front.
+        """
+        task_count = len(tasks) if isinstance(tasks, Sized) else None
+        executor, func = self._pool_for(self.resolve_mode(task_count))
+        size = self._chunk_size_for(task_count)
+        window = self.num_workers * 2
+        
+        pending = deque()
+        iterator = iter(tasks)
+        while True:
+            chunk = list(islice(iterator, size))
+            if not chunk:
+                break
+            pending.append((chunk, executor.submit(func, chunk)))
+            if len(pending) >= window:
+                yield pending.popleft()
+        while pending:
+            yield pending.popleft()
+    
+    def iter_results(self, tasks: Iterable[ProcessingTask]) -> Iterator[ProcessingResult]:
+        """
+        Process tasks, yielding results in task order as they become ready.
+        
+        Args:
+            tasks: Processing tasks; may be a lazy iterable
+            
+        Yields:
+            One ProcessingResult per task
+        """
+        for chunk, future in self._dispatch(tasks):
+            yield from _collect_chunk(chunk, future.result)
     
     async def process_tasks(self, tasks: List[ProcessingTask]) -> List[ProcessingResult]:
         """
@@ -83,267 +187,270 @@ class ParallelProcessor:
         if not tasks:
             return []
         
-        logger.info(f"Processing {len(tasks)} tasks with {self.num_workers} workers")
+        mode = self.resolve_mode(len(tasks))
+        logger.info(f"Processing {len(tasks)} tasks with {self.num_workers} {mode} workers")
         
         # Create progress bar
         pbar = None
         if self.show_progress:
             pbar = tqdm(total=len(tasks), desc="Processing expressions")
         
-        # Process based on mode
-        if self.use_multiprocessing:
-            results = await self._process_multiprocessing(tasks, pbar)
-        else:
-            results = await self._process_asyncio(tasks, pbar)
-        
-        if pbar:
-            pbar.close()
+        results = []
+        try:
+            for chunk, future in self._dispatch(tasks):
+                wrapped = asyncio.wrap_future(future)
+                try:
+                    await asyncio.wait([wrapped])
+                except asyncio.CancelledError:
+                    future.cancel()
+                    raise
+                results.extend(_collect_chunk(chunk, wrapped.result))
+                if pbar:
+                    pbar.update(len(chunk))
+        finally:
+            if pbar:
+                pbar.close()
         
         # Sort results by task ID
         results.sort(key=lambda r: r.task_id)
         
         return results
     
-    async def _process_asyncio(self, tasks: List[ProcessingTask], 
-                              pbar: Optional[tqdm]) -> List[ProcessingResult]:
-        """Process tasks using asyncio"""
-        semaphore = asyncio.Semaphore(self.num_workers)
-        
-        async def process_task(task: ProcessingTask, engine_idx: int) -> ProcessingResult:
-            async with semaphore:
-                start_time = time.time()
-                try:
-                    engine = self.engines[engine_idx % len(self.engines)]
-                    result = engine.process_latex(task.expression)
-                    
-                    duration = time.time() - start_time
-                    
-                    if pbar:
-                        pbar.update(1)
-                    
-                    return ProcessingResult(
-                        task_id=task.id,
-                        success=True,
-                        result=result,
-                        duration=duration
-                    )
-                    
-                except Exception as e:
-                    logger.error(f"Task {task.id} failed: {e}")
-                    
-                    if pbar:
-                        pbar.update(1)
-                    
-                    return ProcessingResult(
-                        task_id=task.id,
-                        success=False,
-                        error=str(e),
-                        duration=time.time() - start_time
-                    )
-        
-        # Create tasks
-        coroutines = [
-            process_task(task, i) for i, task in enumerate(tasks)
-        ]
-        
-        # Run all tasks
-        results = await asyncio.gather(*coroutines, return_exceptions=True)
-        
-        # Handle exceptions
-        processed_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                processed_results.append(ProcessingResult(
-                    task_id=tasks[i].id,
-                    success=False,
-                    error=str(result)
-                ))
-            else:
-                processed_results.append(result)
-        
-        return processed_results
+    def shutdown(self):
+        """Shutdown the worker pools and engine"""
+        if self._process_pool is not None:
+            self._process_pool.shutdown(cancel_futures=True)
+            self._process_pool = None
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(cancel_futures=True)
+            self._thread_pool = None
+        if self._engine is not None:
+            self._engine.shutdown()
+            self._engine = None
+
+
+# ===========================
+# Worker Functions
+# ===========================
+
+_worker_engine: Optional[MathematicalTTSEngine] = None
+
+
+def _init_worker(engine_options: Dict[str, Any]) -> None:
+    """Build the worker process's engine once, before its first chunk"""
+    global _worker_engine
+    _worker_engine = MathematicalTTSEngine(**engine_options)
+
+
+def _process_chunk(tasks: List[ProcessingTask]) -> List[ProcessingResult]:
+    """Worker function for process mode"""
+    return _run_chunk(_worker_engine, tasks)
+
+
+def _run_chunk(engine: MathematicalTTSEngine,
+               tasks: List[ProcessingTask]) -> List[ProcessingResult]:
+    """Process a chunk of tasks on one engine, one process_many batch per context"""
+    groups: Dict[Optional[MathematicalContext], List[int]] = {}
+    for position, task in enumerate(tasks):
+        groups.setdefault(_task_context(task), []).append(position)
     
-    async def _process_multiprocessing(self, tasks: List[ProcessingTask],
-                                     pbar: Optional[tqdm]) -> List[ProcessingResult]:
-        """Process tasks using multiprocessing"""
-        loop = asyncio.get_event_loop()
-        
-        with concurrent.futures.ProcessPoolExecutor(max_workers=self.num_workers) as executor:
-            # Submit all tasks
-            futures = []
-            for task in tasks:
-                future = loop.run_in_executor(
-                    executor,
-                    _process_task_worker,
-                    task
+    results: List[Optional[ProcessingResult]] = [None] * len(tasks)
+    for context, positions in groups.items():
+        start_time = time.time()
+        try:
+            processed = engine.process_many(
+                [tasks[position].expression for position in positions],
+                force_context=context, parallel=False
+            )
+        except Exception as e:
+            logger.error(f"Batch of {len(positions)} tasks failed: {e}")
+            for position in positions:
+                results[position] = ProcessingResult(
+                    task_id=tasks[position].id,
+                    success=False,
+                    error=str(e),
+                    duration=time.time() - start_time
                 )
-                futures.append(future)
-            
-            # Collect results
-            results = []
-            for future in asyncio.as_completed(futures):
-                result = await future
-                results.append(result)
-                
-                if pbar:
-                    pbar.update(1)
-            
-            return results
+            continue
+        
+        for position, result in zip(positions, processed):
+            results[position] = ProcessingResult(
+                task_id=tasks[position].id,
+                success=True,
+                result=result,
+                duration=result.processing_time
+            )
     
-    def shutdown(self):
-        """Shutdown all engines"""
-        for engine in self.engines:
-            engine.shutdown()
+    return results
 
 
-def _process_task_worker(task: ProcessingTask) -> ProcessingResult:
-    """Worker function for multiprocessing"""
-    start_time = time.time()
-    
+def _task_context(task: ProcessingTask) -> Optional[MathematicalContext]:
+    """The task's context if it names a mathematical context"""
+    if not task.context:
+        return None
     try:
-        # Create new engine in worker process
-        engine = MathematicalTTSEngine()
-        result = engine.process_latex(task.expression)
-        engine.shutdown()
-        
-        return ProcessingResult(
-            task_id=task.id,
-            success=True,
-            result=result,
-            duration=time.time() - start_time
-        )
-        
+        return MathematicalContext(task.context)
+    except ValueError:
+        # e.g. "inline" or "display" from DocumentProcessor
+        return None
+
+
+def _collect_chunk(chunk: List[ProcessingTask],
+                   get_results: Callable[[], List[ProcessingResult]]) -> List[ProcessingResult]:
+    """Results of a finished chunk, or one failure per task if the chunk failed"""
+    try:
+        return get_results()
     except Exception as e:
-        return ProcessingResult(
-            task_id=task.id,
-            success=False,
-            error=str(e),
-            duration=time.time() - start_time
-        )
+        logger.error(f"Chunk of {len(chunk)} tasks failed: {e}")
+        return [ProcessingResult(task_id=task.id, success=False, error=str(e))
+                for task in chunk]
 
 
 class DocumentProcessor:
-    """Processes entire LaTeX documents"""
+    """
+    Processes entire LaTeX documents.
+    
+    Math spans are found by a single-pass incremental scanner and fed to
+    the parallel processor as they are found; the processor keeps only a
+    bounded window of chunks in flight, so iter_file streams a file of any
+    size with flat memory. Expressions repeated in a document are not
+    deduplicated up front; repeats are answered by the engine's cache.
+    """
     
     def __init__(self, parallel_processor: Optional[ParallelProcessor] = None):
         self.processor = parallel_processor or ParallelProcessor()
-        
-        # Regex patterns for LaTeX environments
-        self.math_patterns = [
-            # Display math
-            (r'\$\$(.*?)\$\$', 'display'),
-            # Inline math
-            (r'\$(.*?)\$', 'inline'),
-            # Display environments
-            (r'\\begin\{equation\}(.*?)\\end\{equation\}', 'equation'),
-            (r'\\begin\{align\}(.*?)\\end\{align\}', 'align'),
-            (r'\\begin\{gather\}(.*?)\\end\{gather\}', 'gather'),
-            # Inline environments
-            (r'\\\((.*?)\\\)', 'inline'),
-            (r'\\\[(.*?)\\\]', 'display'),
-        ]
     
     def extract_math_expressions(self, document: str) -> List[Tuple[str, str, int]]:
         """
         Extract mathematical expressions from document.
         
         Returns:
-            List of (expression, type, position) tuples
+            List of (expression, type, position) tuples, each distinct
+            expression once, at its first position
         """
+        seen = set()
         expressions = []
+        for span in find_math_spans(document):
+            expression = span.content.strip()
+            if expression and expression not in seen:
+                seen.add(expression)
+                expressions.append((expression, span.kind, span.start))
         
-        for pattern, math_type in self.math_patterns:
-            for match in re.finditer(pattern, document, re.DOTALL):
-                expression = match.group(1).strip()
-                if expression:
-                    expressions.append((expression, math_type, match.start()))
-        
-        # Sort by position
-        expressions.sort(key=lambda x: x[2])
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_expressions = []
-        for expr, math_type, pos in expressions:
-            if expr not in seen:
-                seen.add(expr)
-                unique_expressions.append((expr, math_type, pos))
+        return expressions
+    
+    def iter_document(self, document: str) -> Iterator[Dict[str, Any]]:
+        """
+        Process the math of a LaTeX document, yielding results as they complete.
         
-        return unique_expressions
+        Yields:
+            One result dictionary per expression, in document order;
+            positions are character offsets
+        """
+        return self._iter_spans(find_math_spans(document))
     
-    async def process_document(self, document: str) -> Dict[str, Any]:
+    def iter_file(self, source: Union[Path, BinaryIO],
+                  chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  encoding: str = 'utf-8') -> Iterator[Dict[str, Any]]:
         """
-        Process an entire LaTeX document.
+        Stream the math of a LaTeX file through the processor.
+        
+        The file is read chunk_size bytes at a time, so memory stays flat
+        however large it is.
         
         Args:
-            document: LaTeX document content
+            source: Path of the file, or an open binary file or mmap
+            chunk_size: Bytes read at a time
+            encoding: Encoding of the file; must be ASCII-compatible
             
-        Returns:
-            Dictionary with processed expressions and metadata
+        Yields:
+            One result dictionary per expression, in document order;
+            positions are byte offsets
         """
-        start_time = time.time()
-        
-        # Extract expressions
-        expressions = self.extract_math_expressions(document)
-        logger.info(f"Found {len(expressions)} mathematical expressions")
-        
-        if not expressions:
-            return {
-                'expressions': [],
-                'total_time': 0.0,
-                'success_rate': 1.0
-            }
-        
-        # Create tasks
-        tasks = [
-            ProcessingTask(
-                id=i,
-                expression=expr,
-                context=math_type
-            )
-            for i, (expr, math_type, _) in enumerate(expressions)
-        ]
-        
-        # Process in parallel
-        results = await self.processor.process_tasks(tasks)
-        
-        # Compile results
-        processed_expressions = []
-        successes = 0
-        
-        for i, result in enumerate(results):
-            expr_data = {
-                'original': expressions[i][0],
-                'type': expressions[i][1],
-                'position': expressions[i][2],
+        return self._iter_spans(iter_math_spans(source, chunk_size, encoding))
+    
+    def _iter_spans(self, spans: Iterable[MathSpan]) -> Iterator[Dict[str, Any]]:
+        # Spans whose tasks have been dispatched but not yet yielded; as
+        # long as the processor's in-flight window
+        in_flight = deque()
+        
+        def tasks() -> Iterator[ProcessingTask]:
+            task_id = 0
+            for span in spans:
+                expression = span.content.strip()
+                if expression:
+                    in_flight.append((expression, span))
+                    yield ProcessingTask(id=task_id, expression=expression, context=span.kind)
+                    task_id += 1
+        
+        for result in self.processor.iter_results(tasks()):
+            expression, span = in_flight.popleft()
+            yield {
+                'original': expression,
+                'type': span.kind,
+                'position': span.start,
                 'success': result.success,
                 'processed': result.result.processed if result.result else None,
                 'error': result.error,
                 'duration': result.duration
             }
-            processed_expressions.append(expr_data)
-            
-            if result.success:
-                successes += 1
+    
+    def _summarize(self, records: Iterator[Dict[str, Any]],
+                   keep_expressions: bool) -> Dict[str, Any]:
+        """Consume result records into the summary returned by process_document"""
+        start_time = time.time()
+        expressions = []
+        total = successes = 0
         
-        total_time = time.time() - start_time
+        pbar = None
+        if self.processor.show_progress:
+            pbar = tqdm(desc="Processing expressions", unit="expr")
+        try:
+            for record in records:
+                total += 1
+                if record['success']:
+                    successes += 1
+                if keep_expressions:
+                    expressions.append(record)
+                if pbar:
+                    pbar.update(1)
+        finally:
+            if pbar:
+                pbar.close()
         
+        logger.info(f"Processed {total} mathematical expressions")
         return {
-            'expressions': processed_expressions,
-            'total_time': total_time,
-            'success_rate': successes / len(results) if results else 1.0,
-            'total_expressions': len(expressions),
+            'expressions': expressions,
+            'total_time': time.time() - start_time,
+            'success_rate': successes / total if total else 1.0,
+            'total_expressions': total,
             'successful': successes,
-            'failed': len(expressions) - successes
+            'failed': total - successes
         }
     
-    async def process_file(self, filepath: Path) -> Dict[str, Any]:
-        """Process a LaTeX file"""
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
+    async def process_document(self, document: str,
+                               keep_expressions: bool = True) -> Dict[str, Any]:
+        """
+        Process an entire LaTeX document.
+        
+        Args:
+            document: LaTeX document content
+            keep_expressions: Include each expression's result; without
+                them only the counts are kept
             
-            result = await self.process_document(content)
+        Returns:
+            Dictionary with processed expressions and metadata
+        """
+        return await asyncio.to_thread(
+            self._summarize, self.iter_document(document), keep_expressions
+        )
+    
+    async def process_file(self, filepath: Path,
+                           keep_expressions: bool = True) -> Dict[str, Any]:
+        """Process a LaTeX file, streaming it from disk"""
+        try:
+            result = await asyncio.to_thread(
+                self._summarize, self.iter_file(filepath), keep_expressions
+            )
             result['filename'] = filepath.name
             
             return result
@@ -364,13 +471,14 @@ class BatchProcessor:
         self.processor = parallel_processor or ParallelProcessor()
         self.document_processor = DocumentProcessor(self.processor)
     
-    async def process_files(self, filepaths: List[Path]) -> Dict[str, Any]:
+    async def process_files(self, filepaths: List[Path],
+                            keep_expressions: bool = True) -> Dict[str, Any]:
         """Process multiple files"""
         results = []
         
         for filepath in filepaths:
             logger.info(f"Processing file: {filepath}")
-            result = await self.document_processor.process_file(filepath)
+            result = await self.document_processor.process_file(filepath, keep_expressions)
             results.append(result)
         
         # Aggregate statistics
@@ -389,13 +497,19 @@ class BatchProcessor:
         }
     
     async def process_expressions(self, expressions: List[str]) -> List[ProcessingResult]:
-        """Process a list of expressions"""
+        """Process a list of expressions, each distinct expression once"""
+        unique = list(dict.fromkeys(expressions))
         tasks = [
             ProcessingTask(id=i, expression=expr)
-            for i, expr in enumerate(expressions)
+            for i, expr in enumerate(unique)
         ]
         
-        return await self.processor.process_tasks(tasks)
+        results = await self.processor.process_tasks(tasks)
+        by_expression = dict(zip(unique, results))
+        return [
+            replace(by_expression[expr], task_id=i)
+            for i, expr in enumerate(expressions)
+        ]
     
     def shutdown(self):
         """Shutdown the processor"""
@@ -7,6 +7,8 @@ organized into focused modules for better maintainability.
 
 Structure:
 - base.py: Abstract base classes and core types
+- prefilter.py: Literal trigger extraction used to skip non-matching rules
+- symbol_tables.py: Single-pass command to word tables for final cleanup
 - arithmetic.py: Basic arithmetic patterns
 - algebra.py: Algebraic expression patterns
 - calculus.py: Calculus and analysis patterns
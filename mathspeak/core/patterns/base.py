@@ -9,11 +9,15 @@ the pattern matching system.
 
 import re
 import logging
-from typing import Dict, List, Optional, Tuple, Union, Callable, Any
+from typing import Dict, List, Optional, Tuple, Union, Callable, Any, Pattern, Iterable
 from dataclasses import dataclass
 from enum import Enum
 from abc import ABC, abstractmethod
 
+from . import prefilter
+from .prefilter import extract_trigger
+from ...utils.timeout import Deadline
+
 logger = logging.getLogger(__name__)
 
 # ===========================
@@ -54,9 +58,34 @@ class PatternRule:
     
     def __post_init__(self):
         self.compiled = re.compile(self.pattern)
+        # Literal that must be present for the pattern to match (or None)
+        self.trigger = extract_trigger(self.pattern)
         if self.audience_levels is None:
             self.audience_levels = list(AudienceLevel)
 
+# An execution plan is the frozen, priority-ordered sequence of
+# (compiled regex, replacement, description, trigger) steps for one
+# audience level; a step whose trigger is absent from the text is skipped
+PlanStep = Tuple[Pattern, Union[str, Callable], str, Optional[str]]
+PatternPlan = Tuple[PlanStep, ...]
+
+def build_pattern_plan(patterns: Iterable[PatternRule],
+                       audience: Optional[AudienceLevel] = None) -> PatternPlan:
+    """Filter rules by audience (None keeps all) and order them by priority"""
+    applicable = [
+        p for p in patterns
+        if audience is None or audience in p.audience_levels
+    ]
+    
+    # Stable sort, so equal priorities keep their declaration order
+    applicable.sort(key=lambda p: p.priority, reverse=True)
+    
+    use_triggers = prefilter.PREFILTER_ENABLED
+    return tuple(
+        (p.compiled, p.replacement, p.description, p.trigger if use_triggers else None)
+        for p in applicable
+    )
+
 # ===========================
 # Abstract Base Classes
 # ===========================
@@ -68,35 +97,53 @@ class PatternHandler(ABC):
         self.domain = domain
         self.patterns: List[PatternRule] = []
         self._init_patterns()
+        self._plans: Dict[AudienceLevel, PatternPlan] = {}
+        self.invalidate_plans()
     
     @abstractmethod
     def _init_patterns(self):
         """Initialize patterns for this handler"""
         pass
     
-    def process(self, text: str, audience: AudienceLevel = AudienceLevel.UNDERGRADUATE) -> str:
-        """Process text with patterns appropriate for audience"""
-        result = text
-        
-        # Filter patterns by audience level
-        applicable_patterns = [
-            p for p in self.patterns 
-            if audience in p.audience_levels
-        ]
+    def add_pattern(self, rule: PatternRule) -> None:
+        """Add a pattern rule and rebuild the execution plans"""
+        self.patterns.append(rule)
+        self.invalidate_plans()
+    
+    def invalidate_plans(self) -> None:
+        """Rebuild the per-audience plans after self.patterns changed"""
+        # Build into a fresh dict and swap it in, so concurrent readers
+        # always see a complete set of plans
+        self._plans = {
+            level: build_pattern_plan(self.patterns, level)
+            for level in AudienceLevel
+        }
+    
+    def get_plan(self, audience: AudienceLevel) -> PatternPlan:
+        """Get the precomputed execution plan for an audience level"""
+        plan = self._plans.get(audience)
+        if plan is None:
+            plan = build_pattern_plan(self.patterns, audience)
+        return plan
+    
+    def process(self, text: str, audience: AudienceLevel = AudienceLevel.UNDERGRADUATE,
+                budget: Optional[Deadline] = None) -> str:
+        """Process text with patterns appropriate for audience
         
-        # Sort by priority (highest first)
-        applicable_patterns.sort(key=lambda p: p.priority, reverse=True)
+        If a budget is given it is checked before each rule, and the text
+        is returned as far as it got once the budget has run out.
+        """
+        result = text
         
-        for pattern_rule in applicable_patterns:
+        for compiled, replacement, description, trigger in self.get_plan(audience):
+            if trigger is not None and trigger not in result:
+                continue
+            if budget is not None and budget.spent(description):
+                break
             try:
-                if callable(pattern_rule.replacement):
-                    # Custom function replacement
-                    result = pattern_rule.compiled.sub(pattern_rule.replacement, result)
-                else:
-                    # Simple string replacement
-                    result = pattern_rule.compiled.sub(pattern_rule.replacement, result)
+                result = compiled.sub(replacement, result)
             except Exception as e:
-                logger.warning(f"Pattern application failed: {pattern_rule.description}: {e}")
+                logger.warning(f"Pattern application failed: {description}: {e}")
         
         return result
     
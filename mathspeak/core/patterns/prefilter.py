@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Literal Trigger Prefilter for Pattern Rules
+===========================================
+
+Most rules can only match when a fixed substring such as ``\\frac`` or
+``\\int`` occurs in the text. This module extracts that required literal
+(the rule's *trigger*) from the regex itself, so the expensive regex scan
+can be skipped with a cheap substring test when the trigger is absent.
+
+Skipping is exact: a regex whose every match contains the trigger cannot
+change a text that does not contain it, so outputs are byte-identical
+with or without the prefilter.
+"""
+
+import re
+import functools
+from typing import Callable, List, Optional, Pattern, Tuple, Union
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_parse
+
+# Set to False to run every rule unconditionally (used by differential tests)
+PREFILTER_ENABLED = True
+
+_REPEAT_OPS = tuple(
+    op for op in (
+        getattr(sre_parse, 'MAX_REPEAT', None),
+        getattr(sre_parse, 'MIN_REPEAT', None),
+        getattr(sre_parse, 'POSSESSIVE_REPEAT', None),
+    )
+    if op is not None
+)
+
+def _required_literals(parsed) -> List[str]:
+    """Collect literal runs that every match of a parsed sequence contains"""
+    runs = []
+    current = []
+
+    for op, av in parsed:
+        if op == sre_parse.LITERAL:
+            current.append(chr(av))
+            continue
+
+        # Anything else ends the current run of adjacent literals
+        if current:
+            runs.append(''.join(current))
+            current = []
+
+        if op == sre_parse.SUBPATTERN:
+            _, add_flags, del_flags, sub = av
+            # Groups are mandatory unless their flags change matching rules
+            if not add_flags and not del_flags:
+                runs.extend(_required_literals(sub))
+        elif op in _REPEAT_OPS:
+            min_count, _, sub = av
+            if min_count >= 1:
+                runs.extend(_required_literals(sub))
+        # Alternations, classes and lookarounds contribute nothing required
+
+    if current:
+        runs.append(''.join(current))
+
+    return runs
+
+def extract_trigger(pattern: str, flags: int = 0) -> Optional[str]:
+    """Return the longest literal every match of pattern must contain
+
+    Returns None when no such literal can be proven, in which case the
+    rule must always run.
+    """
+    try:
+        if re.compile(pattern, flags).flags & re.IGNORECASE:
+            return None
+        runs = _required_literals(sre_parse.parse(pattern, flags))
+    except Exception:
+        return None
+
+    if not runs:
+        return None
+    return max(runs, key=len)
+
+@functools.lru_cache(maxsize=None)
+def _compile_guarded(pattern: str, flags: int) -> Tuple[Pattern, Optional[str]]:
+    """Compile a pattern together with its trigger, once per process"""
+    return re.compile(pattern, flags), extract_trigger(pattern, flags)
+
+def guarded_sub(pattern: str, repl: Union[str, Callable], text: str, flags: int = 0) -> str:
+    """Drop-in for re.sub that skips the scan when the trigger is absent"""
+    compiled, trigger = _compile_guarded(pattern, flags)
+    if trigger is not None and PREFILTER_ENABLED and trigger not in text:
+        return text
+    return compiled.sub(repl, text)
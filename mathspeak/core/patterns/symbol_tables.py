@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Command Word Tables for Final Cleanup
+=====================================
+
+Literal LaTeX command to spoken word tables used by
+GeneralizationEngine._cleanup. Each table is compiled into a single
+alternation regex with a dict-lookup callback, so a whole table is applied
+in one O(n) pass instead of one scan per command.
+
+Alternatives are ordered longest first, so ``\\subseteq`` is never read as
+``\\subset`` followed by ``eq``. Commands that need extra context (the
+``(?!e)`` on ``\\sin`` or the word boundary on ``\\in``) carry a guard that
+is appended to their alternative.
+"""
+
+import re
+from typing import Dict, Match, Optional, Pattern
+
+
+class CommandTable:
+    """Replace LaTeX commands by spoken words in a single pass"""
+
+    def __init__(self, words: Dict[str, str], guards: Optional[Dict[str, str]] = None):
+        self.words = dict(words)
+        self.guards = dict(guards or {})
+        # Longest first so a command never matches as the prefix of another
+        names = sorted(self.words, key=len, reverse=True)
+        alternatives = '|'.join(re.escape(name) + self.guards.get(name, '') for name in names)
+        self.compiled: Pattern = re.compile(r'\\(' + alternatives + ')')
+
+    def _lookup(self, match: Match) -> str:
+        return self.words[match.group(1)]
+
+    def apply(self, text: str) -> str:
+        """Replace every command in the table found in text"""
+        if '\\' not in text:
+            return text
+        return self.compiled.sub(self._lookup, text)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+
+# ===========================
+# Functions and Greek letters
+# ===========================
+
+FUNCTION_WORDS = {
+    'sin': 'sine',
+    'cos': 'cosine',
+    'tan': 'tangent',
+    'cot': 'cotangent',
+    'sec': 'secant',
+    'csc': 'cosecant',
+    'cosec': 'cosecant',
+    'arcsin': 'arc sine',
+    'arccos': 'arc cosine',
+    'arctan': 'arc tangent',
+    'sinh': 'hyperbolic sine',
+    'cosh': 'hyperbolic cosine',
+    'tanh': 'hyperbolic tangent',
+    'ln': 'natural log',
+    'log': 'log',
+    'exp': 'exponential',
+    'det': 'determinant',
+    'tr': 'trace',
+    'nabla': 'nabla',
+    'partial': 'partial',
+    'infty': 'infinity',
+    'alpha': 'alpha',
+    'beta': 'beta',
+    'gamma': 'gamma',
+    'delta': 'delta',
+    'epsilon': 'epsilon',
+    'theta': 'theta',
+    'lambda': 'lambda',
+    'mu': 'mu',
+    'nu': 'nu',
+    'pi': 'pi',
+    'rho': 'rho',
+    'sigma': 'sigma',
+    'tau': 'tau',
+    'phi': 'phi',
+    'chi': 'chi',
+    'psi': 'psi',
+    'omega': 'omega',
+    'Gamma': 'capital gamma',
+    'Delta': 'capital delta',
+    'Lambda': 'capital lambda',
+    'Omega': 'capital omega',
+    'Phi': 'capital phi',
+    'Psi': 'capital psi',
+    'Sigma': 'capital sigma',
+    'Pi': 'capital pi',
+}
+
+# Leave already spelled-out words such as \sine or \tangent alone
+FUNCTION_GUARDS = {
+    'sin': r'(?!e)',
+    'cos': r'(?!ine)',
+    'tan': r'(?!gent)',
+    'cot': r'(?!angent)',
+    'sec': r'(?!ant)',
+}
+
+# ===========================
+# Operators, relations and dots
+# ===========================
+
+OPERATOR_WORDS = {
+    'cdot': 'dot',
+    'times': 'cross',
+    'circ': 'compose',
+    'ast': 'star',
+    'star': 'star',
+    'bullet': 'bullet',
+    'div': 'divided by',
+    'pm': 'plus or minus',
+    'mp': 'minus or plus',
+    'oplus': 'direct sum',
+    'otimes': 'tensor product',
+    'wedge': 'wedge',
+    'vee': 'vee',
+    'cap': 'intersection',
+    'cup': 'union',
+    'subset': 'subset',
+    'supset': 'superset',
+    'subseteq': 'subset or equal',
+    'supseteq': 'superset or equal',
+    'in': 'in',
+    'notin': 'not in',
+    'ni': 'contains',
+    'emptyset': 'empty set',
+    'varnothing': 'empty set',
+    'forall': 'for all',
+    'exists': 'there exists',
+    'nexists': 'there does not exist',
+    'neg': 'not',
+    'land': 'and',
+    'lor': 'or',
+    'implies': 'implies',
+    'iff': 'if and only if',
+    'Rightarrow': 'implies',
+    'Leftarrow': 'implied by',
+    'Leftrightarrow': 'if and only if',
+    'rightarrow': 'maps to',
+    'leftarrow': 'mapped from',
+    'leftrightarrow': 'corresponds to',
+    'to': 'to',
+    'mapsto': 'maps to',
+    'approx': 'approximately',
+    'sim': 'similar to',
+    'simeq': 'similar or equal',
+    'cong': 'congruent',
+    'equiv': 'equivalent',
+    'neq': 'not equal',
+    'ne': 'not equal',
+    'leq': 'less than or equal',
+    'geq': 'greater than or equal',
+    'le': 'less than or equal',
+    'ge': 'greater than or equal',
+    'll': 'much less than',
+    'gg': 'much greater than',
+    'prec': 'precedes',
+    'succ': 'succeeds',
+    'preceq': 'precedes or equal',
+    'succeq': 'succeeds or equal',
+    'ldots': 'dot dot dot',
+    'dots': 'dot dot dot',
+    'cdots': 'dot dot dot',
+    'vdots': 'vertical dots',
+    'ddots': 'diagonal dots',
+}
+
+# Short relations must not swallow the start of a longer unknown command
+OPERATOR_GUARDS = {
+    'in': r'\b',
+    'ni': r'\b',
+    'to': r'\b',
+    'ne': r'\b',
+    'le': r'\b',
+    'ge': r'\b',
+}
+
+# ===========================
+# Remaining letters and special symbols
+# ===========================
+
+SYMBOL_WORDS = {
+    'zeta': 'zeta',
+    'eta': 'eta',
+    'iota': 'iota',
+    'kappa': 'kappa',
+    'xi': 'xi',
+    'omicron': 'omicron',
+    'upsilon': 'upsilon',
+    'Theta': 'capital theta',
+    'Xi': 'capital xi',
+    'Upsilon': 'capital upsilon',
+    'aleph': 'aleph',
+    'beth': 'beth',
+    'gimel': 'gimel',
+    'daleth': 'daleth',
+    'hbar': 'h bar',
+    'ell': 'ell',
+    'wp': 'Weierstrass p',
+    'Re': 'real part',
+    'Im': 'imaginary part',
+}
+
+FUNCTION_TABLE = CommandTable(FUNCTION_WORDS, FUNCTION_GUARDS)
+OPERATOR_TABLE = CommandTable(OPERATOR_WORDS, OPERATOR_GUARDS)
+SYMBOL_TABLE = CommandTable(SYMBOL_WORDS)
@@ -20,13 +20,19 @@ Key principles:
 
 import re
 import logging
-from typing import Dict, List, Optional, Tuple, Union, Callable, Any
+import threading
+from typing import Dict, FrozenSet, List, Optional, Tuple, Union, Callable, Any
 from dataclasses import dataclass
 from enum import Enum
 from abc import ABC, abstractmethod
 
 # Import base classes and refactored handlers from the patterns package
-from .patterns.base import AudienceLevel, MathDomain, PatternRule, PatternHandler
+from .patterns.base import (
+    AudienceLevel, MathDomain, PatternRule, PatternHandler, PatternPlan, build_pattern_plan
+)
+from .patterns.prefilter import guarded_sub
+from ..utils.timeout import Deadline
+from .patterns.symbol_tables import FUNCTION_TABLE, OPERATOR_TABLE, SYMBOL_TABLE
 from .patterns.calculus import CalculusHandler
 from .patterns.algebra import AlgebraHandler
 from .patterns.arithmetic import BasicArithmeticHandler
@@ -1526,23 +1532,20 @@ class SpecialSymbolsHandler:
             ),
         ]
         
-        # Compile patterns
-        for pattern in self.patterns:
-            pattern.compiled = re.compile(pattern.pattern)
+        # Symbols apply to every audience, so a single plan is enough
+        self._plan: PatternPlan = build_pattern_plan(self.patterns)
     
-    def process(self, text: str, audience: AudienceLevel = AudienceLevel.UNDERGRADUATE) -> str:
+    def process(self, text: str, audience: AudienceLevel = AudienceLevel.UNDERGRADUATE,
+                budget: Optional[Deadline] = None) -> str:
         """Process text with special symbol patterns"""
         result = text
         
-        # Sort by priority (highest first)
-        sorted_patterns = sorted(self.patterns, key=lambda p: p.priority, reverse=True)
-        
-        # Apply patterns
-        for pattern in sorted_patterns:
-            if callable(pattern.replacement):
-                result = pattern.compiled.sub(pattern.replacement, result)
-            else:
-                result = pattern.compiled.sub(pattern.replacement, result)
+        for compiled, replacement, description, trigger in self._plan:
+            if trigger is not None and trigger not in result:
+                continue
+            if budget is not None and budget.spent(description):
+                break
+            result = compiled.sub(replacement, result)
         
         return result
 
@@ -2482,18 +2485,42 @@ class GeneralizationEngine:
                 r'\\qquad', ' ', MathDomain.BASIC_ARITHMETIC, 'Double quad space', 50
             ),
         ]
+        self._general_plans = self._build_general_plans()
+    
+    def _build_general_plans(self) -> Dict[AudienceLevel, PatternPlan]:
+        """Precompute the priority-ordered general patterns per audience"""
+        return {
+            level: build_pattern_plan(self.general_patterns, level)
+            for level in AudienceLevel
+        }
     
-    def process(self, text: str, audience: AudienceLevel = AudienceLevel.UNDERGRADUATE) -> str:
-        """Process text through all applicable patterns"""
+    def rules(self) -> List[PatternRule]:
+        """All pattern rules the engine applies, across every handler"""
+        rules = list(self.general_patterns)
+        for handler in self.handlers.values():
+            rules.extend(handler.patterns)
+        rules.extend(self.special_handler.patterns)
+        return rules
+    
+    def process(self, text: str, audience: AudienceLevel = AudienceLevel.UNDERGRADUATE,
+                budget: Optional[Deadline] = None) -> str:
+        """Process text through all applicable patterns
+        
+        The optional budget is checked between rules; once it runs out the
+        remaining rules are skipped and the text is returned as is.
+        """
         result = text
         
         # Apply general patterns first
-        for pattern in sorted(self.general_patterns, key=lambda p: p.priority, reverse=True):
-            if audience in pattern.audience_levels:
-                if callable(pattern.replacement):
-                    result = pattern.compiled.sub(pattern.replacement, result)
-                else:
-                    result = pattern.compiled.sub(pattern.replacement, result)
+        plan = self._general_plans.get(audience)
+        if plan is None:
+            plan = build_pattern_plan(self.general_patterns, audience)
+        for compiled, replacement, description, trigger in plan:
+            if trigger is not None and trigger not in result:
+                continue
+            if budget is not None and budget.spent(description):
+                break
+            result = compiled.sub(replacement, result)
         
         # Apply domain-specific patterns in a specific order to prevent conflicts
         # Process patterns that contain LaTeX commands first
@@ -2512,107 +2539,69 @@ class GeneralizationEngine:
         
         for domain in priority_order:
             if domain in self.handlers:
-                result = self.handlers[domain].process(result, audience)
+                result = self.handlers[domain].process(result, audience, budget)
         
         # Apply special symbols handler
-        result = self.special_handler.process(result, audience)
+        result = self.special_handler.process(result, audience, budget)
         
         # Clean up final result
-        result = self._cleanup(result)
+        result = self._cleanup(result, budget)
         
         return result
     
-    def _cleanup(self, text: str) -> str:
-        """Enhanced final cleanup of processed text"""
+    def _cleanup(self, text: str, budget: Optional[Deadline] = None) -> str:
+        """Enhanced final cleanup of processed text
+        
+        The budget is checked between groups of cleanup rules.
+        """
         # Fix specific common errors first
-        text = re.sub(r'integral of egral of', 'integral over', text)
-        text = re.sub(r'integral of egral from', 'integral from', text)
+        text = guarded_sub(r'integral of egral of', 'integral over', text)
+        text = guarded_sub(r'integral of egral from', 'integral from', text)
         
         # Clean up LaTeX commands that should be converted
-        text = re.sub(r'\\sin(?!e)', 'sine', text)
-        text = re.sub(r'\\cos(?!ine)', 'cosine', text)
-        text = re.sub(r'\\tan(?!gent)', 'tangent', text)
-        text = re.sub(r'\\cot(?!angent)', 'cotangent', text)
-        text = re.sub(r'\\sec(?!ant)', 'secant', text)
-        text = re.sub(r'\\csc|\\cosec', 'cosecant', text)
-        text = re.sub(r'\\arcsin', 'arc sine', text)
-        text = re.sub(r'\\arccos', 'arc cosine', text)
-        text = re.sub(r'\\arctan', 'arc tangent', text)
-        text = re.sub(r'\\sinh', 'hyperbolic sine', text)
-        text = re.sub(r'\\cosh', 'hyperbolic cosine', text)
-        text = re.sub(r'\\tanh', 'hyperbolic tangent', text)
-        text = re.sub(r'\\ln', 'natural log', text)
-        text = re.sub(r'\\log', 'log', text)
-        text = re.sub(r'\\exp', 'exponential', text)
-        text = re.sub(r'\\det', 'determinant', text)
-        text = re.sub(r'\\tr', 'trace', text)
-        text = re.sub(r'\\nabla', 'nabla', text)
-        text = re.sub(r'\\partial', 'partial', text)
-        text = re.sub(r'\\infty', 'infinity', text)
-        text = re.sub(r'\\alpha', 'alpha', text)
-        text = re.sub(r'\\beta', 'beta', text)
-        text = re.sub(r'\\gamma', 'gamma', text)
-        text = re.sub(r'\\delta', 'delta', text)
-        text = re.sub(r'\\epsilon', 'epsilon', text)
-        text = re.sub(r'\\theta', 'theta', text)
-        text = re.sub(r'\\lambda', 'lambda', text)
-        text = re.sub(r'\\mu', 'mu', text)
-        text = re.sub(r'\\nu', 'nu', text)
-        text = re.sub(r'\\pi', 'pi', text)
-        text = re.sub(r'\\rho', 'rho', text)
-        text = re.sub(r'\\sigma', 'sigma', text)
-        text = re.sub(r'\\tau', 'tau', text)
-        text = re.sub(r'\\phi', 'phi', text)
-        text = re.sub(r'\\chi', 'chi', text)
-        text = re.sub(r'\\psi', 'psi', text)
-        text = re.sub(r'\\omega', 'omega', text)
-        text = re.sub(r'\\Gamma', 'capital gamma', text)
-        text = re.sub(r'\\Delta', 'capital delta', text)
-        text = re.sub(r'\\Lambda', 'capital lambda', text)
-        text = re.sub(r'\\Omega', 'capital omega', text)
-        text = re.sub(r'\\Phi', 'capital phi', text)
-        text = re.sub(r'\\Psi', 'capital psi', text)
-        text = re.sub(r'\\Sigma', 'capital sigma', text)
-        text = re.sub(r'\\Pi', 'capital pi', text)
+        text = FUNCTION_TABLE.apply(text)
+        
+        if budget is not None and budget.spent("cleanup"):
+            return text
         
         # Clean up matrix environments
-        text = re.sub(r'\\begin\s*\{([pbBv]?matrix)\}', '', text)
-        text = re.sub(r'\\end\s*\{([pbBv]?matrix)\}', '', text)
-        text = re.sub(r'\\begin\s*\{array\}\{[^}]*\}', '', text)
-        text = re.sub(r'\\end\s*\{array\}', '', text)
-        text = re.sub(r'\\begin\s*\{cases\}', 'begin cases', text)
-        text = re.sub(r'\\end\s*\{cases\}', 'end cases', text)
+        text = guarded_sub(r'\\begin\s*\{([pbBv]?matrix)\}', '', text)
+        text = guarded_sub(r'\\end\s*\{([pbBv]?matrix)\}', '', text)
+        text = guarded_sub(r'\\begin\s*\{array\}\{[^}]*\}', '', text)
+        text = guarded_sub(r'\\end\s*\{array\}', '', text)
+        text = guarded_sub(r'\\begin\s*\{cases\}', 'begin cases', text)
+        text = guarded_sub(r'\\end\s*\{cases\}', 'end cases', text)
         
         # Fix matrix row separators and clean up backslashes
-        text = re.sub(r'\s*\\\\\s*', ' ', text)  # Double backslashes for row breaks
-        text = re.sub(r'\s+\\\s+', ' ', text)  # Single backslashes with spaces
-        text = re.sub(r'\\\s*$', '', text)  # Trailing backslashes
+        text = guarded_sub(r'\s*\\\\\s*', ' ', text)  # Double backslashes for row breaks
+        text = guarded_sub(r'\s+\\\s+', ' ', text)  # Single backslashes with spaces
+        text = guarded_sub(r'\\\s*$', '', text)  # Trailing backslashes
         
         # Clean up parentheses and brackets
-        text = re.sub(r'\\left\s*\(', '(', text)
-        text = re.sub(r'\\right\s*\)', ')', text)
-        text = re.sub(r'\\left\s*\[', '[', text) 
-        text = re.sub(r'\\right\s*\]', ']', text)
-        text = re.sub(r'\\left\s*\\{', '{', text)
-        text = re.sub(r'\\right\s*\\}', '}', text)
-        text = re.sub(r'\\left\s*\|', '|', text)
-        text = re.sub(r'\\right\s*\|', '|', text)
-        text = re.sub(r'\\left\.', '', text)  # Invisible left delimiter
-        text = re.sub(r'\\right\.', '', text)  # Invisible right delimiter
+        text = guarded_sub(r'\\left\s*\(', '(', text)
+        text = guarded_sub(r'\\right\s*\)', ')', text)
+        text = guarded_sub(r'\\left\s*\[', '[', text) 
+        text = guarded_sub(r'\\right\s*\]', ']', text)
+        text = guarded_sub(r'\\left\s*\\{', '{', text)
+        text = guarded_sub(r'\\right\s*\\}', '}', text)
+        text = guarded_sub(r'\\left\s*\|', '|', text)
+        text = guarded_sub(r'\\right\s*\|', '|', text)
+        text = guarded_sub(r'\\left\.', '', text)  # Invisible left delimiter
+        text = guarded_sub(r'\\right\.', '', text)  # Invisible right delimiter
         
         # Clean up escaped characters
-        text = re.sub(r'\\\(', '(', text)
-        text = re.sub(r'\\\)', ')', text)
-        text = re.sub(r'\\{', '{', text)
-        text = re.sub(r'\\}', '}', text)
-        text = re.sub(r'\\\[', '[', text)
-        text = re.sub(r'\\\]', ']', text)
-        text = re.sub(r'\\\|', '|', text)
-        text = re.sub(r'\\,', ' ', text)  # Thin space
-        text = re.sub(r'\\;', ' ', text)  # Medium space
-        text = re.sub(r'\\:', ' ', text)  # Medium space
-        text = re.sub(r'\\!', '', text)   # Negative thin space
-        text = re.sub(r'\\\s', ' ', text) # Escaped space
+        text = guarded_sub(r'\\\(', '(', text)
+        text = guarded_sub(r'\\\)', ')', text)
+        text = guarded_sub(r'\\{', '{', text)
+        text = guarded_sub(r'\\}', '}', text)
+        text = guarded_sub(r'\\\[', '[', text)
+        text = guarded_sub(r'\\\]', ']', text)
+        text = guarded_sub(r'\\\|', '|', text)
+        text = guarded_sub(r'\\,', ' ', text)  # Thin space
+        text = guarded_sub(r'\\;', ' ', text)  # Medium space
+        text = guarded_sub(r'\\:', ' ', text)  # Medium space
+        text = guarded_sub(r'\\!', '', text)   # Negative thin space
+        text = guarded_sub(r'\\\s', ' ', text) # Escaped space
         
         # Remove multiple nested parentheses (devil test 9)
         # Keep removing redundant parentheses until no more can be removed
@@ -2620,234 +2609,168 @@ class GeneralizationEngine:
         while prev_text != text:
             prev_text = text
             # Remove redundant parentheses around single items
-            text = re.sub(r'\(\(\(\(([^()]+)\)\)\)\)', r'\1', text)
-            text = re.sub(r'\(\(\(([^()]+)\)\)\)', r'\1', text)
-            text = re.sub(r'\(\(([^()]+)\)\)', r'\1', text)
+            text = guarded_sub(r'\(\(\(\(([^()]+)\)\)\)\)', r'\1', text)
+            text = guarded_sub(r'\(\(\(([^()]+)\)\)\)', r'\1', text)
+            text = guarded_sub(r'\(\(([^()]+)\)\)', r'\1', text)
             # Handle escaped parentheses pattern
-            text = re.sub(r'\(+([a-zA-Z0-9]+)\\\)+', r'\1', text)
-        
-        # Fix other LaTeX artifacts
-        text = re.sub(r'\\cdot', 'dot', text)
-        text = re.sub(r'\\times', 'cross', text)
-        text = re.sub(r'\\circ', 'compose', text)
-        text = re.sub(r'\\ast', 'star', text)
-        text = re.sub(r'\\star', 'star', text)
-        text = re.sub(r'\\bullet', 'bullet', text)
-        text = re.sub(r'\\div', 'divided by', text)
-        text = re.sub(r'\\pm', 'plus or minus', text)
-        text = re.sub(r'\\mp', 'minus or plus', text)
-        text = re.sub(r'\\oplus', 'direct sum', text)
-        text = re.sub(r'\\otimes', 'tensor product', text)
-        text = re.sub(r'\\wedge', 'wedge', text)
-        text = re.sub(r'\\vee', 'vee', text)
-        text = re.sub(r'\\cap', 'intersection', text)
-        text = re.sub(r'\\cup', 'union', text)
-        text = re.sub(r'\\subset', 'subset', text)
-        text = re.sub(r'\\supset', 'superset', text)
-        text = re.sub(r'\\subseteq', 'subset or equal', text)
-        text = re.sub(r'\\supseteq', 'superset or equal', text)
-        text = re.sub(r'\\in\b', 'in', text)
-        text = re.sub(r'\\notin', 'not in', text)
-        text = re.sub(r'\\ni\b', 'contains', text)
-        text = re.sub(r'\\emptyset', 'empty set', text)
-        text = re.sub(r'\\varnothing', 'empty set', text)
-        text = re.sub(r'\\forall', 'for all', text)
-        text = re.sub(r'\\exists', 'there exists', text)
-        text = re.sub(r'\\nexists', 'there does not exist', text)
-        text = re.sub(r'\\neg', 'not', text)
-        text = re.sub(r'\\land', 'and', text)
-        text = re.sub(r'\\lor', 'or', text)
-        text = re.sub(r'\\implies', 'implies', text)
-        text = re.sub(r'\\iff', 'if and only if', text)
-        text = re.sub(r'\\Rightarrow', 'implies', text)
-        text = re.sub(r'\\Leftarrow', 'implied by', text)
-        text = re.sub(r'\\Leftrightarrow', 'if and only if', text)
-        text = re.sub(r'\\rightarrow', 'maps to', text)
-        text = re.sub(r'\\leftarrow', 'mapped from', text)
-        text = re.sub(r'\\leftrightarrow', 'corresponds to', text)
-        text = re.sub(r'\\to\b', 'to', text)
-        text = re.sub(r'\\mapsto', 'maps to', text)
-        text = re.sub(r'\\approx', 'approximately', text)
-        text = re.sub(r'\\sim', 'similar to', text)
-        text = re.sub(r'\\simeq', 'similar or equal', text)
-        text = re.sub(r'\\cong', 'congruent', text)
-        text = re.sub(r'\\equiv', 'equivalent', text)
-        text = re.sub(r'\\neq', 'not equal', text)
-        text = re.sub(r'\\ne\b', 'not equal', text)
-        text = re.sub(r'\\leq', 'less than or equal', text)
-        text = re.sub(r'\\geq', 'greater than or equal', text)
-        text = re.sub(r'\\le\b', 'less than or equal', text)
-        text = re.sub(r'\\ge\b', 'greater than or equal', text)
-        text = re.sub(r'\\ll', 'much less than', text)
-        text = re.sub(r'\\gg', 'much greater than', text)
-        text = re.sub(r'\\prec', 'precedes', text)
-        text = re.sub(r'\\succ', 'succeeds', text)
-        text = re.sub(r'\\preceq', 'precedes or equal', text)
-        text = re.sub(r'\\succeq', 'succeeds or equal', text)
+            text = guarded_sub(r'\(+([a-zA-Z0-9]+)\\\)+', r'\1', text)
+        
+        if budget is not None and budget.spent("cleanup"):
+            return text
+        
+        # Fix other LaTeX artifacts: operators, relations and dots
+        text = OPERATOR_TABLE.apply(text)
         
         # Clean up text command and other remnants
-        text = re.sub(r'\\text\s*\{([^}]+)\}', r'\1', text)
-        text = re.sub(r'\\ldots', 'dot dot dot', text)
-        text = re.sub(r'\\dots', 'dot dot dot', text)
-        text = re.sub(r'\\cdots', 'dot dot dot', text)
-        text = re.sub(r'\\vdots', 'vertical dots', text)
-        text = re.sub(r'\\ddots', 'diagonal dots', text)
+        text = guarded_sub(r'\\text\s*\{([^}]+)\}', r'\1', text)
         
         # Fix sgn and other special functions
-        text = re.sub(r'\\sgn', 'sign', text)
-        text = re.sub(r'sgn\s*\(', 'sign of ', text)
+        text = guarded_sub(r'\\sgn', 'sign', text)
+        text = guarded_sub(r'sgn\s*\(', 'sign of ', text)
         
         # Fix residue notation
-        text = re.sub(r'\\text\s*\{Res\}', 'residue', text)
-        text = re.sub(r'\\Res', 'residue', text)
+        text = guarded_sub(r'\\text\s*\{Res\}', 'residue', text)
+        text = guarded_sub(r'\\Res', 'residue', text)
         
         # Fix interval notation misinterpretation
-        text = re.sub(r'the closed interval from d over dx to d over d y', 'commutator derivative with respect to x derivative with respect to y', text)
-        text = re.sub(r'the open interval from', '', text)
-        text = re.sub(r'the closed interval from', '', text)
+        text = guarded_sub(r'the closed interval from d over dx to d over d y', 'commutator derivative with respect to x derivative with respect to y', text)
+        text = guarded_sub(r'the open interval from', '', text)
+        text = guarded_sub(r'the closed interval from', '', text)
+        
+        if budget is not None and budget.spent("cleanup"):
+            return text
         
         # Clean up any remaining LaTeX commands
-        text = re.sub(r'\\([a-zA-Z]+)\s*', r'\1 ', text)
+        text = guarded_sub(r'\\([a-zA-Z]+)\s*', r'\1 ', text)
         
         # Fix derivative patterns that get broken
-        text = re.sub(r'd\s+squared\s*([a-zA-Z])\s+over\s+d([a-zA-Z])\s+squared', r'second derivative of \1 with respect to \2', text)
-        text = re.sub(r'D\s+squared\s*([a-zA-Z])\s+over\s+d([a-zA-Z])\s+squared', r'second derivative of \1 with respect to \2', text)
-        text = re.sub(r'd\s+to\s+the\s+n\s+over\s+d([a-zA-Z])\s+to\s+the\s+n', r'nth derivative with respect to \1', text)
-        text = re.sub(r'D\s+to\s+the\s+n\s+over\s+D([a-zA-Z])\s+to\s+the\s+n', r'nth derivative with respect to \1', text)
+        text = guarded_sub(r'd\s+squared\s*([a-zA-Z])\s+over\s+d([a-zA-Z])\s+squared', r'second derivative of \1 with respect to \2', text)
+        text = guarded_sub(r'D\s+squared\s*([a-zA-Z])\s+over\s+d([a-zA-Z])\s+squared', r'second derivative of \1 with respect to \2', text)
+        text = guarded_sub(r'd\s+to\s+the\s+n\s+over\s+d([a-zA-Z])\s+to\s+the\s+n', r'nth derivative with respect to \1', text)
+        text = guarded_sub(r'D\s+to\s+the\s+n\s+over\s+D([a-zA-Z])\s+to\s+the\s+n', r'nth derivative with respect to \1', text)
         
         # Fix nested parentheses issues - additional patterns
-        text = re.sub(r'\(\(\(\(([^)]+)\)\)\)\)', r'\1', text)
-        text = re.sub(r'\\\)\\\)\\\)\\\)', ')', text)
-        text = re.sub(r'\\\(\\\(\\\(\\\(', '(', text)
+        text = guarded_sub(r'\(\(\(\(([^)]+)\)\)\)\)', r'\1', text)
+        text = guarded_sub(r'\\\)\\\)\\\)\\\)', ')', text)
+        text = guarded_sub(r'\\\(\\\(\\\(\\\(', '(', text)
         
         # Fix limit patterns
-        text = re.sub(r'limit\s+([a-zA-Z])to\s+', r'limit as \1 approaches ', text)
-        text = re.sub(r'lim\s+([a-zA-Z])to\s+', r'limit as \1 approaches ', text)
+        text = guarded_sub(r'limit\s+([a-zA-Z])to\s+', r'limit as \1 approaches ', text)
+        text = guarded_sub(r'lim\s+([a-zA-Z])to\s+', r'limit as \1 approaches ', text)
         
         # Fix some specific problem patterns
-        text = re.sub(r'Q\s+E\s+D\s+root', 'square root', text)
-        text = re.sub(r'absolute\s+value\s+of\s+([a-zA-Z])\s*absolute\s+value\s+of', r'norm of \1 norm of', text)
+        text = guarded_sub(r'Q\s+E\s+D\s+root', 'square root', text)
+        text = guarded_sub(r'absolute\s+value\s+of\s+([a-zA-Z])\s*absolute\s+value\s+of', r'norm of \1 norm of', text)
         
         # Fix substack notation
-        text = re.sub(r'\\substack\s*\{([^}]+)\}', lambda m: m.group(1).replace('\\\\', ' '), text)
+        text = guarded_sub(r'\\substack\s*\{([^}]+)\}', lambda m: m.group(1).replace('\\\\', ' '), text)
+        
+        if budget is not None and budget.spent("cleanup"):
+            return text
         
         # Enhanced matrix content extraction and cleanup
-        text = re.sub(r'matrix\s*&\s*matrix\s*\\end\s*matrix', 'matrix matrix', text)
-        text = re.sub(r'matrix\s*&\s*matrix\s*', 'matrix matrix ', text)
-        text = re.sub(r'matrix\s*&\s*', 'matrix ', text)
-        text = re.sub(r'&\s*matrix', ' matrix', text)
-        text = re.sub(r'\\end\s*matrix', '', text)
-        text = re.sub(r'end\s*matrix', '', text)
+        text = guarded_sub(r'matrix\s*&\s*matrix\s*\\end\s*matrix', 'matrix matrix', text)
+        text = guarded_sub(r'matrix\s*&\s*matrix\s*', 'matrix matrix ', text)
+        text = guarded_sub(r'matrix\s*&\s*', 'matrix ', text)
+        text = guarded_sub(r'&\s*matrix', ' matrix', text)
+        text = guarded_sub(r'\\end\s*matrix', '', text)
+        text = guarded_sub(r'end\s*matrix', '', text)
         
         # Fix specific LaTeX remnants
-        text = re.sub(r'\\begin\{[^}]+\}', '', text)
-        text = re.sub(r'\\end\{[^}]+\}', '', text)
-        text = re.sub(r'\\left\|([^|]+)\\right\|', r'absolute value of \1', text)
-        text = re.sub(r'\\leftabsolute value of', 'absolute value of', text)
+        text = guarded_sub(r'\\begin\{[^}]+\}', '', text)
+        text = guarded_sub(r'\\end\{[^}]+\}', '', text)
+        text = guarded_sub(r'\\left\|([^|]+)\\right\|', r'absolute value of \1', text)
+        text = guarded_sub(r'\\leftabsolute value of', 'absolute value of', text)
+        
+        if budget is not None and budget.spent("cleanup"):
+            return text
         
         # Normalize whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = guarded_sub(r'\s+', ' ', text)
         text = text.strip()
-        text = re.sub(r'\s+,', ',', text)
-        text = re.sub(r'\s+\.', '.', text)
+        text = guarded_sub(r'\s+,', ',', text)
+        text = guarded_sub(r'\s+\.', '.', text)
         
         # Fix product and sum notation
-        text = re.sub(r'\\prod\s*([a-zA-Z])\s*equals\s*([0-9]+)\s*to\s*the', lambda m: f'product from {m.group(1)} equals {m.group(2)} to', text)
-        text = re.sub(r'product\s+i\s+equals\s+1\s*\^\s*n', 'product from i equals 1 to n', text)
-        text = re.sub(r'sum\s+k\s+equals\s+0\s*\^\s*n', 'sum from k equals 0 to n', text)
+        text = guarded_sub(r'\\prod\s*([a-zA-Z])\s*equals\s*([0-9]+)\s*to\s*the', lambda m: f'product from {m.group(1)} equals {m.group(2)} to', text)
+        text = guarded_sub(r'product\s+i\s+equals\s+1\s*\^\s*n', 'product from i equals 1 to n', text)
+        text = guarded_sub(r'sum\s+k\s+equals\s+0\s*\^\s*n', 'sum from k equals 0 to n', text)
         
         # Fix more parentheses issues
-        text = re.sub(r'\(+([a-zA-Z])\)+', r'\1', text)
+        text = guarded_sub(r'\(+([a-zA-Z])\)+', r'\1', text)
         
         # Fix array environment remnants
-        text = re.sub(r'absolute\s+value\s+of\s+\\begin\s*\{array\}', 'determinant of ', text)
+        text = guarded_sub(r'absolute\s+value\s+of\s+\\begin\s*\{array\}', 'determinant of ', text)
         
         # Fix Bmatrix
-        text = re.sub(r'\\begin\s*\{Bmatrix\}([^\\]*)\\\\([^\\]*)\\\\([^\\]*)\\end\s*\{Bmatrix\}', r'matrix \1 \2 \3', text)
+        text = guarded_sub(r'\\begin\s*\{Bmatrix\}([^\\]*)\\\\([^\\]*)\\\\([^\\]*)\\end\s*\{Bmatrix\}', r'matrix \1 \2 \3', text)
         
         # Fix evaluation notation
-        text = re.sub(r'\\left\.', '', text)
-        text = re.sub(r'\\right\s*\|', ' evaluated at', text)
-        text = re.sub(r'\s*divides\s+', ' evaluated at ', text)
+        text = guarded_sub(r'\\left\.', '', text)
+        text = guarded_sub(r'\\right\s*\|', ' evaluated at', text)
+        text = guarded_sub(r'\s*divides\s+', ' evaluated at ', text)
         
         # Fix more derivative patterns
-        text = re.sub(r'\(\s*d\s+over\s+d([a-zA-Z])\s*\)', r'derivative with respect to \1', text)
-        text = re.sub(r'\[\s*d\s+over\s+d([a-zA-Z])\s*\]', r'derivative with respect to \1', text)
+        text = guarded_sub(r'\(\s*d\s+over\s+d([a-zA-Z])\s*\)', r'derivative with respect to \1', text)
+        text = guarded_sub(r'\[\s*d\s+over\s+d([a-zA-Z])\s*\]', r'derivative with respect to \1', text)
         
         # Fix tensor notation issues
-        text = re.sub(r'tensor\s+T\s+mu\s+nu\s+rho\s+sigma', 'tensor T with indices mu nu rho sigma', text)
+        text = guarded_sub(r'tensor\s+T\s+mu\s+nu\s+rho\s+sigma', 'tensor T with indices mu nu rho sigma', text)
         
         # Fix polylogarithm and special functions
-        text = re.sub(r'polylogarithm\s+([a-zA-Z0-9]+)\s+of', r'polylogarithm \1 of', text)
-        text = re.sub(r'Li\s+s\s*\(', 'polylogarithm s of ', text)
-        
-        # Fix more Greek letter issues
-        text = re.sub(r'\\zeta', 'zeta', text)
-        text = re.sub(r'\\eta', 'eta', text)
-        text = re.sub(r'\\iota', 'iota', text)
-        text = re.sub(r'\\kappa', 'kappa', text)
-        text = re.sub(r'\\xi', 'xi', text)
-        text = re.sub(r'\\omicron', 'omicron', text)
-        text = re.sub(r'\\upsilon', 'upsilon', text)
-        text = re.sub(r'\\Theta', 'capital theta', text)
-        text = re.sub(r'\\Xi', 'capital xi', text)
-        text = re.sub(r'\\Upsilon', 'capital upsilon', text)
-        
-        # Fix more special symbols
-        text = re.sub(r'\\aleph', 'aleph', text)
-        text = re.sub(r'\\beth', 'beth', text)
-        text = re.sub(r'\\gimel', 'gimel', text)
-        text = re.sub(r'\\daleth', 'daleth', text)
-        text = re.sub(r'\\hbar', 'h bar', text)
-        text = re.sub(r'\\ell', 'ell', text)
-        text = re.sub(r'\\wp', 'Weierstrass p', text)
-        text = re.sub(r'\\Re', 'real part', text)
-        text = re.sub(r'\\Im', 'imaginary part', text)
+        text = guarded_sub(r'polylogarithm\s+([a-zA-Z0-9]+)\s+of', r'polylogarithm \1 of', text)
+        text = guarded_sub(r'Li\s+s\s*\(', 'polylogarithm s of ', text)
+        
+        # Fix more Greek letters and special symbols
+        text = SYMBOL_TABLE.apply(text)
         
         # Fix limit notation
-        text = re.sub(r'limit\s*([a-zA-Z])\\to([a-zA-Z]+)', lambda m: f'limit as {m.group(1)} approaches {m.group(2)}', text)
+        text = guarded_sub(r'limit\s*([a-zA-Z])\\to([a-zA-Z]+)', lambda m: f'limit as {m.group(1)} approaches {m.group(2)}', text)
+        
+        if budget is not None and budget.spent("cleanup"):
+            return text
         
         # Fix specific test case issues
-        text = re.sub(r'sigma\s+is\s+in\s+S\s+n', 'sigma in S n', text)
-        text = re.sub(r'an\s+i\s+si', 'a i sigma', text)
-        text = re.sub(r'integral\s+over\s+integral', 'integral from integral', text)
-        text = re.sub(r'\s+to\s+the\s+integral', ' to integral', text)
+        text = guarded_sub(r'sigma\s+is\s+in\s+S\s+n', 'sigma in S n', text)
+        text = guarded_sub(r'an\s+i\s+si', 'a i sigma', text)
+        text = guarded_sub(r'integral\s+over\s+integral', 'integral from integral', text)
+        text = guarded_sub(r'\s+to\s+the\s+integral', ' to integral', text)
         
         # Fix test 4 - integral bounds with nested integrals
-        text = re.sub(r'integral\s+from\s+integral\s+from\s+([^t]+)to\s+integral\s+from', r'integral from integral from \1to integral from', text)
+        text = guarded_sub(r'integral\s+from\s+integral\s+from\s+([^t]+)to\s+integral\s+from', r'integral from integral from \1to integral from', text)
         
         # Fix test 10 - nested matrix spacing (fix double space after first matrix)
-        text = re.sub(r'matrix\s{2,}', 'matrix matrix ', text)
+        text = guarded_sub(r'matrix\s{2,}', 'matrix matrix ', text)
         # Alternative fix for nested matrices
-        text = re.sub(r'matrix\s+([a-z])\s+([a-z])\s+([a-z])\s+([a-z])\s+matrix', r'matrix matrix \1 \2 \3 \4 matrix', text)
+        text = guarded_sub(r'matrix\s+([a-z])\s+([a-z])\s+([a-z])\s+([a-z])\s+matrix', r'matrix matrix \1 \2 \3 \4 matrix', text)
         
         # Fix test 14 - sum with substack
-        text = re.sub(r'sum\s+i\s+equals\s+1\s+j\s+equals\s+1\s+to\s+the\s+n\s+m', 'sum from i equals 1 j equals 1 to n m', text)
-        text = re.sub(r'an\s+i\s+j', 'a i j', text)
+        text = guarded_sub(r'sum\s+i\s+equals\s+1\s+j\s+equals\s+1\s+to\s+the\s+n\s+m', 'sum from i equals 1 j equals 1 to n m', text)
+        text = guarded_sub(r'an\s+i\s+j', 'a i j', text)
         
         # Fix test 24 - trace with extra parenthesis
-        text = re.sub(r'trace\s+of\s+matrix\s+([^)]+)\s*\)', r'trace of matrix \1', text)
+        text = guarded_sub(r'trace\s+of\s+matrix\s+([^)]+)\s*\)', r'trace of matrix \1', text)
         
         # Fix test 25 - Bmatrix fallback
         if 'matrix' not in text and re.match(r'^\s*[a-zA-Z]\s+[a-zA-Z]\s+[a-zA-Z]\s*$', text):
             text = 'matrix ' + text.strip()
         
         # Fix test 46 - dt spacing in integrals
-        text = re.sub(r'd\s+t\s+over', 'dt over', text)
-        text = re.sub(r'd\s+t', 'dt', text)
-        text = re.sub(r'd\s+x', 'dx', text)
-        text = re.sub(r'd\s+y', 'dy', text)
-        text = re.sub(r'd\s+z', 'dz', text)
+        text = guarded_sub(r'd\s+t\s+over', 'dt over', text)
+        text = guarded_sub(r'd\s+t', 'dt', text)
+        text = guarded_sub(r'd\s+x', 'dx', text)
+        text = guarded_sub(r'd\s+y', 'dy', text)
+        text = guarded_sub(r'd\s+z', 'dz', text)
         
         # Fix test 53 - function argument comma
-        text = re.sub(r'f\s+of\s+x\s+plus\s+h\s+y\s+plus\s+h\s+minus\s+f\s+of\s+x,y', 'f of x plus h y plus h minus f of x y', text)
-        text = re.sub(r'f\s+of\s+x,\s*y', 'f of x y', text)
-        text = re.sub(r'limit\s+as\s+h\s+approaches\s+0\s+f\s+of', 'limit as h approaches 0 of f of', text)
+        text = guarded_sub(r'f\s+of\s+x\s+plus\s+h\s+y\s+plus\s+h\s+minus\s+f\s+of\s+x,y', 'f of x plus h y plus h minus f of x y', text)
+        text = guarded_sub(r'f\s+of\s+x,\s*y', 'f of x y', text)
+        text = guarded_sub(r'limit\s+as\s+h\s+approaches\s+0\s+f\s+of', 'limit as h approaches 0 of f of', text)
         
         # Fix test 98 - Fourier transform
-        text = re.sub(r'F\[f\]of\s+omega', 'Fourier transform of f of omega', text)
-        text = re.sub(r'integral\s+over\s+-\s+infinity\s+to\s+the\s+infinity', 'integral from negative infinity to infinity', text)
-        text = re.sub(r'F\s*\[\s*([a-zA-Z])\s*\]\s*of', r'Fourier transform of \1 of', text)
+        text = guarded_sub(r'F\[f\]of\s+omega', 'Fourier transform of f of omega', text)
+        text = guarded_sub(r'integral\s+over\s+-\s+infinity\s+to\s+the\s+infinity', 'integral from negative infinity to infinity', text)
+        text = guarded_sub(r'F\s*\[\s*([a-zA-Z])\s*\]\s*of', r'Fourier transform of \1 of', text)
         
         # Additional fixes for remaining test failures
         # Fix test 4 - integral bounds issue (very specific)
@@ -2855,21 +2778,21 @@ class GeneralizationEngine:
             text = text.replace("dx h of t dt", "dx of h of t dt")
         
         # Fix test 10 - double space issue
-        text = re.sub(r'matrix\s\s+a\s+b', 'matrix matrix a b', text)
+        text = guarded_sub(r'matrix\s\s+a\s+b', 'matrix matrix a b', text)
         
         # Fix test 14 - substack summation
-        text = re.sub(r'sum\s+i\s+equals\s+1\s+j\s+equals\s+1\s+to\s+the\s+n\s+m\s+an\s+i\s+j', 'sum from i equals 1 j equals 1 to n m a i j', text)
+        text = guarded_sub(r'sum\s+i\s+equals\s+1\s+j\s+equals\s+1\s+to\s+the\s+n\s+m\s+an\s+i\s+j', 'sum from i equals 1 j equals 1 to n m a i j', text)
         
         # Fix test 23 - bmatrix double matrix
-        text = re.sub(r'matrix\s+matrix\s+a\s+b\s+c\s+d\s+matrix\s+e\s+f\s+g\s+h', 'matrix a b c d matrix e f g h', text) if text.count('matrix') > 2 else text
+        text = guarded_sub(r'matrix\s+matrix\s+a\s+b\s+c\s+d\s+matrix\s+e\s+f\s+g\s+h', 'matrix a b c d matrix e f g h', text) if text.count('matrix') > 2 else text
         
         # Fix test 24 - extra parenthesis in trace
-        text = re.sub(r'trace\s+of\s+matrix\s+([a-z\s]+)\s*\)$', r'trace of matrix \1', text)
+        text = guarded_sub(r'trace\s+of\s+matrix\s+([a-z\s]+)\s*\)$', r'trace of matrix \1', text)
         
         # Fix test 107 - derivative with mathbb{E}
-        text = re.sub(r'd\s+over\s+dt\s+expected\s+value', 'derivative with respect to t expected value', text)
-        text = re.sub(r'expected\s+value\s+of\s+dX\s+t', 'expected value of derivative of X of t with respect to t', text)
-        text = re.sub(r'X\s*t(?!\s)', 'X of t', text)
+        text = guarded_sub(r'd\s+over\s+dt\s+expected\s+value', 'derivative with respect to t expected value', text)
+        text = guarded_sub(r'expected\s+value\s+of\s+dX\s+t', 'expected value of derivative of X of t with respect to t', text)
+        text = guarded_sub(r'X\s*t(?!\s)', 'X of t', text)
         
         return text
     
@@ -2911,21 +2834,48 @@ class MathSpeechProcessor:
     
     def __init__(self):
         self.engine = GeneralizationEngine()
+        self.commands = self._known_commands()
         logger.info("Math speech processor initialized with all domain handlers")
     
-    def process(self, text: str, audience: AudienceLevel = AudienceLevel.UNDERGRADUATE) -> str:
-        """Convert mathematical notation to natural speech"""
+    def _known_commands(self) -> FrozenSet[str]:
+        """Names of the LaTeX commands some rule or word table speaks"""
+        commands = set()
+        for rule in self.engine.rules():
+            match = re.match(r'\\([a-zA-Z]+)', rule.trigger or '')
+            if match:
+                commands.add(match.group(1))
+        for table in (FUNCTION_TABLE, OPERATOR_TABLE, SYMBOL_TABLE):
+            commands.update(table.words)
+        return frozenset(commands)
+    
+    def process(self, text: str, audience: AudienceLevel = AudienceLevel.UNDERGRADUATE,
+                budget: Optional[Deadline] = None) -> str:
+        """Convert mathematical notation to natural speech
+        
+        If the optional budget runs out, the remaining rules are skipped and
+        a partial but speakable result is returned; budget.exhausted tells
+        the caller this happened.
+        """
         # Pre-process to handle common LaTeX issues
         text = self._preprocess(text)
         
         # Process through generalization engine
-        result = self.engine.process(text, audience)
+        result = self.engine.process(text, audience, budget)
+        
+        if budget is not None and budget.spent("postprocess"):
+            return self._finish_partial(result)
         
         # Post-process for final cleanup
         result = self._postprocess(result)
         
         return result
     
+    def _finish_partial(self, text: str) -> str:
+        """Make partially processed text speakable without further rules"""
+        text = re.sub(r'\\([a-zA-Z]+)', r' \1 ', text)
+        text = re.sub(r'[{}$\\^_&]', ' ', text)
+        return re.sub(r'\s+', ' ', text).strip()
+    
     def _preprocess(self, text: str) -> str:
         """Pre-process text to normalize notation"""
         # Handle display math delimiters
@@ -2956,308 +2906,308 @@ class MathSpeechProcessor:
         """Post-process for natural speech flow"""
         # =================== DEVIL PATTERN FIXES ===================
         # Fix 1: Product notation
-        text = re.sub(r'\bprod\b', 'product', text)
+        text = guarded_sub(r'\bprod\b', 'product', text)
         
         # Fix 2: Triple integral
-        text = re.sub(r'traceiple\s+integral', 'triple integral', text)
+        text = guarded_sub(r'traceiple\s+integral', 'triple integral', text)
         
         # Fix 3: Substack cleanup
-        text = re.sub(r'substack\{([^}]+)\}', lambda m: m.group(1).replace('\\\\', ' '), text)
-        text = re.sub(r'\\substack\{([^}]+)\}', lambda m: m.group(1).replace('\\\\', ' '), text)
+        text = guarded_sub(r'substack\{([^}]+)\}', lambda m: m.group(1).replace('\\\\', ' '), text)
+        text = guarded_sub(r'\\substack\{([^}]+)\}', lambda m: m.group(1).replace('\\\\', ' '), text)
         
         # Fix 4: Matrix environment cleanup
-        text = re.sub(r'begin\{pmatrix\}', '', text)
+        text = guarded_sub(r'begin\{pmatrix\}', '', text)
         
         # Fix 5: Limit superscripts
-        text = re.sub(r'0\^\s*\+|0\^\{\+\}', '0 from the right', text)
-        text = re.sub(r'0\^\s*-|0\^\{-\}', '0 from the left', text)
-        text = re.sub(r'0\^plus', '0 from the right', text)
-        text = re.sub(r'0\^minus', '0 from the left', text)
+        text = guarded_sub(r'0\^\s*\+|0\^\{\+\}', '0 from the right', text)
+        text = guarded_sub(r'0\^\s*-|0\^\{-\}', '0 from the left', text)
+        text = guarded_sub(r'0\^plus', '0 from the right', text)
+        text = guarded_sub(r'0\^minus', '0 from the left', text)
         
         # Fix 6: Negative exponents
-        text = re.sub(r'to the\s*-\s*([0-9]+)', r'to the negative \1', text)
+        text = guarded_sub(r'to the\s*-\s*([0-9]+)', r'to the negative \1', text)
         
         # Fix 7: Distribution notation
-        text = re.sub(r'is similar to', 'distributed as', text)
+        text = guarded_sub(r'is similar to', 'distributed as', text)
         
         # Fix 8: Integral bounds cleanup
-        text = re.sub(r'integral of\s*_([0-9]+)\s*to the', r'integral from \1 to', text)
+        text = guarded_sub(r'integral of\s*_([0-9]+)\s*to the', r'integral from \1 to', text)
         
         # Fix 9: Divisibility notation
-        text = re.sub(r'\b([a-zA-Z])\s*evaluated at\s*([a-zA-Z])\b', 
+        text = guarded_sub(r'\b([a-zA-Z])\s*evaluated at\s*([a-zA-Z])\b', 
                      lambda m: f'{m.group(1)} divides {m.group(2)}' if 'sum' in text[:text.find(m.group(0))] else m.group(0), 
                      text)
         
         # Fix 10: Derivative cleanup
-        text = re.sub(r'd over d([a-zA-Z])\s*\(', r'derivative with respect to \1 of ', text)
+        text = guarded_sub(r'd over d([a-zA-Z])\s*\(', r'derivative with respect to \1 of ', text)
         
         # Fix 11: Nabla squared
-        text = re.sub(r'nabla squared', 'Laplacian', text)
+        text = guarded_sub(r'nabla squared', 'Laplacian', text)
         
         # Fix 12: Probability notation
-        text = re.sub(r'probability of ([a-zA-Z])\b', r'P of \1', text)
+        text = guarded_sub(r'probability of ([a-zA-Z])\b', r'P of \1', text)
         
         # Fix 13: Convergence notation
-        text = re.sub(r'xrightarrow\{d\}', 'converges in distribution to', text)
+        text = guarded_sub(r'xrightarrow\{d\}', 'converges in distribution to', text)
         
         # Fix 14: Special operators
-        text = re.sub(r'\\text\{sgn\}', 'sign', text)
-        text = re.sub(r'\\text\{Con\}', 'consistency', text)
-        text = re.sub(r'\\text\{Var\}', 'variance', text)
-        text = re.sub(r'\\mathbb\{E\}', 'expected value', text)
-        text = re.sub(r'\\mathcal\{F\}', 'Fourier transform', text)
-        text = re.sub(r'\\vdash', 'proves', text)
-        text = re.sub(r'\\bigcap', 'intersection', text)
+        text = guarded_sub(r'\\text\{sgn\}', 'sign', text)
+        text = guarded_sub(r'\\text\{Con\}', 'consistency', text)
+        text = guarded_sub(r'\\text\{Var\}', 'variance', text)
+        text = guarded_sub(r'\\mathbb\{E\}', 'expected value', text)
+        text = guarded_sub(r'\\mathcal\{F\}', 'Fourier transform', text)
+        text = guarded_sub(r'\\vdash', 'proves', text)
+        text = guarded_sub(r'\\bigcap', 'intersection', text)
         
         # Fix 15: Clean up remaining backslashes in common patterns
-        text = re.sub(r'\\delta', 'delta', text)
-        text = re.sub(r'\\iiint', 'triple integral', text)
+        text = guarded_sub(r'\\delta', 'delta', text)
+        text = guarded_sub(r'\\iiint', 'triple integral', text)
         
         # Fix 16: Fix "an i" to "A i" for matrix/set notation
-        text = re.sub(r'\ban i\b', 'A i', text)
+        text = guarded_sub(r'\ban i\b', 'A i', text)
         
         # Fix 17: Fix partial squared patterns
-        text = re.sub(r'partial squared (\w+) over partial (\w+) squared', 
+        text = guarded_sub(r'partial squared (\w+) over partial (\w+) squared', 
                      lambda m: f'second partial derivative of {m.group(1)} with respect to {m.group(2)}', text)
         
         # Fix 18: Fix trace notation
-        text = re.sub(r'trace\s*\(', 'trace of ', text)
+        text = guarded_sub(r'trace\s*\(', 'trace of ', text)
         
         # Fix 19: Clean up absolute value patterns
-        text = re.sub(r'leftabsolute value of', 'determinant of matrix', text)
+        text = guarded_sub(r'leftabsolute value of', 'determinant of matrix', text)
         
         # Fix 20: Fix mathcal/mathbb remnants
-        text = re.sub(r'mathcal\{([A-Z])\}', r'\1', text)
-        text = re.sub(r'mathbb\{([A-Z])\}', r'\1', text)
-        text = re.sub(r'mathbf\{([A-Z]+)\}', r'bold \1', text)
+        text = guarded_sub(r'mathcal\{([A-Z])\}', r'\1', text)
+        text = guarded_sub(r'mathbb\{([A-Z])\}', r'\1', text)
+        text = guarded_sub(r'mathbf\{([A-Z]+)\}', r'bold \1', text)
         
         # =================== ADDITIONAL DEVIL FIXES ===================
         # Fix 21: Handle nested matrix patterns
-        text = re.sub(r'\\begin\{Bmatrix\}', 'matrix ', text)
-        text = re.sub(r'\\end\{Bmatrix\}', '', text)
+        text = guarded_sub(r'\\begin\{Bmatrix\}', 'matrix ', text)
+        text = guarded_sub(r'\\end\{Bmatrix\}', '', text)
         
         # Fix 22: Fix trace notation with parentheses
-        text = re.sub(r'trace of \(', 'trace of ', text)
+        text = guarded_sub(r'trace of \(', 'trace of ', text)
         
         # Fix 23: Fix limit patterns with infty
-        text = re.sub(r'\\infty', 'infinity', text)
-        text = re.sub(r'infty', 'infinity', text)
+        text = guarded_sub(r'\\infty', 'infinity', text)
+        text = guarded_sub(r'infty', 'infinity', text)
         
         # Fix 24: Fix norm notation
-        text = re.sub(r'\\?\|([^|]+)\\\|', lambda m: f'norm of {m.group(1)}', text)
-        text = re.sub(r'absolute value of ([a-zA-Z]+) to infinity', r'norm of \1 approaches infinity', text)
+        text = guarded_sub(r'\\?\|([^|]+)\\\|', lambda m: f'norm of {m.group(1)}', text)
+        text = guarded_sub(r'absolute value of ([a-zA-Z]+) to infinity', r'norm of \1 approaches infinity', text)
         
         # Fix 25: Fix partial derivative patterns
-        text = re.sub(r'partial (\w+) over partial (\w+)', 
+        text = guarded_sub(r'partial (\w+) over partial (\w+)', 
                      lambda m: f'partial derivative of {m.group(1)} with respect to {m.group(2)}', text)
         
         # Fix 26: Fix delta/variational derivative
-        text = re.sub(r'delta over delta ([a-zA-Z])', r'variational derivative with respect to \1', text)
+        text = guarded_sub(r'delta over delta ([a-zA-Z])', r'variational derivative with respect to \1', text)
         
         # Fix 27: Fix bold notation
-        text = re.sub(r'bold ([A-Z]) equals', r'bold \1 equals', text)
+        text = guarded_sub(r'bold ([A-Z]) equals', r'bold \1 equals', text)
         
         # Fix 28: Fix e to the it patterns
-        text = re.sub(r'e to the it\s*-\s*1', 'e to the it minus 1', text)
+        text = guarded_sub(r'e to the it\s*-\s*1', 'e to the it minus 1', text)
         
         # Fix 29: Fix parentheses in limits
-        text = re.sub(r'limit as ([a-zA-Z]) approaches ([0-9]+) ([^(]+)\(', 
+        text = guarded_sub(r'limit as ([a-zA-Z]) approaches ([0-9]+) ([^(]+)\(', 
                      lambda m: f'limit as {m.group(1)} approaches {m.group(2)} of {m.group(3)}', text)
         
         # Fix 30: Fix f of x,y patterns
-        text = re.sub(r'f of ([a-zA-Z]) plus ([a-zA-Z]),([a-zA-Z]) plus ([a-zA-Z])', 
+        text = guarded_sub(r'f of ([a-zA-Z]) plus ([a-zA-Z]),([a-zA-Z]) plus ([a-zA-Z])', 
                      lambda m: f'f of {m.group(1)} plus {m.group(2)} comma {m.group(3)} plus {m.group(4)}', text)
         
         # Fix 31: Fix Fourier transform notation
-        text = re.sub(r'Fourier transform\[([^\]]+)\]\(([^)]+)\)', 
+        text = guarded_sub(r'Fourier transform\[([^\]]+)\]\(([^)]+)\)', 
                      lambda m: f'Fourier transform of {m.group(1)} of {m.group(2)}', text)
         
         # Fix 32: Fix expected value patterns
-        text = re.sub(r'expected value\[([^\]]+)\]', lambda m: f'expected value of {m.group(1)}', text)
+        text = guarded_sub(r'expected value\[([^\]]+)\]', lambda m: f'expected value of {m.group(1)}', text)
         
         # Fix 33: Fix variance patterns  
-        text = re.sub(r'variance\s+sum', 'variance of sum', text)
-        text = re.sub(r'variance\(', 'variance of ', text)
+        text = guarded_sub(r'variance\s+sum', 'variance of sum', text)
+        text = guarded_sub(r'variance\(', 'variance of ', text)
         
         # Fix 34: Fix joint density notation
-        text = re.sub(r'f ([A-Z]) ([A-Z]) ([a-z]) to ([a-z])', r'f sub \1 comma \2 of \3 comma \4', text)
+        text = guarded_sub(r'f ([A-Z]) ([A-Z]) ([a-z]) to ([a-z])', r'f sub \1 comma \2 of \3 comma \4', text)
         
         # Fix 35: Clean up extra parentheses
-        text = re.sub(r'\)\s*\)', ')', text)
-        text = re.sub(r'\(\s*\(', '(', text)
+        text = guarded_sub(r'\)\s*\)', ')', text)
+        text = guarded_sub(r'\(\s*\(', '(', text)
         
         # =================== FINAL DEVIL FIXES FOR 95% ===================
         # Fix 36: Fix normal distribution notation
-        text = re.sub(r'N\s*0 to 1', 'normal 0 1', text)
-        text = re.sub(r'\\mathcal\{N\}', 'normal', text)
-        text = re.sub(r'mathcal\{N\}', 'normal', text)
+        text = guarded_sub(r'N\s*0 to 1', 'normal 0 1', text)
+        text = guarded_sub(r'\\mathcal\{N\}', 'normal', text)
+        text = guarded_sub(r'mathcal\{N\}', 'normal', text)
         
         # Fix 37: Fix bold mathematical notation
-        text = re.sub(r'\\mathbf\{([A-Z]+)\}', r'\1', text)
-        text = re.sub(r'mathbf\{([A-Z]+)\}', r'\1', text)
+        text = guarded_sub(r'\\mathbf\{([A-Z]+)\}', r'\1', text)
+        text = guarded_sub(r'mathbf\{([A-Z]+)\}', r'\1', text)
         
         # Fix 38: Fix not proves
-        text = re.sub(r'not\\vdash', 'does not prove', text)
-        text = re.sub(r'not vdash', 'does not prove', text)
+        text = guarded_sub(r'not\\vdash', 'does not prove', text)
+        text = guarded_sub(r'not vdash', 'does not prove', text)
         
         # Fix 39: Fix power set notation
-        text = re.sub(r'\\mathcal\{P\}', 'power set', text)
-        text = re.sub(r'mathcal\{P\}', 'power set', text)
-        text = re.sub(r'power set\(([^)]+)\)', r'power set of \1', text)
-        text = re.sub(r'power setX', 'power set of X', text)
-        text = re.sub(r'power setY', 'power set of Y', text)
+        text = guarded_sub(r'\\mathcal\{P\}', 'power set', text)
+        text = guarded_sub(r'mathcal\{P\}', 'power set', text)
+        text = guarded_sub(r'power set\(([^)]+)\)', r'power set of \1', text)
+        text = guarded_sub(r'power setX', 'power set of X', text)
+        text = guarded_sub(r'power setY', 'power set of Y', text)
         
         # Fix 40: Fix AD (axiom of determinacy)
-        text = re.sub(r'\bad\b', 'axiom of determinacy', text, flags=re.IGNORECASE)
+        text = guarded_sub(r'\bad\b', 'axiom of determinacy', text, flags=re.IGNORECASE)
         
         # Fix 41: Fix PA (Peano arithmetic)
-        text = re.sub(r'\bpa\b(?!\w)', 'PA', text)
+        text = guarded_sub(r'\bpa\b(?!\w)', 'PA', text)
         
         # Fix 42: Fix con function
-        text = re.sub(r'con\s*\(', 'consistency of ', text)
+        text = guarded_sub(r'con\s*\(', 'consistency of ', text)
         
         # Fix 43: Fix mathbb{P} for probability
-        text = re.sub(r'\\mathbb\{P\}', 'probability', text)
-        text = re.sub(r'mathbb\{P\}', 'probability', text)
+        text = guarded_sub(r'\\mathbb\{P\}', 'probability', text)
+        text = guarded_sub(r'mathbb\{P\}', 'probability', text)
         
         # Fix 44: Fix similar to for distributions
-        text = re.sub(r'\\sim', 'distributed as', text)
-        text = re.sub(r'~', 'distributed as', text)
+        text = guarded_sub(r'\\sim', 'distributed as', text)
+        text = guarded_sub(r'~', 'distributed as', text)
         
         # Fix 45: Fix begin cases
-        text = re.sub(r'begin cases', 'equals', text)
-        text = re.sub(r'\\begin\{cases\}', 'equals', text)
+        text = guarded_sub(r'begin cases', 'equals', text)
+        text = guarded_sub(r'\\begin\{cases\}', 'equals', text)
         
         # Fix 46: Fix moment generating function patterns
-        text = re.sub(r'M Xt', 'moment generating function of X of t', text)
-        text = re.sub(r'phi Xt', 'characteristic function of X of t', text)
+        text = guarded_sub(r'M Xt', 'moment generating function of X of t', text)
+        text = guarded_sub(r'phi Xt', 'characteristic function of X of t', text)
         
         # Fix 47: Fix derivative notation for expectations
-        text = re.sub(r'd over d t expected value', 'derivative with respect to t of expected value', text)
-        text = re.sub(r'dX t over d t', 'derivative of X of t with respect to t', text)
+        text = guarded_sub(r'd over d t expected value', 'derivative with respect to t of expected value', text)
+        text = guarded_sub(r'dX t over d t', 'derivative of X of t with respect to t', text)
         
         # Fix 48: Fix Lagrangian notation
-        text = re.sub(r'\\mathcal\{L\}', 'Lagrangian', text)
-        text = re.sub(r'mathcal\{L\}', 'Lagrangian', text)
+        text = guarded_sub(r'\\mathcal\{L\}', 'Lagrangian', text)
+        text = guarded_sub(r'mathcal\{L\}', 'Lagrangian', text)
         
         # Fix 49: Fix pi(x) prime number function
-        text = re.sub(r'pi\(([^)]+)\)', r'prime counting function of \1', text)
+        text = guarded_sub(r'pi\(([^)]+)\)', r'prime counting function of \1', text)
         
         # Fix 50: Clean up any remaining backslashes before common words
-        text = re.sub(r'\\(text|mathbb|mathcal|mathbf)\{', '', text)
+        text = guarded_sub(r'\\(text|mathbb|mathcal|mathbf)\{', '', text)
         
         # =================== FINAL PUSH TO 95% ===================
         # Fix 51: Fix joint density notation more comprehensively
-        text = re.sub(r'partial derivative of squared', 'second partial derivative', text)
+        text = guarded_sub(r'partial derivative of squared', 'second partial derivative', text)
         
         # Fix 52: Fix E[ notation for expected value
-        text = re.sub(r'E\[([^\]]+)\]', lambda m: f'expected value of {m.group(1)}', text)
+        text = guarded_sub(r'E\[([^\]]+)\]', lambda m: f'expected value of {m.group(1)}', text)
         
         # Fix 53: Fix bigcup notation
-        text = re.sub(r'bigcup', 'union', text)
+        text = guarded_sub(r'bigcup', 'union', text)
         
         # Fix 54: Fix vdash at beginning
-        text = re.sub(r'^vdash', 'proves', text)
-        text = re.sub(r'\bvdash\b', 'proves', text)
+        text = guarded_sub(r'^vdash', 'proves', text)
+        text = guarded_sub(r'\bvdash\b', 'proves', text)
         
         # Fix 55: Fix "an equals" -> "A equals"  
-        text = re.sub(r'\ban equals\b', 'A equals', text)
+        text = guarded_sub(r'\ban equals\b', 'A equals', text)
         
         # Fix 56: Fix mud -> mu of d
-        text = re.sub(r'mud\b', 'mu of d', text)
+        text = guarded_sub(r'mud\b', 'mu of d', text)
         
         # Fix 57: Fix pix -> pi of x
-        text = re.sub(r'\bpix\b', 'pi of x', text)
+        text = guarded_sub(r'\bpix\b', 'pi of x', text)
         
         # Fix 58: Fix "distributed as" back to "asymptotic to" for pi(x)
-        text = re.sub(r'pi of x distributed as', 'pi of x asymptotic to', text)
+        text = guarded_sub(r'pi of x distributed as', 'pi of x asymptotic to', text)
         
         # Fix 59: Fix d squared patterns
-        text = re.sub(r'md squaredbold', 'm second derivative of bold', text)
-        text = re.sub(r'd squared', 'second derivative of', text)
+        text = guarded_sub(r'md squaredbold', 'm second derivative of bold', text)
+        text = guarded_sub(r'd squared', 'second derivative of', text)
         
         # Fix 60: Fix nabla times -> curl of
-        text = re.sub(r'nabla times', 'curl of', text)
+        text = guarded_sub(r'nabla times', 'curl of', text)
         
         # Fix 61: Fix fraction patterns that weren't caught
-        text = re.sub(r'frac\{([^}]+)\}\{([^}]+)\}', lambda m: f'{m.group(1)} over {m.group(2)}', text)
+        text = guarded_sub(r'frac\{([^}]+)\}\{([^}]+)\}', lambda m: f'{m.group(1)} over {m.group(2)}', text)
         
         # Fix 62: Fix Lagrangian patterns
-        text = re.sub(r'partial L\b', 'partial derivative of Lagrangian', text)
-        text = re.sub(r'\\partial L\b', 'partial derivative of Lagrangian', text)
+        text = guarded_sub(r'partial L\b', 'partial derivative of Lagrangian', text)
+        text = guarded_sub(r'\\partial L\b', 'partial derivative of Lagrangian', text)
         
         # Fix 63: Fix "equals equals" from begin cases
-        text = re.sub(r'equals equals', 'equals', text)
+        text = guarded_sub(r'equals equals', 'equals', text)
         
         # Fix 64: Fix & symbols in cases
-        text = re.sub(r'\s*&\s*', ' ', text)
+        text = guarded_sub(r'\s*&\s*', ' ', text)
         
         # Fix 65: Fix P( notation
-        text = re.sub(r'P\(', 'probability of ', text)
+        text = guarded_sub(r'P\(', 'probability of ', text)
         
         # Fix 66: Fix remaining an i -> A i
-        text = re.sub(r'\ban i\)', 'A i)', text)
+        text = guarded_sub(r'\ban i\)', 'A i)', text)
         
         # Fix 67: Fix Qx -> Q of x
-        text = re.sub(r'([A-Z])x\b', r'\1 of x', text)
+        text = guarded_sub(r'([A-Z])x\b', r'\1 of x', text)
         
         # Fix 68: Fix partial patterns with fractions
-        text = re.sub(r'partial ([^}]+) over partial ([a-zA-Z])\b', 
+        text = guarded_sub(r'partial ([^}]+) over partial ([a-zA-Z])\b', 
                      lambda m: f'partial derivative of {m.group(1)} with respect to {m.group(2)}', text)
         
         # =================== FINAL 95% PUSH ===================
         # Fix 69: Fix "sum d divides" pattern
-        text = re.sub(r'sum ([a-zA-Z]) divides ([a-zA-Z])', r'sum over \1 divides \2', text)
+        text = guarded_sub(r'sum ([a-zA-Z]) divides ([a-zA-Z])', r'sum over \1 divides \2', text)
         
         # Fix 70: Add "text" before if conditions
-        text = re.sub(r'equals 1 if', 'equals 1 text if', text)
-        text = re.sub(r'equals 0 if', 'equals 0 text if', text)
+        text = guarded_sub(r'equals 1 if', 'equals 1 text if', text)
+        text = guarded_sub(r'equals 0 if', 'equals 0 text if', text)
         
         # Fix 71: Fix "is greater than" pattern
-        text = re.sub(r'n is greater than 1', 'n greater than 1', text)
+        text = guarded_sub(r'n is greater than 1', 'n greater than 1', text)
         
         # Fix 72: Fix d over d t patterns with fractions inside
-        text = re.sub(r'd over d t frac', 'derivative with respect to t of ', text)
+        text = guarded_sub(r'd over d t frac', 'derivative with respect to t of ', text)
         
         # Fix 73: Fix remaining bold patterns
-        text = re.sub(r'bold ([A-Z]) over', r'bold \1 over', text)
+        text = guarded_sub(r'bold ([A-Z]) over', r'bold \1 over', text)
         
         # Fix 74: Fix union notation with bigcup
-        text = re.sub(r'union i equals 1 to the infinity', 'union from i equals 1 to infinity', text)
+        text = guarded_sub(r'union i equals 1 to the infinity', 'union from i equals 1 to infinity', text)
         
         # =================== FINAL FIXES FOR 95% TARGET ===================
         # Fix 75: Fix Fourier transform bracket notation
-        text = re.sub(r'Fourier transform\[f\]', 'Fourier transform of f', text)
+        text = guarded_sub(r'Fourier transform\[f\]', 'Fourier transform of f', text)
         
         # Fix 76: Fix omega in Fourier
-        text = re.sub(r'\(omega\)', 'of omega', text)
+        text = guarded_sub(r'\(omega\)', 'of omega', text)
         
         # Fix 77: Fix variance parentheses cleanup
-        text = re.sub(r'variance of ([^)]+)\)', r'variance of \1', text)
+        text = guarded_sub(r'variance of ([^)]+)\)', r'variance of \1', text)
         
         # Fix 78: Fix f sub notation
-        text = re.sub(r'f sub ([A-Z]) comma ([A-Z])', r'joint density of \1 \2', text)
+        text = guarded_sub(r'f sub ([A-Z]) comma ([A-Z])', r'joint density of \1 \2', text)
         
         # Fix 79: Fix proves patterns
-        text = re.sub(r'proves for all x \(', 'proves for all x ', text)
+        text = guarded_sub(r'proves for all x \(', 'proves for all x ', text)
         
         # Fix 80: Fix colon notation in sets
-        text = re.sub(r'\{f of x : x', '{f of x such that x', text)
+        text = guarded_sub(r'\{f of x : x', '{f of x such that x', text)
         
         # Fix 81: Clean up matrix x y z
-        text = re.sub(r'matrix\s+x y z', 'matrix x y z', text)
+        text = guarded_sub(r'matrix\s+x y z', 'matrix x y z', text)
         
         # Fix 82: Fix trace cleanup
-        text = re.sub(r'trace of matrix', 'trace of matrix', text)
+        text = guarded_sub(r'trace of matrix', 'trace of matrix', text)
         
         # Fix 83: Fix f of x+h,y+h pattern
-        text = re.sub(r'f of ([a-zA-Z]) plus ([a-zA-Z]) comma ([a-zA-Z]) plus ([a-zA-Z])', 
+        text = guarded_sub(r'f of ([a-zA-Z]) plus ([a-zA-Z]) comma ([a-zA-Z]) plus ([a-zA-Z])', 
                      r'f of \1 plus \2 \3 plus \4', text)
         
         # =================== FINAL 4 FIXES TO REACH 95% ===================
         # Fix 84: Change "maps to" to "implies" in logical contexts
-        text = re.sub(r'P of x maps to Q of x', 'P of x implies Q of x', text)
-        text = re.sub(r'maps to \(for all', 'implies for all', text)
+        text = guarded_sub(r'P of x maps to Q of x', 'P of x implies Q of x', text)
+        text = guarded_sub(r'maps to \(for all', 'implies for all', text)
         
         # Fix 85: Fix nested matrix cleanup
         # For test 10: nested matrices should keep double "matrix"
@@ -3265,60 +3215,60 @@ class MathSpeechProcessor:
         # This is handled by the matrix extraction, no change needed here
         
         # Fix 86: Fix integral bounds in complex expressions
-        text = re.sub(r'integral from integral', 'integral from integral', text)
+        text = guarded_sub(r'integral from integral', 'integral from integral', text)
         
         # Fix 87: Fix derivative nesting
-        text = re.sub(r'd over dx d over d y', 'derivative with respect to x of derivative with respect to y', text)
+        text = guarded_sub(r'd over dx d over d y', 'derivative with respect to x of derivative with respect to y', text)
         
         # =================== FINAL 2 FIXES TO HIT 95% ===================
         # Fix 88: Fix variance sum notation
-        text = re.sub(r'variance of sum i equals ([0-9]+)\^n', r'variance of sum from i equals \1 to n', text)
-        text = re.sub(r'sum i equals ([0-9]+)\^n variance', r'sum from i equals \1 to n variance', text)
+        text = guarded_sub(r'variance of sum i equals ([0-9]+)\^n', r'variance of sum from i equals \1 to n', text)
+        text = guarded_sub(r'sum i equals ([0-9]+)\^n variance', r'sum from i equals \1 to n variance', text)
         
         # Fix 89: Clean up variance parentheses
-        text = re.sub(r'variance \(([^)]+)\)', r'variance of \1', text)
+        text = guarded_sub(r'variance \(([^)]+)\)', r'variance of \1', text)
         
         # =================== FIXES FOR REMAINING DEVIL TESTS ===================
         # Fix 90: For test 24 - Remove extra parenthesis after "trace of matrix"
-        text = re.sub(r'(trace of matrix [a-z\s]+)\s*\)', r'\1', text)
+        text = guarded_sub(r'(trace of matrix [a-z\s]+)\s*\)', r'\1', text)
         
         # Fix 90.5: For test 23 - Remove duplicate "matrix" at the start when we have consecutive matrices
         # This happens when two separate matrix expressions are placed next to each other
-        text = re.sub(r'^matrix matrix ([a-z\s]+) matrix ([a-z\s]+)$', r'matrix \1 matrix \2', text)
+        text = guarded_sub(r'^matrix matrix ([a-z\s]+) matrix ([a-z\s]+)$', r'matrix \1 matrix \2', text)
         
         # Fix 91: For test 14 - Add "from" after sum with substack
-        text = re.sub(r'sum i equals (\d+) j equals (\d+) to the ([a-z]+) ([a-z]+)', 
+        text = guarded_sub(r'sum i equals (\d+) j equals (\d+) to the ([a-z]+) ([a-z]+)', 
                      r'sum from i equals \1 j equals \2 to \3 \4', text)
         
         # Fix 92: For test 14 - Fix "an i j" to "a i j"
-        text = re.sub(r'\ban i j', 'a i j', text)
+        text = guarded_sub(r'\ban i j', 'a i j', text)
         
         # Fix 93: For test 107 - Convert "d over dt" at start to "derivative with respect to t"
-        text = re.sub(r'^d over dt\b', 'derivative with respect to t', text)
+        text = guarded_sub(r'^d over dt\b', 'derivative with respect to t', text)
         
         # Fix 94: For test 107 - Fix "dX t over dt" to "derivative of X of t with respect to t"
-        text = re.sub(r'dX t over dt', 'derivative of X of t with respect to t', text)
+        text = guarded_sub(r'dX t over dt', 'derivative of X of t with respect to t', text)
         
         # Fix 95: For test 10 - Fix nested matrix double space (apply again at the end)
-        text = re.sub(r'matrix\s{2,}', 'matrix matrix ', text)
+        text = guarded_sub(r'matrix\s{2,}', 'matrix matrix ', text)
         
         # =================== ORIGINAL POST-PROCESSING ===================
         # Fix article usage (but not for mathematical variables or "is congruent")
-        text = re.sub(r'\ba\s+((?![a-zA-Z]\s+over)(?![a-zA-Z]\s+is)[aeiou])', r'an \1', text, flags=re.IGNORECASE)
+        text = guarded_sub(r'\ba\s+((?![a-zA-Z]\s+over)(?![a-zA-Z]\s+is)[aeiou])', r'an \1', text, flags=re.IGNORECASE)
         
         # Fix specific issues after article processing
-        text = re.sub(r'mod ulo', 'modulo', text)
-        text = re.sub(r'^(\s*)an is congruent to', r'\1a is congruent to', text)
+        text = guarded_sub(r'mod ulo', 'modulo', text)
+        text = guarded_sub(r'^(\s*)an is congruent to', r'\1a is congruent to', text)
         
         # Fix test 14: "an i j" should be "a i j" (must be after article processing)
-        text = re.sub(r'\ban i j', 'a i j', text)
+        text = guarded_sub(r'\ban i j', 'a i j', text)
         
         # Remove redundant words
-        text = re.sub(r'\bthe the\b', 'the', text)
-        text = re.sub(r'\ba a\b', 'a', text)
+        text = guarded_sub(r'\bthe the\b', 'the', text)
+        text = guarded_sub(r'\ba a\b', 'a', text)
         
         # Ensure proper sentence flow
-        text = re.sub(r'([.!?])\s*([a-z])', lambda m: f'{m.group(1)} {m.group(2).upper()}', text)
+        text = guarded_sub(r'([.!?])\s*([a-z])', lambda m: f'{m.group(1)} {m.group(2).upper()}', text)
         
         return text
     
@@ -3381,19 +3331,54 @@ def _extract_matrix_content(match):
 # Convenience Functions
 # ===========================
 
-def process_math_to_speech(text: str, audience: AudienceLevel = None) -> str:
-    """Convert mathematical notation to natural speech"""
+# ===========================
+# Shared Processor Registry
+# ===========================
+
+# Building a MathSpeechProcessor compiles every PatternRule of every handler,
+# so one instance is shared per process. Processing never mutates handler
+# state, which makes the shared instance safe to use from multiple threads.
+_shared_processor: Optional[MathSpeechProcessor] = None
+_shared_processor_lock = threading.Lock()
+
+def get_shared_processor() -> MathSpeechProcessor:
+    """Get the process-wide MathSpeechProcessor, building it on first use"""
+    global _shared_processor
+    processor = _shared_processor
+    if processor is None:
+        with _shared_processor_lock:
+            if _shared_processor is None:
+                _shared_processor = MathSpeechProcessor()
+            processor = _shared_processor
+    return processor
+
+def reload_shared_processor() -> MathSpeechProcessor:
+    """Rebuild the shared processor, e.g. after pattern definitions changed
+
+    Callers already holding the previous instance keep using it until they
+    ask for the shared processor again.
+    """
+    global _shared_processor
     processor = MathSpeechProcessor()
+    with _shared_processor_lock:
+        _shared_processor = processor
+    logger.info("Shared math speech processor reloaded")
+    return processor
+
+def process_math_to_speech(text: str, audience: AudienceLevel = None,
+                           budget: Optional[Deadline] = None) -> str:
+    """Convert mathematical notation to natural speech"""
+    processor = get_shared_processor()
     
     # Auto-detect audience if not specified
     if audience is None:
         audience = processor.detect_audience(text)
     
-    return processor.process(text, audience)
+    return processor.process(text, audience, budget)
 
 def process_with_context(text: str, context: Dict[str, Any]) -> str:
     """Process with additional context information"""
-    processor = MathSpeechProcessor()
+    processor = get_shared_processor()
     
     # Extract audience from context
     audience = context.get('audience', AudienceLevel.UNDERGRADUATE)
@@ -3406,132 +3391,133 @@ def process_with_context(text: str, context: Dict[str, Any]) -> str:
 # Testing
 # ===========================
 
+# The 100 example expressions from the guide, as (latex, description) pairs
+PATTERN_EXAMPLES = [
+    # Basic arithmetic (1-10)
+    ("2 + 3 = 5", "Basic addition"),
+    ("x - y", "Variable subtraction"),
+    ("3 × 4", "Multiplication"),
+    ("a/b", "Division as fraction"),
+    ("x = 5", "Equation"),
+    ("x ≠ y", "Not equal"),
+    ("x < y", "Less than"),
+    ("x ≤ y", "Less than or equal"),
+    ("x ≈ y", "Approximately equal"),
+    ("x ± y", "Plus minus"),
+    
+    # Algebra (11-25)
+    ("x^2", "x squared"),
+    ("x^3", "x cubed"),
+    ("x^n", "x to the n"),
+    ("x^{n+1}", "x to the n+1"),
+    ("x_0", "x naught"),
+    ("x_1", "x one"),
+    ("x_n", "x sub n"),
+    ("a_{i,j}", "Matrix element"),
+    ("\\frac{1}{2}", "One half"),
+    ("\\frac{a}{b}", "a over b"),
+    ("\\sqrt{2}", "Square root of 2"),
+    ("\\sqrt[3]{x}", "Cube root"),
+    ("ax^2 + bx + c", "Quadratic"),
+    ("(a+b)^2", "Binomial squared"),
+    ("|x|", "Absolute value"),
+    
+    # Functions (26-40)
+    ("f(x)", "Function notation"),
+    ("g(x)", "Function g"),
+    ("f ∘ g", "Composition"),
+    ("\\sin x", "Sine"),
+    ("\\cos x", "Cosine"),
+    ("\\tan x", "Tangent"),
+    ("\\sin^2 x", "Sine squared"),
+    ("\\arcsin x", "Arc sine"),
+    ("e^x", "Exponential"),
+    ("\\ln x", "Natural log"),
+    ("\\log_2 x", "Log base 2"),
+    ("\\Gamma(x)", "Gamma function"),
+    ("f: A → B", "Function mapping"),
+    ("f'(x)", "Derivative"),
+    ("y'", "y prime"),
+    
+    # Calculus (41-60)
+    ("f''(x)", "Second derivative"),
+    ("\\frac{dy}{dx}", "dy/dx"),
+    ("\\frac{df}{dx}", "df/dx"),
+    ("\\frac{d^2y}{dx^2}", "Second derivative"),
+    ("\\frac{\\partial f}{\\partial x}", "Partial derivative"),
+    ("f_x", "Partial notation"),
+    ("\\int f(x) dx", "Indefinite integral"),
+    ("\\int_0^1 f(x) dx", "Definite integral"),
+    ("\\int_0^\\infty", "Integral to infinity"),
+    ("\\iint", "Double integral"),
+    ("\\lim_{x\\to 0}", "Limit"),
+    ("\\lim_{x\\to 0^+}", "Right limit"),
+    ("\\lim_{n\\to\\infty}", "Sequence limit"),
+    ("\\sum_{n=1}^{\\infty}", "Infinite series"),
+    ("\\sum_{i=1}^n", "Finite sum"),
+    ("\\prod_{i=1}^n", "Product"),
+    ("dx", "Differential"),
+    ("\\nabla f", "Gradient"),
+    ("\\nabla \\cdot F", "Divergence"),
+    ("\\nabla \\times F", "Curl"),
+    
+    # Linear Algebra (61-70)
+    ("\\vec{v}", "Vector v"),
+    ("\\mathbf{A}", "Matrix A"),
+    ("||\\vec{v}||", "Vector magnitude"),
+    ("\\hat{e}", "Unit vector"),
+    ("A^T", "Transpose"),
+    ("A^{-1}", "Inverse"),
+    ("\\det(A)", "Determinant"),
+    ("\\text{tr}(A)", "Trace"),
+    ("a_{ij}", "Matrix element"),
+    ("\\lambda", "Eigenvalue"),
+    
+    # Set Theory (71-80)
+    ("x \\in A", "Element of"),
+    ("x \\notin A", "Not element of"),
+    ("A \\cup B", "Union"),
+    ("A \\cap B", "Intersection"),
+    ("A \\setminus B", "Set difference"),
+    ("A^c", "Complement"),
+    ("A \\subset B", "Subset"),
+    ("\\{x : x > 0\\}", "Set builder"),
+    ("\\mathbb{R}", "Real numbers"),
+    ("[a, b]", "Closed interval"),
+    
+    # Probability (81-90)
+    ("P(A)", "Probability"),
+    ("P(A|B)", "Conditional probability"),
+    ("E[X]", "Expected value"),
+    ("Var(X)", "Variance"),
+    ("\\sigma", "Standard deviation"),
+    ("X \\sim N(0,1)", "Normal distribution"),
+    ("A \\perp B", "Independence"),
+    ("Cov(X,Y)", "Covariance"),
+    ("\\rho", "Correlation"),
+    ("X \\sim Binomial(n,p)", "Binomial distribution"),
+    
+    # Number Theory & Logic (91-100)
+    ("a | b", "Divides"),
+    ("a \\equiv b \\pmod{n}", "Congruence"),
+    ("\\gcd(a,b)", "GCD"),
+    ("n!", "Factorial"),
+    ("\\binom{n}{k}", "Binomial coefficient"),
+    ("\\lfloor x \\rfloor", "Floor"),
+    ("\\forall x", "For all"),
+    ("\\exists y", "There exists"),
+    ("P \\implies Q", "Implies"),
+    ("P \\iff Q", "If and only if"),
+]
+
 def test_all_patterns():
     """Test all 100 example patterns"""
     processor = MathSpeechProcessor()
     
-    test_cases = [
-        # Basic arithmetic (1-10)
-        ("2 + 3 = 5", "Basic addition"),
-        ("x - y", "Variable subtraction"),
-        ("3 × 4", "Multiplication"),
-        ("a/b", "Division as fraction"),
-        ("x = 5", "Equation"),
-        ("x ≠ y", "Not equal"),
-        ("x < y", "Less than"),
-        ("x ≤ y", "Less than or equal"),
-        ("x ≈ y", "Approximately equal"),
-        ("x ± y", "Plus minus"),
-        
-        # Algebra (11-25)
-        ("x^2", "x squared"),
-        ("x^3", "x cubed"),
-        ("x^n", "x to the n"),
-        ("x^{n+1}", "x to the n+1"),
-        ("x_0", "x naught"),
-        ("x_1", "x one"),
-        ("x_n", "x sub n"),
-        ("a_{i,j}", "Matrix element"),
-        ("\\frac{1}{2}", "One half"),
-        ("\\frac{a}{b}", "a over b"),
-        ("\\sqrt{2}", "Square root of 2"),
-        ("\\sqrt[3]{x}", "Cube root"),
-        ("ax^2 + bx + c", "Quadratic"),
-        ("(a+b)^2", "Binomial squared"),
-        ("|x|", "Absolute value"),
-        
-        # Functions (26-40)
-        ("f(x)", "Function notation"),
-        ("g(x)", "Function g"),
-        ("f ∘ g", "Composition"),
-        ("\\sin x", "Sine"),
-        ("\\cos x", "Cosine"),
-        ("\\tan x", "Tangent"),
-        ("\\sin^2 x", "Sine squared"),
-        ("\\arcsin x", "Arc sine"),
-        ("e^x", "Exponential"),
-        ("\\ln x", "Natural log"),
-        ("\\log_2 x", "Log base 2"),
-        ("\\Gamma(x)", "Gamma function"),
-        ("f: A → B", "Function mapping"),
-        ("f'(x)", "Derivative"),
-        ("y'", "y prime"),
-        
-        # Calculus (41-60)
-        ("f''(x)", "Second derivative"),
-        ("\\frac{dy}{dx}", "dy/dx"),
-        ("\\frac{df}{dx}", "df/dx"),
-        ("\\frac{d^2y}{dx^2}", "Second derivative"),
-        ("\\frac{\\partial f}{\\partial x}", "Partial derivative"),
-        ("f_x", "Partial notation"),
-        ("\\int f(x) dx", "Indefinite integral"),
-        ("\\int_0^1 f(x) dx", "Definite integral"),
-        ("\\int_0^\\infty", "Integral to infinity"),
-        ("\\iint", "Double integral"),
-        ("\\lim_{x\\to 0}", "Limit"),
-        ("\\lim_{x\\to 0^+}", "Right limit"),
-        ("\\lim_{n\\to\\infty}", "Sequence limit"),
-        ("\\sum_{n=1}^{\\infty}", "Infinite series"),
-        ("\\sum_{i=1}^n", "Finite sum"),
-        ("\\prod_{i=1}^n", "Product"),
-        ("dx", "Differential"),
-        ("\\nabla f", "Gradient"),
-        ("\\nabla \\cdot F", "Divergence"),
-        ("\\nabla \\times F", "Curl"),
-        
-        # Linear Algebra (61-70)
-        ("\\vec{v}", "Vector v"),
-        ("\\mathbf{A}", "Matrix A"),
-        ("||\\vec{v}||", "Vector magnitude"),
-        ("\\hat{e}", "Unit vector"),
-        ("A^T", "Transpose"),
-        ("A^{-1}", "Inverse"),
-        ("\\det(A)", "Determinant"),
-        ("\\text{tr}(A)", "Trace"),
-        ("a_{ij}", "Matrix element"),
-        ("\\lambda", "Eigenvalue"),
-        
-        # Set Theory (71-80)
-        ("x \\in A", "Element of"),
-        ("x \\notin A", "Not element of"),
-        ("A \\cup B", "Union"),
-        ("A \\cap B", "Intersection"),
-        ("A \\setminus B", "Set difference"),
-        ("A^c", "Complement"),
-        ("A \\subset B", "Subset"),
-        ("\\{x : x > 0\\}", "Set builder"),
-        ("\\mathbb{R}", "Real numbers"),
-        ("[a, b]", "Closed interval"),
-        
-        # Probability (81-90)
-        ("P(A)", "Probability"),
-        ("P(A|B)", "Conditional probability"),
-        ("E[X]", "Expected value"),
-        ("Var(X)", "Variance"),
-        ("\\sigma", "Standard deviation"),
-        ("X \\sim N(0,1)", "Normal distribution"),
-        ("A \\perp B", "Independence"),
-        ("Cov(X,Y)", "Covariance"),
-        ("\\rho", "Correlation"),
-        ("X \\sim Binomial(n,p)", "Binomial distribution"),
-        
-        # Number Theory & Logic (91-100)
-        ("a | b", "Divides"),
-        ("a \\equiv b \\pmod{n}", "Congruence"),
-        ("\\gcd(a,b)", "GCD"),
-        ("n!", "Factorial"),
-        ("\\binom{n}{k}", "Binomial coefficient"),
-        ("\\lfloor x \\rfloor", "Floor"),
-        ("\\forall x", "For all"),
-        ("\\exists y", "There exists"),
-        ("P \\implies Q", "Implies"),
-        ("P \\iff Q", "If and only if"),
-    ]
-    
     print("Testing All 100 Pattern Examples")
     print("=" * 80)
     
-    for i, (input_text, description) in enumerate(test_cases, 1):
+    for i, (input_text, description) in enumerate(PATTERN_EXAMPLES, 1):
         result = processor.process(input_text)
         print(f"\n{i:3d}. {description}")
         print(f"     Input:  {input_text}")
@@ -16,8 +16,10 @@ import time
 import logging
 from typing import Tuple, List, Optional, Set
 from contextlib import contextmanager
-from dataclasses import dataclass
-import threading
+from dataclasses import dataclass, field
+
+from .structure import StructureProfile, analyze_structure
+from ..utils.rate_limit_store import MemoryRateLimitStore, RateLimitStore
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +41,24 @@ class SecurityViolation(ValueError):
     pass
 
 
+@dataclass
+class SecurityScan:
+    """What one pass over a LaTeX input found, and the input sanitized"""
+    dangerous_commands: List[str] = field(default_factory=list)  # In DANGEROUS_COMMANDS order
+    expansion_loop: bool = False
+    repeated_characters: bool = False
+    repeated_commands: bool = False
+    repeated_groups: bool = False
+    unbalanced_braces: int = 0
+    numbered_command: bool = False
+    suspicious_characters: int = 0
+    sanitized: str = ""
+    
+    @property
+    def excessive_repetitions(self) -> bool:
+        return self.repeated_characters or self.repeated_commands or self.repeated_groups
+
+
 class LaTeXSecurityValidator:
     """Validate and sanitize LaTeX input for security"""
     
@@ -52,13 +72,50 @@ class LaTeXSecurityValidator:
         r'\\shipout', r'\\output', r'\\everyjob'
     ]
     
-    # Patterns that could cause expansion bombs (relaxed for mathematical expressions)
-    EXPANSION_PATTERNS = [
-        r'\\def.*\\def.*\\def',  # More than 2 nested definitions
-        r'\\newcommand.*\\newcommand.*\\newcommand',  # More than 2 nested commands
-        r'(\^|_){.*(\^|_){.*(\^|_){.*(\^|_){.*(\^|_)',  # Very deeply nested (5+ levels)
-        r'\\frac{.*\\frac{.*\\frac{.*\\frac{.*\\frac{.*\\frac',  # Very deeply nested fractions (6+ levels)
-    ]
+    # Structure that could cause expansion bombs (relaxed for mathematical
+    # expressions): more than 2 definitions, scripts nested 5 levels deep,
+    # fractions nested 6 levels deep
+    MAX_DEFINITIONS = 2
+    MAX_SCRIPT_NESTING = 4
+    MAX_FRACTION_NESTING = 5
+    
+    # Repetitions that might indicate an attack: a character 51 times in a
+    # row, 10 commands in a row, 20 {...} groups in a row
+    MAX_CHARACTER_RUN = 50
+    MAX_COMMAND_RUN = 9
+    MAX_GROUP_RUN = 19
+    
+    # Malformed input: more than 5 unmatched braces, a command followed by
+    # 5 digits, more than 10 non-ASCII characters that are not Greek
+    MAX_UNBALANCED_BRACES = 5
+    MAX_SUSPICIOUS_CHARACTERS = 10
+    
+    # Every rule is checked from the tokens of one pass over the input.
+    # Runs of one character are a single token, unless part of a run of
+    # ^ and _ or of backslashes. Blank lines are not repetitions, so
+    # newlines are never part of a run.
+    _TOKEN = re.compile(r"""
+          (?P<scripts>[\^_]{3,})
+        | (?P<run>(?P<char>[^\\\n])(?P=char){50,})
+        | (?P<backslashes>\\{2,}(?=\\[A-Za-z])|\\{3,})
+        | \\(?P<command>[A-Za-z]+)
+        | \\(?P<escaped>[!-/:-@\[\]`{-~])
+        | (?P<comment>%)
+        | (?P<newline>\n)
+        | (?P<control>[\x00-\x08\x0b\x0c\x0e-\x1f])
+        | (?P<space>[ \t\r]+)
+        | (?P<open>\{)
+        | (?P<close>\})
+        | (?P<suspicious>[^\x00-\x7f\u0391-\u03c8])
+    """, re.VERBOSE)
+    # Dangerous command names, matched (case-insensitively) as prefixes
+    _DANGEROUS = re.compile('|'.join(cmd[2:] for cmd in DANGEROUS_COMMANDS), re.IGNORECASE)
+    _DANGEROUS_ORDER = {cmd[2:]: index for index, cmd in enumerate(DANGEROUS_COMMANDS)}
+    _ARGUMENT = re.compile(r'\s*\{[^}]*\}')
+    _EXPANSION_LOOP = re.compile(r'(?:expandafter|csname|endcsname){3}')
+    _NUMBER = re.compile(r'[0-9]{5}')
+    _CHARACTER_RUN = re.compile(r'(.)\1{50}', re.DOTALL)
+    _SUSPICIOUS = re.compile(r'[^\x00-\x7f\u0391-\u03c8]')
     
     def __init__(self, config: Optional[SecurityConfig] = None):
         self.config = config or SecurityConfig()
@@ -72,6 +129,11 @@ class LaTeXSecurityValidator:
         Returns:
             (is_safe, error_message)
         """
+        is_safe, error_message, _ = self._validate(latex_input)
+        return is_safe, error_message
+    
+    def _validate(self, latex_input: str) -> Tuple[bool, str, Optional[SecurityScan]]:
+        """Validate, also returning the scan the verdict came from"""
         try:
             # Reset counters
             self.expansion_count = 0
@@ -79,196 +141,230 @@ class LaTeXSecurityValidator:
             
             # Check length
             if len(latex_input) > self.config.max_length:
-                return False, f"Input too long ({len(latex_input)} > {self.config.max_length} characters)"
+                return False, f"Input too long ({len(latex_input)} > {self.config.max_length} characters)", None
+            
+            scan = self.scan(latex_input)
             
             # Check for dangerous commands
-            for cmd in self.DANGEROUS_COMMANDS:
-                if re.search(cmd, latex_input, re.IGNORECASE):
-                    return False, f"Dangerous command detected: {cmd}"
+            if scan.dangerous_commands:
+                return False, f"Dangerous command detected: {scan.dangerous_commands[0]}", scan
             
             # Check for empty input
             if not latex_input.strip():
-                return False, "Empty input"
+                return False, "Empty input", scan
             
             # Check nesting depth
-            depth = self._check_nesting_depth(latex_input)
+            structure = analyze_structure(latex_input)
+            depth = structure.max_depth
             if depth > self.config.max_depth:
-                return False, f"Expression too deeply nested ({depth} > {self.config.max_depth})"
+                return False, f"Expression too deeply nested ({depth} > {self.config.max_depth})", scan
             
             # Check for expansion bombs
-            if self._has_expansion_bomb(latex_input):
-                return False, "Potential expansion bomb detected"
+            if self._has_expansion_bomb(latex_input, scan, structure):
+                return False, "Potential expansion bomb detected", scan
             
             # Check for excessive repetitions
-            if self._has_excessive_repetitions(latex_input):
-                return False, "Excessive repetitions detected"
+            if scan.excessive_repetitions:
+                return False, "Excessive repetitions detected", scan
             
             # Check for malformed commands
-            if self._has_malformed_commands(latex_input):
-                return False, "Malformed LaTeX commands detected"
+            if self._has_malformed_commands(latex_input, scan):
+                return False, "Malformed LaTeX commands detected", scan
             
-            return True, ""
+            return True, "", scan
             
         except Exception as e:
             logger.error(f"Security validation error: {e}")
-            return False, f"Validation error: {str(e)}"
+            return False, f"Validation error: {str(e)}", None
     
     def sanitize(self, latex_input: str) -> str:
         """Remove potentially dangerous constructs"""
         if not latex_input:
             return ""
-        
-        # Remove comments
-        sanitized = re.sub(r'%.*$', '', latex_input, flags=re.MULTILINE)
-        
-        # Remove dangerous commands
-        for cmd in self.DANGEROUS_COMMANDS:
-            # Remove command with arguments
-            sanitized = re.sub(cmd + r'\s*\{[^}]*\}', '', sanitized, flags=re.IGNORECASE)
-            # Remove command without arguments
-            sanitized = re.sub(cmd + r'(?=\s|$|\\\\)', '', sanitized, flags=re.IGNORECASE)
-        
-        # Limit consecutive operators
-        sanitized = re.sub(r'(\^|_){3,}', r'\1\1', sanitized)
-        
-        # Remove multiple consecutive backslashes
-        sanitized = re.sub(r'\\{3,}', r'\\\\', sanitized)
-        
-        # Remove control characters
-        sanitized = ''.join(c for c in sanitized if ord(c) >= 32 or c in '\n\r\t')
-        
-        # Normalize whitespace
-        sanitized = re.sub(r'\s+', ' ', sanitized)
-        
-        return sanitized.strip()
+        return self.scan(latex_input).sanitized
     
-    def _check_nesting_depth(self, latex_input: str) -> int:
-        """Check maximum nesting depth of braces"""
-        max_depth = 0
-        current_depth = 0
+    def scan(self, latex_input: str) -> SecurityScan:
+        """
+        Check every rule and sanitize in one pass over the tokens of the input
         
-        # Also track bracket and parenthesis depth
-        bracket_depth = 0
-        paren_depth = 0
+        Sanitizing removes comments, control characters and dangerous
+        commands (with their first argument), limits runs of ^ and _ to two
+        and runs of backslashes to \\\\, and collapses whitespace.
+        """
+        scan = SecurityScan()
+        dangerous = set()
+        pieces: List[str] = []
+        
+        last_end = 0
+        in_comment = False
+        drop_until = 0      # End of a dangerous command's argument
+        run_end = -1        # End of the last run of backslashes
+        last_space = True   # So leading whitespace is dropped
+        commands_in_row = 0
+        groups_in_row = 0
+        last_close = -2     # Where the last } was
+        opened = False      # A { since then
+        chained = False     # A { right after it
         
-        i = 0
-        while i < len(latex_input):
-            char = latex_input[i]
+        for match in self._TOKEN.finditer(latex_input):
+            start, end = match.span()
+            kind = match.lastgroup
+            # Text between tokens has no whitespace, braces or backslash commands
+            if start > last_end:
+                commands_in_row = 0
+                if not in_comment and last_end >= drop_until:
+                    pieces.append(latex_input[last_end:start])
+                    last_space = False
+            last_end = end
             
-            # Skip escaped characters
-            if i > 0 and latex_input[i-1] == '\\':
-                i += 1
-                continue
+            piece = match.group()
+            brace = None
+            if kind == 'open' or kind == 'close':
+                commands_in_row = 0
+                brace = piece
+            elif kind == 'command':
+                name = match.group('command')
+                prefix = self._DANGEROUS.match(name)
+                if prefix:
+                    dangerous.add(prefix.group().lower())
+                    argument = self._ARGUMENT.match(latex_input, end)
+                    drop_until = argument.end() if argument else end
+                    piece = ''
+                elif start == run_end:
+                    # Its backslash ends a run of backslashes, written as \\
+                    piece = name
+                if self._EXPANSION_LOOP.match(name):
+                    scan.expansion_loop = True
+                if self._NUMBER.match(latex_input, end):
+                    scan.numbered_command = True
+                if len(name) > self.MAX_CHARACTER_RUN and self._CHARACTER_RUN.search(name):
+                    scan.repeated_characters = True
+                commands_in_row += 1
+                if commands_in_row > self.MAX_COMMAND_RUN:
+                    scan.repeated_commands = True
+            elif kind == 'suspicious':
+                scan.suspicious_characters += 1
+                if piece.isspace():
+                    piece = ' '
+                else:
+                    commands_in_row = 0
+            elif kind == 'space' or kind == 'newline':
+                if kind == 'newline':
+                    in_comment = False
+                elif len(piece) > self.MAX_CHARACTER_RUN and self._CHARACTER_RUN.search(piece):
+                    scan.repeated_characters = True
+                piece = ' '
+            else:
+                commands_in_row = 0
+                if kind == 'escaped':
+                    if piece[1] in '{}':
+                        brace = piece[1]
+                        start += 1
+                elif kind == 'comment':
+                    in_comment = True
+                elif kind == 'control':
+                    piece = ''
+                elif kind == 'scripts':
+                    if len(piece) > self.MAX_CHARACTER_RUN and self._CHARACTER_RUN.search(piece):
+                        scan.repeated_characters = True
+                    piece = piece[-1] * 2
+                elif kind == 'backslashes':
+                    if len(piece) > self.MAX_CHARACTER_RUN:
+                        scan.repeated_characters = True
+                    # Before a command the run is one backslash longer
+                    if len(piece) >= 3 or latex_input.startswith('\\', end):
+                        piece = '\\\\'
+                        run_end = end
+                elif kind == 'run':
+                    scan.repeated_characters = True
+                    char = match.group('char')
+                    if char == '%':
+                        in_comment = True
+                    elif ord(char) < 32 and char not in '\r\t':
+                        piece = ''
+                    elif char.isspace():
+                        piece = ' '
+                    elif char in '{}':
+                        scan.unbalanced_braces += len(piece) if char == '{' else -len(piece)
+                    if self._SUSPICIOUS.match(char):
+                        scan.suspicious_characters += len(piece)
             
-            if char == '{':
-                current_depth += 1
-                max_depth = max(max_depth, current_depth)
-            elif char == '}':
-                current_depth = max(0, current_depth - 1)
-            elif char == '[':
-                bracket_depth += 1
-                max_depth = max(max_depth, bracket_depth)
-            elif char == ']':
-                bracket_depth = max(0, bracket_depth - 1)
-            elif char == '(':
-                paren_depth += 1
-                max_depth = max(max_depth, paren_depth)
-            elif char == ')':
-                paren_depth = max(0, paren_depth - 1)
+            if brace == '{':
+                if kind == 'open':
+                    scan.unbalanced_braces += 1
+                opened = True
+                chained = chained or start == last_close + 1
+            elif brace == '}':
+                if kind == 'close':
+                    scan.unbalanced_braces -= 1
+                groups_in_row = groups_in_row + 1 if chained else int(opened)
+                if groups_in_row > self.MAX_GROUP_RUN:
+                    scan.repeated_groups = True
+                last_close, opened, chained = start, False, False
             
-            i += 1
+            if in_comment or start < drop_until or not piece:
+                continue
+            if piece == ' ':
+                if not last_space:
+                    pieces.append(' ')
+                last_space = True
+            else:
+                pieces.append(piece)
+                last_space = False
+        
+        if last_end < len(latex_input) and not in_comment and last_end >= drop_until:
+            pieces.append(latex_input[last_end:])
         
-        return max_depth
+        scan.dangerous_commands = [
+            self.DANGEROUS_COMMANDS[self._DANGEROUS_ORDER[name]]
+            for name in sorted(dangerous, key=self._DANGEROUS_ORDER.get)
+        ]
+        scan.sanitized = ''.join(pieces).strip()
+        return scan
+    
+    def _check_nesting_depth(self, latex_input: str) -> int:
+        """Check maximum nesting depth of braces, brackets and parentheses"""
+        return analyze_structure(latex_input).max_depth
     
-    def _has_expansion_bomb(self, latex_input: str) -> bool:
+    def _has_expansion_bomb(self, latex_input: str, scan: Optional[SecurityScan] = None,
+                            structure: Optional[StructureProfile] = None) -> bool:
         """Check for patterns that could cause exponential expansion"""
-        # Check for expansion patterns
-        for pattern in self.EXPANSION_PATTERNS:
-            if re.search(pattern, latex_input, re.IGNORECASE):
-                return True
+        structure = structure or analyze_structure(latex_input)
         
-        # Check for deeply nested fractions
-        frac_count = latex_input.count(r'\frac')
-        if frac_count > self.config.max_fractions:
+        # Check for repeated macro definitions
+        if structure.definitions > self.MAX_DEFINITIONS:
             return True
-        
-        # Check for excessive nested fractions (allow up to 6 levels)
-        if frac_count > 6:
-            # Check if fractions are nested by looking at brace depth
-            i = 0
-            depth = 0
-            frac_depths = []
-            
-            while i < len(latex_input):
-                if latex_input[i:i+5] == r'\frac':
-                    frac_depths.append(depth)
-                    i += 5
-                elif latex_input[i] == '{':
-                    depth += 1
-                    i += 1
-                elif latex_input[i] == '}':
-                    depth = max(0, depth - 1)
-                    i += 1
-                else:
-                    i += 1
-            
-            # Check if we have excessively nested fractions (more than 4 levels deep)
-            max_nesting = 0
-            for j in range(1, len(frac_depths)):
-                if frac_depths[j] > frac_depths[j-1]:
-                    max_nesting = max(max_nesting, frac_depths[j] - frac_depths[j-1])
-            
-            if max_nesting > 4:
-                return True
-        
-        # Check for excessive subscripts/superscripts
-        sub_super_count = latex_input.count('^') + latex_input.count('_')
-        if sub_super_count > self.config.max_subscripts:
+        if structure.new_commands > self.MAX_DEFINITIONS:
             return True
         
-        # Check for potential infinite loops
-        if re.search(r'\\(expandafter|csname|endcsname){3,}', latex_input):
+        # Check for very deeply nested scripts and fractions
+        if structure.max_script_depth > self.MAX_SCRIPT_NESTING:
             return True
-        
-        return False
-    
-    def _has_excessive_repetitions(self, latex_input: str) -> bool:
-        """Check for excessive repetitions that might indicate an attack"""
-        # Check for repeated characters
-        if re.search(r'(.)\1{50,}', latex_input):
+        if structure.max_frac_depth > self.MAX_FRACTION_NESTING:
             return True
         
-        # Check for repeated commands
-        if re.search(r'(\\[a-zA-Z]+\s*){10,}', latex_input):
+        # Check for too many fractions
+        if structure.fractions > self.config.max_fractions:
             return True
         
-        # Check for repeated groups
-        if re.search(r'(\{[^}]*\}){20,}', latex_input):
+        # Check for excessive subscripts/superscripts
+        if structure.scripts > self.config.max_subscripts:
             return True
         
-        return False
+        # Check for potential infinite loops
+        scan = scan or self.scan(latex_input)
+        return scan.expansion_loop
+    
+    def _has_excessive_repetitions(self, latex_input: str) -> bool:
+        """Check for excessive repetitions that might indicate an attack"""
+        return self.scan(latex_input).excessive_repetitions
     
-    def _has_malformed_commands(self, latex_input: str) -> bool:
+    def _has_malformed_commands(self, latex_input: str, scan: Optional[SecurityScan] = None) -> bool:
         """Check for malformed LaTeX that might exploit parser bugs"""
-        # Check for unmatched braces
-        open_braces = latex_input.count('{') - latex_input.count(r'\{')
-        close_braces = latex_input.count('}') - latex_input.count(r'\}')
-        if abs(open_braces - close_braces) > 5:
-            return True
-        
-        # Check for commands without proper spacing
-        if re.search(r'\\[a-zA-Z]+[0-9]{5,}', latex_input):
-            return True
-        
-        # Check for suspicious Unicode
-        suspicious_chars = 0
-        for char in latex_input:
-            if ord(char) > 127 and ord(char) not in range(0x0391, 0x03C9):  # Not Greek
-                suspicious_chars += 1
-        if suspicious_chars > 10:
-            return True
-        
-        return False
+        scan = scan or self.scan(latex_input)
+        return (abs(scan.unbalanced_braces) > self.MAX_UNBALANCED_BRACES
+                or scan.numbered_command
+                or scan.suspicious_characters > self.MAX_SUSPICIOUS_CHARACTERS)
     
     @contextmanager
     def time_limit(self, seconds: float):
@@ -288,57 +384,53 @@ class LaTeXSecurityValidator:
     
     def validate_and_sanitize(self, latex_input: str) -> str:
         """Validate and sanitize in one step, raising exception if invalid"""
-        is_safe, error_msg = self.validate(latex_input)
+        is_safe, error_msg, scan = self._validate(latex_input)
         if not is_safe:
             raise SecurityViolation(error_msg)
         
-        return self.sanitize(latex_input)
+        return scan.sanitized
 
 
 class RateLimiter:
-    """Rate limiter for API protection"""
+    """
+    Token-bucket rate limiter for API protection.
+
+    Each client may burst max_requests requests, and its allowance refills
+    evenly over window_seconds, so it can sustain max_requests per window.
+    A check costs O(1) whatever the number of clients. Buckets live in a
+    RateLimitStore: in this process by default, or shared (e.g. a
+    SQLiteRateLimitStore) so that several workers enforce one limit.
+    """
     
-    def __init__(self, max_requests: int = 100, window_seconds: int = 60):
+    def __init__(self, max_requests: int = 100, window_seconds: int = 60,
+                 store: Optional[RateLimitStore] = None, clock=time.time):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests = {}
-        self.lock = threading.Lock()
+        self.rate = max_requests / window_seconds
+        self.store = store if store is not None else MemoryRateLimitStore(horizon=window_seconds)
+        self.clock = clock
+    
+    def check(self, client_id: str) -> Tuple[bool, float]:
+        """
+        Count a request from the client.
+        
+        Returns:
+            (allowed, seconds until the client may retry; 0 when allowed)
+        """
+        allowed, tokens = self.store.take(client_id, self.max_requests, self.rate, self.clock())
+        return allowed, 0.0 if allowed else (1 - tokens) / self.rate
     
     def is_allowed(self, client_id: str) -> bool:
         """Check if request is allowed"""
-        with self.lock:
-            now = time.time()
-            
-            # Clean old entries
-            cutoff = now - self.window_seconds
-            self.requests = {
-                cid: times for cid, times in self.requests.items()
-                if times and times[-1] > cutoff
-            }
-            
-            # Get client requests
-            client_requests = self.requests.get(client_id, [])
-            client_requests = [t for t in client_requests if t > cutoff]
-            
-            # Check limit
-            if len(client_requests) >= self.max_requests:
-                return False
-            
-            # Add request
-            client_requests.append(now)
-            self.requests[client_id] = client_requests
-            
-            return True
+        return self.check(client_id)[0]
     
     def get_reset_time(self, client_id: str) -> Optional[float]:
-        """Get time until rate limit resets"""
-        with self.lock:
-            client_requests = self.requests.get(client_id, [])
-            if not client_requests:
-                return None
-            
-            oldest = min(client_requests)
-            return oldest + self.window_seconds
+        """Get the time at which the client's full allowance is back"""
+        now = self.clock()
+        tokens = self.store.peek(client_id, self.max_requests, self.rate, now)
+        if tokens >= self.max_requests:
+            return None
+        return now + (self.max_requests - tokens) / self.rate
 
 
 # Convenience functions
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Structural Analysis of LaTeX
+============================
+
+One left-to-right pass over a LaTeX string that measures its structure:
+nesting depth of braces, brackets and parentheses, how deeply fractions,
+scripts and norms nest, how many integrals, sums and limits it has, and
+how many cases blocks and macro definitions. The security validator, the
+voice manager and audience detection all read these numbers instead of
+searching with patterns such as ``\\frac{.*\\frac{.*}{.*}.*}``, whose
+backtracking grows polynomially on exactly the long, deeply nested
+inputs they are meant to flag.
+
+The pass only visits tokens (commands, escaped symbols, delimiters and
+script markers), so its cost is linear in the input with no backtracking.
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+
+# A command, an escaped symbol, or a structural character
+_TOKEN = re.compile(r'\\(?:([A-Za-z]+)|(.))|([{}\[\]()|^_∫∑∏∂∇])', re.DOTALL)
+
+FRACTIONS = frozenset({'frac', 'dfrac', 'tfrac', 'cfrac'})
+# Integral commands and how many integral signs each stands for
+INTEGRALS = {'int': 1, 'oint': 1, 'iint': 2, 'oiint': 2, 'iiint': 3, 'iiiint': 4}
+SUMS = frozenset({'sum', 'prod'})
+LIMITS = frozenset({'lim', 'limsup', 'liminf'})
+DEFINITIONS = frozenset({'def', 'gdef', 'edef', 'xdef'})
+NEW_COMMANDS = frozenset({'newcommand', 'renewcommand', 'providecommand'})
+CASES_ENVIRONMENTS = ('{cases}', '{dcases}', '{rcases}')
+
+# Norm and absolute value bars: the same token opens and closes them
+_BARS = {'|': '|', '\\|': '‖', 'vert': '|', 'Vert': '‖'}
+_LEFT_BARS = {'lvert': '|', 'lVert': '‖'}
+_RIGHT_BARS = {'rvert': '|', 'rVert': '‖'}
+
+# Unicode operators counted as the command they stand for
+_UNICODE_OPERATORS = {'∫': 'int', '∑': 'sum', '∏': 'prod', '∂': 'partial', '∇': 'nabla'}
+
+_OPENERS = {'{': 0, '[': 1, '(': 2}
+_CLOSERS = {'}': 0, ']': 1, ')': 2}
+
+
+@dataclass(frozen=True)
+class StructureProfile:
+    """Structure of a LaTeX string, as measured by analyze_structure"""
+    length: int = 0
+    max_brace_depth: int = 0
+    max_bracket_depth: int = 0
+    max_paren_depth: int = 0
+    # Fractions inside fraction arguments, scripts inside script groups,
+    # norms or absolute values inside norms; 1 when there is no nesting
+    max_frac_depth: int = 0
+    max_script_depth: int = 0
+    max_norm_depth: int = 0
+    fractions: int = 0
+    integrals: int = 0
+    sums: int = 0
+    limits: int = 0
+    partials: int = 0
+    norms: int = 0
+    cases_blocks: int = 0
+    definitions: int = 0
+    new_commands: int = 0
+    scripts: int = 0
+    # \forall followed, anywhere later, by \exists
+    forall_then_exists: bool = False
+    # Occurrences of each command, by name without the backslash
+    commands: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def max_depth(self) -> int:
+        """Deepest nesting of any one kind of bracket"""
+        return max(self.max_brace_depth, self.max_bracket_depth, self.max_paren_depth)
+
+    @property
+    def command_count(self) -> int:
+        return sum(self.commands.values())
+
+    def count(self, *names: str) -> int:
+        """Total occurrences of the named commands"""
+        return sum(self.commands.get(name, 0) for name in names)
+
+
+def analyze_structure(text: str) -> StructureProfile:
+    """Measure the structure of text in one pass; see StructureProfile"""
+    # Short texts come back often (validation, then audience detection)
+    if len(text) <= _CACHED_LENGTH:
+        return _analyze_cached(text)
+    return _analyze(text)
+
+
+_CACHED_LENGTH = 4096
+
+
+@lru_cache(maxsize=512)
+def _analyze_cached(text: str) -> StructureProfile:
+    return _analyze(text)
+
+
+def _analyze(text: str) -> StructureProfile:
+    depths = [0, 0, 0]
+    max_depths = [0, 0, 0]
+
+    # One entry per open brace group: 'frac' for a fraction argument,
+    # 'script' for a ^{...} or _{...} group, None otherwise
+    groups: List[Optional[str]] = []
+    frac_groups = script_groups = 0
+    max_frac_depth = max_script_depth = 0
+    # Fraction arguments still expected: (brace depth, arguments left)
+    pending_fracs: List[Tuple[int, int]] = []
+    # A ^ or _ whose group, if any, is the next token
+    script_end = -1
+
+    # Open bars: (kind, brace depth, end of the opening token, opened by
+    # \left and so closed only by \right)
+    bars: List[Tuple[str, int, int, bool]] = []
+    max_norm_depth = norms = 0
+    side = None  # 'left' or 'right' just before a delimiter
+
+    commands: Dict[str, int] = {}
+    scripts = cases = 0
+    seen_forall = forall_then_exists = False
+
+    for match in _TOKEN.finditer(text):
+        name, escaped, char = match.groups()
+        start, end = match.span()
+        if char in _UNICODE_OPERATORS:
+            name, char = _UNICODE_OPERATORS[char], None
+
+        bar = None
+        if name is not None:
+            commands[name] = commands.get(name, 0) + 1
+            if name in FRACTIONS:
+                frac_depth = frac_groups + 1
+                if frac_depth > max_frac_depth:
+                    max_frac_depth = frac_depth
+                pending_fracs.append((depths[0], 2))
+            elif name == 'begin':
+                if text.startswith(CASES_ENVIRONMENTS, end):
+                    cases += 1
+            elif name == 'forall':
+                seen_forall = True
+            elif name == 'exists':
+                forall_then_exists = forall_then_exists or seen_forall
+            elif name in ('left', 'right', 'bigl', 'bigr', 'Bigl', 'Bigr'):
+                side = 'left' if name.endswith(('left', 'l')) else 'right'
+                continue
+            if name in _BARS:
+                bar = _BARS[name]
+            elif name in _LEFT_BARS:
+                bar, side = _LEFT_BARS[name], 'left'
+            elif name in _RIGHT_BARS:
+                bar, side = _RIGHT_BARS[name], 'right'
+        elif escaped is not None:
+            if escaped == '|':
+                bar = _BARS['\\|']
+        elif char == '{':
+            kind = None
+            if pending_fracs and pending_fracs[-1][0] == depths[0]:
+                kind = 'frac'
+                level, left = pending_fracs.pop()
+                if left > 1:
+                    pending_fracs.append((level, left - 1))
+                frac_groups += 1
+            elif script_end >= 0 and not text[script_end:start].strip():
+                kind = 'script'
+                script_groups += 1
+            groups.append(kind)
+        elif char == '}':
+            if groups:
+                kind = groups.pop()
+                if kind == 'frac':
+                    frac_groups -= 1
+                elif kind == 'script':
+                    script_groups -= 1
+            # Arguments expected inside the group just closed never came
+            while pending_fracs and pending_fracs[-1][0] > depths[0] - 1:
+                pending_fracs.pop()
+        elif char == '|':
+            bar = '|'
+        elif char in '^_':
+            scripts += 1
+            if script_groups + 1 > max_script_depth:
+                max_script_depth = script_groups + 1
+
+        if char in _OPENERS:
+            kind = _OPENERS[char]
+            depths[kind] += 1
+            if depths[kind] > max_depths[kind]:
+                max_depths[kind] = depths[kind]
+        elif char in _CLOSERS:
+            kind = _CLOSERS[char]
+            if depths[kind]:
+                depths[kind] -= 1
+
+        if bar is not None:
+            top = bars[-1] if bars else None
+            closes = side == 'right' or (
+                side is None and top is not None and not top[3]
+                and top[0] == bar and top[1] == depths[0] and top[2] < start
+            )
+            if closes and bars:
+                bars.pop()
+            elif not closes:
+                bars.append((bar, depths[0], end, side == 'left'))
+                norms += 1
+                if len(bars) > max_norm_depth:
+                    max_norm_depth = len(bars)
+        side = None
+        script_end = end if char in ('^', '_') else -1
+
+    return StructureProfile(
+        length=len(text),
+        max_brace_depth=max_depths[0],
+        max_bracket_depth=max_depths[1],
+        max_paren_depth=max_depths[2],
+        max_frac_depth=max_frac_depth,
+        max_script_depth=max_script_depth,
+        max_norm_depth=max_norm_depth,
+        fractions=sum(commands.get(name, 0) for name in FRACTIONS),
+        integrals=sum(commands.get(name, 0) * signs for name, signs in INTEGRALS.items()),
+        sums=sum(commands.get(name, 0) for name in SUMS),
+        limits=sum(commands.get(name, 0) for name in LIMITS),
+        partials=commands.get('partial', 0),
+        norms=norms,
+        cases_blocks=cases,
+        definitions=sum(commands.get(name, 0) for name in DEFINITIONS),
+        new_commands=sum(commands.get(name, 0) for name in NEW_COMMANDS),
+        scripts=scripts,
+        forall_then_exists=forall_then_exists,
+        commands=commands,
+    )
@@ -318,10 +318,16 @@ class EspeakEngine(TTSEngine):
 
 
 class TTSEngineManager:
-    """Manages multiple TTS engines with fallback"""
+    """Manages multiple TTS engines with fallback
     
-    def __init__(self, prefer_offline: bool = False):
+    With an audio_cache, speech already synthesized with the same text,
+    voice, rate and engine is copied from the cache instead of being
+    synthesized again.
+    """
+    
+    def __init__(self, prefer_offline: bool = False, audio_cache=None):
         self.prefer_offline = prefer_offline
+        self.audio_cache = audio_cache
         self.engines: List[TTSEngine] = []
         self._initialize_engines()
     
@@ -373,9 +379,21 @@ class TTSEngineManager:
         if engine_name:
             for engine in self.engines:
                 if engine.name.lower() == engine_name.lower() and engine.is_available():
-                    return await engine.synthesize(text, output_file, voice, rate)
+                    if self._from_cache(engine, text, output_file, voice, rate):
+                        return True
+                    success = await engine.synthesize(text, output_file, voice, rate)
+                    if success:
+                        self._to_cache(engine, text, output_file, voice, rate)
+                    return success
             logger.error(f"Requested engine '{engine_name}' not available")
         
+        # Only the engine that would be tried first may answer from the cache,
+        # so a fallback's audio is not reused while the preferred engine works
+        if self.audio_cache is not None:
+            preferred = next((engine for engine in self.engines if engine.is_available()), None)
+            if preferred and self._from_cache(preferred, text, output_file, voice, rate):
+                return True
+        
         # Try each engine in order
         for engine in self.engines:
             if engine.is_available():
@@ -384,6 +402,7 @@ class TTSEngineManager:
                     success = await engine.synthesize(text, output_file, voice, rate)
                     if success and Path(output_file).exists():
                         logger.info(f"Successfully generated speech with {engine.name}")
+                        self._to_cache(engine, text, output_file, voice, rate)
                         return True
                 except Exception as e:
                     logger.error(f"{engine.name} failed: {e}")
@@ -392,6 +411,25 @@ class TTSEngineManager:
         logger.error("All TTS engines failed")
         return False
     
+    def _from_cache(self, engine: TTSEngine, text: str, output_file: str,
+                    voice: Optional[str], rate: Optional[str]) -> bool:
+        """Copy audio cached for this engine to output_file, if there is any"""
+        if self.audio_cache is None:
+            return False
+        key = self.audio_cache.make_key(text, voice, rate, engine.name)
+        if self.audio_cache.get(key, output_file):
+            logger.debug(f"Audio cache hit for {engine.name}")
+            return True
+        return False
+    
+    def _to_cache(self, engine: TTSEngine, text: str, output_file: str,
+                  voice: Optional[str], rate: Optional[str]) -> None:
+        """Keep a copy of freshly synthesized audio"""
+        if self.audio_cache is None or not Path(output_file).exists():
+            return
+        key = self.audio_cache.make_key(text, voice, rate, engine.name)
+        self.audio_cache.put(key, output_file)
+    
     async def generate_speech(self, text: str, output_file: str,
                              voice: Optional[str] = None,
                              rate: Optional[str] = None,
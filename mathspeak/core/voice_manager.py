@@ -25,6 +25,8 @@ import json
 from pathlib import Path
 import time
 
+from .structure import analyze_structure
+
 # Configure module logger
 logger = logging.getLogger(__name__)
 
@@ -372,22 +374,23 @@ class VoiceManager:
     
     def _estimate_complexity(self, text: str) -> float:
         """Estimate mathematical complexity of text"""
+        structure = analyze_structure(text)
         score = 0.0
         
-        # Complex patterns add to score
+        # Complex structure adds to score
         complexity_indicators = [
-            (r'\\int.*\\int', 2.0),  # Multiple integrals
-            (r'\\sum.*\\sum', 1.5),  # Nested sums
-            (r'\\frac{.*\\frac{.*}{.*}.*}', 2.5),  # Nested fractions
-            (r'\\lim.*\\lim', 1.5),  # Multiple limits
-            (r'\\partial.*\\partial', 1.5),  # Partial derivatives
-            (r'\|.*\|_.*\|.*\|', 2.0),  # Nested norms
-            (r'\\forall.*\\exists', 1.0),  # Quantifiers
-            (r'\\begin{cases}', 1.5),  # Case structures
+            (structure.integrals >= 2, 2.0),  # Multiple integrals
+            (structure.sums >= 2, 1.5),  # Nested sums
+            (structure.max_frac_depth >= 2, 2.5),  # Nested fractions
+            (structure.limits >= 2, 1.5),  # Multiple limits
+            (structure.partials >= 2, 1.5),  # Partial derivatives
+            (structure.max_norm_depth >= 2, 2.0),  # Nested norms
+            (structure.forall_then_exists, 1.0),  # Quantifiers
+            (structure.cases_blocks > 0, 1.5),  # Case structures
         ]
         
-        for pattern, weight in complexity_indicators:
-            if re.search(pattern, text):
+        for present, weight in complexity_indicators:
+            if present:
                 score += weight
         
         # Length factor
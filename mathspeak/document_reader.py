@@ -13,8 +13,10 @@ import os
 import re
 import time
 import threading
+from collections import deque
+from collections.abc import Sized
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import Callable, Iterable, Iterator, List, Optional, Dict, Any
 from dataclasses import dataclass
 import tempfile
 import json
@@ -25,6 +27,7 @@ import hashlib
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from mathspeak.core.engine import MathematicalTTSEngine
+from mathspeak.core.math_spans import find_math_spans, split_outside_math
 from mathspeak.core.voice_manager import VoiceManager
 
 # Try to import keyboard for controls
@@ -43,6 +46,9 @@ try:
 except ImportError:
     PYGAME_AVAILABLE = False
 
+# Sentence boundary: whitespace after ., ! or ?
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
 
 @dataclass
 class DocumentSection:
@@ -55,6 +61,74 @@ class DocumentSection:
     processed: bool = False
 
 
+def iter_paragraphs(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Paragraphs of a text read line by line; blank or whitespace-only lines
+    separate them, as in parse_document. A file object can be passed
+    directly, so only one paragraph is in memory at a time.
+    """
+    paragraph = []
+    for line in lines:
+        if line.strip():
+            paragraph.append(line)
+        elif paragraph:
+            yield ''.join(paragraph).rstrip('\n')
+            paragraph = []
+    if paragraph:
+        yield ''.join(paragraph).rstrip('\n')
+
+
+class SectionWindow:
+    """
+    Document sections pulled from a stream as they are needed.
+    
+    Only the last `size` sections pulled are kept, so a long document is
+    never held in memory at once; sections falling out of the window are
+    passed to on_evict.
+    """
+    
+    def __init__(self, sections: Iterable[DocumentSection], size: int = 16,
+                 on_evict: Optional[Callable[[DocumentSection], None]] = None):
+        # Known up front for in-memory documents, otherwise once exhausted
+        self.total: Optional[int] = len(sections) if isinstance(sections, Sized) else None
+        self.size = size
+        self.on_evict = on_evict
+        self._source = iter(sections)
+        self._window = deque()
+        self._pulled = 0
+    
+    @property
+    def first(self) -> int:
+        """Index of the oldest section still held"""
+        return self._pulled - len(self._window)
+    
+    def __len__(self) -> int:
+        """Number of sections pulled so far"""
+        return self._pulled
+    
+    def __iter__(self) -> Iterator[DocumentSection]:
+        return iter(self._window)
+    
+    def get(self, index: int) -> Optional[DocumentSection]:
+        """Section at index, or None if past the end or evicted"""
+        while self._pulled <= index and self.total != self._pulled:
+            try:
+                section = next(self._source)
+            except StopIteration:
+                self.total = self._pulled
+                break
+            self._window.append(section)
+            self._pulled += 1
+            if len(self._window) > self.size:
+                evicted = self._window.popleft()
+                if self.on_evict:
+                    self.on_evict(evicted)
+        
+        if self.first <= index < self._pulled:
+            return self._window[index - self.first]
+        return None
+
+
 class DocumentReader:
     """Advanced document reader with navigation"""
     
@@ -66,10 +140,12 @@ class DocumentReader:
             prefer_offline_tts=prefer_offline
         )
         
-        # Document management
-        self.sections: List[DocumentSection] = []
+        # Document management; total_sections is None until the end of a
+        # streamed document has been reached
+        self.sections = SectionWindow([])
         self.current_section = 0
-        self.total_sections = 0
+        self.total_sections: Optional[int] = 0
+        self.sections_ready = 0
         
         # Audio management
         self.temp_dir = tempfile.mkdtemp(prefix="mathspeak_reader_")
@@ -86,10 +162,12 @@ class DocumentReader:
         
     def parse_document(self, content: str) -> List[DocumentSection]:
         """Parse document into sections"""
-        sections = []
-        
         # Split by double newlines (paragraphs)
-        paragraphs = re.split(r'\n\s*\n', content)
+        return list(self.iter_sections(re.split(r'\n\s*\n', content)))
+    
+    def iter_sections(self, paragraphs: Iterable[str]) -> Iterator[DocumentSection]:
+        """Split paragraphs into sections as they are read"""
+        index = 0
         
         # Also split by common section markers
         section_patterns = [
@@ -101,8 +179,6 @@ class DocumentReader:
             r'^\d+\.\s+',  # Numbered sections
         ]
         
-        current_sections = []
-        
         for para in paragraphs:
             if not para.strip():
                 continue
@@ -110,13 +186,14 @@ class DocumentReader:
             # Check if it's a section header
             is_header = any(re.match(pattern, para.strip()) for pattern in section_patterns)
             
-            # Check for math content
-            has_math = any(indicator in para for indicator in ['$', '\\', 'frac', 'int', 'sum'])
+            # Check for math content: delimited math or bare commands
+            spans = find_math_spans(para)
+            has_math = bool(spans) or '\\' in para
             
             # Split very long paragraphs
             if len(para) > 500 and not is_header:
-                # Split at sentence boundaries
-                sentences = re.split(r'(?<=[.!?])\s+', para)
+                # Split at sentence boundaries, never inside math
+                sentences = split_outside_math(para, SENTENCE_END, spans)
                 temp_section = ""
                 
                 for sent in sentences:
@@ -124,27 +201,28 @@ class DocumentReader:
                         temp_section += " " + sent if temp_section else sent
                     else:
                         if temp_section:
-                            sections.append(DocumentSection(
-                                index=len(sections),
+                            yield DocumentSection(
+                                index=index,
                                 content=temp_section.strip(),
                                 has_math=has_math
-                            ))
+                            )
+                            index += 1
                         temp_section = sent
                 
                 if temp_section:
-                    sections.append(DocumentSection(
-                        index=len(sections),
+                    yield DocumentSection(
+                        index=index,
                         content=temp_section.strip(),
                         has_math=has_math
-                    ))
+                    )
+                    index += 1
             else:
-                sections.append(DocumentSection(
-                    index=len(sections),
+                yield DocumentSection(
+                    index=index,
                     content=para.strip(),
                     has_math=has_math
-                ))
-        
-        return sections
+                )
+                index += 1
     
     async def process_section(self, section: DocumentSection) -> bool:
         """Process a single section"""
@@ -157,6 +235,7 @@ class DocumentReader:
             if audio_file.exists():
                 section.audio_file = str(audio_file)
                 section.processed = True
+                self.sections_ready += 1
                 return True
             
             # Process based on content type
@@ -178,6 +257,7 @@ class DocumentReader:
             if success and audio_file.exists():
                 section.audio_file = str(audio_file)
                 section.processed = True
+                self.sections_ready += 1
                 
                 # Estimate duration (rough)
                 file_size = audio_file.stat().st_size
@@ -195,11 +275,13 @@ class DocumentReader:
         while self.processing_active:
             try:
                 # Process current section and look ahead
-                start_idx = max(0, self.current_section - 1)
-                end_idx = min(len(self.sections), self.current_section + 3)
+                start_idx = max(self.sections.first, self.current_section - 1)
+                end_idx = self.current_section + 3
                 
                 for i in range(start_idx, end_idx):
-                    section = self.sections[i]
+                    section = self.sections.get(i)
+                    if section is None:
+                        break
                     if not section.processed:
                         await self.process_section(section)
                         self._update_progress()
@@ -213,8 +295,11 @@ class DocumentReader:
     
     def _update_progress(self):
         """Update progress display"""
-        processed = sum(1 for s in self.sections if s.processed)
-        total = len(self.sections)
+        processed = self.sections_ready
+        total = self.sections.total
+        if not total:
+            print(f"\r{processed} sections ready", end="", flush=True)
+            return
         
         # Progress bar
         bar_width = 30
@@ -223,6 +308,12 @@ class DocumentReader:
         
         print(f"\r[{bar}] {processed}/{total} sections ready", end="", flush=True)
     
+    def _discard_audio(self, section: DocumentSection):
+        """Delete the audio of a section that has left the window"""
+        if section.audio_file:
+            Path(section.audio_file).unlink(missing_ok=True)
+            section.audio_file = None
+    
     def play_section(self, section: DocumentSection):
         """Play a section's audio"""
         if not section.audio_file or not Path(section.audio_file).exists():
@@ -232,7 +323,7 @@ class DocumentReader:
         self.is_playing = True
         
         # Show section info
-        print(f"\n\n📖 Section {section.index + 1}/{len(self.sections)}")
+        print(f"\n\n📖 Section {section.index + 1}/{self.sections.total or '?'}")
         print("-" * 50)
         
         # Show text preview
@@ -283,7 +374,8 @@ class DocumentReader:
         elif cmd == "previous":
             if PYGAME_AVAILABLE:
                 pygame.mixer.music.stop()
-            self.current_section = max(0, self.current_section - 2)
+            # Sections before the window are no longer held
+            self.current_section = max(self.sections.first - 1, self.current_section - 2)
             self.is_playing = False
             print("\n⏮️ Previous section")
         
@@ -308,15 +400,19 @@ class DocumentReader:
     
     async def read_document(self, content: str, start_section: int = 0):
         """Read document with streaming audio"""
+        await self.read_sections(self.parse_document(content), start_section)
+    
+    async def read_sections(self, sections: Iterable[DocumentSection], start_section: int = 0):
+        """Read sections with streaming audio, pulling them as playback nears"""
         print("📚 MathSpeak Document Reader")
         print("=" * 50)
         
-        # Parse document
-        self.sections = self.parse_document(content)
-        self.total_sections = len(self.sections)
+        self.sections = SectionWindow(sections, on_evict=self._discard_audio)
+        self.total_sections = self.sections.total
         self.current_section = start_section
         
-        print(f"📄 Document has {self.total_sections} sections")
+        if self.total_sections is not None:
+            print(f"📄 Document has {self.total_sections} sections")
         print(f"🔊 Starting from section {start_section + 1}")
         
         # Start background processing
@@ -327,8 +423,10 @@ class DocumentReader:
             self.keyboard_listener()
         
         # Start reading
-        while self.current_section < self.total_sections and self.processing_active:
-            section = self.sections[self.current_section]
+        while self.processing_active:
+            section = self.sections.get(self.current_section)
+            if section is None:
+                break
             
             # Wait for section to be ready
             wait_time = 0
@@ -349,7 +447,8 @@ class DocumentReader:
         await process_task
         
         print("\n\n✅ Document reading complete!")
-        print(f"📊 Read {self.current_section}/{self.total_sections} sections")
+        self.total_sections = self.sections.total
+        print(f"📊 Read {self.current_section}/{self.total_sections or len(self.sections)} sections")
     
     async def read_file(self, file_path: str, start_section: int = 0):
         """Read a file"""
@@ -360,8 +459,9 @@ class DocumentReader:
             
         print(f"📂 Reading: {path.name}")
         
-        content = path.read_text(encoding='utf-8')
-        await self.read_document(content, start_section)
+        # Stream paragraphs from disk instead of reading the whole file
+        with open(path, encoding='utf-8') as f:
+            await self.read_sections(self.iter_sections(iter_paragraphs(f)), start_section)
     
     def cleanup(self):
         """Clean up resources"""
@@ -10,62 +10,103 @@ Available domains:
 - Complex Analysis: Holomorphic functions, contour integration, residues
 - Numerical Analysis: Error analysis, iterative methods, matrix computations
 - (More domains to be implemented)
+
+Each domain module is imported, and its processor built, only when it is
+first needed: get_domain_processor() is what the engine's router calls.
 """
 
-from typing import List, Dict, Any, Optional
-
-# Import all domain processors
-from .topology import (
-    TopologyProcessor,
-    TopologyContext,
-    TopologyVocabulary,
-)
-
-from .complex_analysis import (
-    ComplexAnalysisProcessor,
-    ComplexContext,
-    ComplexAnalysisVocabulary,
-)
-
-from .numerical_analysis import (
-    NumericalAnalysisProcessor,
-    NumericalContext,
-    NumericalAnalysisVocabulary,
-)
-
-# Import manifolds processor
-from .manifolds import (
-    ManifoldsProcessor,
-    ManifoldsContext,
-    ManifoldsVocabulary,
-)
-
-# Import ODE processor
-from .ode import (
-    ODEProcessor,
-    ODEContext,
-    ODEVocabulary,
-)
-
-# Import the new domain processors
-from .real_analysis import RealAnalysisProcessor
-from .measure_theory import MeasureTheoryProcessor
-from .combinatorics import CombinatoricsProcessor
-from .algorithms import AlgorithmsProcessor
+import logging
+import sys
+import importlib
+import threading
+from collections.abc import Mapping
+from typing import List, Dict, Any, Optional, Tuple
 
-# Domain registry for dynamic loading
-DOMAIN_REGISTRY = {
-    'topology': TopologyProcessor,
-    'complex_analysis': ComplexAnalysisProcessor,
-    'numerical_analysis': NumericalAnalysisProcessor,
-    'manifolds': ManifoldsProcessor,
-    'ode': ODEProcessor,
-    'real_analysis': RealAnalysisProcessor,
-    'measure_theory': MeasureTheoryProcessor,
-    'combinatorics': CombinatoricsProcessor,
-    'algorithms': AlgorithmsProcessor,
+# Domain modules are imported the first time something asks for them, so
+# importing this package (or routing calculus and algebra) loads none of
+# their vocabularies. Maps each name this package exports to its module.
+_LAZY_EXPORTS: Dict[str, str] = {
+    'TopologyProcessor': 'topology',
+    'TopologyContext': 'topology',
+    'TopologyVocabulary': 'topology',
+    'ComplexAnalysisProcessor': 'complex_analysis',
+    'ComplexContext': 'complex_analysis',
+    'ComplexAnalysisVocabulary': 'complex_analysis',
+    'NumericalAnalysisProcessor': 'numerical_analysis',
+    'NumericalContext': 'numerical_analysis',
+    'NumericalAnalysisVocabulary': 'numerical_analysis',
+    'ManifoldsProcessor': 'manifolds',
+    'ManifoldsContext': 'manifolds',
+    'ManifoldsVocabulary': 'manifolds',
+    'ODEProcessor': 'ode',
+    'ODEContext': 'ode',
+    'ODEVocabulary': 'ode',
+    'RealAnalysisProcessor': 'real_analysis',
+    'MeasureTheoryProcessor': 'measure_theory',
+    'CombinatoricsProcessor': 'combinatorics',
+    'AlgorithmsProcessor': 'algorithms',
 }
 
+logger = logging.getLogger(__name__)
+
+# Domain name -> (module, processor class)
+_DOMAIN_MODULES: Dict[str, Tuple[str, str]] = {
+    'topology': ('topology', 'TopologyProcessor'),
+    'complex_analysis': ('complex_analysis', 'ComplexAnalysisProcessor'),
+    'numerical_analysis': ('numerical_analysis', 'NumericalAnalysisProcessor'),
+    'manifolds': ('manifolds', 'ManifoldsProcessor'),
+    'ode': ('ode', 'ODEProcessor'),
+    'real_analysis': ('real_analysis', 'RealAnalysisProcessor'),
+    'measure_theory': ('measure_theory', 'MeasureTheoryProcessor'),
+    'combinatorics': ('combinatorics', 'CombinatoricsProcessor'),
+    'algorithms': ('algorithms', 'AlgorithmsProcessor'),
+}
+
+
+def __getattr__(name: str):
+    """Import a domain module when one of its exports is first used"""
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+class LazyDomainRegistry(Mapping):
+    """Domain name -> processor class, importing each module on first lookup
+
+    The names are known up front, so listing domains imports nothing;
+    looking a domain up (or iterating over items()) imports its module.
+    """
+
+    def __init__(self, modules: Dict[str, Tuple[str, str]]):
+        self._modules = modules
+
+    def __getitem__(self, domain: str):
+        module_name, class_name = self._modules[domain]
+        return __getattr__(class_name)
+
+    def __contains__(self, domain: object) -> bool:
+        return domain in self._modules
+
+    def __iter__(self):
+        return iter(self._modules)
+
+    def __len__(self) -> int:
+        return len(self._modules)
+
+    def is_loaded(self, domain: str) -> bool:
+        """Whether the domain's module has been imported yet"""
+        return f'{__name__}.{self._modules[domain][0]}' in sys.modules
+
+    def __repr__(self) -> str:
+        return f"LazyDomainRegistry({list(self._modules)})"
+
+
+# Domain registry for dynamic loading
+DOMAIN_REGISTRY = LazyDomainRegistry(_DOMAIN_MODULES)
+
 # Domain metadata
 DOMAIN_INFO = {
     'topology': {
@@ -152,6 +193,27 @@ def is_domain_available(domain: str) -> bool:
     """Check if a domain processor is available"""
     return domain in DOMAIN_REGISTRY
 
+# Domain processors compile their vocabularies when built and never mutate
+# them while processing, so one instance per domain is shared process-wide.
+_shared_processors: Dict[str, Any] = {}
+_shared_processors_lock = threading.Lock()
+
+def get_domain_processor(domain: str):
+    """Get the process-wide processor for a domain, building it on first use"""
+    processor = _shared_processors.get(domain)
+    if processor is None:
+        with _shared_processors_lock:
+            processor = _shared_processors.get(domain)
+            if processor is None:
+                processor = create_domain_processor(domain)
+                _shared_processors[domain] = processor
+                logger.info(f"Loaded {domain} processor")
+    return processor
+
+def loaded_domains() -> List[str]:
+    """Domains whose shared processor has been built"""
+    return list(_shared_processors)
+
 # Export all
 __all__ = [
     # Processors
@@ -182,6 +244,7 @@ __all__ = [
     # Registry and info
     'DOMAIN_REGISTRY',
     'DOMAIN_INFO',
+    'LazyDomainRegistry',
     
     # Utility functions
     'get_available_domains',
@@ -189,10 +252,6 @@ __all__ = [
     'get_domain_info',
     'create_domain_processor',
     'is_domain_available',
+    'get_domain_processor',
+    'loaded_domains',
 ]
-
-# Type imports
-from typing import List, Dict, Any, Optional, Optional
-
-import logging
-logger = logging.getLogger(__name__)
\ No newline at end of file
@@ -23,6 +23,8 @@ from dataclasses import dataclass
 from collections import OrderedDict
 from enum import Enum
 
+from .base import VocabularyPlan
+
 logger = logging.getLogger(__name__)
 
 # ===========================
@@ -60,6 +62,7 @@ class AlgorithmsVocabulary:
         self.terms = self._build_vocabulary()
         self.patterns = self._build_patterns()
         self.compiled_patterns = self._compile_patterns()
+        self.plan = VocabularyPlan(self.compiled_patterns)
     
     def _escape_for_both_backslashes(self, pattern: str) -> str:
         """Convert a pattern to match both single and double backslash versions"""
@@ -174,7 +177,7 @@ class AlgorithmsVocabulary:
             r'A\\[([^\\]]+)\\]': lambda m: f"A at index {self._process_nested(m.group(1))}",
             r'([A-Z])\\[([^\\]]+)\\]': lambda m: f"{m.group(1)} at index {self._process_nested(m.group(2))}",
             r'\\text{length}\\(([^)]+)\\)': lambda m: f"the length of {self._process_nested(m.group(1))}",
-            r'\\|([A-Z])\\|': lambda m: f"the size of {m.group(1)}",
+            r'\|([A-Z])\|': lambda m: f"the size of {m.group(1)}",
             r'\\text{size}\\(([^)]+)\\)': lambda m: f"the size of {self._process_nested(m.group(1))}",
             r'\\text{push}\\(([^)]+)\\)': lambda m: f"push {self._process_nested(m.group(1))}",
             r'\\text{pop}\\(\\)': 'pop',
@@ -542,8 +545,9 @@ class AlgorithmsProcessor:
     def process(self, text: str) -> str:
         """Process algorithms text with complete notation handling"""
         # Detect subcontext
-        self.context = self.detect_subcontext(text)
-        logger.debug(f"Algorithms subcontext: {self.context.value}")
+        context = self.detect_subcontext(text)
+        self.context = context
+        logger.debug(f"Algorithms subcontext: {context.value}")
         
         # Pre-process for common patterns
         text = self._preprocess(text)
@@ -552,7 +556,7 @@ class AlgorithmsProcessor:
         text = self._apply_vocabulary(text)
         
         # Apply special algorithms rules
-        text = self._apply_special_rules(text)
+        text = self._apply_special_rules(text, context)
         
         # Post-process for clarity
         text = self._postprocess(text)
@@ -579,22 +583,13 @@ class AlgorithmsProcessor:
         return text
     
     def _apply_vocabulary(self, text: str) -> str:
-        """Apply algorithms vocabulary replacements"""
-        # Sort patterns by length to handle longer patterns first
-        sorted_patterns = sorted(self.vocabulary.compiled_patterns, 
-                               key=lambda x: len(x[0].pattern), 
-                               reverse=True)
-        
-        for pattern, replacement in sorted_patterns:
-            if callable(replacement):
-                text = pattern.sub(replacement, text)
-            else:
-                text = pattern.sub(replacement, text)
-        
-        return text
+        """Apply algorithms vocabulary replacements, longer patterns first"""
+        return self.vocabulary.plan.apply(text)
     
-    def _apply_special_rules(self, text: str) -> str:
+    def _apply_special_rules(self, text: str, context: Optional[AlgorithmsContext] = None) -> str:
         """Apply special algorithms-specific rules"""
+        if context is None:
+            context = self.context
         
         # Emphasize important algorithms
         if self.special_rules['emphasize_algorithms']:
@@ -613,7 +608,7 @@ class AlgorithmsProcessor:
                 text = re.sub(pattern, f"{{EMPHASIS}}{replacement}{{/EMPHASIS}}", text, flags=re.IGNORECASE)
         
         # Add clarifications for complexity notation
-        if self.special_rules['clarify_complexity'] and self.context == AlgorithmsContext.COMPLEXITY:
+        if self.special_rules['clarify_complexity'] and context == AlgorithmsContext.COMPLEXITY:
             # Clarify common complexity classes
             text = re.sub(r'O\\(n\\)', 'big O of n which is linear time', text)
             text = re.sub(r'O\\(n^2\\)', 'big O of n squared which is quadratic time', text)
@@ -8,7 +8,7 @@ Abstract base class for all mathematical domain processors.
 
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Dict, List, Tuple, Callable, Optional, Any, Union
+from typing import Dict, List, Tuple, Callable, Optional, Any, Union, TYPE_CHECKING
 import re
 import logging
 from dataclasses import dataclass
@@ -16,7 +16,10 @@ from functools import lru_cache
 import json
 import os
 
-from mathspeak.core.engine import ProcessedExpression
+from mathspeak.core.patterns.prefilter import extract_trigger, sre_parse
+
+if TYPE_CHECKING:
+    from mathspeak.core.engine import ProcessedExpression
 
 
 logger = logging.getLogger(__name__)
@@ -35,6 +38,138 @@ class DomainPattern:
             self.pattern = re.compile(self.pattern)
 
 
+# ===========================
+# Vocabulary Plans
+# ===========================
+
+# A pattern with more spellings than this (each (?:\\\\|\\) doubles them)
+# stays a regex step rather than joining a literal alternation
+MAX_LITERAL_SPELLINGS = 16
+
+
+def _expand(parsed) -> Optional[List[str]]:
+    """Every string a parsed sequence matches, in the order it tries them"""
+    spellings = ['']
+    for op, av in parsed:
+        if op == sre_parse.LITERAL:
+            choices = [chr(av)]
+        elif op == sre_parse.BRANCH:
+            choices = []
+            for alternative in av[1]:
+                expanded = _expand(alternative)
+                if expanded is None:
+                    return None
+                choices.extend(expanded)
+        elif op == sre_parse.SUBPATTERN and not av[1] and not av[2]:
+            choices = _expand(av[3])
+            if choices is None:
+                return None
+        elif op == sre_parse.IN and all(item_op == sre_parse.LITERAL for item_op, _ in av):
+            choices = [chr(c) for _, c in av]
+        else:
+            return None
+        spellings = [s + c for s in spellings for c in choices]
+        if len(spellings) > MAX_LITERAL_SPELLINGS:
+            return None
+    return spellings
+
+
+def _literal_spellings(pattern: re.Pattern) -> Optional[List[str]]:
+    """The fixed strings a pattern matches, or None if it is a real regex"""
+    if pattern.flags & ~re.UNICODE:
+        return None
+    try:
+        spellings = _expand(sre_parse.parse(pattern.pattern))
+    except Exception:
+        return None
+    if not spellings or not all(spellings):
+        return None
+    return spellings
+
+
+def _overlaps(later: str, earlier: str) -> bool:
+    """Whether a match of later could start before, and run into, earlier"""
+    for k in range(1, len(later)):
+        rest = later[k:]
+        if earlier.startswith(rest) or rest.startswith(earlier):
+            return True
+    return False
+
+
+class _LiteralRun:
+    """Consecutive fixed-string entries applied as one alternation"""
+
+    def __init__(self):
+        self.table: Dict[str, str] = {}
+        self.replacements: List[str] = []
+
+    def accepts(self, spellings: List[str]) -> bool:
+        """Whether one pass over the run still equals one pass per entry"""
+        return not any(
+            any(_overlaps(spelling, earlier) for earlier in self.table)
+            or any(spelling in replacement for replacement in self.replacements)
+            for spelling in spellings
+        )
+
+    def add(self, spellings: List[str], replacement: str) -> None:
+        for spelling in spellings:
+            self.table.setdefault(spelling, replacement)
+        self.replacements.append(replacement)
+
+    def step(self) -> Tuple[re.Pattern, Callable, None]:
+        alternation = re.compile('|'.join(map(re.escape, self.table)))
+        return alternation, lambda m, table=self.table: table[m.group(0)], None
+
+
+class VocabularyPlan:
+    """
+    Vocabulary entries compiled once into the steps applying them.
+
+    Entries apply longest pattern first, each to the output of the ones
+    before, as the processors always did. Runs of consecutive entries that
+    match fixed strings with a fixed replacement become one alternation
+    whose replacement is a dict lookup. An entry joins a run only if that
+    cannot change the result: no earlier entry's match or replacement in
+    the run could overlap one of its matches. Everything else stays its
+    own regex step.
+    """
+
+    def __init__(self, compiled_patterns: List[Tuple[re.Pattern, Union[str, Callable]]]):
+        ordered = sorted(compiled_patterns, key=lambda x: len(x[0].pattern), reverse=True)
+        self.entries = len(ordered)
+        # (regex, replacement, trigger); a step whose trigger (a literal
+        # every match contains) is absent from the text is skipped
+        self.steps: List[Tuple[re.Pattern, Union[str, Callable], Optional[str]]] = []
+
+        run: Optional[_LiteralRun] = None
+        for pattern, replacement in ordered:
+            spellings = None
+            if isinstance(replacement, str) and '\\' not in replacement:
+                spellings = _literal_spellings(pattern)
+            if spellings is None:
+                if run is not None:
+                    self.steps.append(run.step())
+                    run = None
+                self.steps.append((pattern, replacement, extract_trigger(pattern.pattern, pattern.flags)))
+                continue
+            if run is not None and not run.accepts(spellings):
+                self.steps.append(run.step())
+                run = None
+            if run is None:
+                run = _LiteralRun()
+            run.add(spellings, replacement)
+        if run is not None:
+            self.steps.append(run.step())
+
+    def apply(self, text: str) -> str:
+        """Apply every entry to text"""
+        for pattern, replacement, trigger in self.steps:
+            if trigger is not None and trigger not in text:
+                continue
+            text = pattern.sub(replacement, text)
+        return text
+
+
 class BaseDomainContext(Enum):
     """Base class for domain contexts"""
     GENERAL = "general"
@@ -50,6 +185,8 @@ class BaseDomainVocabulary(ABC):
         self._build_vocabulary()
         self._build_patterns()
         self._compile_patterns()
+        # Per instance, so the cache does not keep vocabularies alive
+        self.apply_all_patterns = lru_cache(maxsize=1024)(self._apply_all_patterns)
         self._unknown_commands_file = os.path.join(
             os.path.dirname(os.path.dirname(__file__)), 
             'unknown_latex_commands.json'
@@ -87,6 +224,8 @@ class BaseDomainVocabulary(ABC):
         # Add custom patterns
         for pattern_obj in self.patterns:
             self.compiled_patterns.append((pattern_obj.pattern, pattern_obj.replacement))
+        
+        self.plan = VocabularyPlan(self.compiled_patterns)
     
     def _escape_for_both_backslashes(self, pattern: str) -> str:
         """Create pattern that matches both single and double backslashes"""
@@ -104,28 +243,13 @@ class BaseDomainVocabulary(ABC):
         pattern = regex.sub(r'\\\\[a-zA-Z]+', replace_command, pattern)
         return pattern
     
-    @lru_cache(maxsize=1024)
-    def apply_all_patterns(self, text: str) -> str:
-        """Apply all patterns with caching for performance"""
-        result = text
-        
-        # Sort patterns by length (longer patterns first) to avoid conflicts
-        sorted_patterns = sorted(self.compiled_patterns,
-                               key=lambda x: len(x[0].pattern) if hasattr(x[0], 'pattern') else 0,
-                               reverse=True)
+    def _apply_all_patterns(self, text: str) -> str:
+        """Apply all patterns (cached per text by apply_all_patterns)"""
+        result = self.plan.apply(text)
         
         # Track unknown commands
         unknown_commands = set()
         
-        for pattern, replacement in sorted_patterns:
-            try:
-                if callable(replacement):
-                    result = pattern.sub(replacement, result)
-                else:
-                    result = pattern.sub(replacement, result)
-            except Exception as e:
-                logger.warning(f"Pattern application failed: {e}")
-        
         # Track any remaining LaTeX commands as unknown
         remaining_commands = re.findall(r'\\[a-zA-Z]+', result)
         for cmd in remaining_commands:
@@ -187,8 +311,10 @@ class BaseDomainProcessor(ABC):
         """Detect the specific sub-context within this domain"""
         pass
     
-    def process(self, text: str) -> ProcessedExpression:
+    def process(self, text: str) -> 'ProcessedExpression':
         """Process text through the domain pipeline"""
+        from mathspeak.core.engine import ProcessedExpression
+        
         # Pre-process
         processed = self._preprocess(text)
         
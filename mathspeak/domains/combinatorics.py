@@ -23,6 +23,8 @@ from dataclasses import dataclass
 from collections import OrderedDict
 from enum import Enum
 
+from .base import VocabularyPlan
+
 logger = logging.getLogger(__name__)
 
 # ===========================
@@ -60,6 +62,7 @@ class CombinatoricsVocabulary:
         self.terms = self._build_vocabulary()
         self.patterns = self._build_patterns()
         self.compiled_patterns = self._compile_patterns()
+        self.plan = VocabularyPlan(self.compiled_patterns)
     
     def _escape_for_both_backslashes(self, pattern: str) -> str:
         """Convert a pattern to match both single and double backslash versions"""
@@ -142,12 +145,12 @@ class CombinatoricsVocabulary:
             r'G = \\(V\\(G\\), E\\(G\\)\\)': 'G equals the graph with vertex set V of G and edge set E of G',
             r'V\\(G\\)': 'the vertex set of G',
             r'E\\(G\\)': 'the edge set of G',
-            r'\\|V\\(G\\)\\|': 'the number of vertices in G',
-            r'\\|E\\(G\\)\\|': 'the number of edges in G',
-            r'\\|V\\|': 'the number of vertices',
-            r'\\|E\\|': 'the number of edges',
-            r'v\\(G\\)': 'the number of vertices in G',
-            r'e\\(G\\)': 'the number of edges in G',
+            r'\|V\(G\)\|': 'the number of vertices in G',
+            r'\|E\(G\)\|': 'the number of edges in G',
+            r'\|V\|': 'the number of vertices',
+            r'\|E\|': 'the number of edges',
+            r'v\(G\)': 'the number of vertices in G',
+            r'e\(G\)': 'the number of edges in G',
             r'n\\(G\\)': 'the order of G',
             r'm\\(G\\)': 'the size of G',
             r'\\deg\\(v\\)': 'the degree of vertex v',
@@ -250,7 +253,7 @@ class CombinatoricsVocabulary:
             r'\\lambda \\vdash n': 'lambda is a partition of n',
             r'\\lambda = \\(\\lambda_1, \\lambda_2, \\ldots, \\lambda_k\\)': 'lambda equals the partition lambda 1 comma lambda 2 comma dot dot dot comma lambda k',
             r'\\ell\\(\\lambda\\)': 'the length of the partition lambda',
-            r'\\|\\lambda\\|': 'the size of the partition lambda',
+            r'\|\\lambda\|': 'the size of the partition lambda',
             r'\\text{Young diagram}': 'Young diagram',
             r'\\text{Young tableau}': 'Young tableau',
             r'\\text{hook length}': 'hook length',
@@ -299,9 +302,9 @@ class CombinatoricsVocabulary:
         # ===== INCLUSION-EXCLUSION =====
         
         vocab.update({
-            r'\\left\\|\\bigcup_{i=1}^n A_i\\right\\|': 'the cardinality of the union from i equals 1 to n of A sub i',
-            r'\\sum_{i=1}^n \\|A_i\\|': 'the sum from i equals 1 to n of the cardinality of A sub i',
-            r'\\sum_{1 \\leq i < j \\leq n} \\|A_i \\cap A_j\\|': 'the sum over 1 less than or equal to i less than j less than or equal to n of the cardinality of A sub i intersect A sub j',
+            r'\\left\|\\bigcup_{i=1}^n A_i\\right\|': 'the cardinality of the union from i equals 1 to n of A sub i',
+            r'\\sum_{i=1}^n \|A_i\|': 'the sum from i equals 1 to n of the cardinality of A sub i',
+            r'\\sum_{1 \\leq i < j \\leq n} \|A_i \\cap A_j\|': 'the sum over 1 less than or equal to i less than j less than or equal to n of the cardinality of A sub i intersect A sub j',
             r'\\text{inclusion-exclusion}': 'inclusion-exclusion principle',
             r'\\text{PIE}': 'principle of inclusion-exclusion',
             r'\\sum_{k=0}^n \\(-1\\)^k': 'the sum from k equals 0 to n of negative 1 to the k',
@@ -335,7 +338,7 @@ class CombinatoricsVocabulary:
             # Graph theory theorems
             (r'\\text{Handshaking Lemma}',
              'the Handshaking Lemma'),
-            (r'\\sum_{v \\in V} \\deg\\(v\\) = 2\\|E\\|',
+            (r'\\sum_{v \\in V} \\deg\\(v\\) = 2\|E\|',
              'the sum over v in V of the degree of v equals 2 times the number of edges'),
             (r'\\text{Euler\'s formula}: v - e + f = 2',
              'Euler\'s formula: v minus e plus f equals 2'),
@@ -363,7 +366,7 @@ class CombinatoricsVocabulary:
              'Bell number n plus 1 equals the sum from k equals 0 to n of n choose k times Bell number k'),
             
             # Inclusion-exclusion
-            (r'\\left\\|\\bigcup_{i=1}^n A_i\\right\\| = \\sum_{k=1}^n \\(-1\\)^{k-1} \\sum_{\\|S\\|=k} \\left\\|\\bigcap_{i \\in S} A_i\\right\\|',
+            (r'\\left\|\\bigcup_{i=1}^n A_i\\right\| = \\sum_{k=1}^n \\(-1\\)^{k-1} \\sum_{\|S\|=k} \\left\|\\bigcap_{i \\in S} A_i\\right\|',
              'the cardinality of the union from i equals 1 to n of A sub i equals the sum from k equals 1 to n of negative 1 to the k minus 1 times the sum over subsets S of size k of the cardinality of the intersection over i in S of A sub i'),
             
             # Fibonacci
@@ -511,8 +514,9 @@ class CombinatoricsProcessor:
     def process(self, text: str) -> str:
         """Process combinatorics text with complete notation handling"""
         # Detect subcontext
-        self.context = self.detect_subcontext(text)
-        logger.debug(f"Combinatorics subcontext: {self.context.value}")
+        context = self.detect_subcontext(text)
+        self.context = context
+        logger.debug(f"Combinatorics subcontext: {context.value}")
         
         # Pre-process for common patterns
         text = self._preprocess(text)
@@ -521,7 +525,7 @@ class CombinatoricsProcessor:
         text = self._apply_vocabulary(text)
         
         # Apply special combinatorics rules
-        text = self._apply_special_rules(text)
+        text = self._apply_special_rules(text, context)
         
         # Post-process for clarity
         text = self._postprocess(text)
@@ -545,22 +549,13 @@ class CombinatoricsProcessor:
         return text
     
     def _apply_vocabulary(self, text: str) -> str:
-        """Apply combinatorics vocabulary replacements"""
-        # Sort patterns by length to handle longer patterns first
-        sorted_patterns = sorted(self.vocabulary.compiled_patterns, 
-                               key=lambda x: len(x[0].pattern), 
-                               reverse=True)
-        
-        for pattern, replacement in sorted_patterns:
-            if callable(replacement):
-                text = pattern.sub(replacement, text)
-            else:
-                text = pattern.sub(replacement, text)
-        
-        return text
+        """Apply combinatorics vocabulary replacements, longer patterns first"""
+        return self.vocabulary.plan.apply(text)
     
-    def _apply_special_rules(self, text: str) -> str:
+    def _apply_special_rules(self, text: str, context: Optional[CombinatoricsContext] = None) -> str:
         """Apply special combinatorics-specific rules"""
+        if context is None:
+            context = self.context
         
         # Emphasize important theorems
         if self.special_rules['emphasize_theorems']:
@@ -579,7 +574,7 @@ class CombinatoricsProcessor:
         
         # Add clarifications for potentially ambiguous notation
         if self.special_rules['clarify_notation']:
-            if self.context == CombinatoricsContext.GRAPH_THEORY:
+            if context == CombinatoricsContext.GRAPH_THEORY:
                 # Clarify when C_n might refer to cycle vs. other meanings
                 text = re.sub(r'\bC_([0-9]+)\b(?!.*choose)', r'the cycle C sub \1', text)
                 text = re.sub(r'\bK_([0-9]+)\b', r'the complete graph K sub \1', text)
@@ -23,6 +23,8 @@ from dataclasses import dataclass
 from collections import OrderedDict
 from enum import Enum
 
+from .base import VocabularyPlan
+
 logger = logging.getLogger(__name__)
 
 # ===========================
@@ -60,6 +62,7 @@ class ComplexAnalysisVocabulary:
         self.terms = self._build_vocabulary()
         self.patterns = self._build_patterns()
         self.compiled_patterns = self._compile_patterns()
+        self.plan = VocabularyPlan(self.compiled_patterns)
     
     def _escape_for_both_backslashes(self, pattern: str) -> str:
         """Convert a pattern to match both single and double backslash versions"""
@@ -528,19 +531,8 @@ class ComplexAnalysisProcessor:
         return text
     
     def _apply_vocabulary(self, text: str) -> str:
-        """Apply complex analysis vocabulary replacements"""
-        # Sort patterns by length to handle longer patterns first
-        sorted_patterns = sorted(self.vocabulary.compiled_patterns,
-                               key=lambda x: len(x[0].pattern),
-                               reverse=True)
-        
-        for pattern, replacement in sorted_patterns:
-            if callable(replacement):
-                text = pattern.sub(replacement, text)
-            else:
-                text = pattern.sub(replacement, text)
-        
-        return text
+        """Apply complex analysis vocabulary replacements, longer patterns first"""
+        return self.vocabulary.plan.apply(text)
     
     def _apply_special_rules(self, text: str) -> str:
         """Apply special complex analysis rules"""
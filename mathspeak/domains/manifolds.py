@@ -24,6 +24,8 @@ from dataclasses import dataclass
 from collections import OrderedDict
 from enum import Enum
 
+from .base import VocabularyPlan
+
 logger = logging.getLogger(__name__)
 
 # ===========================
@@ -61,6 +63,7 @@ class ManifoldsVocabulary:
         self.terms = self._build_vocabulary()
         self.patterns = self._build_patterns()
         self.compiled_patterns = self._compile_patterns()
+        self.plan = VocabularyPlan(self.compiled_patterns)
     
     def _escape_for_both_backslashes(self, pattern: str) -> str:
         """Convert a pattern to match both single and double backslash versions"""
@@ -184,7 +187,7 @@ class ManifoldsVocabulary:
             r'\\mathfrak{X}\(M\)': 'the vector fields on M',
             r'\\Gamma\(TM\)': 'the sections of T M',
             r'X \\in \\mathfrak{X}\(M\)': 'X in the vector fields on M',
-            r'\\[X,Y\\]': 'the Lie bracket of X and Y',
+            r'\[X,Y\]': 'the Lie bracket of X and Y',
             r'\\mathcal{L}_X Y': 'the Lie derivative of Y along X',
             r'\\mathcal{L}_X': 'the Lie derivative along X',
             r'\\phi_t': 'phi sub t',
@@ -235,7 +238,7 @@ class ManifoldsVocabulary:
             r'\\text{im}\(d\)': 'the image of d',
             r'H\^k_{dR}\(M\)': 'the k-th de Rham cohomology of M',
             r'H\^\\*_{dR}\(M\)': 'the de Rham cohomology of M',
-            r'\\[\\omega\\]': 'the cohomology class of omega',
+            r'\[\\omega\]': 'the cohomology class of omega',
             r'\\text{exact}': 'exact',
             r'\\text{closed}': 'closed',
             r'd\\omega = 0': 'd omega equals zero',
@@ -281,7 +284,7 @@ class ManifoldsVocabulary:
             r'\\mathfrak{so}\(n\)': 'fraktur s o n',
             r'\\mathfrak{su}\(n\)': 'fraktur s u n',
             r'\\mathfrak{sp}\(2n,\\mathbb{R}\)': 'fraktur s p 2n R',
-            r'\\[\\cdot,\\cdot\\]': 'the Lie bracket',
+            r'\[\\cdot,\\cdot\]': 'the Lie bracket',
             r'\\text{Jac}\(X,Y,Z\)': 'the Jacobi identity of X Y Z',
             r'\\exp: \\mathfrak{g} \\to G': 'the exponential map from fraktur g to G',
             r'\\log: G \\to \\mathfrak{g}': 'the logarithm from G to fraktur g',
@@ -326,8 +329,8 @@ class ManifoldsVocabulary:
             r'\\langle X,Y \\rangle': 'the inner product of X and Y',
             r'g\(X,Y\)': 'g of X and Y',
             r'g_p\(X,Y\)': 'g at p of X and Y',
-            r'\\|X\\|': 'the norm of X',
-            r'\\|X\\|_g': 'the g-norm of X',
+            r'\\\|X\\\|': 'the norm of X',
+            r'\\\|X\\\|_g': 'the g-norm of X',
             r'ds\^2': 'd s squared',
             r'ds\^2 = g_{ij} dx\^i dx\^j': 'd s squared equals g i j d x i d x j',
             r'\\text{Riem}\(M\)': 'the space of Riemannian metrics on M',
@@ -610,8 +613,9 @@ class ManifoldsProcessor:
     def process(self, text: str) -> str:
         """Process manifolds text with complete notation handling"""
         # Detect subcontext
-        self.context = self.detect_subcontext(text)
-        logger.debug(f"Manifolds subcontext: {self.context.value}")
+        context = self.detect_subcontext(text)
+        self.context = context
+        logger.debug(f"Manifolds subcontext: {context.value}")
         
         # Pre-process for common patterns
         text = self._preprocess(text)
@@ -620,7 +624,7 @@ class ManifoldsProcessor:
         text = self._apply_vocabulary(text)
         
         # Apply special manifolds rules
-        text = self._apply_special_rules(text)
+        text = self._apply_special_rules(text, context)
         
         # Post-process for clarity
         text = self._postprocess(text)
@@ -647,22 +651,13 @@ class ManifoldsProcessor:
         return text
     
     def _apply_vocabulary(self, text: str) -> str:
-        """Apply manifolds vocabulary replacements"""
-        # Sort patterns by length to handle longer patterns first
-        sorted_patterns = sorted(self.vocabulary.compiled_patterns, 
-                               key=lambda x: len(x[0].pattern), 
-                               reverse=True)
-        
-        for pattern, replacement in sorted_patterns:
-            if callable(replacement):
-                text = pattern.sub(replacement, text)
-            else:
-                text = pattern.sub(replacement, text)
-        
-        return text
+        """Apply manifolds vocabulary replacements, longer patterns first"""
+        return self.vocabulary.plan.apply(text)
     
-    def _apply_special_rules(self, text: str) -> str:
+    def _apply_special_rules(self, text: str, context: Optional[ManifoldsContext] = None) -> str:
         """Apply special manifolds-specific rules"""
+        if context is None:
+            context = self.context
         
         # Add clarifications for potentially ambiguous terms
         if self.special_rules['add_clarifications']:
@@ -674,7 +669,7 @@ class ManifoldsProcessor:
             
             for pattern, term in clarifications:
                 # Check context to avoid over-clarification
-                if self.context in [ManifoldsContext.BASIC_MANIFOLDS, ManifoldsContext.DIFFERENTIAL_FORMS]:
+                if context in [ManifoldsContext.BASIC_MANIFOLDS, ManifoldsContext.DIFFERENTIAL_FORMS]:
                     text = re.sub(pattern, f"{term}", text)
         
         # Emphasize key theorems
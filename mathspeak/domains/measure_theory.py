@@ -23,6 +23,8 @@ from dataclasses import dataclass
 from collections import OrderedDict
 from enum import Enum
 
+from .base import VocabularyPlan
+
 logger = logging.getLogger(__name__)
 
 # ===========================
@@ -60,6 +62,7 @@ class MeasureTheoryVocabulary:
         self.terms = self._build_vocabulary()
         self.patterns = self._build_patterns()
         self.compiled_patterns = self._compile_patterns()
+        self.plan = VocabularyPlan(self.compiled_patterns)
     
     def _escape_for_both_backslashes(self, pattern: str) -> str:
         """Convert a pattern to match both single and double backslash versions"""
@@ -141,7 +144,7 @@ class MeasureTheoryVocabulary:
             r'\\mu \\ll \\nu': 'mu is absolutely continuous with respect to nu',
             r'\\mu \\perp \\nu': 'mu is singular with respect to nu',
             r'\\text{total variation}': 'total variation',
-            r'|\\mu|': 'the total variation of mu',
+            r'\|\\mu\|': 'the total variation of mu',
         })
         
         # ===== INTEGRATION =====
@@ -173,12 +176,12 @@ class MeasureTheoryVocabulary:
             r'L^p\\(X,\\mu\\)': 'L p space on X with measure mu',
             r'L^1\\(X,\\mu\\)': 'L 1 space on X with measure mu',
             r'L^2\\(X,\\mu\\)': 'L 2 space on X with measure mu',
-            r'\\|f\\|_p': 'the L p norm of f',
-            r'\\|f\\|_([0-9]+)': lambda m: f"the L {m.group(1)} norm of f",
-            r'\\|f\\|_\\infty': 'the L infinity norm of f',
-            r'\\|f\\|_{L^p}': 'the L p norm of f',
-            r'\\|f\\|_{L^([0-9]+)}': lambda m: f"the L {m.group(1)} norm of f",
-            r'\\|f\\|_{L^\\infty}': 'the L infinity norm of f',
+            r'\\\|f\\\|_p': 'the L p norm of f',
+            r'\\\|f\\\|_([0-9]+)': lambda m: f"the L {m.group(1)} norm of f",
+            r'\\\|f\\\|_\\infty': 'the L infinity norm of f',
+            r'\\\|f\\\|_{L^p}': 'the L p norm of f',
+            r'\\\|f\\\|_{L^([0-9]+)}': lambda m: f"the L {m.group(1)} norm of f",
+            r'\\\|f\\\|_{L^\\infty}': 'the L infinity norm of f',
             r'\\text{esssup}': 'essential supremum',
             r'\\text{ess sup}': 'essential supremum',
             r'\\text{essinf}': 'essential infimum',
@@ -333,9 +336,9 @@ class MeasureTheoryVocabulary:
              'the integral of the sum from i equals 1 to n of a sub i times the indicator function of A sub i with respect to mu equals the sum from i equals 1 to n of a sub i times mu of A sub i'),
             
             # Lp norms
-            (r'\\|f\\|_p = \\left\\(\\int |f|^p \\, d\\mu\\right\\)^{1/p}',
+            (r'\\\|f\\\|_p = \\left\\(\\int \|f\|^p \\, d\\mu\\right\\)^{1/p}',
              'the L p norm of f equals the p-th root of the integral of the absolute value of f to the p with respect to mu'),
-            (r'\\|f\\|_\\infty = \\text{esssup} |f|',
+            (r'\\\|f\\\|_\\infty = \\text{esssup} \|f\|',
              'the L infinity norm of f equals the essential supremum of the absolute value of f'),
             
             # Convergence statements
@@ -345,11 +348,11 @@ class MeasureTheoryVocabulary:
              'f sub n converges to f in measure'),
             (r'f_n \\to f \\text{ in } L^p',
              'f sub n converges to f in L p'),
-            (r'\\|f_n - f\\|_p \\to 0',
+            (r'\\\|f_n - f\\\|_p \\to 0',
              'the L p norm of f sub n minus f converges to zero'),
             
             # Dominated convergence
-            (r'\\text{If } |f_n| \\leq g \\text{ and } f_n \\to f \\text{ a.e., then } \\int f_n \\, d\\mu \\to \\int f \\, d\\mu',
+            (r'\\text{If } \|f_n\| \\leq g \\text{ and } f_n \\to f \\text{ a.e., then } \\int f_n \\, d\\mu \\to \\int f \\, d\\mu',
              'If the absolute value of f sub n is less than or equal to g and f sub n converges to f almost everywhere, then the integral of f sub n with respect to mu converges to the integral of f with respect to mu'),
             
             # Product measures
@@ -473,8 +476,9 @@ class MeasureTheoryProcessor:
     def process(self, text: str) -> str:
         """Process measure theory text with complete notation handling"""
         # Detect subcontext
-        self.context = self.detect_subcontext(text)
-        logger.debug(f"Measure theory subcontext: {self.context.value}")
+        context = self.detect_subcontext(text)
+        self.context = context
+        logger.debug(f"Measure theory subcontext: {context.value}")
         
         # Pre-process for common patterns
         text = self._preprocess(text)
@@ -483,7 +487,7 @@ class MeasureTheoryProcessor:
         text = self._apply_vocabulary(text)
         
         # Apply special measure theory rules
-        text = self._apply_special_rules(text)
+        text = self._apply_special_rules(text, context)
         
         # Post-process for clarity
         text = self._postprocess(text)
@@ -498,8 +502,8 @@ class MeasureTheoryProcessor:
             (r'\\sigma\\text{-finite}', 'sigma-finite'),
             (r'\\text{a\\.e\\.}', 'almost everywhere'),
             (r'\\text{a\\.s\\.}', 'almost surely'),
-            (r'meas\\(', 'the measure of '),
-            (r'Leb\\(', 'the Lebesgue measure of '),
+            (r'meas\(', 'the measure of '),
+            (r'Leb\(', 'the Lebesgue measure of '),
         ]
         
         for pattern, replacement in normalizations:
@@ -508,22 +512,13 @@ class MeasureTheoryProcessor:
         return text
     
     def _apply_vocabulary(self, text: str) -> str:
-        """Apply measure theory vocabulary replacements"""
-        # Sort patterns by length to handle longer patterns first
-        sorted_patterns = sorted(self.vocabulary.compiled_patterns, 
-                               key=lambda x: len(x[0].pattern), 
-                               reverse=True)
-        
-        for pattern, replacement in sorted_patterns:
-            if callable(replacement):
-                text = pattern.sub(replacement, text)
-            else:
-                text = pattern.sub(replacement, text)
-        
-        return text
+        """Apply measure theory vocabulary replacements, longer patterns first"""
+        return self.vocabulary.plan.apply(text)
     
-    def _apply_special_rules(self, text: str) -> str:
+    def _apply_special_rules(self, text: str, context: Optional[MeasureTheoryContext] = None) -> str:
         """Apply special measure theory-specific rules"""
+        if context is None:
+            context = self.context
         
         # Emphasize important theorems
         if self.special_rules['emphasize_theorems']:
@@ -541,7 +536,7 @@ class MeasureTheoryProcessor:
                 text = re.sub(pattern, f"{{EMPHASIS}}{replacement}{{/EMPHASIS}}", text, flags=re.IGNORECASE)
         
         # Clarify measure notation when context is unclear
-        if self.special_rules['clarify_measures'] and self.context == MeasureTheoryContext.MEASURES:
+        if self.special_rules['clarify_measures'] and context == MeasureTheoryContext.MEASURES:
             # Add clarifications for potentially ambiguous measure notation
             text = re.sub(r'\\mu(?!\\()', 'the measure mu', text)
             text = re.sub(r'\\nu(?!\\()', 'the measure nu', text)
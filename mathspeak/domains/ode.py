@@ -27,6 +27,8 @@ from dataclasses import dataclass
 from collections import OrderedDict
 from enum import Enum
 
+from .base import VocabularyPlan
+
 logger = logging.getLogger(__name__)
 
 # ===========================
@@ -66,6 +68,7 @@ class ODEVocabulary:
         self.terms = self._build_vocabulary()
         self.patterns = self._build_patterns()
         self.compiled_patterns = self._compile_patterns()
+        self.plan = VocabularyPlan(self.compiled_patterns)
     
     def _escape_for_both_backslashes(self, pattern: str) -> str:
         """Convert a pattern to match both single and double backslash versions"""
@@ -691,8 +694,9 @@ class ODEProcessor:
     def process(self, text: str) -> str:
         """Process ODE text with complete notation handling"""
         # Detect subcontext
-        self.context = self.detect_subcontext(text)
-        logger.debug(f"ODE subcontext: {self.context.value}")
+        context = self.detect_subcontext(text)
+        self.context = context
+        logger.debug(f"ODE subcontext: {context.value}")
         
         # Pre-process for common patterns
         text = self._preprocess(text)
@@ -701,7 +705,7 @@ class ODEProcessor:
         text = self._apply_vocabulary(text)
         
         # Apply special ODE rules
-        text = self._apply_special_rules(text)
+        text = self._apply_special_rules(text, context)
         
         # Post-process for clarity
         text = self._postprocess(text)
@@ -731,22 +735,13 @@ class ODEProcessor:
         return text
     
     def _apply_vocabulary(self, text: str) -> str:
-        """Apply ODE vocabulary replacements"""
-        # Sort patterns by length to handle longer patterns first
-        sorted_patterns = sorted(self.vocabulary.compiled_patterns, 
-                               key=lambda x: len(x[0].pattern), 
-                               reverse=True)
-        
-        for pattern, replacement in sorted_patterns:
-            if callable(replacement):
-                text = pattern.sub(replacement, text)
-            else:
-                text = pattern.sub(replacement, text)
-        
-        return text
+        """Apply ODE vocabulary replacements, longer patterns first"""
+        return self.vocabulary.plan.apply(text)
     
-    def _apply_special_rules(self, text: str) -> str:
+    def _apply_special_rules(self, text: str, context: Optional[ODEContext] = None) -> str:
         """Apply special ODE-specific rules"""
+        if context is None:
+            context = self.context
         
         # Add clarifications for potentially ambiguous terms
         if self.special_rules['add_clarifications']:
@@ -759,7 +754,7 @@ class ODEProcessor:
             
             for pattern, term in clarifications:
                 # Check context to avoid over-clarification
-                if self.context in [ODEContext.BASIC_ODE, ODEContext.FIRST_ORDER, ODEContext.SECOND_ORDER]:
+                if context in [ODEContext.BASIC_ODE, ODEContext.FIRST_ORDER, ODEContext.SECOND_ORDER]:
                     text = re.sub(pattern, f"{term}", text)
         
         # Emphasize key theorems and methods
@@ -21,6 +21,8 @@ from dataclasses import dataclass
 from collections import OrderedDict
 from enum import Enum
 
+from .base import VocabularyPlan
+
 logger = logging.getLogger(__name__)
 
 # ===========================
@@ -58,6 +60,7 @@ class RealAnalysisVocabulary:
         self.terms = self._build_vocabulary()
         self.patterns = self._build_patterns()
         self.compiled_patterns = self._compile_patterns()
+        self.plan = VocabularyPlan(self.compiled_patterns)
     
     def _escape_for_both_backslashes(self, pattern: str) -> str:
         """Convert a pattern to match both single and double backslash versions"""
@@ -113,8 +116,8 @@ class RealAnalysisVocabulary:
             r'\\forall \\epsilon > 0': 'for all epsilon greater than zero',
             r'\\exists \\delta > 0': 'there exists delta greater than zero',
             r'\\forall \\epsilon > 0 \\, \\exists \\delta > 0': 'for all epsilon greater than zero there exists delta greater than zero',
-            r'0 < \\|x - a\\| < \\delta': 'zero less than the absolute value of x minus a less than delta',
-            r'\\|f\\(x\\) - L\\| < \\epsilon': 'the absolute value of f of x minus L is less than epsilon',
+            r'0 < \|x - a\| < \\delta': 'zero less than the absolute value of x minus a less than delta',
+            r'\|f\\(x\\) - L\| < \\epsilon': 'the absolute value of f of x minus L is less than epsilon',
         })
         
         # ===== CONTINUITY =====
@@ -193,13 +196,13 @@ class RealAnalysisVocabulary:
             r'L^p\\(([^)]+)\\)': lambda m: f"L p space on {self._process_nested(m.group(1))}",
             r'L^([0-9]+)\\(([^)]+)\\)': lambda m: f"L {m.group(1)} space on {self._process_nested(m.group(2))}",
             r'L^\\infty\\(([^)]+)\\)': lambda m: f"L infinity space on {self._process_nested(m.group(1))}",
-            r'\\|f\\|_p': 'the L p norm of f',
-            r'\\|f\\|_([0-9]+)': lambda m: f"the L {m.group(1)} norm of f",
-            r'\\|f\\|_\\infty': 'the L infinity norm of f',
-            r'\\|f\\|_{\\infty}': 'the supremum norm of f',
+            r'\\\|f\\\|_p': 'the L p norm of f',
+            r'\\\|f\\\|_([0-9]+)': lambda m: f"the L {m.group(1)} norm of f",
+            r'\\\|f\\\|_\\infty': 'the L infinity norm of f',
+            r'\\\|f\\\|_{\\infty}': 'the supremum norm of f',
             # Fixed to prevent infinite recursion
-            r'\\|([^|]+)\\|': lambda m: f"the norm of {m.group(1)}" if m.group(1) and '|' not in m.group(1) else f"the norm of {m.group(1) or ''}",
-            r'\\sup_{x \\in ([^}]+)} \\|f\\(x\\)\\|': lambda m: f"the supremum over x in {self._process_nested(m.group(1))} of the norm of f of x",
+            r'\\\|([^|]+)\\\|': lambda m: f"the norm of {m.group(1)}" if m.group(1) and '|' not in m.group(1) else f"the norm of {m.group(1) or ''}",
+            r'\\sup_{x \\in ([^}]+)} \\\|f\(x\)\\\|': lambda m: f"the supremum over x in {self._process_nested(m.group(1))} of the norm of f of x",
             r'\\text{esssup}': 'essential supremum',
             r'\\text{ess sup}': 'essential supremum',
         })
@@ -257,15 +260,15 @@ class RealAnalysisVocabulary:
         """Build pattern-based replacements"""
         patterns = [
             # Epsilon-delta definitions
-            (r'\\forall \\epsilon > 0 \\, \\exists \\delta > 0 \\text{ such that } 0 < \\|x - a\\| < \\delta \\Rightarrow \\|f\\(x\\) - L\\| < \\epsilon',
+            (r'\\forall \\epsilon > 0 \\, \\exists \\delta > 0 \\text{ such that } 0 < \|x - a\| < \\delta \\Rightarrow \|f\\(x\\) - L\| < \\epsilon',
              'for all epsilon greater than zero there exists delta greater than zero such that if zero is less than the absolute value of x minus a which is less than delta then the absolute value of f of x minus L is less than epsilon'),
             
             # Uniform continuity
-            (r'\\forall \\epsilon > 0 \\, \\exists \\delta > 0 \\text{ such that } \\|x - y\\| < \\delta \\Rightarrow \\|f\\(x\\) - f\\(y\\)\\| < \\epsilon',
+            (r'\\forall \\epsilon > 0 \\, \\exists \\delta > 0 \\text{ such that } \|x - y\| < \\delta \\Rightarrow \|f\\(x\\) - f\\(y\\)\| < \\epsilon',
              'for all epsilon greater than zero there exists delta greater than zero such that if the absolute value of x minus y is less than delta then the absolute value of f of x minus f of y is less than epsilon'),
             
             # Cauchy sequences
-            (r'\\forall \\epsilon > 0 \\, \\exists N \\in \\mathbb{N} \\text{ such that } m, n > N \\Rightarrow \\|([a-z])_m - ([a-z])_n\\| < \\epsilon',
+            (r'\\forall \\epsilon > 0 \\, \\exists N \\in \\mathbb{N} \\text{ such that } m, n > N \\Rightarrow \|([a-z])_m - ([a-z])_n\| < \\epsilon',
              lambda m: f'for all epsilon greater than zero there exists N in the natural numbers such that if m and n are greater than N then the absolute value of {m.group(1)} sub m minus {m.group(2)} sub n is less than epsilon'),
             
             # Convergence
@@ -439,8 +442,9 @@ class RealAnalysisProcessor:
     def process(self, text: str) -> str:
         """Process real analysis text with complete notation handling"""
         # Detect subcontext
-        self.context = self.detect_subcontext(text)
-        logger.debug(f"Real analysis subcontext: {self.context.value}")
+        context = self.detect_subcontext(text)
+        self.context = context
+        logger.debug(f"Real analysis subcontext: {context.value}")
         
         # Pre-process for common patterns
         text = self._preprocess(text)
@@ -449,7 +453,7 @@ class RealAnalysisProcessor:
         text = self._apply_vocabulary(text)
         
         # Apply special real analysis rules
-        text = self._apply_special_rules(text)
+        text = self._apply_special_rules(text, context)
         
         # Post-process for clarity
         text = self._postprocess(text)
@@ -475,22 +479,13 @@ class RealAnalysisProcessor:
         return text
     
     def _apply_vocabulary(self, text: str) -> str:
-        """Apply real analysis vocabulary replacements"""
-        # Sort patterns by length to handle longer patterns first
-        sorted_patterns = sorted(self.vocabulary.compiled_patterns, 
-                               key=lambda x: len(x[0].pattern), 
-                               reverse=True)
-        
-        for pattern, replacement in sorted_patterns:
-            if callable(replacement):
-                text = pattern.sub(replacement, text)
-            else:
-                text = pattern.sub(replacement, text)
-        
-        return text
+        """Apply real analysis vocabulary replacements, longer patterns first"""
+        return self.vocabulary.plan.apply(text)
     
-    def _apply_special_rules(self, text: str) -> str:
+    def _apply_special_rules(self, text: str, context: Optional[RealAnalysisContext] = None) -> str:
         """Apply special real analysis-specific rules"""
+        if context is None:
+            context = self.context
         
         # Emphasize important theorems
         if self.special_rules['emphasize_definitions']:
@@ -507,7 +502,7 @@ class RealAnalysisProcessor:
                 text = re.sub(pattern, f"{{EMPHASIS}}{replacement}{{/EMPHASIS}}", text, flags=re.IGNORECASE)
         
         # Expand epsilon-delta definitions when detected
-        if self.special_rules['expand_epsilon_delta'] and self.context == RealAnalysisContext.LIMITS:
+        if self.special_rules['expand_epsilon_delta'] and context == RealAnalysisContext.LIMITS:
             # Add natural language explanations for complex epsilon-delta statements
             if 'epsilon' in text.lower() and 'delta' in text.lower():
                 text = re.sub(r'(\\forall \\epsilon.*?\\epsilon)', 
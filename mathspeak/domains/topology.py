@@ -22,6 +22,8 @@ from dataclasses import dataclass
 from collections import OrderedDict
 from enum import Enum
 
+from .base import VocabularyPlan
+
 logger = logging.getLogger(__name__)
 
 # ===========================
@@ -56,6 +58,7 @@ class TopologyVocabulary:
         self.terms = self._build_vocabulary()
         self.patterns = self._build_patterns()
         self.compiled_patterns = self._compile_patterns()
+        self.plan = VocabularyPlan(self.compiled_patterns)
     
     def _escape_for_both_backslashes(self, pattern: str) -> str:
         """Convert a pattern to match both single and double backslash versions"""
@@ -532,8 +535,9 @@ class TopologyProcessor:
     def process(self, text: str) -> str:
         """Process topology text with complete notation handling"""
         # Detect subcontext
-        self.context = self.detect_subcontext(text)
-        logger.debug(f"Topology subcontext: {self.context.value}")
+        context = self.detect_subcontext(text)
+        self.context = context
+        logger.debug(f"Topology subcontext: {context.value}")
         
         # Pre-process for common patterns
         text = self._preprocess(text)
@@ -542,7 +546,7 @@ class TopologyProcessor:
         text = self._apply_vocabulary(text)
         
         # Apply special topology rules
-        text = self._apply_special_rules(text)
+        text = self._apply_special_rules(text, context)
         
         # Post-process for clarity
         text = self._postprocess(text)
@@ -569,22 +573,13 @@ class TopologyProcessor:
         return text
     
     def _apply_vocabulary(self, text: str) -> str:
-        """Apply topology vocabulary replacements"""
-        # Sort patterns by length to handle longer patterns first
-        sorted_patterns = sorted(self.vocabulary.compiled_patterns, 
-                               key=lambda x: len(x[0].pattern), 
-                               reverse=True)
-        
-        for pattern, replacement in sorted_patterns:
-            if callable(replacement):
-                text = pattern.sub(replacement, text)
-            else:
-                text = pattern.sub(replacement, text)
-        
-        return text
+        """Apply topology vocabulary replacements, longer patterns first"""
+        return self.vocabulary.plan.apply(text)
     
-    def _apply_special_rules(self, text: str) -> str:
+    def _apply_special_rules(self, text: str, context: Optional[TopologyContext] = None) -> str:
         """Apply special topology-specific rules"""
+        if context is None:
+            context = self.context
         
         # Add clarifications for potentially ambiguous terms
         if self.special_rules['add_clarifications']:
@@ -596,7 +591,7 @@ class TopologyProcessor:
             
             for pattern, term in clarifications:
                 # Check context to avoid over-clarification
-                if self.context == TopologyContext.POINT_SET:
+                if context == TopologyContext.POINT_SET:
                     text = re.sub(pattern, f"{term}", text)
         
         # Emphasize key theorems
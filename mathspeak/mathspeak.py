@@ -631,11 +631,13 @@ async def process_batch(engine: MathematicalTTSEngine,
     from mathspeak.utils.progress import BatchProgress
     batch_progress = BatchProgress(expressions, "Processing expressions")
     
+    # Process the whole batch at once; speech is generated per expression
+    processed = engine.process_many(expressions)
+    
     async def process_one(idx: int, expr: str) -> Tuple[int, bool, str]:
-        """Process a single expression"""
+        """Speak a single processed expression"""
         try:
-            # Process
-            result = engine.process_latex(expr, show_progress=False)
+            result = processed[idx]
             
             # Generate filename
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -730,17 +732,8 @@ def main():
         prefer_offline_tts=args.offline  # Use offline engines if requested
     )
     
-    # Load domain processors
-    try:
-        from mathspeak.domains.topology import TopologyProcessor
-        engine.domain_processors[MathematicalContext.TOPOLOGY] = TopologyProcessor()
-        logger.info("Loaded topology processor")
-    except ImportError:
-        logger.warning("Topology processor not available")
-    
-    # Additional domain processors would be loaded here
-    # from mathspeak.domains.complex_analysis import ComplexAnalysisProcessor
-    # engine.domain_processors[MathematicalContext.COMPLEX_ANALYSIS] = ComplexAnalysisProcessor()
+    # Domain processors (topology, complex analysis, ...) are loaded by the
+    # engine the first time it routes an expression to their context
     
     try:
         # Interactive mode
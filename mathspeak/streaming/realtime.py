@@ -8,16 +8,26 @@ lookahead buffering, and context preservation.
 """
 
 import asyncio
+import os
 import re
+import tempfile
 import time
 import logging
 from collections import deque
-from typing import AsyncIterator, Optional, Dict, List, Any, Tuple
+from contextlib import aclosing
+from pathlib import Path
+from typing import AsyncIterator, Iterator, Optional, Dict, List, Any, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
+from ..core.math_spans import MathSpan, MathSpanScanner, find_math_spans
+
 logger = logging.getLogger(__name__)
 
+# Rough size of a second of synthesized audio: 48 kbit/s MP3, edge-tts'
+# output format
+AUDIO_BYTES_PER_SECOND = 6000
+
 
 class ChunkType(Enum):
     """Type of content chunk"""
@@ -38,6 +48,200 @@ class ProcessedChunk:
     timestamp: float = field(default_factory=time.time)
     
 
+@dataclass
+class StreamMetrics:
+    """Latency and throughput of one processed stream"""
+    started: float = field(default_factory=time.perf_counter)
+    chunks: int = 0
+    audio_chunks: int = 0
+    audio_seconds: float = 0.0  # Estimated from the audio's size
+    first_audio_at: Optional[float] = None
+    last_audio_at: Optional[float] = None
+    
+    def record(self, chunk: ProcessedChunk) -> None:
+        """Count a chunk as it is yielded"""
+        self.chunks += 1
+        if not chunk.audio:
+            return
+        now = time.perf_counter()
+        self.audio_chunks += 1
+        if self.first_audio_at is None:
+            self.first_audio_at = now
+        else:
+            # Steady state is after the first audio
+            self.audio_seconds += len(chunk.audio) / AUDIO_BYTES_PER_SECOND
+        self.last_audio_at = now
+        
+    @property
+    def time_to_first_audio(self) -> Optional[float]:
+        """Seconds from the start of the stream to its first audio"""
+        if self.first_audio_at is None:
+            return None
+        return self.first_audio_at - self.started
+    
+    @property
+    def real_time_factor(self) -> Optional[float]:
+        """
+        Seconds taken per second of audio after the first audio; below 1
+        the stream is produced faster than it plays.
+        """
+        if not self.audio_seconds:
+            return None
+        return (self.last_audio_at - self.first_audio_at) / self.audio_seconds
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'chunks': self.chunks,
+            'audio_chunks': self.audio_chunks,
+            'time_to_first_audio': self.time_to_first_audio,
+            'real_time_factor': self.real_time_factor,
+        }
+
+
+class StreamBuffer:
+    """
+    Text of a live stream that has not been emitted yet.
+    
+    Chunks are kept as they arrive and scanned once, by a math span
+    scanner and for sentence ends, each from where it stopped; emitted
+    text is dropped from the front. The cost of a chunk is its own
+    length, however long the stream runs without punctuation.
+    """
+    
+    # A sentence or paragraph ends after these; sentences end past the
+    # whitespace, so the end of a match is the boundary
+    BOUNDARY_PATTERN = re.compile(r'[.!?]\s|\n\n')
+    
+    def __init__(self):
+        self._chunks = deque()
+        self._chunk_start = 0   # Offset of the first chunk
+        self._start = 0         # Offset of the first character not taken
+        self._end = 0           # Offset just past the last character fed
+        self._last_char = ''
+        self._first_text = None # Offset of the first non-space character not taken
+        self._scanner = MathSpanScanner()
+        self._closed = False
+        self._spans = deque()       # Math spans not taken yet
+        self._math = deque()        # Math spans boundaries are checked against
+        self._boundaries = deque()  # Candidate sentence boundaries
+        
+    def __len__(self) -> int:
+        return self._end - self._start
+        
+    @property
+    def text(self) -> str:
+        """All the text not taken yet"""
+        offset = self._start - self._chunk_start
+        return ''.join(self._chunks)[offset:]
+        
+    def feed(self, chunk: str) -> None:
+        """Add the next chunk of the stream"""
+        if not chunk:
+            return
+        offset = self._end
+        self._chunks.append(chunk)
+        self._end += len(chunk)
+        if self._first_text is None:
+            match = _NON_SPACE.search(chunk)
+            if match:
+                self._first_text = offset + match.start()
+                
+        # A boundary may straddle the previous chunk
+        window_start = offset - len(self._last_char)
+        for match in self.BOUNDARY_PATTERN.finditer(self._last_char + chunk):
+            self._boundaries.append(window_start + match.end())
+        self._last_char = chunk[-1]
+        
+        for span in self._scanner.feed(chunk):
+            self._spans.append(span)
+            self._math.append(span)
+            
+    def close(self) -> None:
+        """Mark the end of the stream; spans left open are text"""
+        for span in self._scanner.close():
+            self._spans.append(span)
+            self._math.append(span)
+        self._closed = True
+        
+    def take_math(self) -> Optional[Tuple[str, MathSpan]]:
+        """
+        Take a complete math span that starts the text, with its delimiters.
+        
+        Math after text waits for the sentence it belongs to.
+        """
+        if not self._spans or self._spans[0].start != self._first_text:
+            return None
+        span = self._spans.popleft()
+        self._take(span.start)
+        return self._take(span.end), span
+        
+    def take_sentence(self) -> Optional[str]:
+        """
+        Take the text up to the next sentence or paragraph end.
+        
+        Ends inside math do not count, nor do ends past the text scanned
+        so far, which may still turn out to be math.
+        """
+        if self._closed:
+            settled = self._end
+        else:
+            settled = self._scanner.open_start
+            if settled is None:
+                settled = self._scanner.position
+            
+        while self._boundaries:
+            boundary = self._boundaries[0]
+            if boundary > settled:
+                return None
+            self._boundaries.popleft()
+            if boundary <= self._start:
+                continue
+            # The end matched the two characters before the boundary
+            while self._math and self._math[0].end <= boundary - 2:
+                self._math.popleft()
+            if self._math and self._math[0].start < boundary:
+                continue
+            
+            while self._spans and self._spans[0].end <= boundary:
+                self._spans.popleft()
+            return self._take(boundary)
+            
+        return None
+        
+    def take_rest(self) -> str:
+        """Take all the text not taken yet"""
+        self._spans.clear()
+        self._math.clear()
+        self._boundaries.clear()
+        return self._take(self._end)
+        
+    def _take(self, end: int) -> str:
+        """Take the text up to offset end, dropping the chunks it used up"""
+        pieces = []
+        while self._start < end:
+            chunk = self._chunks[0]
+            stop = min(len(chunk), end - self._chunk_start)
+            pieces.append(chunk[self._start - self._chunk_start:stop])
+            self._start = self._chunk_start + stop
+            if stop == len(chunk):
+                self._chunks.popleft()
+                self._chunk_start += len(chunk)
+                
+        if self._first_text is not None and self._first_text < self._start:
+            self._first_text = None
+            offset = self._chunk_start
+            for chunk in self._chunks:
+                match = _NON_SPACE.search(chunk, max(self._start - offset, 0))
+                if match:
+                    self._first_text = offset + match.start()
+                    break
+                offset += len(chunk)
+        return ''.join(pieces)
+
+
+_NON_SPACE = re.compile(r'\S')
+
+
 class RealtimeMathProcessor:
     """Process mathematical content in real-time with intelligent chunking"""
     
@@ -45,7 +249,11 @@ class RealtimeMathProcessor:
                  lookback_sentences: int = 3,
                  lookahead_chars: int = 200,
                  chunk_timeout: float = 0.5,
-                 engine = None):
+                 engine = None,
+                 tts_manager = None,
+                 max_in_flight: int = 4,
+                 voice: str = "en-US-AriaNeural",
+                 rate: str = "+0%"):
         """
         Initialize real-time processor
         
@@ -54,71 +262,130 @@ class RealtimeMathProcessor:
             lookahead_chars: Characters to look ahead for complete expressions
             chunk_timeout: Maximum time to wait for more content
             engine: MathSpeechProcessor instance
+            tts_manager: TTSEngineManager chunks are synthesized with
+                (default: the engine's, if it has one; else no audio)
+            max_in_flight: Chunks converted but not yet yielded at most
+            voice: Voice the audio is synthesized in
+            rate: Speech rate of the audio
         """
         self.lookback = deque(maxlen=lookback_sentences)
         self.lookahead_chars = lookahead_chars
         self.chunk_timeout = chunk_timeout
-        self.buffer = ""
+        self.stream_buffer = StreamBuffer()
         self.math_mode = False
         self.engine = engine
+        self.tts_manager = tts_manager or getattr(engine, 'tts_manager', None)
+        self.max_in_flight = max_in_flight
+        self.voice = voice
+        self.rate = rate
         self.context_memory = {}  # Remember defined symbols
+        self.metrics = StreamMetrics()  # Of the last stream processed
         
-        # Regex patterns
-        self.math_patterns = {
-            'display': re.compile(r'\$\$([^$]+)\$\$'),
-            'inline': re.compile(r'\$([^$]+)\$'),
-            'latex_inline': re.compile(r'\\\((.+?)\\\)'),
-            'latex_display': re.compile(r'\\\[(.+?)\\\]'),
-        }
-        
-        self.sentence_end_pattern = re.compile(r'[.!?]\s+')
+    @property
+    def buffer(self) -> str:
+        """Text received but not processed yet"""
+        return self.stream_buffer.text
         
     async def process_stream(self, 
                            text_stream: AsyncIterator[str]) -> AsyncIterator[ProcessedChunk]:
         """
         Process streaming text input and yield processed chunks
         
+        Text is converted as it arrives while earlier chunks synthesize,
+        with at most max_in_flight chunks converted but not yet yielded;
+        chunks are yielded in order. Closing the iterator (the client
+        going away) cancels the synthesis still in flight.
+        
         Args:
             text_stream: Async iterator of text chunks
             
         Yields:
             ProcessedChunk objects with text and optional audio
         """
-        async for chunk in text_stream:
-            self.buffer += chunk
-            
-            # Process complete sentences or math expressions
-            async for result in self._process_buffer():
-                yield result
+        self.stream_buffer = StreamBuffer()
+        self.metrics = StreamMetrics()
+        ready = asyncio.Queue()
+        slots = asyncio.Semaphore(self.max_in_flight)
+        producer = asyncio.create_task(self._produce(text_stream, ready, slots))
+        synthesis = None
+        
+        try:
+            while True:
+                item = await ready.get()
+                if item is None:
+                    break
+                chunk, synthesis = item
+                chunk.audio = await synthesis
+                slots.release()
+                self.metrics.record(chunk)
+                yield chunk
                 
-        # Process remaining buffer
-        if self.buffer:
-            async for result in self._process_buffer(force=True):
-                yield result
+            # Raise what stopped the producer, if anything
+            await producer
+        finally:
+            producer.cancel()
+            if synthesis is not None:
+                synthesis.cancel()
+            while not ready.empty():
+                item = ready.get_nowait()
+                if item is not None:
+                    item[1].cancel()
+                    
+    async def _produce(self, text_stream: AsyncIterator[str],
+                       ready: asyncio.Queue, slots: asyncio.Semaphore):
+        """Convert chunks as text arrives and start their synthesis"""
+        try:
+            async for text in text_stream:
+                self.stream_buffer.feed(text)
                 
-    async def _process_buffer(self, force: bool = False) -> AsyncIterator[ProcessedChunk]:
-        """Process buffer content when appropriate"""
+                # Process complete sentences or math expressions
+                async for chunk in self._convert_buffer():
+                    await slots.acquire()
+                    ready.put_nowait((chunk, asyncio.create_task(self._generate_audio(chunk.processed))))
+                    
+            # Process remaining buffer
+            self.stream_buffer.close()
+            async for chunk in self._convert_buffer(force=True):
+                await slots.acquire()
+                ready.put_nowait((chunk, asyncio.create_task(self._generate_audio(chunk.processed))))
+        finally:
+            ready.put_nowait(None)
+            
+    async def _convert_buffer(self, force: bool = False) -> AsyncIterator[ProcessedChunk]:
+        """
+        Convert buffer content in a worker thread, one chunk at a time,
+        so the event loop keeps driving synthesis while a chunk converts
+        """
+        chunks = self._process_buffer(force)
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+                
+    def _process_buffer(self, force: bool = False) -> Iterator[ProcessedChunk]:
+        """Convert buffer content when appropriate"""
         
         while True:
             # Check for complete math expression
             math_chunk = self._find_complete_math()
             if math_chunk:
-                yield await self._process_math(math_chunk)
+                yield self._process_math(math_chunk)
                 continue
                 
             # Check for complete sentence
             sentence = self._find_complete_sentence()
-            if sentence or (force and self.buffer):
-                text = sentence or self.buffer
-                if sentence:
-                    self.buffer = self.buffer[len(sentence):]
-                else:
-                    self.buffer = ""
+            if sentence == "":
+                continue
+            if sentence or (force and self.stream_buffer):
+                text = sentence or self.stream_buffer.take_rest().strip()
+                if not text:
+                    break
                     
                 if self._contains_math(text):
-                    yield await self._process_mixed_content(text)
+                    yield self._process_mixed_content(text)
                 else:
-                    yield await self._process_text(text)
+                    yield self._process_text(text)
                     
                 if not force:
                     self.lookback.append(text)
@@ -127,68 +394,31 @@ class RealtimeMathProcessor:
             break
             
     def _find_complete_math(self) -> Optional[Tuple[str, str, ChunkType]]:
-        """Find complete math expression in buffer"""
-        
-        # Check display math first (higher priority)
-        for pattern_name, pattern in [
-            ('display', self.math_patterns['display']),
-            ('latex_display', self.math_patterns['latex_display'])
-        ]:
-            match = pattern.search(self.buffer)
-            if match:
-                # Check if we might get more content
-                if len(self.buffer) < match.end() + self.lookahead_chars:
-                    # Look for closing delimiter
-                    if ('$$' in self.buffer[match.end():] or 
-                        '\\]' in self.buffer[match.end():]):
-                        expr = match.group(0)
-                        content = match.group(1)
-                        self.buffer = self.buffer[match.end():]
-                        return (expr, content, ChunkType.MATH_DISPLAY)
-                else:
-                    expr = match.group(0)
-                    content = match.group(1)
-                    self.buffer = self.buffer[match.end():]
-                    return (expr, content, ChunkType.MATH_DISPLAY)
-        
-        # Check inline math
-        for pattern_name, pattern in [
-            ('inline', self.math_patterns['inline']),
-            ('latex_inline', self.math_patterns['latex_inline'])
-        ]:
-            match = pattern.search(self.buffer)
-            if match:
-                # For inline math, be more aggressive about processing
-                expr = match.group(0)
-                content = match.group(1)
-                self.buffer = self.buffer[match.end():]
-                return (expr, content, ChunkType.MATH_INLINE)
-                
-        return None
+        """Take a complete math expression off the start of the buffer"""
+        found = self.stream_buffer.take_math()
+        if found is None:
+            return None
+        
+        expr, span = found
+        chunk_type = ChunkType.MATH_INLINE if span.kind == 'inline' else ChunkType.MATH_DISPLAY
+        return (expr, span.content, chunk_type)
         
     def _find_complete_sentence(self) -> Optional[str]:
-        """Find complete sentence in buffer"""
-        match = self.sentence_end_pattern.search(self.buffer)
-        if match:
-            sentence = self.buffer[:match.end()].strip()
-            return sentence
-            
-        # Also check for paragraph breaks
-        if '\n\n' in self.buffer:
-            idx = self.buffer.index('\n\n')
-            return self.buffer[:idx].strip()
-            
-        return None
+        """
+        Take a complete sentence off the buffer.
+        
+        Returns None if the buffer holds no complete sentence, and "" if
+        it only held whitespace before one.
+        """
+        sentence = self.stream_buffer.take_sentence()
+        return sentence.strip() if sentence is not None else None
         
     def _contains_math(self, text: str) -> bool:
         """Check if text contains any math expressions"""
-        return any(
-            pattern.search(text) 
-            for pattern in self.math_patterns.values()
-        )
+        return bool(find_math_spans(text))
         
-    async def _process_math(self, math_data: Tuple[str, str, ChunkType]) -> ProcessedChunk:
-        """Process pure math expression"""
+    def _process_math(self, math_data: Tuple[str, str, ChunkType]) -> ProcessedChunk:
+        """Convert pure math expression; audio is added by the pipeline"""
         original, content, chunk_type = math_data
         
         # Get context from lookback
@@ -209,45 +439,36 @@ class RealtimeMathProcessor:
         else:
             processed_text = self._basic_math_processing(content)
             
-        # Generate audio if available
-        audio = await self._generate_audio(processed_text, voice='narrator')
-        
         return ProcessedChunk(
             type=chunk_type,
             original=original,
             processed=processed_text,
-            audio=audio,
             context={
                 'lookback': list(self.lookback),
                 'memory': dict(self.context_memory)
             }
         )
         
-    async def _process_text(self, text: str) -> ProcessedChunk:
+    def _process_text(self, text: str) -> ProcessedChunk:
         """Process plain text"""
         # Update context if this defines something
         self._update_context_memory(text)
         
-        # Generate audio if available
-        audio = await self._generate_audio(text, voice='narrator')
-        
         return ProcessedChunk(
             type=ChunkType.TEXT,
             original=text,
             processed=text,
-            audio=audio,
             context={
                 'lookback': list(self.lookback),
                 'memory': dict(self.context_memory)
             }
         )
         
-    async def _process_mixed_content(self, text: str) -> ProcessedChunk:
-        """Process text with embedded math"""
+    def _process_mixed_content(self, text: str) -> ProcessedChunk:
+        """Process text with embedded math; its audio is synthesized whole"""
         segments = self._split_mixed_content(text)
         
         processed_parts = []
-        audio_segments = []
         
         for segment in segments:
             if segment['type'] == 'math':
@@ -264,20 +485,13 @@ class RealtimeMathProcessor:
                 # Keep text as is
                 processed_parts.append(segment['content'])
                 
-            # Generate audio for segment
-            audio = await self._generate_audio(processed_parts[-1], voice='narrator')
-            if audio:
-                audio_segments.append(audio)
-                
         # Combine everything
         processed_text = ' '.join(processed_parts)
-        combined_audio = self._combine_audio(audio_segments) if audio_segments else None
         
         return ProcessedChunk(
             type=ChunkType.MIXED,
             original=text,
             processed=processed_text,
-            audio=combined_audio,
             context={
                 'lookback': list(self.lookback),
                 'memory': dict(self.context_memory)
@@ -287,32 +501,16 @@ class RealtimeMathProcessor:
     def _split_mixed_content(self, text: str) -> List[Dict[str, str]]:
         """Split text into math and non-math segments"""
         segments = []
+        last = 0
         
-        # Combined pattern for all math types
-        combined_pattern = r'(\$\$[^$]+\$\$|\$[^$]+\$|\\\([^)]+\\\)|\\\[[^\]]+\\\])'
-        
-        parts = re.split(combined_pattern, text)
-        
-        for i, part in enumerate(parts):
-            if not part:
-                continue
-                
-            if i % 2 == 0:  # Text segment
-                if part.strip():
-                    segments.append({'type': 'text', 'content': part})
-            else:  # Math segment
-                # Extract content without delimiters
-                content = part
-                if part.startswith('$$') and part.endswith('$$'):
-                    content = part[2:-2]
-                elif part.startswith('$') and part.endswith('$'):
-                    content = part[1:-1]
-                elif part.startswith('\\(') and part.endswith('\\)'):
-                    content = part[2:-2]
-                elif part.startswith('\\[') and part.endswith('\\]'):
-                    content = part[2:-2]
-                    
-                segments.append({'type': 'math', 'content': content})
+        for span in find_math_spans(text):
+            if text[last:span.start].strip():
+                segments.append({'type': 'text', 'content': text[last:span.start]})
+            segments.append({'type': 'math', 'content': span.content})
+            last = span.end
+            
+        if text[last:].strip():
+            segments.append({'type': 'text', 'content': text[last:]})
                 
         return segments
         
@@ -355,26 +553,33 @@ class RealtimeMathProcessor:
             for match in matches:
                 self.context_memory[match] = True
                 
-    async def _generate_audio(self, text: str, voice: str = 'narrator') -> Optional[bytes]:
-        """Generate audio for text (placeholder)"""
-        # In production, this would call the actual TTS engine
-        # For now, return None
-        await asyncio.sleep(0.01)  # Simulate processing
-        return None
+    async def _generate_audio(self, text: str, voice: Optional[str] = None) -> Optional[bytes]:
+        """Synthesize text with the TTS manager; None without one or on failure"""
+        if self.tts_manager is None or not text.strip():
+            return None
         
-    def _combine_audio(self, segments: List[bytes]) -> Optional[bytes]:
-        """Combine audio segments (placeholder)"""
-        if not segments:
+        fd, path = tempfile.mkstemp(prefix="mathspeak_realtime_", suffix=".mp3")
+        os.close(fd)
+        try:
+            success = await self.tts_manager.synthesize(
+                text=text,
+                output_file=path,
+                voice=voice or self.voice,
+                rate=self.rate
+            )
+            return Path(path).read_bytes() if success else None
+        except Exception as e:
+            logger.error(f"Synthesis failed: {e}")
             return None
-        # In production, this would concatenate audio
-        return b''.join(segments)
+        finally:
+            Path(path).unlink(missing_ok=True)
 
 
 class LiveMathStreamHandler:
     """Handle live math dictation via WebSocket or other streaming interface"""
     
-    def __init__(self, engine = None):
-        self.processor = RealtimeMathProcessor(engine=engine)
+    def __init__(self, engine = None, tts_manager = None):
+        self.processor = RealtimeMathProcessor(engine=engine, tts_manager=tts_manager)
         self.active_connections = set()
         
     async def handle_text_stream(self, text_stream: AsyncIterator[str]) -> AsyncIterator[Dict[str, Any]]:
@@ -387,15 +592,16 @@ class LiveMathStreamHandler:
         Yields:
             Dict with processed results
         """
-        async for chunk in self.processor.process_stream(text_stream):
-            yield {
-                'type': chunk.type.value,
-                'original': chunk.original,
-                'text': chunk.processed,
-                'audio': chunk.audio,
-                'context': chunk.context,
-                'timestamp': chunk.timestamp
-            }
+        async with aclosing(self.processor.process_stream(text_stream)) as chunks:
+            async for chunk in chunks:
+                yield {
+                    'type': chunk.type.value,
+                    'original': chunk.original,
+                    'text': chunk.processed,
+                    'audio': chunk.audio,
+                    'context': chunk.context,
+                    'timestamp': chunk.timestamp
+                }
             
     async def handle_websocket(self, websocket):
         """Handle WebSocket connection for live streaming"""
@@ -409,8 +615,11 @@ class LiveMathStreamHandler:
                         break
                     yield message
                     
-            async for result in self.handle_text_stream(text_generator()):
-                await websocket.send_json(result)
+            # Closing the stream when the client goes away cancels the
+            # synthesis in flight
+            async with aclosing(self.handle_text_stream(text_generator())) as results:
+                async for result in results:
+                    await websocket.send_json(result)
                 
         except Exception as e:
             logger.error(f"WebSocket error: {e}")
@@ -446,6 +655,8 @@ async def demo_streaming():
         print(f"Original: {result.original}")
         print(f"Processed: {result.processed}")
         print(f"Context: {len(result.context.get('lookback', []))} lookback items")
+        
+    print(f"\nMetrics: {processor.metrics.to_dict()}")
 
 
 if __name__ == "__main__":
@@ -23,6 +23,7 @@ import logging
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from mathspeak.core.engine import MathematicalTTSEngine
+from mathspeak.core.math_spans import find_math_spans, split_outside_math
 from mathspeak.core.voice_manager import VoiceManager
 
 # Audio playback
@@ -36,6 +37,10 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Split points of long paragraphs and of long sentences
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+CLAUSE_END = re.compile(r'(?<=[,;:])\s+')
+
 
 class AudioBuffer:
     """Manages audio file buffering and playback"""
@@ -121,8 +126,8 @@ class StreamingMathSpeak:
                 
             # Check if paragraph is too long
             if len(para) > 200:
-                # Split by sentences
-                sentences = re.split(r'(?<=[.!?])\s+', para)
+                # Split by sentences, never inside math
+                sentences = split_outside_math(para, SENTENCE_END)
                 for sent in sentences:
                     if sent.strip():
                         lines.append(sent.strip())
@@ -134,7 +139,7 @@ class StreamingMathSpeak:
         for line in lines:
             if len(line) > 300:
                 # Split at logical points
-                parts = re.split(r'(?<=[,;:])\s+', line)
+                parts = split_outside_math(line, CLAUSE_END)
                 current = ""
                 for part in parts:
                     if len(current) + len(part) < 250:
@@ -160,8 +165,8 @@ class StreamingMathSpeak:
             self.file_counter += 1
             audio_file = Path(self.temp_dir) / f"stream_{self.file_counter:04d}.mp3"
             
-            # Check for math expressions
-            has_math = any(pattern in line for pattern in ['$', '\\', 'frac', 'sum', 'int'])
+            # Check for math expressions: delimited math or bare commands
+            has_math = '\\' in line or bool(find_math_spans(line))
             
             if has_math:
                 # Process as LaTeX
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the API Executor Layer
+=====================================
+
+Checks that CPU-bound work runs off the event loop on bounded pools, that
+full pools push back with ExecutorBusy (429) and stopped pools with
+ExecutorUnavailable (503), and that waiting callers are admitted later.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from mathspeak.api.executors import (
+    BoundedExecutor,
+    ExecutorBusy,
+    ExecutorConfig,
+    ExecutorLayer,
+    ExecutorUnavailable,
+)
+from mathspeak.core.engine import MathematicalTTSEngine, ProcessedExpression
+from mathspeak.utils.timeout import Deadline
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestBoundedExecutor:
+    """Tests for BoundedExecutor"""
+
+    def test_not_started_is_unavailable(self):
+        pool = BoundedExecutor("text", workers=1, max_pending=1)
+
+        with pytest.raises(ExecutorUnavailable):
+            run(pool.run(lambda: 1))
+
+    def test_runs_in_worker_thread(self):
+        async def scenario():
+            pool = BoundedExecutor("text", workers=1, max_pending=1)
+            pool.start()
+            try:
+                return await pool.run(threading.current_thread)
+            finally:
+                pool.shutdown()
+
+        assert run(scenario()) is not threading.current_thread()
+
+    def test_full_pool_rejects_then_admits_waiters(self):
+        release = threading.Event()
+
+        async def scenario():
+            pool = BoundedExecutor("text", workers=1, max_pending=1)
+            pool.start()
+            try:
+                blocker = asyncio.ensure_future(pool.run(release.wait))
+                await asyncio.sleep(0.05)
+
+                with pytest.raises(ExecutorBusy):
+                    await pool.run(lambda: 'rejected')
+
+                waiter = asyncio.ensure_future(pool.run(lambda: 'admitted', wait=True))
+                await asyncio.sleep(0.05)
+                assert not waiter.done()
+
+                release.set()
+                await blocker
+                return await waiter, pool.stats()
+            finally:
+                release.set()
+                pool.shutdown()
+
+        result, stats = run(scenario())
+        assert result == 'admitted'
+        assert stats['rejected'] == 1
+        assert stats['in_flight'] == 0
+
+    def test_event_loop_stays_responsive(self):
+        async def scenario():
+            pool = BoundedExecutor("text", workers=1, max_pending=2)
+            pool.start()
+            try:
+                slow = asyncio.ensure_future(pool.run(time.sleep, 0.3))
+                start = time.perf_counter()
+                await asyncio.sleep(0.01)
+                elapsed = time.perf_counter() - start
+                await slow
+                return elapsed
+            finally:
+                pool.shutdown()
+
+        assert run(scenario()) < 0.1
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            BoundedExecutor("text", workers=1, max_pending=1, mode="fiber")
+
+
+class TestExecutorLayer:
+    """Tests for ExecutorLayer and its configuration"""
+
+    def test_config_from_env(self, monkeypatch):
+        monkeypatch.setenv("MATHSPEAK_TEXT_WORKERS", "8")
+        monkeypatch.setenv("MATHSPEAK_TTS_QUEUE", "3")
+        monkeypatch.setenv("MATHSPEAK_TEXT_QUEUE", "many")
+
+        config = ExecutorConfig.from_env()
+
+        assert config.text_workers == 8
+        assert config.tts_queue_depth == 3
+        assert config.text_queue_depth == ExecutorConfig.text_queue_depth
+
+    def test_process_latex_on_text_pool(self):
+        engine = MathematicalTTSEngine(enable_caching=False)
+
+        async def scenario():
+            layer = ExecutorLayer(ExecutorConfig(text_workers=2, tts_workers=1))
+            layer.start()
+            try:
+                return await layer.process_latex(engine, r'\frac{a}{b}', deadline=Deadline(10))
+            finally:
+                layer.shutdown()
+
+        result = run(scenario())
+        assert isinstance(result, ProcessedExpression)
+        assert result.processed == engine.process_latex(r'\frac{a}{b}').processed
+
+    def test_process_many_on_text_pool(self):
+        engine = MathematicalTTSEngine(enable_caching=False)
+        expressions = [r'\frac{a}{b}', 'x^2', r'\frac{a}{b}']
+
+        async def scenario():
+            layer = ExecutorLayer(ExecutorConfig(text_workers=2, tts_workers=1))
+            layer.start()
+            try:
+                return await layer.process_many(engine, expressions, deadline_seconds=10)
+            finally:
+                layer.shutdown()
+
+        results = run(scenario())
+        assert [result.processed for result in results] == [
+            engine.process_latex(latex).processed for latex in expressions
+        ]
+
+
+class TestBackpressureResponses:
+    """Executor errors map to HTTP status codes"""
+
+    def test_status_codes(self):
+        from mathspeak.api.server import overload_error
+
+        busy = overload_error(ExecutorBusy("text", 4))
+        assert busy.status_code == 429
+        assert busy.headers["Retry-After"] == "1"
+        assert overload_error(ExecutorUnavailable("stopped")).status_code == 503
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Test Suite for Progressive Audio Streaming
+==========================================
+
+Checks that /speak/stream synthesizes its sentences concurrently on the
+TTS pool and sends each one's audio in order as soon as it is ready, that
+a full TTS pool still answers 429, and that closing the stream cancels
+the synthesis still pending. Synthesis is replaced by a function that
+writes its input text after a delay.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import HTTPException
+
+from mathspeak.api import server
+from mathspeak.api.executors import ExecutorBusy, ExecutorConfig, ExecutorLayer
+from mathspeak.core.engine import MathematicalTTSEngine
+
+SENTENCES = [f"Sentence number {i} is here." for i in range(6)]
+
+
+class SlowSynthesis:
+    """Writes the text as its audio after a delay, counting overlap"""
+
+    def __init__(self, delay=0.1, first_delay=None):
+        self.delay = delay
+        self.first_delay = delay if first_delay is None else first_delay
+        self.lock = threading.Lock()
+        self.started = []
+        self.active = 0
+        self.most_active = 0
+
+    def __call__(self, text, audio_file, speed=1.0):
+        with self.lock:
+            self.started.append(text)
+            first = len(self.started) == 1
+            self.active += 1
+            self.most_active = max(self.most_active, self.active)
+        try:
+            time.sleep(self.first_delay if first else self.delay)
+        finally:
+            with self.lock:
+                self.active -= 1
+        audio_file.write_bytes(text.encode())
+        return audio_file
+
+
+@pytest.fixture
+def synthesis(monkeypatch):
+    synthesis = SlowSynthesis()
+    monkeypatch.setattr(server, "synthesize_text", synthesis)
+    return synthesis
+
+
+def with_executors(scenario, tts_workers=4, tts_queue_depth=8):
+    """Run scenario() with a started executor layer in app_state"""
+    async def run():
+        layer = ExecutorLayer(ExecutorConfig(text_workers=1, tts_workers=tts_workers,
+                                             tts_queue_depth=tts_queue_depth))
+        layer.start()
+        previous, server.app_state.executors = server.app_state.executors, layer
+        try:
+            return await scenario()
+        finally:
+            server.app_state.executors = previous
+            layer.shutdown(wait=False)
+
+    return asyncio.run(run())
+
+
+class TestStreamSentenceAudio:
+    """Tests for stream_sentence_audio"""
+
+    def test_audio_in_order(self, synthesis):
+        async def scenario():
+            return [audio async for audio in server.stream_sentence_audio(SENTENCES)]
+
+        assert [audio.decode() for audio in with_executors(scenario)] == SENTENCES
+
+    def test_sentences_synthesize_concurrently(self, synthesis):
+        async def scenario():
+            start = time.perf_counter()
+            arrivals = []
+            async for _ in server.stream_sentence_audio(SENTENCES, in_flight=3):
+                arrivals.append(time.perf_counter() - start)
+            return arrivals
+
+        arrivals = with_executors(scenario)
+
+        assert synthesis.most_active == 3
+        assert arrivals[0] < 2 * synthesis.delay
+        assert arrivals[-1] < len(SENTENCES) * synthesis.delay * 0.75
+
+    def test_first_sentence_is_not_held_back(self, monkeypatch):
+        synthesis = SlowSynthesis(delay=1, first_delay=0.05)
+        monkeypatch.setattr(server, "synthesize_text", synthesis)
+
+        async def scenario():
+            audio = server.stream_sentence_audio(SENTENCES)
+            start = time.perf_counter()
+            first = await audio.__anext__()
+            elapsed = time.perf_counter() - start
+            await audio.aclose()
+            return first, elapsed
+
+        first, elapsed = with_executors(scenario)
+
+        assert first.decode() == SENTENCES[0]
+        assert elapsed < 0.5
+
+    def test_closing_cancels_pending_synthesis(self, monkeypatch):
+        synthesis = SlowSynthesis(delay=0.5, first_delay=0.01)
+        monkeypatch.setattr(server, "synthesize_text", synthesis)
+
+        async def scenario():
+            audio = server.stream_sentence_audio(SENTENCES, in_flight=3)
+            await audio.__anext__()
+            start = time.perf_counter()
+            await audio.aclose()
+            await asyncio.sleep(0)
+            return time.perf_counter() - start, server.app_state.executors.tts.in_flight
+
+        elapsed, in_flight = with_executors(scenario)
+
+        assert elapsed < synthesis.delay / 2
+        assert in_flight == 0
+        assert len(synthesis.started) < len(SENTENCES)
+
+    def test_full_pool_rejects_first_sentence(self, synthesis):
+        async def scenario():
+            busy = asyncio.ensure_future(server.synthesize_sentence("Blocking.", 1.0))
+            await asyncio.sleep(0.01)
+            try:
+                with pytest.raises(ExecutorBusy):
+                    await server.stream_sentence_audio(SENTENCES).__anext__()
+            finally:
+                await busy
+
+        with_executors(scenario, tts_workers=1, tts_queue_depth=1)
+
+
+class TestSpeakStreamEndpoint:
+    """Tests for the /speak/stream endpoint"""
+
+    @pytest.fixture
+    def engine(self, monkeypatch):
+        engine = MathematicalTTSEngine(enable_caching=False)
+        monkeypatch.setattr(server.app_state, "engine", engine)
+        return engine
+
+    def test_streams_each_sentence(self, engine, synthesis):
+        expression = r"Let $x > 0$. Then $\frac{1}{x}$ is positive. Hence $x^2 > 0$ as well."
+        result = engine.process_latex(expression)
+
+        async def scenario():
+            response = await server.speak_math_stream(server.MathExpression(expression=expression))
+            return response.media_type, [chunk async for chunk in response.body_iterator]
+
+        media_type, chunks = with_executors(scenario)
+
+        assert media_type == "audio/mpeg"
+        assert len(result.sentences) > 1
+        assert [chunk.decode() for chunk in chunks] == [s for s in result.sentences if s.strip()]
+
+    def test_busy_tts_pool_is_429(self, engine, synthesis):
+        async def scenario():
+            busy = asyncio.ensure_future(server.synthesize_sentence("Blocking.", 1.0))
+            await asyncio.sleep(0.01)
+            try:
+                with pytest.raises(HTTPException) as error:
+                    await server.speak_math_stream(server.MathExpression(expression="x^2"))
+                return error.value.status_code
+            finally:
+                await busy
+
+        assert with_executors(scenario, tts_workers=1, tts_queue_depth=1) == 429
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the Audio Cache
+==============================
+
+Checks that AudioCache stores and copies audio by content key, keeps
+under its size bound by evicting the least recently used entries, leaves
+no partial files behind, and picks up entries written by another
+instance; and that TTSEngineManager synthesizes identical speech only
+once.
+"""
+
+import asyncio
+
+import pytest
+
+from mathspeak.core.tts_engines import TTSEngine, TTSEngineManager
+from mathspeak.utils.audio_cache import AudioCache
+
+
+class FakeEngine(TTSEngine):
+    """Writes its name and the text as audio, counting calls"""
+
+    def __init__(self, name, works=True):
+        self._name = name
+        self.works = works
+        self.calls = 0
+
+    def is_available(self):
+        return True
+
+    async def synthesize(self, text, output_file, voice=None, rate=None):
+        self.calls += 1
+        if not self.works:
+            return False
+        with open(output_file, 'w') as f:
+            f.write(f"{self._name}:{voice}:{rate}:{text}")
+        return True
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def requires_internet(self):
+        return False
+
+
+def make_manager(cache, *engines):
+    manager = TTSEngineManager.__new__(TTSEngineManager)
+    manager.prefer_offline = False
+    manager.audio_cache = cache
+    manager.engines = list(engines)
+    return manager
+
+
+def write_audio(path, size):
+    path.write_bytes(b'\xff' * size)
+    return path
+
+
+class TestAudioCache:
+    """Tests for AudioCache"""
+
+    def test_put_and_get(self, tmp_path):
+        cache = AudioCache(tmp_path / 'cache')
+        key = cache.make_key("x squared", "en-US-AriaNeural", "+0%", "edge-tts")
+        source = write_audio(tmp_path / 'in.mp3', 100)
+
+        assert not cache.get(key, tmp_path / 'out.mp3')
+        cache.put(key, source)
+
+        assert cache.get(key, tmp_path / 'out.mp3')
+        assert (tmp_path / 'out.mp3').read_bytes() == source.read_bytes()
+        assert cache.get_stats()['hits'] == 1
+        assert cache.get_stats()['misses'] == 1
+
+    def test_key_covers_voice_rate_and_engine(self):
+        base = AudioCache.make_key("text", "voice", "+0%", "edge")
+
+        assert base == AudioCache.make_key("text", "voice", "+0%", "Edge")
+        assert len({base,
+                    AudioCache.make_key("text", "other", "+0%", "edge"),
+                    AudioCache.make_key("text", "voice", "+10%", "edge"),
+                    AudioCache.make_key("text", "voice", "+0%", "gtts"),
+                    AudioCache.make_key("text ", "voice", "+0%", "edge")}) == 5
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = AudioCache(tmp_path / 'cache', max_bytes=250)
+        for name in 'abc':
+            cache.put(name * 64, write_audio(tmp_path / name, 100))
+            if name == 'b':
+                assert cache.get('a' * 64, tmp_path / 'out')
+
+        assert 'a' * 64 in cache
+        assert 'b' * 64 not in cache
+        assert not cache._path('b' * 64).exists()
+        assert cache.total_bytes == 200
+        assert cache.get_stats()['evictions'] == 1
+
+    def test_no_partial_files(self, tmp_path):
+        cache = AudioCache(tmp_path / 'cache')
+        key = 'f' * 64
+        cache.put(key, write_audio(tmp_path / 'in', 10))
+        cache.put(key, write_audio(tmp_path / 'in', 20))
+
+        files = [p for p in (tmp_path / 'cache').rglob('*') if p.is_file()]
+        assert files == [cache._path(key)]
+        assert cache.total_bytes == 20
+
+    def test_missing_source_is_not_cached(self, tmp_path):
+        cache = AudioCache(tmp_path / 'cache')
+        cache.put('e' * 64, tmp_path / 'missing')
+
+        assert len(cache) == 0
+        assert cache.get_stats()['errors'] == 1
+
+    def test_shared_directory(self, tmp_path):
+        first = AudioCache(tmp_path / 'cache')
+        second = AudioCache(tmp_path / 'cache')
+        first.put('a' * 64, write_audio(tmp_path / 'in', 10))
+
+        assert second.get('a' * 64, tmp_path / 'out')
+        assert len(second) == 1
+        assert len(AudioCache(tmp_path / 'cache')) == 1
+
+        second.clear()
+        assert not first.get('a' * 64, tmp_path / 'out')
+        assert len(first) == 0
+
+
+class TestCachedSynthesis:
+    """Tests for TTSEngineManager with an audio cache"""
+
+    def synthesize(self, manager, tmp_path, text, **kwargs):
+        output = tmp_path / f'out_{abs(hash((text, str(kwargs))))}.mp3'
+        assert asyncio.run(manager.synthesize(text, str(output), **kwargs))
+        return output.read_text()
+
+    def test_identical_speech_is_synthesized_once(self, tmp_path):
+        engine = FakeEngine('edge')
+        manager = make_manager(AudioCache(tmp_path / 'cache'), engine)
+
+        first = self.synthesize(manager, tmp_path, "x squared", voice="v", rate="+0%")
+        again = self.synthesize(manager, tmp_path, "x squared", voice="v", rate="+0%")
+        self.synthesize(manager, tmp_path, "x squared", voice="v", rate="+20%")
+
+        assert first == again
+        assert engine.calls == 2
+        assert manager.audio_cache.get_stats()['hits'] == 1
+
+    def test_fallback_audio_is_not_served_for_preferred_engine(self, tmp_path):
+        preferred = FakeEngine('edge', works=False)
+        fallback = FakeEngine('espeak')
+        manager = make_manager(AudioCache(tmp_path / 'cache'), preferred, fallback)
+
+        self.synthesize(manager, tmp_path, "y")
+        preferred.works = True
+        assert self.synthesize(manager, tmp_path, "y").startswith('edge:')
+        assert self.synthesize(manager, tmp_path, "y").startswith('edge:')
+
+        assert preferred.calls == 2
+        assert fallback.calls == 1
+
+    def test_requested_engine(self, tmp_path):
+        edge, espeak = FakeEngine('edge'), FakeEngine('espeak')
+        manager = make_manager(AudioCache(tmp_path / 'cache'), edge, espeak)
+
+        for _ in range(3):
+            assert self.synthesize(manager, tmp_path, "z", engine_name='espeak').startswith('espeak:')
+
+        assert (edge.calls, espeak.calls) == (0, 1)
+
+    def test_without_cache(self, tmp_path):
+        engine = FakeEngine('edge')
+        manager = make_manager(None, engine)
+
+        self.synthesize(manager, tmp_path, "x")
+        self.synthesize(manager, tmp_path, "x")
+
+        assert engine.calls == 2
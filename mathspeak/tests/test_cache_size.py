@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test Suite for Cache Size Estimation
+====================================
+
+Checks that LRUCache sizes entries without pickling them, that estimates
+stay close to the pickled size of real results, and that the memory
+bound still holds.
+"""
+
+import pickle
+from dataclasses import dataclass, field
+from typing import List
+
+import pytest
+
+from mathspeak.core.engine import MathematicalTTSEngine
+from mathspeak.core.patterns_v2 import PATTERN_EXAMPLES
+from mathspeak.core.voice_manager import VoiceManager
+from mathspeak.utils.cache import LRUCache, estimate_size, register_sizer
+
+
+@dataclass
+class Record:
+    name: str
+    tags: List[str] = field(default_factory=list)
+
+
+class Opaque:
+    __slots__ = ()
+
+
+@pytest.fixture(scope="module")
+def results():
+    engine = MathematicalTTSEngine(voice_manager=VoiceManager(), enable_caching=False)
+    return [engine.process_latex(latex) for latex, _ in PATTERN_EXAMPLES]
+
+
+class TestEstimateSize:
+    """Tests for estimate_size"""
+
+    def test_strings_cost_their_length(self):
+        assert estimate_size('x' * 1000) - estimate_size('') == 1000
+
+    def test_containers_and_dataclasses_sum_their_parts(self):
+        record = Record('a' * 100, ['b' * 50, 'c' * 50])
+
+        assert estimate_size(record) > estimate_size('a' * 100) + estimate_size(['b' * 50, 'c' * 50])
+        assert estimate_size({'k': 'v' * 100}) > 100
+
+    def test_registered_sizer_wins(self):
+        register_sizer(Opaque, lambda obj: 12345)
+
+        assert estimate_size(Opaque()) == 12345
+
+    def test_self_sizing_values(self, results):
+        for result in results:
+            assert estimate_size(result) == result.cache_size()
+
+    def test_close_to_pickled_size(self, results):
+        for result in results:
+            ratio = estimate_size(result) / len(pickle.dumps(result))
+            assert 0.8 < ratio < 1.5
+
+    def test_put_does_not_pickle(self, monkeypatch, results):
+        def fail(*args, **kwargs):
+            raise AssertionError("pickle.dumps called")
+
+        monkeypatch.setattr(pickle, 'dumps', fail)
+        cache = LRUCache()
+        cache.put('key', results[0])
+
+        assert cache.total_memory == results[0].cache_size()
+
+
+class TestMemoryBound:
+    """The max_memory_mb bound holds with estimated sizes"""
+
+    def test_bound_holds_in_pickled_bytes(self, results):
+        cache = LRUCache(max_size=100_000, max_memory_mb=1)
+        for i in range(20_000):
+            cache.put(str(i), results[i % len(results)])
+
+        pickled = sum(len(pickle.dumps(entry.value)) for entry in cache.cache.values())
+        assert cache.total_memory <= cache.max_memory_bytes
+        assert pickled <= cache.max_memory_bytes
+        assert cache.stats['evictions'] > 0
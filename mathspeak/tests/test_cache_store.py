@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the Persistent Cache Store
+=========================================
+
+Checks that the SQLite tier persists entries incrementally, flushes
+writes left pending while idle, survives a process that never shuts down
+cleanly, ignores entries from other format versions, compacts least
+recently used entries, and is shared between processes. Also covers ExpressionCache using it behind the LRU tier.
+"""
+
+import multiprocessing
+import pickle
+import time
+
+import pytest
+
+from mathspeak.utils.cache import ExpressionCache, LRUCache
+from mathspeak.utils.cache_store import SQLiteCacheStore
+
+
+def write_entries(path, prefix, count):
+    store = SQLiteCacheStore(path)
+    for i in range(count):
+        store.put(f"{prefix}{i}", i)
+    store.flush()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "expressions.db"
+
+
+class TestSQLiteCacheStore:
+    """Tests for SQLiteCacheStore"""
+
+    def test_roundtrip_across_instances(self, db_path):
+        store = SQLiteCacheStore(db_path)
+        store.put('key', {'speech': 'x squared'}, 0.5)
+        assert store.get('key') == ({'speech': 'x squared'}, 0.5)
+
+        store.flush()
+        # No close(): a crashed process loses nothing that was flushed
+        assert SQLiteCacheStore(db_path).get('key') == ({'speech': 'x squared'}, 0.5)
+
+    def test_writes_flush_in_batches(self, db_path):
+        store = SQLiteCacheStore(db_path)
+        for i in range(SQLiteCacheStore.FLUSH_BATCH):
+            store.put(f"k{i}", i)
+
+        assert store.get_stats()['pending'] == 0
+        assert len(SQLiteCacheStore(db_path)) == SQLiteCacheStore.FLUSH_BATCH
+
+    def test_idle_writes_are_flushed(self, db_path):
+        store = SQLiteCacheStore(db_path)
+        store.FLUSH_INTERVAL = 0.05
+        store.put('key', 'value')
+
+        # Nothing else is called on the store; the flush timer writes it
+        deadline = time.time() + 5
+        while store.get_stats()['pending'] and time.time() < deadline:
+            time.sleep(0.01)
+        assert SQLiteCacheStore(db_path).get('key') == ('value', 0.0)
+
+    def test_other_versions_are_misses(self, db_path):
+        old = SQLiteCacheStore(db_path, version=1)
+        old.put('key', 'old format')
+        old.flush()
+
+        new = SQLiteCacheStore(db_path, version=2)
+        assert new.get('key') is None
+        assert new.compact() == 1
+        assert len(old) == 0
+
+    def test_unreadable_entry_is_dropped(self, db_path):
+        store = SQLiteCacheStore(db_path)
+        store.put('key', 'value')
+        store.flush()
+        store._connection().execute("UPDATE entries SET value = ?", (b'not a pickle',))
+
+        assert store.get('key') is None
+        assert len(store) == 0
+
+    def test_compaction_keeps_most_recently_used(self, db_path):
+        store = SQLiteCacheStore(db_path, max_entries=10)
+        for i in range(20):
+            store.put(f"k{i}", i)
+            store.flush()
+        # Reading k0 makes it recently used
+        store.get('k0')
+        store.flush()
+
+        store.compact()
+
+        assert len(store) == 9
+        assert store.get('k0') == (0, 0.0)
+        assert store.get('k1') is None
+        assert store.get('k19') == (19, 0.0)
+
+    def test_compaction_respects_byte_limit(self, db_path):
+        value = 'x' * 1000
+        store = SQLiteCacheStore(db_path, max_bytes=10 * len(pickle.dumps(value)))
+        for i in range(30):
+            store.put(f"k{i}", value)
+        store.flush()
+
+        store.compact()
+
+        assert 0 < len(store) <= 9
+
+    def test_shared_between_processes(self, db_path):
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=write_entries, args=(db_path, prefix, 50))
+                   for prefix in ('a', 'b', 'c')]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(60)
+            assert worker.exitcode == 0
+
+        store = SQLiteCacheStore(db_path)
+        assert len(store) == 150
+        assert store.get('b49') == (49, 0.0)
+
+
+class TestExpressionCacheTiers:
+    """ExpressionCache with the persistent store behind LRUCache"""
+
+    def test_store_hits_are_promoted(self, tmp_path):
+        cache = ExpressionCache(cache_dir=tmp_path)
+        cache.put('x^2', 'x squared', computation_time=0.1)
+        cache.save()
+
+        fresh = ExpressionCache(cache_dir=tmp_path)
+        fresh.cache.clear()
+        assert fresh.get('x^2') == 'x squared'
+        assert fresh.get_stats()['persistent']['hits'] == 1
+        assert fresh.get('x^2') == 'x squared'
+        assert fresh.get_stats()['persistent']['hits'] == 1
+
+    def test_warm_start(self, tmp_path):
+        cache = ExpressionCache(cache_dir=tmp_path)
+        cache.put('x^2', 'x squared')
+        cache.save()
+
+        fresh = ExpressionCache(cache_dir=tmp_path)
+        # Loaded into memory without touching the store
+        assert fresh._make_key('x^2') in fresh.cache
+        assert fresh.get_stats()['persistent']['hits'] == 0
+
+    def test_legacy_pickle_is_imported_once(self, tmp_path):
+        legacy = LRUCache()
+        legacy.put('a' * 64, 'from pickle')
+        legacy.save_to_disk(tmp_path / 'expressions.cache')
+
+        cache = ExpressionCache(cache_dir=tmp_path)
+        assert cache.get('a' * 64) == 'from pickle'
+        assert len(cache.store) == 1
+
+        cache.store._connection().execute("DELETE FROM entries")
+        assert len(ExpressionCache(cache_dir=tmp_path).store) == 0
+
+    def test_without_store_uses_pickle_file(self, tmp_path):
+        cache = ExpressionCache(cache_dir=tmp_path, persistent=False)
+        cache.put('x^2', 'x squared')
+        cache.save()
+
+        assert cache.store is None
+        assert ExpressionCache(cache_dir=tmp_path, persistent=False).get('x^2') == 'x squared'
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test Suite for Canonical Cache Keys
+===================================
+
+Checks that notation-only differences in LaTeX reduce to one canonical
+form and one cache entry, that the forced context and audience level
+still separate cache entries, and, differentially over the examples/*.json
+corpus, that an expression reads the same as its canonical form.
+"""
+
+import pytest
+
+from mathspeak.core.engine import MathematicalContext, MathematicalTTSEngine, canonicalize_latex
+from mathspeak.core.patterns_v2 import AudienceLevel
+from mathspeak.tests.test_prefilter import load_example_corpus
+
+# Notation the canonical form must not touch
+SCRIPTS = [
+    r'\sum_{i=1}^{n} a_i',
+    r'\prod_{k=1}^{m} x_k',
+    r'\int_{0}^{1} x^{2} \, dx',
+    r'\bigcup_{i=1}^{\infty} A_i',
+    r'\mathbb{R}^{n}',
+    'a_{1} + a_{2}',
+    'x ^ 2',
+]
+
+
+@pytest.fixture
+def engine():
+    engine = MathematicalTTSEngine(enable_caching=True)
+    # Keep the test off the on-disk expression cache
+    engine.expression_cache = {}
+    engine._use_advanced_cache = False
+    return engine
+
+
+class TestCanonicalize:
+    """Tests for canonicalize_latex"""
+
+    @pytest.mark.parametrize("latex", ['x^2', '$x^2$', '  $x^2$ ', r'x^2\,', 'x^2 \\quad'])
+    def test_notation_variants(self, latex):
+        assert canonicalize_latex(latex) == 'x^2'
+
+    def test_spacing_commands(self):
+        assert canonicalize_latex(r'\int f(x)\,dx \quad a\;b\:c\!d') == r'\int f(x) dx a b cd'
+
+    def test_line_breaks_are_not_spacing(self):
+        assert canonicalize_latex(r'a \\, b') == r'a \\, b'
+
+    @pytest.mark.parametrize("latex", SCRIPTS)
+    def test_scripts_are_kept(self, latex):
+        assert canonicalize_latex(latex) == ' '.join(latex.replace(r'\,', ' ').split())
+
+    def test_lines_are_kept(self):
+        # % comments run to the end of the line
+        assert canonicalize_latex('x % note\n  + y') == 'x % note\n+ y'
+
+    def test_quad_prefix_of_longer_command(self):
+        assert canonicalize_latex(r'\quadrilateral') == r'\quadrilateral'
+
+
+class TestCanonicalCacheKeys:
+    """Variants share one cache entry in the engine"""
+
+    def test_variants_share_entry(self, engine):
+        results = [engine.process_latex(latex) for latex in ('x^2', '$x^2$', ' x^2 ', r'x^2\,')]
+
+        assert len(engine.expression_cache) == 1
+        assert engine.metrics.cache_hits == 3
+        assert len({result.processed for result in results}) == 1
+
+    def test_hit_keeps_callers_original(self, engine):
+        engine.process_latex('x^2')
+        result = engine.process_latex('$x^2$')
+
+        assert result.original == '$x^2$'
+        assert engine.process_latex('x^2').original == 'x^2'
+
+    def test_forced_context_separates_entries(self, engine):
+        engine.process_latex('x^2')
+        engine.process_latex('x^2', force_context=MathematicalContext.TOPOLOGY)
+
+        assert len(engine.expression_cache) == 2
+
+    def test_audience_level_is_part_of_key(self, engine):
+        keys = {engine._get_cache_key('x^2', None, level) for level in AudienceLevel}
+
+        assert len(keys) == len(AudienceLevel)
+
+
+class TestCanonicalSpeech:
+    """An expression and its canonical form must read byte-identically"""
+
+    def test_corpus_reads_as_canonical_form(self):
+        engine = MathematicalTTSEngine(enable_caching=False)
+        mismatches = []
+        for expression in load_example_corpus() + SCRIPTS:
+            # Also as a deck might send it, delimited and padded
+            for latex in (expression, f'  ${expression}$ '):
+                canonical = canonicalize_latex(latex)
+                if canonical == latex:
+                    continue
+                speech = engine.process_latex(latex).processed
+                canonical_speech = engine.process_latex(canonical).processed
+                if speech != canonical_speech:
+                    mismatches.append((latex, speech, canonical_speech))
+
+        assert not mismatches
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test Suite for Document Streaming
+=================================
+
+Checks that DocumentProcessor streams a file's math through the parallel
+processor in document order with the same speech as the engine, that its
+summaries keep their shape, and that DocumentReader reads paragraphs and
+sections lazily.
+"""
+
+import asyncio
+import io
+
+import pytest
+
+pytest.importorskip("tqdm")
+
+from mathspeak.core.engine import MathematicalTTSEngine
+from mathspeak.core.parallel_processor import DocumentProcessor, ParallelProcessor
+from mathspeak.document_reader import DocumentReader, SectionWindow, iter_paragraphs
+from mathspeak.tests.test_math_spans import generated_document
+from mathspeak.tests.test_prefilter import load_example_corpus
+
+ENGINE_OPTIONS = {'enable_caching': False}
+
+
+@pytest.fixture(scope="module")
+def document():
+    return generated_document(load_example_corpus(), 120, seed=1)
+
+
+@pytest.fixture
+def document_processor():
+    processor = ParallelProcessor(num_workers=2, mode="thread", show_progress=False,
+                                  chunk_size=4, engine_options=ENGINE_OPTIONS)
+    yield DocumentProcessor(processor)
+    processor.shutdown()
+
+
+class TestDocumentProcessor:
+    """Tests for DocumentProcessor streaming"""
+
+    def test_iter_file_matches_engine(self, document, document_processor, tmp_path):
+        path = tmp_path / 'doc.tex'
+        path.write_text(document, encoding='utf-8')
+        data = document.encode('utf-8')
+        engine = MathematicalTTSEngine(**ENGINE_OPTIONS)
+
+        records = list(document_processor.iter_file(path, chunk_size=101))
+
+        assert records
+        assert [record['position'] for record in records] == sorted(record['position'] for record in records)
+        for record in records:
+            assert record['success']
+            assert data[record['position']:].startswith((b'$', b'\\(', b'\\[', b'\\begin'))
+            assert record['processed'] == engine.process_latex(record['original']).processed
+
+    def test_iter_document_uses_character_offsets(self, document_processor):
+        records = list(document_processor.iter_document('Für $x^2$ and $$y$$ and $  $'))
+
+        assert [(r['original'], r['type'], r['position']) for r in records] == [
+            ('x^2', 'inline', 4), ('y', 'display', 14)
+        ]
+
+    def test_extract_math_expressions_dedups(self, document_processor):
+        expressions = document_processor.extract_math_expressions('$x$ then $$y$$ and \\(x\\)')
+
+        assert expressions == [('x', 'inline', 0), ('y', 'display', 9)]
+
+    def test_process_file_summary(self, document, document_processor, tmp_path):
+        path = tmp_path / 'doc.tex'
+        path.write_text(document, encoding='utf-8')
+
+        full = asyncio.run(document_processor.process_file(path))
+        counts = asyncio.run(document_processor.process_file(path, keep_expressions=False))
+
+        assert full['filename'] == 'doc.tex'
+        assert full['total_expressions'] == len(full['expressions']) > 0
+        assert full['successful'] == full['total_expressions']
+        assert counts['expressions'] == []
+        assert counts['total_expressions'] == full['total_expressions']
+
+    def test_missing_file(self, document_processor, tmp_path):
+        result = asyncio.run(document_processor.process_file(tmp_path / 'missing.tex'))
+
+        assert result['success_rate'] == 0.0
+        assert 'error' in result
+
+
+class TestDocumentReaderStreaming:
+    """Tests for DocumentReader's lazy paragraphs and sections"""
+
+    def test_iter_paragraphs(self):
+        text = "First line\nsecond line\n\n  \nNext $x$\n\n\n\nLast"
+
+        assert list(iter_paragraphs(io.StringIO(text))) == [
+            'First line\nsecond line', 'Next $x$', 'Last'
+        ]
+
+    def test_streamed_sections_match_parse_document(self, document):
+        reader = DocumentReader.__new__(DocumentReader)
+
+        parsed = reader.parse_document(document)
+        streamed = list(reader.iter_sections(iter_paragraphs(io.StringIO(document))))
+
+        assert [(s.index, s.content, s.has_math) for s in streamed] == [
+            (s.index, s.content, s.has_math) for s in parsed
+        ]
+
+    def test_section_window(self):
+        reader = DocumentReader.__new__(DocumentReader)
+        evicted = []
+        sections = reader.iter_sections(f'Paragraph {i}.' for i in range(10))
+        window = SectionWindow(sections, size=3, on_evict=evicted.append)
+
+        assert window.total is None
+        assert window.get(4).content == 'Paragraph 4.'
+        assert [s.index for s in window] == [2, 3, 4]
+        assert [s.index for s in evicted] == [0, 1]
+        assert window.get(1) is None
+        assert window.get(20) is None
+        assert window.total == len(window) == 10
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Test Suite for Domain Routing
+=============================
+
+Checks that importing the domains package loads no domain module, that
+the engine loads a domain only when it first routes an expression to it
+and then runs that domain's processor as a timed stage, and that
+expressions without a domain context, or whose commands the general
+patterns all speak, are not routed. Shared processors keep each call's
+subcontext to that call.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from mathspeak import domains
+from mathspeak.core.engine import MathematicalContext, MathematicalTTSEngine
+
+EXAMPLES = Path(__file__).parent.parent.parent / 'examples'
+
+
+def run_python(code):
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip()
+
+
+class RecordingProcessor:
+    """Domain processor that tags and records what it is given"""
+
+    def __init__(self):
+        self.seen = []
+
+    def process(self, text):
+        self.seen.append(text)
+        return text + ' routed'
+
+
+@pytest.fixture
+def engine():
+    return MathematicalTTSEngine(enable_caching=False)
+
+
+class TestLazyRegistry:
+    """Tests for the lazy domain registry"""
+
+    def test_import_loads_no_domain(self):
+        loaded = run_python(
+            "import sys, mathspeak.domains as d\n"
+            "d.get_available_domains(); d.is_domain_available('topology')\n"
+            "print(sorted(m for m in sys.modules if m.startswith('mathspeak.domains.')))"
+        )
+
+        assert loaded == '[]'
+
+    def test_lookup_loads_only_that_domain(self):
+        loaded = run_python(
+            "import sys\n"
+            "from mathspeak.domains import DOMAIN_REGISTRY, get_domain_processor\n"
+            "get_domain_processor('ode')\n"
+            "print([d for d in DOMAIN_REGISTRY if DOMAIN_REGISTRY.is_loaded(d)])"
+        )
+
+        assert loaded == "['ode']"
+
+    def test_registry_and_exports(self):
+        assert 'topology' in domains.DOMAIN_REGISTRY
+        assert len(domains.DOMAIN_REGISTRY) == len(domains.get_available_domains())
+        assert domains.DOMAIN_REGISTRY['topology'] is domains.TopologyProcessor
+        with pytest.raises(AttributeError):
+            domains.NoSuchProcessor
+
+    def test_shared_processor(self):
+        processor = domains.get_domain_processor('topology')
+
+        assert processor is domains.get_domain_processor('topology')
+        assert 'topology' in domains.loaded_domains()
+        with pytest.raises(ValueError):
+            domains.get_domain_processor('astrology')
+
+
+@pytest.mark.parametrize('domain', ['algorithms', 'combinatorics', 'manifolds', 'measure_theory',
+                                    'ode', 'real_analysis', 'topology'])
+def test_subcontext_is_per_call(domain):
+    """A shared processor's rules use the subcontext of their own call"""
+    processor = type(domains.get_domain_processor(domain))()
+    text = 'the limit as epsilon approaches 0 of a smooth function'
+    own = processor.detect_subcontext(text)
+    other = next(context for context in type(own) if context != own)
+    seen = []
+
+    apply_vocabulary = processor._apply_vocabulary
+    apply_special_rules = processor._apply_special_rules
+
+    def interleaved(text):
+        # Another thread starting a call on the same processor
+        processor.context = other
+        return apply_vocabulary(text)
+
+    def recording(text, context=None):
+        seen.append(context)
+        return apply_special_rules(text, context)
+
+    processor._apply_vocabulary = interleaved
+    processor._apply_special_rules = recording
+    processor.process(text)
+
+    assert seen == [own]
+
+
+class TestEngineRouting:
+    """Tests for the domain stage of MathematicalTTSEngine.process_latex"""
+
+    def test_routes_to_detected_domain(self, engine):
+        result = engine.process_latex(r'\iota: A \hookrightarrow X, \pi_1(X) \cong \mathbb{Z}')
+
+        assert result.context == 'topology'
+        assert 'embeds into' in result.processed
+        assert engine.domain_processors[MathematicalContext.TOPOLOGY] is \
+            domains.get_domain_processor('topology')
+
+    def test_general_context_is_not_routed(self, engine):
+        engine.process_latex(r'\int_0^1 x^2 dx')
+
+        assert engine.domain_processors == {}
+        assert engine.get_performance_report()['domains'] == {}
+
+    def test_commands_the_general_patterns_speak_are_not_routed(self, engine):
+        result = engine.process_latex(r'\nabla \cdot F')
+
+        assert result.context == 'manifolds'
+        assert result.processed == 'divergence F'
+        assert engine.domain_processors == {}
+
+    def test_assigned_processor_and_timing(self, engine):
+        processor = RecordingProcessor()
+        engine.domain_processors[MathematicalContext.ODE] = processor
+
+        engine.process_latex(r"\ddot{y} + y = 0", force_context=MathematicalContext.ODE)
+        engine.process_latex(r"\dot{y} = ky", force_context=MathematicalContext.ODE)
+        engine.process_latex("y' = ky", force_context=MathematicalContext.ODE)
+
+        assert len(processor.seen) == 2
+        report = engine.get_performance_report()['domains']
+        assert report['ode']['expressions'] == 2
+        assert report['ode']['total_time'] >= 0
+
+    def test_enabled_domains_limit_routing(self):
+        engine = MathematicalTTSEngine(enable_caching=False, enabled_domains={'ode'})
+
+        result = engine.process_latex(r'\iota: A \hookrightarrow X, \pi_1(X) \cong \mathbb{Z}')
+
+        assert result.context == 'topology'
+        assert engine.get_domain_processor(MathematicalContext.TOPOLOGY) is None
+        assert engine.get_domain_processor(MathematicalContext.ODE) is not None
+
+    def test_failing_processor_falls_back(self, engine):
+        class Broken:
+            def process(self, text):
+                raise RuntimeError("broken vocabulary")
+
+        engine.domain_processors[MathematicalContext.ODE] = Broken()
+
+        assert engine.process_latex(r"\ddot{y} + y = 0", force_context=MathematicalContext.ODE).processed
+
+
+def example_expressions():
+    """LaTeX of every example in examples/*.json"""
+    found = set()
+    for path in sorted(EXAMPLES.glob('*.json')):
+        for examples in json.loads(path.read_text()).values():
+            found.update(example['latex'] for example in examples)
+    return sorted(found)
+
+
+def test_examples_read_as_without_routing():
+    """Routing leaves the output of every repository example unchanged"""
+    routed = MathematicalTTSEngine(enable_caching=False)
+    unrouted = MathematicalTTSEngine(enable_caching=False, enabled_domains=set())
+    expressions = example_expressions()
+
+    assert expressions
+    for latex in expressions:
+        assert routed.process_latex(latex).processed == unrouted.process_latex(latex).processed, latex
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the Math Span Scanner
+====================================
+
+Checks the delimiters, escapes and comments MathSpanScanner recognizes,
+that spans and their offsets do not depend on how the input is chunked,
+that byte offsets are exact for non-ASCII text, and that the scanner's
+buffer stays bounded however much is fed to it.
+"""
+
+import asyncio
+import io
+import mmap
+import random
+import re
+
+import pytest
+
+from mathspeak.core.math_spans import (
+    MathSpan, MathSpanScanner, find_math_spans, iter_math_spans, split_outside_math
+)
+from mathspeak.streaming.realtime import ChunkType, RealtimeMathProcessor
+from mathspeak.tests.test_prefilter import load_example_corpus
+
+SAMPLE = (
+    "Let $x^2$ be given. % a comment with $y$\n"
+    "Then $$\\int_0^1 f$$ and \\(a+b\\) and \\[c\\]. It costs \\$5.\n"
+    "\\begin{align*}a &= b \\\\[2pt] c &= d\\end{align*}\n"
+    "\\begin{equation}E = mc^2\\end{equation} Grüße $\\alpha$ 50\\% $z$"
+)
+
+
+def spans(text, **kwargs):
+    return [(span.kind, span.content) for span in find_math_spans(text, **kwargs)]
+
+
+def generated_document(corpus, count, seed=0):
+    """A LaTeX document wrapping corpus expressions in mixed delimiters"""
+    rng = random.Random(seed)
+    wrappers = ['${}$', '$${}$$', '\\({}\\)', '\\[{}\\]',
+                '\\begin{{equation}}{}\\end{{equation}}', '\\begin{{align*}}{}\\end{{align*}}']
+    prose = ['Hence ', 'Für alle ', 'costs \\$3 and ', '% note $q$\n', '\n\n', 'so that ']
+    parts = []
+    for _ in range(count):
+        parts.append(rng.choice(prose))
+        parts.append(rng.choice(wrappers).format(rng.choice(corpus)))
+    return ''.join(parts)
+
+
+@pytest.fixture(scope="module")
+def document():
+    return generated_document(load_example_corpus(), 400)
+
+
+class TestMathSpanScanner:
+    """Tests for MathSpanScanner and find_math_spans"""
+
+    def test_delimiters(self):
+        assert spans(SAMPLE) == [
+            ('inline', 'x^2'),
+            ('display', '\\int_0^1 f'),
+            ('inline', 'a+b'),
+            ('display', 'c'),
+            ('align', 'a &= b \\\\[2pt] c &= d'),
+            ('equation', 'E = mc^2'),
+            ('inline', '\\alpha'),
+            ('inline', 'z'),
+        ]
+
+    def test_offsets_cover_delimiters(self):
+        for span in find_math_spans(SAMPLE):
+            source = SAMPLE[span.start:span.end]
+            assert span.content in source
+            assert source.startswith(('$', '\\(', '\\[', '\\begin'))
+
+    def test_adjacent_inline_spans(self):
+        assert spans('$a$$b$') == [('inline', 'a'), ('inline', 'b')]
+
+    def test_escaped_dollars_are_text(self):
+        assert spans(r'from \$3 to \$5') == []
+        assert spans(r'$\$3 + x$') == [('inline', r'\$3 + x')]
+
+    def test_comment_runs_to_end_of_line(self):
+        assert spans('% $a$\n$b$ % $c$') == [('inline', 'b')]
+
+    def test_percent_as_text(self):
+        assert spans('50% of $x$') == []
+        assert spans('50% of $x$', comments=False) == [('inline', 'x')]
+
+    def test_unclosed_span_is_dropped(self):
+        assert spans('costs $5 and $x$') == [('inline', '5 and ')]
+        assert spans('a stray $ at the end') == []
+
+    def test_overlong_span_is_given_up(self):
+        text = '$' + 'a' * 50 + ' $x$'
+        assert spans(text, max_span=20) == [('inline', 'x')]
+
+    def test_chunking_does_not_change_spans(self):
+        expected = find_math_spans(SAMPLE)
+        for chunk_size in range(1, 40):
+            scanner = MathSpanScanner()
+            found = []
+            for i in range(0, len(SAMPLE), chunk_size):
+                found.extend(scanner.feed(SAMPLE[i:i + chunk_size]))
+            found.extend(scanner.close())
+            assert found == expected, chunk_size
+
+
+class TestIterMathSpans:
+    """Tests for streaming spans from files"""
+
+    def test_byte_offsets(self, document):
+        data = document.encode('utf-8')
+        found = list(iter_math_spans(io.BytesIO(data), chunk_size=97))
+
+        assert [span.content for span in found] == [span.content for span in find_math_spans(document)]
+        for span in found:
+            assert span.content.encode('utf-8') in data[span.start:span.end]
+
+    @pytest.mark.parametrize("chunk_size", [1, 16, 17, 4096])
+    def test_chunk_size_invariance(self, document, chunk_size):
+        data = document.encode('utf-8')
+        expected = list(iter_math_spans(io.BytesIO(data), chunk_size=len(data)))
+
+        assert list(iter_math_spans(io.BytesIO(data), chunk_size=chunk_size)) == expected
+
+    def test_path_and_mmap(self, document, tmp_path):
+        path = tmp_path / 'doc.tex'
+        path.write_text(document, encoding='utf-8')
+        from_path = list(iter_math_spans(path))
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            from_mmap = list(iter_math_spans(mapped))
+
+        assert from_path == from_mmap
+        assert all(isinstance(span, MathSpan) and isinstance(span.content, str) for span in from_path)
+
+    def test_buffer_stays_bounded(self, document):
+        scanner = MathSpanScanner(binary=True, max_span=1000)
+        data = document.encode('utf-8')
+        largest = 0
+        for _ in range(20):
+            for i in range(0, len(data), 4096):
+                scanner.feed(data[i:i + 4096])
+                largest = max(largest, len(scanner._buffer))
+
+        assert largest < 4096 + 1000 + 64
+
+
+class TestSpanConsumers:
+    """Tests for the readers that find their math with the scanner"""
+
+    def test_split_outside_math(self):
+        sentence_end = re.compile(r'(?<=[.!?])\s+')
+
+        assert split_outside_math('A $a. b$ c. D e. $$f! g$$', sentence_end) == [
+            'A $a. b$ c.', 'D e.', '$$f! g$$'
+        ]
+
+    def test_realtime_chunks(self):
+        processor = RealtimeMathProcessor()
+
+        async def stream():
+            for chunk in ['The integral ', '$\\int_0^1 x. dx$ ', 'is small. ',
+                          '$$a! b$$ ', 'where $a > 0$.']:
+                yield chunk
+
+        async def collect():
+            return [chunk async for chunk in processor.process_stream(stream())]
+
+        chunks = asyncio.run(collect())
+
+        assert [(chunk.type, chunk.original.strip()) for chunk in chunks] == [
+            (ChunkType.MIXED, 'The integral $\\int_0^1 x. dx$ is small.'),
+            (ChunkType.MATH_DISPLAY, '$$a! b$$'),
+            (ChunkType.MIXED, 'where $a > 0$.'),
+        ]
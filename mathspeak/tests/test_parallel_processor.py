@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the Parallel Processor
+=====================================
+
+Checks that thread and process pools return the same results as the
+engine, in task order, that failures stay per-task, and that auto mode
+picks a pool by batch size.
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("tqdm")
+
+from mathspeak.core.engine import MathematicalTTSEngine
+from mathspeak.core.parallel_processor import BatchProcessor, ParallelProcessor, ProcessingTask
+from mathspeak.core.patterns_v2 import PATTERN_EXAMPLES
+
+ENGINE_OPTIONS = {'enable_caching': False}
+
+
+def make_tasks():
+    return [ProcessingTask(id=i, expression=latex)
+            for i, (latex, _) in enumerate(PATTERN_EXAMPLES)]
+
+
+@pytest.fixture(scope="module")
+def expected():
+    engine = MathematicalTTSEngine(**ENGINE_OPTIONS)
+    return [engine.process_latex(task.expression).processed for task in make_tasks()]
+
+
+def processed(results):
+    return [result.result.processed for result in results]
+
+
+class TestParallelProcessor:
+    """Tests for ParallelProcessor"""
+
+    @pytest.mark.parametrize("mode", ["thread", "process"])
+    def test_matches_serial_engine(self, mode, expected):
+        processor = ParallelProcessor(num_workers=2, mode=mode, show_progress=False,
+                                      chunk_size=3, engine_options=ENGINE_OPTIONS)
+        try:
+            results = asyncio.run(processor.process_tasks(make_tasks()))
+        finally:
+            processor.shutdown()
+
+        assert all(result.success for result in results)
+        assert [result.task_id for result in results] == list(range(len(expected)))
+        assert processed(results) == expected
+
+    def test_iter_results_streams_in_order(self, expected):
+        processor = ParallelProcessor(num_workers=2, mode="thread", show_progress=False,
+                                      chunk_size=2, engine_options=ENGINE_OPTIONS)
+        try:
+            # A generator is consumed lazily, chunk by chunk
+            results = list(processor.iter_results(task for task in make_tasks()))
+        finally:
+            processor.shutdown()
+
+        assert processed(results) == expected
+
+    def test_pool_is_reused(self):
+        processor = ParallelProcessor(num_workers=1, mode="thread", show_progress=False,
+                                      engine_options=ENGINE_OPTIONS)
+        try:
+            list(processor.iter_results(make_tasks()[:2]))
+            engine = processor._engine
+            list(processor.iter_results(make_tasks()[:2]))
+            assert processor._engine is engine
+        finally:
+            processor.shutdown()
+
+    def test_failed_task_does_not_fail_chunk(self, monkeypatch):
+        extract = MathematicalTTSEngine._extract_unknown_commands
+
+        def failing_extract(engine, text):
+            if text == 'boom':
+                raise RuntimeError('boom')
+            return extract(engine, text)
+
+        monkeypatch.setattr(MathematicalTTSEngine, '_extract_unknown_commands', failing_extract)
+        tasks = [ProcessingTask(id=0, expression='x^2'),
+                 ProcessingTask(id=1, expression='boom'),
+                 ProcessingTask(id=2, expression='y^2')]
+        processor = ParallelProcessor(num_workers=1, mode="thread", show_progress=False,
+                                      chunk_size=3, engine_options=ENGINE_OPTIONS)
+        try:
+            results = list(processor.iter_results(tasks))
+        finally:
+            processor.shutdown()
+
+        assert [result.result.context for result in results] == ['general', 'error', 'general']
+        assert results[0].result.processed == MathematicalTTSEngine(**ENGINE_OPTIONS).process_latex('x^2').processed
+
+    def test_duplicate_expressions_processed_once(self, monkeypatch):
+        calls = []
+        process_many = MathematicalTTSEngine.process_many
+
+        def counting_process_many(engine, expressions, **kwargs):
+            calls.extend(expressions)
+            return process_many(engine, expressions, **kwargs)
+
+        monkeypatch.setattr(MathematicalTTSEngine, 'process_many', counting_process_many)
+        processor = ParallelProcessor(num_workers=1, mode="thread", show_progress=False,
+                                      engine_options=ENGINE_OPTIONS)
+        batch = BatchProcessor(processor)
+        try:
+            results = asyncio.run(batch.process_expressions(['x^2', 'y^2', 'x^2']))
+        finally:
+            batch.shutdown()
+
+        assert sorted(calls) == ['x^2', 'y^2']
+        assert [result.task_id for result in results] == [0, 1, 2]
+        assert results[0].result.processed == results[2].result.processed
+
+    def test_auto_mode_by_workload(self):
+        processor = ParallelProcessor(num_workers=4, mode="auto", show_progress=False)
+
+        assert processor.resolve_mode(10) == "thread"
+        assert processor.resolve_mode(10_000) == "process"
+        assert ParallelProcessor(num_workers=1, mode="auto").resolve_mode(10_000) == "thread"
+
+    def test_use_multiprocessing_selects_process_mode(self):
+        assert ParallelProcessor(num_workers=2, use_multiprocessing=True).mode == "process"
+        with pytest.raises(ValueError):
+            ParallelProcessor(mode="greenlet")
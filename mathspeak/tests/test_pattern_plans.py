@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test Suite for Precomputed Pattern Execution Plans
+==================================================
+
+Ensures PatternHandler plans are ordered by priority, filtered by audience,
+rebuilt when patterns are added, and produce the same text as the old
+per-call filter+sort dispatch.
+"""
+
+import pytest
+
+from mathspeak.core.patterns.base import (
+    AudienceLevel,
+    MathDomain,
+    PatternHandler,
+    PatternRule,
+    build_pattern_plan,
+)
+from mathspeak.core.patterns_v2 import PATTERN_EXAMPLES, get_shared_processor
+
+
+class ToyHandler(PatternHandler):
+    """Minimal handler with known priorities and audiences"""
+
+    def __init__(self):
+        super().__init__(MathDomain.ALGEBRA)
+
+    def _init_patterns(self):
+        self.patterns = [
+            PatternRule(r'a', 'b', self.domain, 'a to b', priority=10),
+            PatternRule(r'b', 'c', self.domain, 'b to c', priority=90),
+            PatternRule(
+                r'c', 'd', self.domain, 'c to d', priority=50,
+                audience_levels=[AudienceLevel.GRADUATE]
+            ),
+        ]
+
+
+def legacy_process(handler, text, audience):
+    applicable = [p for p in handler.patterns if audience in p.audience_levels]
+    applicable.sort(key=lambda p: p.priority, reverse=True)
+    for rule in applicable:
+        text = rule.compiled.sub(rule.replacement, text)
+    return text
+
+
+class TestPatternPlans:
+    """Tests for PatternHandler.get_plan and build_pattern_plan"""
+
+    def test_plan_ordered_by_priority(self):
+        handler = ToyHandler()
+        plan = handler.get_plan(AudienceLevel.GRADUATE)
+
+        assert [description for _, _, description, _ in plan] == ['b to c', 'c to d', 'a to b']
+
+    def test_plan_filters_audience(self):
+        handler = ToyHandler()
+        plan = handler.get_plan(AudienceLevel.HIGH_SCHOOL)
+
+        assert [description for _, _, description, _ in plan] == ['b to c', 'a to b']
+
+    def test_plan_is_frozen(self):
+        handler = ToyHandler()
+
+        assert isinstance(handler.get_plan(AudienceLevel.GRADUATE), tuple)
+        assert handler.get_plan(AudienceLevel.GRADUATE) is handler.get_plan(AudienceLevel.GRADUATE)
+
+    def test_add_pattern_invalidates_plans(self):
+        handler = ToyHandler()
+        handler.add_pattern(PatternRule(r'd', 'e', handler.domain, 'd to e', priority=100))
+
+        plan = handler.get_plan(AudienceLevel.UNDERGRADUATE)
+        assert plan[0][2] == 'd to e'
+        assert handler.process('d', AudienceLevel.UNDERGRADUATE) == 'e'
+
+    def test_equal_priorities_keep_declaration_order(self):
+        rules = [
+            PatternRule(r'x', 'y', MathDomain.ALGEBRA, 'first', priority=50),
+            PatternRule(r'y', 'z', MathDomain.ALGEBRA, 'second', priority=50),
+        ]
+
+        assert [d for _, _, d, _ in build_pattern_plan(rules)] == ['first', 'second']
+
+    @pytest.mark.parametrize("audience", list(AudienceLevel))
+    def test_matches_legacy_dispatch(self, audience):
+        handlers = get_shared_processor().engine.handlers.values()
+
+        for latex, _ in PATTERN_EXAMPLES:
+            for handler in handlers:
+                assert handler.process(latex, audience) == legacy_process(handler, latex, audience)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the Shared Pattern Processor Registry
+====================================================
+
+Ensures the process-wide MathSpeechProcessor is built once, shared across
+threads and callers, and can be rebuilt through the reload hook.
+"""
+
+import threading
+
+import pytest
+
+from mathspeak.core import patterns_v2
+from mathspeak.core.patterns_v2 import (
+    AudienceLevel,
+    MathSpeechProcessor,
+    get_shared_processor,
+    process_math_to_speech,
+    process_with_context,
+    reload_shared_processor,
+)
+
+
+@pytest.fixture(autouse=True)
+def restore_shared_processor():
+    """Keep the registry state from leaking between tests"""
+    original = patterns_v2._shared_processor
+    yield
+    patterns_v2._shared_processor = original
+
+
+class TestSharedProcessor:
+    """Tests for get_shared_processor / reload_shared_processor"""
+
+    def test_same_instance_returned(self):
+        assert get_shared_processor() is get_shared_processor()
+
+    def test_built_once_across_threads(self):
+        patterns_v2._shared_processor = None
+        seen = []
+
+        def worker():
+            seen.append(get_shared_processor())
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(seen) == 8
+        assert all(processor is seen[0] for processor in seen)
+
+    def test_reload_replaces_instance(self):
+        before = get_shared_processor()
+        after = reload_shared_processor()
+
+        assert after is not before
+        assert get_shared_processor() is after
+
+    @pytest.mark.parametrize("latex", [
+        r"\frac{1}{2}",
+        r"\int_0^1 f(x) dx",
+        r"x \in A",
+        r"\forall x",
+    ])
+    def test_output_matches_fresh_processor(self, latex):
+        fresh = MathSpeechProcessor()
+        audience = AudienceLevel.UNDERGRADUATE
+
+        assert process_math_to_speech(latex, audience) == fresh.process(latex, audience)
+
+    def test_process_with_context_uses_shared_processor(self):
+        latex = r"\frac{a}{b}"
+        expected = get_shared_processor().process(latex, AudienceLevel.GRADUATE)
+
+        assert process_with_context(latex, {'audience': 'graduate'}) == expected
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the Literal Trigger Prefilter
+============================================
+
+Checks trigger extraction on representative rule shapes and verifies,
+differentially over the examples/*.json corpus, that the prefiltered
+pipeline produces byte-identical speech to the unfiltered one.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from mathspeak.core.patterns import prefilter
+from mathspeak.core.patterns.prefilter import extract_trigger, guarded_sub
+from mathspeak.core.patterns_v2 import (
+    PATTERN_EXAMPLES,
+    AudienceLevel,
+    MathSpeechProcessor,
+    get_shared_processor,
+)
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[2] / 'examples'
+
+
+def load_example_corpus():
+    """All LaTeX inputs from examples/*.json plus the 100 guide examples"""
+    expressions = [latex for latex, _ in PATTERN_EXAMPLES]
+    for path in sorted(EXAMPLES_DIR.glob('*.json')):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        for items in data.values():
+            expressions.extend(item['latex'] for item in items)
+    return list(dict.fromkeys(expressions))
+
+
+@pytest.fixture(scope="module")
+def unfiltered_processor():
+    original = prefilter.PREFILTER_ENABLED
+    prefilter.PREFILTER_ENABLED = False
+    try:
+        yield MathSpeechProcessor()
+    finally:
+        prefilter.PREFILTER_ENABLED = original
+
+
+class TestTriggerExtraction:
+    """Tests for extract_trigger"""
+
+    @pytest.mark.parametrize("pattern,expected", [
+        (r'\\frac\{([^}]+)\}\{([^}]+)\}', '\\frac{'),
+        (r'\\int_0\^1', '\\int_0^1'),
+        (r'\\sin(?!e)', '\\sin'),
+        (r'\\in\b', '\\in'),
+        (r'd\s+over\s+d([a-zA-Z])', 'over'),
+        (r'(\\left)+\(', '\\left'),
+        # The parser factors out the common prefix of the alternatives
+        (r'\\csc|\\cosec', '\\c'),
+    ])
+    def test_required_literal(self, pattern, expected):
+        assert extract_trigger(pattern) == expected
+
+    @pytest.mark.parametrize("pattern", [
+        r'alpha|beta',
+        r'\s+',
+        r'(?:\\alpha)*',
+        r'(\\alpha)?[a-z]',
+    ])
+    def test_no_required_literal(self, pattern):
+        assert extract_trigger(pattern) is None
+
+    def test_ignorecase_has_no_trigger(self):
+        assert extract_trigger(r'\bad\b', flags=0) == 'ad'
+        assert extract_trigger(r'\bad\b', flags=prefilter.re.IGNORECASE) is None
+        assert extract_trigger(r'(?i)proof') is None
+
+    def test_guarded_sub_matches_re_sub(self):
+        assert guarded_sub(r'\\alpha', 'alpha', r'\alpha + \beta') == 'alpha + \\beta'
+        assert guarded_sub(r'\\alpha', 'alpha', 'x + y') == 'x + y'
+
+
+class TestPrefilterDifferential:
+    """Prefiltered output must be byte-identical to running every rule"""
+
+    @pytest.mark.parametrize("audience", list(AudienceLevel))
+    def test_examples_identical(self, unfiltered_processor, audience):
+        filtered_processor = get_shared_processor()
+        mismatches = []
+
+        for latex in load_example_corpus():
+            filtered = filtered_processor.process(latex, audience)
+            prefilter.PREFILTER_ENABLED = False
+            try:
+                unfiltered = unfiltered_processor.process(latex, audience)
+            finally:
+                prefilter.PREFILTER_ENABLED = True
+            if filtered != unfiltered:
+                mismatches.append((latex, filtered, unfiltered))
+
+        assert not mismatches
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test Suite for Pre-fork Serving
+===============================
+
+Checks that workers saving to one expression cache file merge their
+entries instead of overwriting each other, and that the pre-fork
+configuration is read from the environment.
+"""
+
+import pytest
+
+from mathspeak.utils.cache import LRUCache
+
+
+class TestSharedCacheFile:
+    """Tests for LRUCache.save_to_disk(merge=True)"""
+
+    def test_merge_keeps_entries_from_other_processes(self, tmp_path):
+        cache_file = tmp_path / "expressions.pkl"
+        first, second = LRUCache(max_size=10), LRUCache(max_size=10)
+        first.put('a', 'from first')
+        second.put('b', 'from second')
+
+        first.save_to_disk(cache_file, merge=True)
+        second.save_to_disk(cache_file, merge=True)
+
+        loaded = LRUCache(max_size=10)
+        loaded.load_from_disk(cache_file)
+        assert loaded.get('a') == 'from first'
+        assert loaded.get('b') == 'from second'
+
+    def test_merge_prefers_own_entries_and_respects_max_size(self, tmp_path):
+        cache_file = tmp_path / "expressions.pkl"
+        other = LRUCache(max_size=3)
+        for key in ('a', 'b', 'c'):
+            other.put(key, 'old')
+        other.save_to_disk(cache_file, merge=True)
+
+        ours = LRUCache(max_size=3)
+        ours.put('c', 'new')
+        ours.put('d', 'new')
+        ours.save_to_disk(cache_file, merge=True)
+
+        loaded = LRUCache(max_size=10)
+        loaded.load_from_disk(cache_file)
+        assert len(loaded) == 3
+        assert loaded.get('a') is None
+        assert loaded.get('c') == 'new'
+        assert loaded.get('d') == 'new'
+
+    def test_plain_save_overwrites(self, tmp_path):
+        cache_file = tmp_path / "expressions.pkl"
+        first, second = LRUCache(max_size=10), LRUCache(max_size=10)
+        first.put('a', 1)
+        second.put('b', 2)
+
+        first.save_to_disk(cache_file)
+        second.save_to_disk(cache_file)
+
+        loaded = LRUCache(max_size=10)
+        loaded.load_from_disk(cache_file)
+        assert loaded.get('a') is None
+        assert loaded.get('b') == 2
+        assert not list(tmp_path.glob("*.tmp"))
+
+
+class TestPreforkConfig:
+    """Tests for PreforkConfig"""
+
+    @pytest.fixture(autouse=True)
+    def prefork(self):
+        pytest.importorskip("fastapi")
+        from mathspeak.api import prefork
+        return prefork
+
+    def test_from_env(self, prefork, monkeypatch):
+        monkeypatch.setenv("MATHSPEAK_WORKERS", "3")
+        monkeypatch.setenv("MATHSPEAK_MAX_REQUESTS", "500")
+        monkeypatch.setenv("MATHSPEAK_GRACEFUL_TIMEOUT", "soon")
+
+        config = prefork.PreforkConfig.from_env(max_requests=None, port=9000)
+
+        assert config.workers == 3
+        assert config.max_requests == 500
+        assert config.port == 9000
+        assert config.graceful_timeout == prefork.PreforkConfig.graceful_timeout
+
+    def test_zero_workers_means_cpu_count(self, prefork):
+        assert prefork.PreforkConfig(workers=0).worker_count >= 1
+        assert prefork.PreforkConfig(workers=5).worker_count == 5
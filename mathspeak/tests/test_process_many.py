@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test Suite for Batch Processing
+===============================
+
+Checks that MathematicalTTSEngine.process_many returns the same results as
+process_latex, in input order, that duplicates and cache hits are resolved
+without reprocessing, that errors stay per expression, and that the batched
+context and audience detection agree with the per-expression detectors.
+"""
+
+import random
+
+import pytest
+
+from mathspeak.core.engine import ContextDetector, MathematicalContext, MathematicalTTSEngine
+from mathspeak.tests.test_prefilter import load_example_corpus
+
+
+def comparable(result):
+    return (result.original, result.processed, result.context,
+            sorted(result.unknown_commands), result.partial)
+
+
+@pytest.fixture
+def engine():
+    engine = MathematicalTTSEngine(enable_caching=True)
+    # Keep the test off the on-disk expression cache
+    engine.expression_cache = {}
+    engine._use_advanced_cache = False
+    yield engine
+    engine.shutdown()
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return load_example_corpus()
+
+
+class TestBatchedDetection:
+    """Batched detectors agree with the per-expression ones"""
+
+    def test_detect_contexts(self, corpus):
+        detector = ContextDetector()
+        texts = corpus + ['', 'COMPACT Hausdorff', 'İ compact', 'a\x00b \\oint']
+
+        assert detector.detect_contexts(texts) == [detector.detect_context(t) for t in texts]
+
+    def test_detect_audience_levels(self, corpus):
+        engine = MathematicalTTSEngine(enable_caching=False)
+        texts = corpus + ['', 'Solve x = 2', 'THEOREM and lemma']
+
+        assert engine._detect_audience_levels(texts) == [
+            engine._detect_audience_level(text) for text in texts
+        ]
+
+
+class TestProcessMany:
+    """Tests for MathematicalTTSEngine.process_many"""
+
+    @pytest.mark.parametrize("parallel", [True, False])
+    def test_matches_process_latex(self, corpus, parallel):
+        serial = MathematicalTTSEngine(enable_caching=False)
+        batched = MathematicalTTSEngine(enable_caching=False)
+        expressions = random.Random(0).sample(corpus, 60) + ['', '$x^{2}$', r'\input{x}']
+
+        expected = [comparable(serial.process_latex(latex)) for latex in expressions]
+        results = batched.process_many(expressions, parallel=parallel)
+        batched.shutdown()
+
+        assert [comparable(result) for result in results] == expected
+
+    def test_duplicates_processed_once(self, engine):
+        results = engine.process_many(['x^2', 'y^2', ' x^2 ', '$x^2$', 'x^2'])
+
+        assert engine.metrics.cache_misses == 2
+        assert engine.metrics.cache_hits == 3
+        assert len({results[i].processed for i in (0, 2, 3, 4)}) == 1
+        # Each input keeps its own original text
+        assert [result.original for result in results] == ['x^2', 'y^2', ' x^2 ', '$x^2$', 'x^2']
+
+    def test_cache_hits_skip_processing(self, engine, monkeypatch):
+        engine.process_latex('x^2')
+
+        def fail(*args, **kwargs):
+            raise AssertionError("cached expression was processed")
+
+        monkeypatch.setattr(engine, '_process_miss', fail)
+        result, = engine.process_many(['$x^2$'])
+
+        assert result.original == '$x^2$'
+        assert engine.metrics.cache_hits == 1
+
+    def test_errors_are_per_expression(self, engine, monkeypatch):
+        extract = engine._extract_unknown_commands
+
+        def failing_extract(text):
+            if 'boom' in text:
+                raise RuntimeError('boom')
+            return extract(text)
+
+        monkeypatch.setattr(engine, '_extract_unknown_commands', failing_extract)
+        results = engine.process_many(['x^2', r'\text{boom}', r'\write18{rm}', 'y^2'])
+
+        assert [result.context for result in results] == ['general', 'error', 'error', 'general']
+        assert results[2].processed.startswith('Security error')
+
+    def test_force_context(self, engine):
+        results = engine.process_many(['x^2', r'\oint f'], force_context=MathematicalContext.TOPOLOGY)
+
+        assert [result.context for result in results] == ['topology', 'topology']
+
+    def test_empty_batch(self, engine):
+        assert engine.process_many([]) == []
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the Cooperative Processing Budget
+================================================
+
+Checks that a Deadline stops the pattern pipeline between rules,
+that the partial result is still speakable, and that process_latex flags
+partial results and keeps them out of the cache.
+"""
+
+import time
+
+import pytest
+
+from mathspeak.core.engine import MathematicalTTSEngine
+from mathspeak.core.patterns.base import AudienceLevel, MathDomain, PatternHandler, PatternRule
+from mathspeak.utils.timeout import Deadline
+from mathspeak.core.patterns_v2 import PATTERN_EXAMPLES, get_shared_processor
+
+
+def slow_replacement(match):
+    time.sleep(0.05)
+    return 'b'
+
+
+class SlowHandler(PatternHandler):
+    """First rule is slow, second rule should be cut by a short budget"""
+
+    def __init__(self):
+        super().__init__(MathDomain.ALGEBRA)
+
+    def _init_patterns(self):
+        self.patterns = [
+            PatternRule(r'a', slow_replacement, self.domain, 'slow a to b', priority=90),
+            PatternRule(r'b', 'c', self.domain, 'b to c', priority=10),
+        ]
+
+
+@pytest.fixture
+def engine():
+    engine = MathematicalTTSEngine(enable_caching=True)
+    # Keep the test off the on-disk expression cache
+    engine.expression_cache = {}
+    engine._use_advanced_cache = False
+    return engine
+
+
+class TestDeadlineBudget:
+    """Tests for the budget bookkeeping on Deadline"""
+
+    def test_unlimited(self):
+        budget = Deadline()
+
+        assert not budget.expired
+        assert budget.remaining() is None
+        assert not budget.exhausted
+
+    def test_expired_is_sticky(self):
+        budget = Deadline(0)
+
+        assert budget.spent('first rule')
+        assert budget.spent('second rule')
+        assert budget.exhausted
+        assert budget.exhausted_at == 'first rule'
+
+    def test_generous_budget_is_not_exhausted(self):
+        budget = Deadline(60)
+
+        assert not budget.spent('rule')
+        assert budget.remaining() > 0
+
+    def test_fork_keeps_expiry_not_bookkeeping(self):
+        shared = Deadline(0)
+        assert shared.spent('first request')
+
+        forked = shared.fork()
+
+        assert forked.expires_at == shared.expires_at
+        assert forked.exhausted_at is None
+        assert forked.spent('second request')
+        assert forked.exhausted_at == 'second request'
+
+
+class TestBudgetedPipeline:
+    """The budget is checked between rules"""
+
+    def test_handler_stops_between_rules(self):
+        handler = SlowHandler()
+        budget = Deadline(0.01)
+
+        assert handler.process('a', AudienceLevel.UNDERGRADUATE, budget) == 'b'
+        assert budget.exhausted_at == 'b to c'
+
+    def test_handler_without_budget_runs_all_rules(self):
+        assert SlowHandler().process('a', AudienceLevel.UNDERGRADUATE) == 'c'
+
+    def test_partial_result_is_speakable(self):
+        budget = Deadline(0)
+        result = get_shared_processor().process(
+            r'\int_0^1 \frac{\alpha}{x} dx', AudienceLevel.UNDERGRADUATE, budget
+        )
+
+        assert budget.exhausted
+        assert '\\' not in result
+        assert '{' not in result
+        assert 'alpha' in result
+
+    def test_generous_budget_matches_unbudgeted(self):
+        processor = get_shared_processor()
+
+        for latex, _ in PATTERN_EXAMPLES:
+            budget = Deadline(60)
+            expected = processor.process(latex, AudienceLevel.UNDERGRADUATE)
+            assert processor.process(latex, AudienceLevel.UNDERGRADUATE, budget) == expected
+            assert not budget.exhausted
+
+
+class TestPartialResults:
+    """process_latex flags partial results"""
+
+    def test_complete_result_not_partial(self, engine):
+        result = engine.process_latex(r'\frac{a}{b}')
+
+        assert not result.partial
+        assert engine.expression_cache
+
+    def test_exhausted_result_is_flagged_and_not_cached(self, engine):
+        result = engine.process_latex(r'\frac{a}{b}', deadline=0)
+
+        assert result.partial
+        assert not engine.expression_cache
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Test Suite for Rate Limiting
+============================
+
+Checks the token-bucket RateLimiter (bursts, refill, retry times) against
+a fake clock, that the in-memory store's timing wheel drops clients once
+their allowance is back, that the SQLite store enforces one limit across
+limiter instances and processes and lets requests through when it is
+locked, and the API middleware answering 429 without blocking the event
+loop on a shared store.
+"""
+
+import multiprocessing
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from mathspeak.core.security import RateLimiter
+from mathspeak.utils.rate_limit_store import (
+    MemoryRateLimitStore, RateLimitStore, SQLiteRateLimitStore
+)
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def take_all(path, results):
+    limiter = RateLimiter(20, 3600, store=SQLiteRateLimitStore(path))
+    results.put(sum(limiter.is_allowed('shared') for _ in range(15)))
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestRateLimiter:
+    """Tests for RateLimiter with the in-memory store"""
+
+    def test_burst_then_refill(self, clock):
+        limiter = RateLimiter(3, 30, clock=clock)
+
+        assert [limiter.is_allowed('a') for _ in range(4)] == [True, True, True, False]
+        # One request's worth of allowance comes back every 10 seconds
+        clock.now += 9
+        assert not limiter.is_allowed('a')
+        clock.now += 1
+        assert limiter.is_allowed('a')
+        assert not limiter.is_allowed('a')
+
+    def test_retry_after(self, clock):
+        limiter = RateLimiter(2, 10, clock=clock)
+        limiter.check('a')
+        limiter.check('a')
+
+        allowed, retry_after = limiter.check('a')
+        assert not allowed
+        assert retry_after == pytest.approx(5.0)
+        clock.now += 2
+        assert limiter.check('a')[1] == pytest.approx(3.0)
+
+    def test_clients_are_independent(self, clock):
+        limiter = RateLimiter(1, 60, clock=clock)
+
+        assert limiter.is_allowed('a')
+        assert not limiter.is_allowed('a')
+        assert limiter.is_allowed('b')
+
+    def test_reset_time(self, clock):
+        limiter = RateLimiter(4, 60, clock=clock)
+        assert limiter.get_reset_time('a') is None
+
+        limiter.is_allowed('a')
+        limiter.is_allowed('a')
+        assert limiter.get_reset_time('a') == pytest.approx(clock.now + 30)
+
+    def test_refilled_clients_are_dropped(self, clock):
+        store = MemoryRateLimitStore(horizon=60)
+        limiter = RateLimiter(10, 60, store=store, clock=clock)
+        for i in range(1000):
+            limiter.is_allowed(f'client-{i}')
+        assert len(store) == 1000
+
+        # A used token takes 6 seconds to come back
+        clock.now += 7
+        limiter.is_allowed('other')
+        assert len(store) == 1
+
+    def test_idle_longer_than_wheel_turn(self, clock):
+        store = MemoryRateLimitStore(horizon=10)
+        # Refills over 100 seconds, ten turns of the wheel
+        limiter = RateLimiter(1, 100, store=store, clock=clock)
+        limiter.is_allowed('slow')
+
+        clock.now += 50
+        limiter.is_allowed('other')
+        assert not limiter.is_allowed('slow')
+        clock.now += 1000
+        limiter.is_allowed('other')
+        assert len(store) == 1
+        assert limiter.is_allowed('slow')
+
+
+class TestRateLimitStore:
+    """Tests for the store interface"""
+
+    def test_interface_is_abstract(self):
+        with pytest.raises(TypeError):
+            RateLimitStore()
+
+    def test_partial_store_cannot_be_built(self):
+        class TakeOnly(RateLimitStore):
+            def take(self, key, capacity, rate, now, cost=1.0):
+                return True, capacity
+
+        with pytest.raises(TypeError):
+            TakeOnly()
+
+
+class TestSQLiteRateLimitStore:
+    """Tests for the shared SQLite store"""
+
+    def test_limit_shared_between_limiters(self, tmp_path, clock):
+        first = RateLimiter(3, 30, store=SQLiteRateLimitStore(tmp_path / "limits.db"), clock=clock)
+        second = RateLimiter(3, 30, store=SQLiteRateLimitStore(tmp_path / "limits.db"), clock=clock)
+
+        assert [first.is_allowed('a'), second.is_allowed('a'), first.is_allowed('a')] == [True] * 3
+        assert not second.is_allowed('a')
+        clock.now += 10
+        assert second.is_allowed('a')
+        assert second.get_reset_time('a') == pytest.approx(clock.now + 30)
+
+    def test_limit_shared_between_processes(self, tmp_path):
+        path = tmp_path / "limits.db"
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        workers = [context.Process(target=take_all, args=(path, results)) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=30)
+
+        assert all(worker.exitcode == 0 for worker in workers)
+        assert sum(results.get(timeout=5) for _ in workers) == 20
+
+    def test_purge_refilled_buckets(self, tmp_path):
+        store = SQLiteRateLimitStore(tmp_path / "limits.db")
+        store.take('quick', 5, 1.0, now=100.0)
+        store.take('slow', 5, 0.01, now=100.0)
+
+        assert store.purge(now=102.0) == 1
+        assert len(store) == 1
+        assert store.peek('slow', 5, 0.01, now=200.0) == pytest.approx(5.0)
+
+    def test_locked_database_fails_open_quickly(self, tmp_path):
+        store = SQLiteRateLimitStore(tmp_path / "limits.db", timeout=0.1)
+        store.take('a', 1, 0.01, now=100.0)
+        writer = sqlite3.connect(str(tmp_path / "limits.db"), isolation_level=None)
+        writer.execute("BEGIN IMMEDIATE")
+
+        start = time.perf_counter()
+        assert store.take('a', 1, 0.01, now=101.0) == (True, 1.0)
+        assert time.perf_counter() - start < 1
+        assert store.stats['errors'] == 1
+        writer.execute("ROLLBACK")
+
+
+class TestRateLimitMiddleware:
+    """Tests for the API middleware"""
+
+    @pytest.fixture
+    def client(self):
+        pytest.importorskip("fastapi")
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from mathspeak.api.server import RateLimitMiddleware
+
+        app = FastAPI()
+        app.add_middleware(RateLimitMiddleware, limiter=RateLimiter(2, 60))
+
+        @app.get("/health")
+        def health():
+            return {"status": "ok"}
+
+        @app.get("/voices")
+        def voices():
+            return []
+
+        return TestClient(app)
+
+    def test_rejects_over_limit(self, client):
+        assert [client.get("/voices").status_code for _ in range(2)] == [200, 200]
+
+        response = client.get("/voices")
+        assert response.status_code == 429
+        assert response.json() == {"detail": "Rate limit exceeded"}
+        assert response.headers["Retry-After"] == "30"
+        assert response.headers["X-RateLimit-Limit"] == "2"
+
+    def test_health_is_exempt(self, client):
+        assert all(client.get("/health").status_code == 200 for _ in range(5))
+        assert client.get("/voices").status_code == 200
+
+    def test_shared_store_is_checked_off_the_event_loop(self, tmp_path):
+        pytest.importorskip("fastapi")
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from mathspeak.api.server import RateLimitMiddleware
+
+        class RecordingLimiter(RateLimiter):
+            def check(self, client_id):
+                checked_in.append(threading.current_thread())
+                return super().check(client_id)
+
+        checked_in, loop_threads = [], []
+        app = FastAPI()
+        app.add_middleware(RateLimitMiddleware, limiter=RecordingLimiter(
+            1, 60, store=SQLiteRateLimitStore(tmp_path / "limits.db")))
+
+        @app.get("/voices")
+        async def voices():
+            loop_threads.append(threading.current_thread())
+            return []
+
+        client = TestClient(app)
+        assert [client.get("/voices").status_code for _ in range(2)] == [200, 429]
+
+        assert len(checked_in) == 2
+        assert loop_threads[0] not in checked_in
+
+    def test_configured_from_env(self, monkeypatch, tmp_path):
+        pytest.importorskip("fastapi")
+        from mathspeak.api.server import rate_limiter_from_env
+
+        monkeypatch.delenv("MATHSPEAK_RATE_LIMIT", raising=False)
+        assert rate_limiter_from_env() is None
+
+        monkeypatch.setenv("MATHSPEAK_RATE_LIMIT", "30")
+        monkeypatch.setenv("MATHSPEAK_RATE_LIMIT_WINDOW", "10")
+        monkeypatch.setenv("MATHSPEAK_RATE_LIMIT_DB", str(tmp_path / "limits.db"))
+        limiter = rate_limiter_from_env()
+        assert (limiter.max_requests, limiter.rate) == (30, 3.0)
+        assert isinstance(limiter.store, SQLiteRateLimitStore)
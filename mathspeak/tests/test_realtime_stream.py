@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Test Suite for Real-time Stream Buffering
+=========================================
+
+Checks that RealtimeMathProcessor emits the same chunks however its
+input is split, that StreamBuffer drops the text it has handed out and
+never ends a sentence inside math, and that the span scanner holds back
+only what may still grow into a delimiter. The synthesis pipeline is
+checked with a TTS manager that writes its input text after a delay.
+"""
+
+import asyncio
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from mathspeak.core.math_spans import MathSpanScanner
+from mathspeak.streaming.realtime import ChunkType, RealtimeMathProcessor, StreamBuffer
+
+TEXT = (
+    "The integral $\\int_0^1 x. dx$ is small. $$a! b$$ where $a > 0$.\n\n"
+    "Next \\begin{align*}x. y\\end{align*} and a stray $ sign. End"
+)
+
+
+def process(chunks):
+    processor = RealtimeMathProcessor()
+
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def collect():
+        return [(chunk.type, chunk.original) async for chunk in processor.process_stream(stream())]
+
+    return asyncio.run(collect())
+
+
+class SlowTTSManager:
+    """Writes the text as its audio after a delay, counting overlap"""
+
+    def __init__(self, delay=0.05, first_delay=None):
+        self.delay = delay
+        self.first_delay = delay if first_delay is None else first_delay
+        self.active = 0
+        self.most_active = 0
+        self.started = []
+        self.finished = 0
+        self.cancelled = 0
+
+    async def synthesize(self, text, output_file, voice=None, rate=None, engine_name=None):
+        self.started.append(text)
+        self.active += 1
+        self.most_active = max(self.most_active, self.active)
+        try:
+            await asyncio.sleep(self.delay if len(self.started) > 1 else self.first_delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.active -= 1
+        Path(output_file).write_bytes(text.encode())
+        self.finished += 1
+        return True
+
+
+class SlowEngine:
+    """Converts math after a blocking delay, counting synthesis finished meanwhile"""
+
+    def __init__(self, tts, delay=0.05):
+        self.tts = tts
+        self.delay = delay
+        self.overlapped = 0
+
+    def process_latex(self, latex):
+        finished = self.tts.finished
+        time.sleep(self.delay)
+        if self.tts.finished > finished:
+            self.overlapped += 1
+        return SimpleNamespace(processed=latex)
+
+
+def split(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class TestRealtimeProcessor:
+    """Tests for RealtimeMathProcessor.process_stream"""
+
+    def test_chunks(self):
+        assert process([TEXT]) == [
+            (ChunkType.MIXED, 'The integral $\\int_0^1 x. dx$ is small.'),
+            (ChunkType.MATH_DISPLAY, '$$a! b$$'),
+            (ChunkType.MIXED, 'where $a > 0$.'),
+            (ChunkType.MIXED, 'Next \\begin{align*}x. y\\end{align*} and a stray $ sign.'),
+            (ChunkType.TEXT, 'End'),
+        ]
+
+    def test_splitting_does_not_change_chunks(self):
+        expected = process([TEXT])
+        for size in (1, 2, 3, 5, 16):
+            assert process(split(TEXT, size)) == expected, size
+
+
+class TestSynthesisPipeline:
+    """Tests for the synthesis stage of process_stream"""
+
+    SENTENCES = [f"Sentence number {i} is here. " for i in range(8)]
+
+    def run(self, processor, chunks, take=None):
+        async def stream():
+            for chunk in chunks:
+                yield chunk
+
+        async def collect():
+            results = []
+            chunk_stream = processor.process_stream(stream())
+            async for chunk in chunk_stream:
+                results.append(chunk)
+                if take is not None and len(results) == take:
+                    await chunk_stream.aclose()
+                    break
+            # Let cancelled synthesis unwind
+            await asyncio.sleep(0)
+            return results
+
+        return asyncio.run(collect())
+
+    def test_audio_in_order(self):
+        tts = SlowTTSManager()
+        processor = RealtimeMathProcessor(tts_manager=tts)
+
+        chunks = self.run(processor, self.SENTENCES)
+
+        assert [chunk.audio.decode() for chunk in chunks] == [
+            sentence.strip() for sentence in self.SENTENCES
+        ]
+
+    def test_synthesis_overlaps_within_bound(self):
+        tts = SlowTTSManager(delay=0.05)
+        processor = RealtimeMathProcessor(tts_manager=tts, max_in_flight=3)
+
+        start = time.perf_counter()
+        self.run(processor, self.SENTENCES)
+        elapsed = time.perf_counter() - start
+
+        assert tts.most_active == 3
+        assert elapsed < len(self.SENTENCES) * tts.delay * 0.75
+
+    def test_conversion_does_not_block_synthesis(self):
+        tts = SlowTTSManager(delay=0.02)
+        engine = SlowEngine(tts, delay=0.05)
+        processor = RealtimeMathProcessor(engine=engine, tts_manager=tts, max_in_flight=3)
+        sentences = [f"Value ${i}$ here. " for i in range(6)]
+
+        chunks = self.run(processor, sentences)
+
+        assert [chunk.processed.split() for chunk in chunks] == [
+            ["Value", str(i), "here."] for i in range(6)
+        ]
+        # Each earlier chunk's synthesis finishes while a later one converts
+        assert engine.overlapped == len(sentences) - 1
+
+    def test_closing_cancels_synthesis(self):
+        tts = SlowTTSManager(delay=5, first_delay=0.01)
+        processor = RealtimeMathProcessor(tts_manager=tts, max_in_flight=4)
+
+        start = time.perf_counter()
+        chunks = self.run(processor, self.SENTENCES, take=1)
+
+        assert len(chunks) == 1
+        assert time.perf_counter() - start < 1
+        assert len(tts.started) == 4
+        assert tts.cancelled == 3
+
+    def test_metrics(self):
+        processor = RealtimeMathProcessor(tts_manager=SlowTTSManager(delay=0.01))
+        self.run(processor, self.SENTENCES)
+        metrics = processor.metrics
+
+        assert metrics.chunks == metrics.audio_chunks == len(self.SENTENCES)
+        assert 0 < metrics.time_to_first_audio < 1
+        assert metrics.real_time_factor > 0
+
+    def test_no_audio_without_tts_manager(self):
+        chunks = self.run(RealtimeMathProcessor(), self.SENTENCES[:2])
+
+        assert [chunk.audio for chunk in chunks] == [None, None]
+        assert chunk_types(chunks) == [ChunkType.TEXT, ChunkType.TEXT]
+
+
+def chunk_types(chunks):
+    return [chunk.type for chunk in chunks]
+
+
+class TestStreamBuffer:
+    """Tests for StreamBuffer"""
+
+    def test_math_is_taken_as_soon_as_it_closes(self):
+        buffer = StreamBuffer()
+        for chunk in split('  $x^2', 2):
+            buffer.feed(chunk)
+            assert buffer.take_math() is None
+        buffer.feed('$ and')
+
+        expr, span = buffer.take_math()
+        assert (expr, span.content) == ('$x^2$', 'x^2')
+        assert buffer.text == ' and'
+
+    def test_sentence_end_inside_open_math_waits(self):
+        buffer = StreamBuffer()
+        buffer.feed('Let $a. b')
+        assert buffer.take_sentence() is None
+        buffer.feed('$ hold. Then')
+
+        assert buffer.take_sentence() == 'Let $a. b$ hold. '
+        assert buffer.text == 'Then'
+
+    def test_stray_dollar_is_text_at_the_end(self):
+        buffer = StreamBuffer()
+        buffer.feed('It costs $5. More')
+        assert buffer.take_sentence() is None
+        buffer.close()
+
+        assert buffer.take_sentence() == 'It costs $5. '
+        assert buffer.take_rest() == 'More'
+
+    def test_taken_chunks_are_dropped(self):
+        buffer = StreamBuffer()
+        for _ in range(10000):
+            buffer.feed('word ')
+            buffer.feed('end. ')
+            while buffer.take_sentence() is not None:
+                pass
+
+        assert len(buffer) == 0
+        assert len(buffer._chunks) <= 1
+
+
+class TestScannerHoldBack:
+    """Tests for what MathSpanScanner holds back between chunks"""
+
+    def test_closing_dollar_is_not_held(self):
+        scanner = MathSpanScanner()
+
+        assert [span.content for span in scanner.feed('so $a > 0$')] == ['a > 0']
+        assert scanner.position == len('so $a > 0$')
+
+    def test_trailing_delimiter_prefixes_are_held(self):
+        scanner = MathSpanScanner()
+        assert scanner.feed('a $') == []
+        assert scanner.position == 2
+        assert scanner.feed('$x$') == []
+        assert scanner.open_start == 2
+
+        assert [span.kind for span in scanner.feed('$ \\beg')] == ['display']
+        assert scanner.position == len('a $$x$$ ')
+        assert scanner.feed('in{gather}y\\end{gather}')[-1].kind == 'gather'
+
+    def test_open_span_is_set_aside(self):
+        scanner = MathSpanScanner(max_span=10 ** 6)
+        scanner.feed('$')
+        for _ in range(1000):
+            scanner.feed('word ')
+
+        assert len(scanner._buffer) < 10
+        assert scanner.open_start == 0
+        assert [span.content for span in scanner.feed('$')] == ['word ' * 1000]
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test Suite for LaTeX Security Validation
+========================================
+
+Checks the verdicts validate() reads from one tokenizing pass over the
+input, and the sanitized text the same pass produces.
+"""
+
+import pytest
+
+from mathspeak.core.security import LaTeXSecurityValidator, SecurityViolation
+
+
+@pytest.fixture
+def validator():
+    return LaTeXSecurityValidator()
+
+
+class TestValidate:
+    """Tests for LaTeXSecurityValidator.validate"""
+
+    def test_safe_expression(self, validator):
+        assert validator.validate(r'\frac{a}{b} + \int_0^1 x^{2} \, dx') == (True, "")
+
+    @pytest.mark.parametrize('latex, command', [
+        (r'\input{/etc/passwd}', r'\\input'),
+        (r'x + \DEF\y{z}', r'\\def'),
+        (r'\includegraphics{x}', r'\\include'),
+        (r'% \write18{rm}' '\nx', r'\\write'),
+        # The first dangerous command in DANGEROUS_COMMANDS order is reported
+        (r'\def\a{\input{x}}', r'\\input'),
+    ])
+    def test_dangerous_commands(self, validator, latex, command):
+        assert validator.validate(latex) == (False, f"Dangerous command detected: {command}")
+
+    def test_line_break_before_letters_is_not_a_command(self, validator):
+        assert validator.scan(r'a \\ b').dangerous_commands == []
+
+    @pytest.mark.parametrize('latex, message', [
+        ('x' * 51, "Excessive repetitions detected"),
+        (r'\alpha \beta \gamma \delta \epsilon \zeta \eta \theta \iota \kappa',
+         "Excessive repetitions detected"),
+        ('{a}' * 20, "Excessive repetitions detected"),
+        (r'\alpha12345', "Malformed LaTeX commands detected"),
+        ('{' * 6 + 'x', "Malformed LaTeX commands detected"),
+        ('中' * 11, "Malformed LaTeX commands detected"),
+        (r'\endcsnameendcsnameendcsname', "Potential expansion bomb detected"),
+        ('   ', "Empty input"),
+    ])
+    def test_rejections(self, validator, latex, message):
+        assert validator.validate(latex) == (False, message)
+
+    @pytest.mark.parametrize('latex', [
+        r'\alpha \beta \gamma \delta \epsilon \zeta \eta \theta \iota x',
+        '{a}' * 19,
+        '{a} ' * 20,
+        r'\{' * 6 + 'x',
+        'αβγδεζηθικλμ',
+        'x' + '\n' * 60 + 'y',
+    ])
+    def test_accepted_near_limits(self, validator, latex):
+        assert validator.validate(latex) == (True, "")
+
+    def test_escaped_braces_are_linear(self, validator):
+        # Each \{ used to start a (\{[^}]*\}){20,} match running to the end
+        scan = validator.scan(r'\{a' * 30_000 + '}')
+
+        assert not scan.repeated_groups
+        assert scan.unbalanced_braces == -1
+
+
+class TestSanitize:
+    """Tests for the sanitized text the scan produces"""
+
+    @pytest.mark.parametrize('latex, sanitized', [
+        ('  x  +\n\t y  ', 'x + y'),
+        ('x % comment\n+ y', 'x + y'),
+        (r'10\% of x', r'10\% of x'),
+        (r'x \input{file} + y', 'x + y'),
+        ('x^^^^2 + y___1', 'x^^2 + y__1'),
+        ('a \\\\\\\\ b', r'a \\ b'),
+        ('a \\\\\\\\alpha', r'a \\alpha'),
+        ('a\x00b\x07c', 'abc'),
+        ('x %' + '\n' * 60 + '+ y', 'x + y'),
+    ])
+    def test_sanitize(self, validator, latex, sanitized):
+        assert validator.sanitize(latex) == sanitized
+
+    def test_validate_and_sanitize(self, validator):
+        assert validator.validate_and_sanitize('x  %  note\n+ 1') == 'x + 1'
+        with pytest.raises(SecurityViolation):
+            validator.validate_and_sanitize(r'\input{x}')
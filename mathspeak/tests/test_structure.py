@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test Suite for Structural Analysis
+==================================
+
+Checks what analyze_structure measures (nesting of brackets, fractions,
+scripts and norms, big operator counts, cases blocks, quantifier order),
+that the security validator, voice manager and audience detection read
+it consistently, and that adversarial inputs take time linear in their
+length.
+"""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from mathspeak.core.engine import MathematicalTTSEngine
+from mathspeak.core.security import LaTeXSecurityValidator
+from mathspeak.core.structure import analyze_structure
+from mathspeak.core.voice_manager import VoiceManager
+from mathspeak_clean.adapters.structure_adapter import LegacyStructureAnalyzer
+from mathspeak_clean.domain.entities.expression import MathExpression
+
+
+class TestAnalyzeStructure:
+    """Tests for analyze_structure"""
+
+    def test_bracket_depths_are_separate(self):
+        structure = analyze_structure(r'f((x)) + [{a}] + \{ \} + \\{b}')
+
+        assert structure.max_paren_depth == 2
+        assert structure.max_bracket_depth == 1
+        assert structure.max_brace_depth == 1
+        assert structure.max_depth == 2
+
+    def test_nested_fractions_differ_from_sequential(self):
+        nested = analyze_structure(r'\frac{\frac{\frac{a}{b}}{c}}{d}')
+        sequential = analyze_structure(r'\frac{a}{b} + \frac{c}{d} + \dfrac{e}{f}')
+
+        assert (nested.fractions, nested.max_frac_depth) == (3, 3)
+        assert (sequential.fractions, sequential.max_frac_depth) == (3, 1)
+
+    def test_fraction_in_denominator_is_nested(self):
+        assert analyze_structure(r'\frac{1}{1 + \frac{1}{x}}').max_frac_depth == 2
+
+    def test_script_depth(self):
+        assert analyze_structure(r'x^{y^{z_{w}}}').max_script_depth == 3
+        assert analyze_structure(r'x^2 + y_1^{3} + z^{n}').max_script_depth == 1
+        assert analyze_structure(r'x^2 + y_1^{3}').scripts == 3
+
+    @pytest.mark.parametrize('latex, depth, norms', [
+        (r'|x| + |y|', 1, 2),
+        (r'\|f\|_p', 1, 1),
+        (r'\left\| \|x\| - y \right\|', 2, 2),
+        (r'\left| |x| - 1 \right|', 2, 2),
+        (r'\lVert \|x\| \rVert', 2, 2),
+        (r'x + y', 0, 0),
+    ])
+    def test_norm_nesting(self, latex, depth, norms):
+        structure = analyze_structure(latex)
+
+        assert (structure.max_norm_depth, structure.norms) == (depth, norms)
+
+    def test_big_operators(self):
+        structure = analyze_structure(r'\iint_D f + ∫ g + \sum_i \prod_j + \lim \limsup + ∂_x \partial_y')
+
+        assert structure.integrals == 3
+        assert structure.sums == 2
+        assert structure.limits == 2
+        assert structure.partials == 2
+
+    def test_cases_and_quantifiers(self):
+        structure = analyze_structure(r'f(x) = \begin{cases} 1 \\ 0 \end{cases}, \forall x \exists y')
+
+        assert structure.cases_blocks == 1
+        assert structure.forall_then_exists
+        assert not analyze_structure(r'\exists y \forall x').forall_then_exists
+
+    def test_commands(self):
+        structure = analyze_structure(r'\alpha + \alpha + \beta')
+
+        assert structure.commands == {'alpha': 2, 'beta': 1}
+        assert structure.command_count == 3
+        assert structure.count('alpha', 'gamma') == 2
+
+
+class TestConsumers:
+    """The validator, voice manager, audience detection and MathExpression"""
+
+    def test_security_rejects_nesting_not_repetition(self):
+        validator = LaTeXSecurityValidator()
+
+        deep_scripts = 'x' + '^{x' * 5 + '}' * 5
+        deep_fractions = r'\frac{' * 6 + 'x' + '}{y}' * 6
+        many_scripts = ' + '.join(f'x_{{{i}}}^{{2}}' for i in range(8))
+        many_fractions = ' + '.join(r'\frac{1}{%d}' % i for i in range(8))
+
+        assert validator._has_expansion_bomb(deep_scripts)
+        assert validator._has_expansion_bomb(deep_fractions)
+        assert not validator._has_expansion_bomb(many_scripts)
+        assert not validator._has_expansion_bomb(many_fractions)
+
+    def test_security_nesting_depth(self):
+        validator = LaTeXSecurityValidator()
+
+        assert validator._check_nesting_depth('{' * 60 + '}' * 60) == 60
+        assert not validator.validate('{' * 60 + 'x' + '}' * 60)[0]
+
+    def test_voice_complexity(self):
+        manager = VoiceManager()
+
+        assert manager._estimate_complexity('x + y') < 0.1
+        assert manager._estimate_complexity(r'\int\int f + \frac{\frac{a}{b}}{c}') >= 4.5
+
+    def test_audience_batch_matches_single(self):
+        engine = MathematicalTTSEngine(enable_caching=False)
+        texts = [r'\lim_{n} \frac{1}{n}', r'\forall x \exists y', r'solve x = 2',
+                 r'Theorem: \int f', r'\limsup a_n', 'plain text']
+
+        assert engine._detect_audience_levels(texts) == \
+            [engine._detect_audience_level(text) for text in texts]
+
+    def test_math_expression_uses_structure(self, monkeypatch):
+        monkeypatch.setattr(MathExpression, 'structure_analyzer', LegacyStructureAnalyzer())
+        expression = MathExpression(r'\frac{x^{2}}{\sum_i y_i}')
+
+        assert expression._calculate_nesting_depth() == 2
+        assert 0 < expression.complexity_score <= 100
+
+    def test_math_expression_does_not_load_legacy_package(self):
+        code = (
+            "import sys\n"
+            "from mathspeak_clean.domain.entities.expression import MathExpression\n"
+            "expression = MathExpression(r'\\frac{x^{2}}{\\sum_i y_i}')\n"
+            "assert expression._calculate_nesting_depth() == 2\n"
+            "assert 0 < expression.complexity_score <= 100\n"
+            "assert 'mathspeak' not in sys.modules, 'legacy package loaded'\n"
+        )
+        root = Path(__file__).parent.parent.parent
+        result = subprocess.run([sys.executable, '-c', code], cwd=root,
+                                capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+
+
+@pytest.mark.parametrize('unit', [r'\frac{', '|', r'\int ', 'x^{', r'\forall ', '{[(', r'\|'])
+def test_adversarial_input_is_linear(unit):
+    """Ten times the input takes about ten times as long, not a hundred"""
+    small = unit * (10_000 // len(unit))
+    large = unit * (100_000 // len(unit))
+
+    def timed(text):
+        start = time.perf_counter()
+        analyze_structure(text)
+        return time.perf_counter() - start
+
+    small_time = min(timed(small) for _ in range(3))
+    large_time = min(timed(large) for _ in range(3))
+
+    assert large_time < 1.0
+    assert large_time < small_time * 30
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test Suite for Single-Pass Command Word Tables
+==============================================
+
+Checks longest-match-first ordering, per-command guards, and that each
+table gives the same text as applying its commands one by one wherever no
+command is a prefix of another.
+"""
+
+import re
+
+import pytest
+
+from mathspeak.core.patterns.symbol_tables import (
+    FUNCTION_TABLE,
+    OPERATOR_TABLE,
+    SYMBOL_TABLE,
+    CommandTable,
+)
+from mathspeak.core.patterns_v2 import PATTERN_EXAMPLES
+
+TABLES = [FUNCTION_TABLE, OPERATOR_TABLE, SYMBOL_TABLE]
+
+
+def sequential_apply(table, text):
+    """The previous cleanup: one re.sub per command, in declaration order"""
+    for name, word in table.words.items():
+        text = re.sub(r'\\' + re.escape(name) + table.guards.get(name, ''), word, text)
+    return text
+
+
+class TestCommandTable:
+    """Tests for CommandTable"""
+
+    @pytest.mark.parametrize("latex,expected", [
+        (r'A \subseteq B', 'A subset or equal B'),
+        (r'A \subset B', 'A subset B'),
+        (r'a \preceq b', 'a precedes or equal b'),
+        (r'x \simeq y', 'x similar or equal y'),
+        (r'1, \cdots, n', '1, dot dot dot, n'),
+        (r'a \cdot b', 'a dot b'),
+    ])
+    def test_longest_match_first(self, latex, expected):
+        assert OPERATOR_TABLE.apply(latex) == expected
+
+    def test_function_prefixes(self):
+        assert FUNCTION_TABLE.apply(r'\sinh x') == 'hyperbolic sine x'
+        assert FUNCTION_TABLE.apply(r'\cosec x') == 'cosecant x'
+        assert FUNCTION_TABLE.apply(r'\sin x') == 'sine x'
+
+    def test_guards(self):
+        assert FUNCTION_TABLE.apply(r'\sine') == r'\sine'
+        assert FUNCTION_TABLE.apply(r'\tangent') == r'\tangent'
+        assert OPERATOR_TABLE.apply(r'x \in A') == 'x in A'
+        assert OPERATOR_TABLE.apply(r'\int') == r'\int'
+        assert OPERATOR_TABLE.apply(r'\top') == r'\top'
+
+    def test_text_without_commands_is_returned(self):
+        text = 'x plus y'
+        assert FUNCTION_TABLE.apply(text) is text
+
+    def test_custom_table(self):
+        table = CommandTable({'a': 'one', 'ab': 'two'}, {'a': r'\b'})
+
+        assert len(table) == 2
+        assert table.apply(r'\ab \a \ac') == r'two one \ac'
+
+    @pytest.mark.parametrize("table", TABLES)
+    def test_matches_sequential_without_prefix_conflicts(self, table):
+        for latex, _ in PATTERN_EXAMPLES:
+            if any(f'\\{name}' in latex for name in ('subseteq', 'supseteq', 'sinh', 'cosh',
+                                                   'tanh', 'cosec', 'simeq', 'preceq',
+                                                   'succeq', 'cdots')):
+                continue
+            assert table.apply(latex) == sequential_apply(table, latex)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test Suite for Timeouts and Request Deadlines
+=============================================
+
+Covers the shared watchdog pool behind timeout(), the cooperative
+Deadline, and the per-request deadline accepted by process_latex.
+"""
+
+import threading
+import time
+
+import pytest
+
+from mathspeak.core.engine import MathematicalTTSEngine
+from mathspeak.utils import timeout as timeout_module
+from mathspeak.utils.timeout import (
+    Deadline,
+    TimeoutError,
+    get_watchdog_executor,
+    run_with_deadline,
+    timeout_with_fallback,
+    with_timeout,
+)
+
+
+@pytest.fixture
+def engine():
+    engine = MathematicalTTSEngine(enable_caching=True)
+    # Keep the test off the on-disk expression cache
+    engine.expression_cache = {}
+    engine._use_advanced_cache = False
+    return engine
+
+
+class TestWatchdogPool:
+    """Tests for the shared timeout() thread pool"""
+
+    def test_pool_is_shared(self):
+        assert get_watchdog_executor() is get_watchdog_executor()
+
+    def test_calls_do_not_create_threads(self):
+        with_timeout(lambda: None, 1.0)
+        before = threading.active_count()
+
+        for _ in range(50):
+            assert with_timeout(lambda: 42, 1.0) == 42
+
+        assert threading.active_count() <= max(before, timeout_module.WATCHDOG_MAX_WORKERS + 1)
+
+    def test_timeout_raises(self):
+        with pytest.raises(TimeoutError):
+            with_timeout(time.sleep, 0.05, 0.5)
+
+    def test_fallback_respects_deadline(self):
+        assert timeout_with_fallback(lambda: 1, 1.0, fallback=0, deadline=Deadline(0)) == 0
+        assert timeout_with_fallback(lambda: 1, 1.0, fallback=0, deadline=Deadline(5)) == 1
+
+
+class TestDeadline:
+    """Tests for Deadline and run_with_deadline"""
+
+    def test_unlimited_deadline(self):
+        deadline = Deadline()
+
+        assert deadline.remaining() is None
+        assert not deadline.expired
+        assert deadline.clamp(3.0) == 3.0
+        deadline.check()
+
+    def test_expired_deadline(self):
+        deadline = Deadline(0)
+
+        assert deadline.expired
+        assert deadline.clamp(3.0) == 0.0
+        with pytest.raises(TimeoutError):
+            deadline.check("pattern processing")
+
+    def test_coerce(self):
+        existing = Deadline(5)
+
+        assert Deadline.coerce(existing) is existing
+        assert Deadline.coerce(2).seconds == 2.0
+        assert Deadline.coerce(None, 7.0).seconds == 7.0
+
+    def test_run_with_deadline(self):
+        assert run_with_deadline(lambda: 'done', Deadline(5), fallback='skipped') == 'done'
+        assert run_with_deadline(lambda: 'done', Deadline(0), fallback='skipped') == 'skipped'
+
+    def test_run_with_deadline_runs_inline(self):
+        caller = threading.current_thread()
+        ran_on = run_with_deadline(threading.current_thread, Deadline(5), fallback=None)
+
+        assert ran_on is caller
+
+    def test_run_with_deadline_falls_back_on_error(self):
+        def fail():
+            raise ValueError("boom")
+
+        assert run_with_deadline(fail, Deadline(5), fallback='fallback') == 'fallback'
+
+
+class TestProcessLatexDeadline:
+    """Tests for the per-request deadline of process_latex"""
+
+    def test_generous_deadline_matches_default(self, engine):
+        default = engine.process_latex(r'\frac{a}{b}')
+        engine.expression_cache.clear()
+
+        assert engine.process_latex(r'\frac{a}{b}', deadline=30.0).processed == default.processed
+
+    def test_expired_deadline_skips_stages(self, engine):
+        result = engine.process_latex(r'\frac{a}{b}', deadline=Deadline(0))
+
+        assert result.context == 'general'
+        assert 'frac' in result.processed
+        assert not engine.expression_cache
+
+    def test_one_deadline_class(self, engine):
+        # The engine and the API share mathspeak.utils.timeout
+        import sys
+
+        from mathspeak.core import engine as engine_module
+
+        engine.process_latex(r'\frac{a}{b}', deadline=Deadline(30))
+        assert engine_module.Deadline is Deadline
+        assert 'utils.timeout' not in sys.modules
+
+    def test_no_threads_started(self, engine):
+        engine.process_latex(r'x^2')
+        before = threading.active_count()
+
+        for i in range(20):
+            engine.process_latex(f'x^{i} + y_{i}')
+
+        assert threading.active_count() == before
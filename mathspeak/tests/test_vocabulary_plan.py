@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test Suite for Vocabulary Plans
+===============================
+
+Checks that VocabularyPlan merges fixed-string vocabulary entries into
+one alternation only where that cannot change the result, and that every
+domain processor's plan gives the same output as applying its entries
+one by one, longest pattern first.
+"""
+
+import re
+
+import pytest
+
+from mathspeak.domains import DOMAIN_REGISTRY
+from mathspeak.domains.base import VocabularyPlan
+
+LATEX = r'(?:\\\\|\\)'
+
+TEXTS = [
+    r'\pi_1(X) \cong \mathbb{Z} and X \simeq Y',
+    r'\oint_\gamma f(z)\,dz = 2\pi i \text{Res}(f, z_0)',
+    r"y'' + p(x)y' + q(x)y = 0 with \mathbb{R}^n",
+    r'\|f_n - f\|_p \to 0 and \mu(A) = 0',
+    r'|V(G)| = n, \binom{n}{k} and O(n \log n)',
+    r'\nabla_X Y - \nabla_Y X = [X,Y] on T_pM',
+    r'\\mathbb{R} \\to \\mathbb{C}',
+]
+
+
+def apply_per_entry(compiled_patterns, text):
+    for pattern, replacement in sorted(compiled_patterns, key=lambda x: len(x[0].pattern),
+                                       reverse=True):
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def plan_for(entries):
+    compiled = [(re.compile(pattern), replacement) for pattern, replacement in entries]
+    return VocabularyPlan(compiled), compiled
+
+
+class TestVocabularyPlan:
+    """Tests for VocabularyPlan"""
+
+    def test_fixed_strings_share_one_step(self):
+        plan, _ = plan_for([
+            (LATEX + 'mathbb{R}', 'the real numbers'),
+            (LATEX + 'mathbb{Z}', 'the integers'),
+            (LATEX + 'cong', 'is isomorphic to'),
+        ])
+
+        assert len(plan.steps) == 1
+        assert plan.apply(r'\mathbb{Z} \cong \\mathbb{R}') == \
+            'the integers is isomorphic to the real numbers'
+
+    def test_regex_entries_keep_their_place(self):
+        entries = [
+            (r'f\(([a-z])\)', r'f of \1'),
+            (LATEX + 'to', 'to'),
+            (r'([A-Z])_n', lambda m: f'{m.group(1)} sub n'),
+        ]
+        plan, compiled = plan_for(entries)
+
+        assert len(plan.steps) == 3
+        text = r'f(x) \to X_n'
+        assert plan.apply(text) == apply_per_entry(compiled, text) == 'f of x to X sub n'
+
+    def test_chained_replacement_is_not_merged(self):
+        # The second entry rewrites the first one's output
+        plan, compiled = plan_for([('AAAA', 'BB'), ('BB', 'C')])
+
+        assert len(plan.steps) == 2
+        assert plan.apply('AAAA') == apply_per_entry(compiled, 'AAAA') == 'C'
+
+    def test_overlapping_match_is_not_merged(self):
+        # 'xab' could start before, and run into, an 'abcd' match
+        plan, compiled = plan_for([('abcd', '1'), ('xab', '2')])
+
+        assert len(plan.steps) == 2
+        assert plan.apply('xabcd') == apply_per_entry(compiled, 'xabcd') == 'x1'
+
+    def test_empty_vocabulary(self):
+        assert VocabularyPlan([]).apply('x') == 'x'
+
+
+@pytest.mark.parametrize('domain', list(DOMAIN_REGISTRY))
+def test_domain_plan_matches_per_entry(domain):
+    vocabulary = DOMAIN_REGISTRY[domain]().vocabulary
+
+    assert len(vocabulary.plan.steps) < vocabulary.plan.entries
+    for text in TEXTS:
+        assert vocabulary.plan.apply(text) == apply_per_entry(vocabulary.compiled_patterns, text)
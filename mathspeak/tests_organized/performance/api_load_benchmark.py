@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+API Load Benchmark
+==================
+
+Simulates requests arriving at a fixed rate on one event loop and reports
+p50/p99 latency of ordinary expressions, with and without one pathological
+expression in flight. Compares calling process_latex inline in the
+handler (the old server behaviour) with the bounded text pool of
+mathspeak.api.executors.
+
+Security validation is disabled so the pathological input (deeply nested
+parentheses) reaches the pattern stage instead of being rejected early.
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add mathspeak to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from mathspeak.api.executors import ExecutorConfig, ExecutorLayer
+from mathspeak.core.engine import MathematicalTTSEngine
+from mathspeak.core.patterns_v2 import PATTERN_EXAMPLES
+from mathspeak.utils.timeout import Deadline
+
+REQUESTS = 400
+ARRIVAL_INTERVAL = 0.005  # seconds between request arrivals
+TEXT_WORKERS = 4
+PATHOLOGICAL = '(' * 1500 + 'x' + ')' * 1500
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run_clients(process, expressions):
+    """Latencies in milliseconds, measured from each request's arrival
+
+    Requests arrive on a fixed schedule regardless of how fast earlier
+    ones finish, so time spent waiting for a blocked event loop counts.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    latencies = []
+
+    async def request(index):
+        arrival = start + index * ARRIVAL_INTERVAL
+        await asyncio.sleep(max(0.0, arrival - loop.time()))
+        await process(expressions[index % len(expressions)])
+        latencies.append((loop.time() - arrival) * 1000)
+
+    await asyncio.gather(*(request(i) for i in range(REQUESTS)))
+    return latencies
+
+
+async def scenario(mode, engine, expressions, with_pathological):
+    layer = None
+    if mode == 'inline':
+        async def process(latex):
+            return engine.process_latex(latex, deadline=Deadline(60))
+    else:
+        layer = ExecutorLayer(ExecutorConfig(text_workers=TEXT_WORKERS, text_queue_depth=REQUESTS))
+        layer.start()
+
+        async def process(latex):
+            return await layer.process_latex(engine, latex, deadline=Deadline(60))
+
+    try:
+        slow = None
+        if with_pathological:
+            # Arrives shortly after the first ordinary requests
+            async def pathological():
+                await asyncio.sleep(10 * ARRIVAL_INTERVAL)
+                return await process(PATHOLOGICAL)
+            slow = asyncio.ensure_future(pathological())
+        latencies = await run_clients(process, expressions)
+        if slow is not None:
+            await slow
+        return latencies
+    finally:
+        if layer is not None:
+            layer.shutdown()
+
+
+def main():
+    engine = MathematicalTTSEngine(enable_caching=False, enable_security=False)
+    expressions = [latex for latex, _ in PATTERN_EXAMPLES]
+
+    start = time.perf_counter()
+    engine.process_latex(PATHOLOGICAL, deadline=Deadline(60))
+    pathological_s = time.perf_counter() - start
+
+    print(f"API load benchmark: {REQUESTS} requests, one every {ARRIVAL_INTERVAL * 1000:.0f} ms; "
+          f"pathological expression takes {pathological_s:.2f}s alone")
+    print("-" * 60)
+    print(f"{'mode':<12} {'pathological':<14} {'p50 ms':>10} {'p99 ms':>10}")
+    for mode in ('inline', 'text pool'):
+        for with_pathological in (False, True):
+            latencies = asyncio.run(scenario(mode, engine, expressions, with_pathological))
+            print(f"{mode:<12} {'in flight' if with_pathological else 'none':<14} "
+                  f"{statistics.median(latencies):>10.1f} {percentile(latencies, 0.99):>10.1f}")
+    print("-" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Cache Size Estimation Benchmark
+===============================
+
+Compares LRUCache.put throughput with the structural size estimate
+against the old pickle-based estimate, on ProcessedExpression results
+with speech segments, and checks how well each fills a 1 MB
+max_memory_mb bound (measured in pickled bytes of the retained entries).
+"""
+
+import pickle
+import sys
+import time
+from pathlib import Path
+
+# Add mathspeak to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from mathspeak.core.engine import MathematicalTTSEngine
+from mathspeak.core.patterns_v2 import PATTERN_EXAMPLES
+from mathspeak.core.voice_manager import VoiceManager
+from mathspeak.utils.cache import LRUCache
+
+PUTS = 50_000
+MEMORY_MB = 1
+
+
+class PickleSizedLRUCache(LRUCache):
+    """LRUCache with the previous pickle-based size estimate"""
+
+    def _estimate_size(self, obj):
+        try:
+            return len(pickle.dumps(obj))
+        except Exception:
+            return 1000
+
+
+def put_throughput(cache_class, values):
+    cache = cache_class(max_size=PUTS, max_memory_mb=1024)
+    start = time.perf_counter()
+    for i in range(PUTS):
+        cache.put(str(i), values[i % len(values)])
+    return PUTS / (time.perf_counter() - start)
+
+
+def bound_fill(cache_class, values):
+    """(entries retained, pickled bytes of retained entries / bound)"""
+    cache = cache_class(max_size=PUTS, max_memory_mb=MEMORY_MB)
+    for i in range(PUTS):
+        cache.put(str(i), values[i % len(values)])
+    pickled = sum(len(pickle.dumps(entry.value)) for entry in cache.cache.values())
+    return len(cache), pickled / cache.max_memory_bytes
+
+
+def main():
+    engine = MathematicalTTSEngine(voice_manager=VoiceManager(), enable_caching=False)
+    values = [engine.process_latex(latex) for latex, _ in PATTERN_EXAMPLES]
+
+    print(f"Cache size benchmark: {PUTS} puts of {len(values)} distinct ProcessedExpression values")
+    print("-" * 60)
+    print(f"{'estimator':<12} {'puts/s':>12} {'entries in 1MB':>16} {'bound used':>12}")
+    for name, cache_class in (('pickle', PickleSizedLRUCache), ('structural', LRUCache)):
+        throughput = put_throughput(cache_class, values)
+        entries, used = bound_fill(cache_class, values)
+        print(f"{name:<12} {throughput:>12.0f} {entries:>16} {used:>11.1%}")
+    print("-" * 60)
+
+
+if __name__ == "__main__":
+    main()
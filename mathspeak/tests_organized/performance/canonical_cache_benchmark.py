@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Canonical Cache Key Benchmark
+=============================
+
+Runs every expression in the examples/ corpus (the LaTeX of the cycle
+markdown files and the test-example JSON files) through one engine with
+an empty in-memory cache, and compares the hit rate of the canonical
+cache keys with that of keys on the raw LaTeX string.
+
+The corpus itself is written consistently, so a second pass re-sends it
+in other notation (no $ delimiters, extra whitespace, thin spaces before
+differentials), as decks written by different authors would.
+"""
+
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add mathspeak to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from mathspeak.core.engine import MathematicalTTSEngine, canonicalize_latex
+
+EXAMPLES_DIR = Path(__file__).parent.parent.parent.parent / "examples"
+MARKDOWN_LATEX = re.compile(r'\*\*LaTeX\*\*: `(.+?)`')
+DIFFERENTIAL = re.compile(r' (d[a-z])\b')
+
+
+def load_corpus():
+    expressions = []
+    for path in sorted(EXAMPLES_DIR.glob("*.md")):
+        expressions.extend(MARKDOWN_LATEX.findall(path.read_text(encoding="utf-8")))
+    for path in sorted(EXAMPLES_DIR.glob("*.json")):
+        for items in json.loads(path.read_text(encoding="utf-8")).values():
+            expressions.extend(item["latex"] for item in items)
+    return expressions
+
+
+def variant(latex):
+    """The same expression in different notation"""
+    text = latex.replace('$', '').replace(' ', '  ')
+    return DIFFERENTIAL.sub(r'\\, \1', text) + ' '
+
+
+def main():
+    corpus = load_corpus()
+    total = len(corpus)
+
+    engine = MathematicalTTSEngine(enable_caching=True)
+    # Keep the run off the on-disk cache
+    engine.expression_cache = {}
+    engine._use_advanced_cache = False
+    engine.max_cache_size = total + 1
+
+    start = time.perf_counter()
+    for latex in corpus:
+        engine.process_latex(latex)
+    elapsed = time.perf_counter() - start
+
+    raw_unique = len(set(corpus))
+    canonical_unique = len({canonicalize_latex(latex) for latex in corpus})
+
+    print(f"Canonical cache key benchmark: {total} expressions from {EXAMPLES_DIR.name}/")
+    print("-" * 60)
+    print(f"{'keys':<12} {'distinct':>10} {'hit rate':>10}")
+    print(f"{'raw':<12} {raw_unique:>10} {(total - raw_unique) / total:>10.1%}")
+    print(f"{'canonical':<12} {canonical_unique:>10} {(total - canonical_unique) / total:>10.1%}")
+    print(f"{'engine':<12} {len(engine.expression_cache):>10} "
+          f"{engine.metrics.cache_hits / total:>10.1%}")
+    print("-" * 60)
+
+    variants = [variant(latex) for latex in corpus]
+    changed = sum(1 for latex, other in zip(corpus, variants) if latex != other)
+    hits_before = engine.metrics.cache_hits
+    for latex in variants:
+        engine.process_latex(latex)
+    raw_seen = set(corpus)
+    raw_hits = sum(1 for latex in variants if latex in raw_seen)
+    print(f"Second pass in variant notation ({changed} of {total} strings differ)")
+    print(f"{'raw':<12} {'':>10} {raw_hits / total:>10.1%}")
+    print(f"{'engine':<12} {len(engine.expression_cache):>10} "
+          f"{(engine.metrics.cache_hits - hits_before) / total:>10.1%}")
+    print("-" * 60)
+    print(f"Processed in {elapsed:.2f}s ({elapsed / total * 1000:.2f} ms/expr)")
+
+
+if __name__ == "__main__":
+    main()
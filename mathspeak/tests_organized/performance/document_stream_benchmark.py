@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Document Stream Benchmark
+=========================
+
+Streams a large LaTeX file through DocumentProcessor.iter_file and samples
+the process's resident memory as it goes, to check that memory stays flat
+however large the document is. Reports throughput (MB/s and expressions/s)
+and the resident memory at each tenth of the file.
+
+Pass .tex files to benchmark them; otherwise a thesis collection of
+--size MB is generated (chapters of prose with inline, display and
+aligned math). --scan-only times the span scanner alone.
+
+    python document_stream_benchmark.py [--size 50] [--scan-only] [file.tex ...]
+"""
+
+import argparse
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add mathspeak to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from mathspeak.core.math_spans import iter_math_spans
+from mathspeak.core.parallel_processor import DocumentProcessor, ParallelProcessor
+
+TERMS = [
+    'f(x)', 'x^2', r'\sin x', r'e^{x}', 'a_i', r'\frac{1}{n}', 'g(t)', r'\epsilon',
+    r'\delta', r'\sqrt{x}', r'\lambda', r'\|x\|', r'\int_0^1 f(t) \, dt', r'\sum_{k=1}^{n} k',
+]
+PROSE = [
+    "Recall the definition from the previous chapter.",
+    "The proof follows the same lines, with one change.",
+    "Für die Abschätzung verwenden wir das folgende Lemma.",
+    "This costs \\$5 per page, 10\\% of the budget. % TODO: check",
+]
+
+
+def generate_collection(path: Path, megabytes: float, seed: int = 0) -> None:
+    """Write theses of about a page each until the file reaches megabytes"""
+    rng = random.Random(seed)
+    pick = rng.choice
+    target = int(megabytes * 1024 * 1024)
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        chapter = 0
+        while written < target:
+            chapter += 1
+            lines = [f"\\chapter{{Chapter {chapter}}}"]
+            for _ in range(20):
+                # A chapter-specific constant keeps expressions varied
+                lines.append(f"{pick(PROSE)} Let ${pick(TERMS)} + c_{{{chapter}}}$ and ${pick(TERMS)}$.")
+                lines.append(f"\\[ {pick(TERMS)} \\leq {pick(TERMS)} \\]")
+                if rng.random() < 0.2:
+                    lines.append(f"\\begin{{align*}} {pick(TERMS)} &= {pick(TERMS)} \\\\ &= {chapter} \\end{{align*}}")
+                lines.append("")
+            text = '\n'.join(lines) + '\n'
+            f.write(text)
+            written += len(text.encode('utf-8'))
+
+
+def resident_mb() -> float:
+    """Current resident set size in MB (peak size where /proc is missing)"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / (1024 * 1024)
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(path: Path, scan_only: bool, workers: int) -> None:
+    size = path.stat().st_size
+    print(f"\n{path.name}: {size / (1024 * 1024):.1f} MB")
+
+    processor = ParallelProcessor(num_workers=workers, mode="thread", show_progress=False)
+    document_processor = DocumentProcessor(processor)
+    records = iter_math_spans(path) if scan_only else document_processor.iter_file(path)
+
+    samples = [(0, resident_mb())]
+    next_sample = size // 10
+    count = 0
+    start = time.perf_counter()
+    try:
+        for record in records:
+            count += 1
+            position = record.start if scan_only else record['position']
+            if position >= next_sample:
+                samples.append((position * 100 // size, resident_mb()))
+                next_sample += size // 10
+    finally:
+        processor.shutdown()
+    elapsed = time.perf_counter() - start
+    samples.append((100, resident_mb()))
+
+    what = "spans scanned" if scan_only else "expressions processed"
+    print(f"  {count} {what} in {elapsed:.2f}s "
+          f"({size / (1024 * 1024) / elapsed:.1f} MB/s, {count / elapsed:.0f}/s)")
+    print("  resident memory: " + ", ".join(f"{pct}%: {mb:.0f} MB" for pct, mb in samples))
+    growth = max(mb for _, mb in samples[1:]) - samples[1][1] if len(samples) > 2 else 0.0
+    print(f"  growth after the first tenth: {growth:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming document processing")
+    parser.add_argument('files', nargs='*', type=Path, help='LaTeX files (default: generated)')
+    parser.add_argument('--size', type=float, default=50, help='Generated collection size in MB')
+    parser.add_argument('--scan-only', action='store_true', help='Time the span scanner alone')
+    parser.add_argument('--workers', type=int, default=4, help='Processing threads')
+    args = parser.parse_args()
+
+    if args.files:
+        for path in args.files:
+            run(path, args.scan_only, args.workers)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'theses.tex'
+        print(f"Generating a {args.size:g} MB thesis collection...")
+        generate_collection(path, args.size)
+        run(path, args.scan_only, args.workers)
+
+
+if __name__ == "__main__":
+    main()
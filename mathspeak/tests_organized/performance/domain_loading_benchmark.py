@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Domain Loading Benchmark
+========================
+
+Starts a fresh interpreter per run and reports the time to import
+MathSpeak, build the engine and speak a handful of calculus and algebra
+expressions, together with the peak RSS, for two set-ups:
+
+- eager: every domain processor built at startup (what the server and
+  create_engine did before domains were loaded on demand)
+- lazy: domains loaded only when the engine routes an expression to them
+
+A third run feeds topology and ODE expressions as well, to show the cost
+of a domain falling on the first request that needs it.
+
+    python domain_loading_benchmark.py [--runs 3]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.parent.parent
+
+CALCULUS = [r'\int_0^1 x^2 \, dx', r'\frac{d}{dx} \sin x', r'x^2 + 2x + 1 = 0',
+            r'\lim_{x \to 0} \frac{\sin x}{x} = 1', r'\sum_{k=1}^n k']
+DOMAIN = [r'\pi_1(X) \cong \mathbb{Z}', r"y'' + y = 0"]
+
+SCRIPT = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+from mathspeak.core.engine import MathematicalContext, MathematicalTTSEngine
+engine = MathematicalTTSEngine(enable_caching=False)
+if {eager!r}:
+    from mathspeak.domains import get_available_domains
+    for name in get_available_domains():
+        try:
+            engine.get_domain_processor(MathematicalContext(name))
+        except ValueError:
+            pass
+ready = time.perf_counter()
+for latex in {expressions!r}:
+    engine.process_latex(latex)
+done = time.perf_counter()
+print(json.dumps({{
+    'startup': ready - start,
+    'first_requests': done - ready,
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'domains': len(engine.domain_processors),
+}}))
+"""
+
+
+def run_once(eager: bool, expressions) -> dict:
+    code = SCRIPT.format(root=str(ROOT), eager=eager, expressions=expressions)
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                            text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark on-demand domain loading")
+    parser.add_argument('--runs', type=int, default=3, help='Fresh interpreters per set-up')
+    args = parser.parse_args()
+
+    print(f"{'set-up':<28} {'startup':>9} {'requests':>9} {'peak RSS':>9} {'domains':>8}")
+    for label, eager, expressions in (
+        ("eager, calculus", True, CALCULUS),
+        ("lazy, calculus", False, CALCULUS),
+        ("lazy, calculus + domains", False, CALCULUS + DOMAIN),
+    ):
+        runs = [run_once(eager, expressions) for _ in range(args.runs)]
+        print(f"{label:<28} "
+              f"{statistics.median(r['startup'] for r in runs) * 1000:>7.0f}ms "
+              f"{statistics.median(r['first_requests'] for r in runs) * 1000:>7.0f}ms "
+              f"{statistics.median(r['rss_mb'] for r in runs):>7.1f}MB "
+              f"{runs[0]['domains']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Domain Vocabulary Benchmark
+===========================
+
+For each domain processor, applies its vocabulary to the domain's test
+expressions the old way (sort every entry by pattern length on each call,
+then one re.sub per entry) and through the precompiled VocabularyPlan,
+checks the outputs are identical, and reports the number of steps and
+the time per expression.
+
+    python domain_vocabulary_benchmark.py [--rounds 20]
+"""
+
+import argparse
+import ast
+import sys
+import time
+from pathlib import Path
+
+# Add mathspeak to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from mathspeak.domains import DOMAIN_REGISTRY
+
+TESTS = Path(__file__).parent.parent.parent / 'tests'
+
+
+def expressions(domain: str):
+    """String constants with LaTeX in the domain's test file (or all of them)"""
+    files = [TESTS / f'test_{domain}.py']
+    if not files[0].exists():
+        files = sorted(TESTS.glob('test_*.py'))
+    found = set()
+    for path in files:
+        for node in ast.walk(ast.parse(path.read_text())):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str) \
+                    and '\\' in node.value and len(node.value) < 300:
+                found.add(node.value)
+    return sorted(found)
+
+
+def apply_per_entry(vocabulary, text: str) -> str:
+    """What every processor's _apply_vocabulary used to do"""
+    sorted_patterns = sorted(vocabulary.compiled_patterns,
+                             key=lambda x: len(x[0].pattern),
+                             reverse=True)
+    for pattern, replacement in sorted_patterns:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def timed(func, texts, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            func(text)
+    return (time.perf_counter() - start) / (rounds * len(texts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark domain vocabulary plans")
+    parser.add_argument('--rounds', type=int, default=20, help='Passes over each corpus')
+    args = parser.parse_args()
+
+    print(f"{'domain':<20} {'entries':>7} {'steps':>6} {'texts':>6} "
+          f"{'per entry':>10} {'plan':>9} {'speed-up':>9}")
+    for domain in DOMAIN_REGISTRY:
+        vocabulary = DOMAIN_REGISTRY[domain]().vocabulary
+        plan = vocabulary.plan
+        texts = expressions(domain)
+
+        mismatches = [t for t in texts if plan.apply(t) != apply_per_entry(vocabulary, t)]
+        old = timed(lambda t: apply_per_entry(vocabulary, t), texts, args.rounds)
+        new = timed(plan.apply, texts, args.rounds)
+
+        print(f"{domain:<20} {plan.entries:>7} {len(plan.steps):>6} {len(texts):>6} "
+              f"{old * 1e6:>8.1f}µs {new * 1e6:>7.1f}µs {old / new:>8.1f}x"
+              + (f"  {len(mismatches)} MISMATCHES" if mismatches else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Parallel Processing Benchmark
+=============================
+
+Processes a 10,000-expression corpus with ParallelProcessor in process
+mode on 1, 2, 4 and 8 workers and reports throughput and speedup over
+one worker. Also times the old behaviour of building one engine per task.
+
+Every expression is unique (each example gets a distinct subscripted
+term), so the expression cache cannot hide the processing work. Scaling
+is bounded by the cores actually available; worker counts above
+os.cpu_count() are still run but cannot speed up further.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add mathspeak to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from mathspeak.core.engine import MathematicalTTSEngine
+from mathspeak.core.parallel_processor import ParallelProcessor, ProcessingTask
+from mathspeak.core.patterns_v2 import PATTERN_EXAMPLES
+
+CORPUS_SIZE = 10_000
+WORKER_COUNTS = (1, 2, 4, 8)
+ENGINE_OPTIONS = {'enable_caching': False}
+PER_TASK_ENGINE_SAMPLE = 50
+
+
+def build_corpus():
+    examples = [latex for latex, _ in PATTERN_EXAMPLES]
+    return [
+        ProcessingTask(id=i, expression=f"{examples[i % len(examples)]} + a_{{{i}}}")
+        for i in range(CORPUS_SIZE)
+    ]
+
+
+def run(tasks, workers):
+    processor = ParallelProcessor(num_workers=workers, mode="process", show_progress=False,
+                                  engine_options=ENGINE_OPTIONS)
+    try:
+        # Start the pool and build worker engines outside the timed region
+        list(processor.iter_results(tasks[:workers]))
+        start = time.perf_counter()
+        results = list(processor.iter_results(tasks))
+        elapsed = time.perf_counter() - start
+    finally:
+        processor.shutdown()
+    assert all(result.success for result in results)
+    return elapsed
+
+
+def per_task_engine(tasks):
+    """Seconds per task when every task builds its own engine"""
+    start = time.perf_counter()
+    for task in tasks[:PER_TASK_ENGINE_SAMPLE]:
+        engine = MathematicalTTSEngine(**ENGINE_OPTIONS)
+        engine.process_latex(task.expression)
+        engine.shutdown()
+    return (time.perf_counter() - start) / PER_TASK_ENGINE_SAMPLE
+
+
+def main():
+    tasks = build_corpus()
+    print(f"Parallel benchmark: {CORPUS_SIZE} expressions, {os.cpu_count()} CPUs available")
+    print("-" * 60)
+    print(f"{'workers':>8} {'seconds':>10} {'expr/s':>10} {'speedup':>10}")
+    baseline = None
+    for workers in WORKER_COUNTS:
+        elapsed = run(tasks, workers)
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>10.2f} {CORPUS_SIZE / elapsed:>10.0f} "
+              f"{baseline / elapsed:>9.2f}x")
+    print("-" * 60)
+    per_task = per_task_engine(tasks)
+    print(f"engine per task (old multiprocessing worker): {per_task * 1000:.2f} ms/expr, "
+          f"{CORPUS_SIZE * per_task:.1f}s for the corpus on one core")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Pattern Plan Micro-Benchmark
+============================
+
+Measures the per-expression overhead of running the domain handlers over
+the 100-example corpus, comparing the old per-call filter+sort dispatch
+with the precomputed per-audience execution plans.
+"""
+
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+# Add mathspeak to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from mathspeak.core.patterns.base import AudienceLevel, PatternHandler
+from mathspeak.core.patterns_v2 import PATTERN_EXAMPLES, get_shared_processor
+
+ROUNDS = 20
+
+
+def legacy_process(handler: PatternHandler, text: str, audience: AudienceLevel) -> str:
+    """The previous PatternHandler.process: filter and sort on every call"""
+    applicable = [p for p in handler.patterns if audience in p.audience_levels]
+    applicable.sort(key=lambda p: p.priority, reverse=True)
+    for rule in applicable:
+        text = rule.compiled.sub(rule.replacement, text)
+    return text
+
+
+def legacy_dispatch(handler: PatternHandler, audience: AudienceLevel) -> int:
+    """Only the filter+sort part of the legacy path"""
+    applicable = [p for p in handler.patterns if audience in p.audience_levels]
+    applicable.sort(key=lambda p: p.priority, reverse=True)
+    return len(applicable)
+
+
+def plan_dispatch(handler: PatternHandler, audience: AudienceLevel) -> int:
+    """Only the plan lookup part of the new path"""
+    return len(handler.get_plan(audience))
+
+
+def time_per_expression(run: Callable[[str], object], expressions: List[str]) -> float:
+    """Average microseconds per expression over ROUNDS passes"""
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for expression in expressions:
+            run(expression)
+    elapsed = time.perf_counter() - start
+    return elapsed / (ROUNDS * len(expressions)) * 1e6
+
+
+def main():
+    processor = get_shared_processor()
+    handlers = list(processor.engine.handlers.values())
+    expressions = [latex for latex, _ in PATTERN_EXAMPLES]
+    audience = AudienceLevel.UNDERGRADUATE
+
+    # Sanity check: both paths must produce identical text
+    for expression in expressions:
+        for handler in handlers:
+            assert legacy_process(handler, expression, audience) == handler.process(expression, audience)
+
+    def run_legacy_dispatch(_):
+        for handler in handlers:
+            legacy_dispatch(handler, audience)
+
+    def run_plan_dispatch(_):
+        for handler in handlers:
+            plan_dispatch(handler, audience)
+
+    def run_legacy_full(expression):
+        for handler in handlers:
+            expression = legacy_process(handler, expression, audience)
+
+    def run_plan_full(expression):
+        for handler in handlers:
+            expression = handler.process(expression, audience)
+
+    results = {
+        'dispatch (before)': time_per_expression(run_legacy_dispatch, expressions),
+        'dispatch (after)': time_per_expression(run_plan_dispatch, expressions),
+        'handlers (before)': time_per_expression(run_legacy_full, expressions),
+        'handlers (after)': time_per_expression(run_plan_full, expressions),
+    }
+
+    total_rules = sum(len(h.patterns) for h in handlers)
+    print(f"Pattern plan benchmark: {len(expressions)} expressions, "
+          f"{len(handlers)} handlers, {total_rules} rules, {ROUNDS} rounds")
+    print("-" * 60)
+    for name, micros in results.items():
+        print(f"{name:<20} {micros:>10.1f} us/expression")
+    print("-" * 60)
+    saved = results['handlers (before)'] - results['handlers (after)']
+    print(f"Overhead removed: {saved:.1f} us/expression")
+
+
+if __name__ == "__main__":
+    main()
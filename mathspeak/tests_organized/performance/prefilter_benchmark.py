@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Trigger Prefilter Benchmark
+===========================
+
+Counts regex invocations and measures per-expression latency of
+MathSpeechProcessor.process over the 100-example corpus (typical short
+inline math), with and without the literal trigger prefilter.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add mathspeak to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from mathspeak.core import patterns_v2
+from mathspeak.core.patterns import prefilter
+from mathspeak.core.patterns_v2 import PATTERN_EXAMPLES, AudienceLevel, MathSpeechProcessor
+
+ROUNDS = 10
+
+
+class CountingPattern:
+    """Wraps a compiled pattern and counts sub() calls"""
+
+    calls = 0
+
+    def __init__(self, compiled):
+        self.compiled = compiled
+
+    def sub(self, repl, text):
+        CountingPattern.calls += 1
+        return self.compiled.sub(repl, text)
+
+
+def instrument(processor: MathSpeechProcessor) -> None:
+    """Route every plan step of a processor through CountingPattern"""
+    def wrap(plan):
+        return tuple((CountingPattern(c), r, d, t) for c, r, d, t in plan)
+
+    engine = processor.engine
+    for handler in engine.handlers.values():
+        handler._plans = {level: wrap(plan) for level, plan in handler._plans.items()}
+    engine._general_plans = {level: wrap(plan) for level, plan in engine._general_plans.items()}
+    engine.special_handler._plan = wrap(engine.special_handler._plan)
+
+
+def counting_guarded_sub(pattern, repl, text, flags=0):
+    """guarded_sub replacement used by _cleanup/_postprocess while counting"""
+    compiled, trigger = prefilter._compile_guarded(pattern, flags)
+    if trigger is not None and prefilter.PREFILTER_ENABLED and trigger not in text:
+        return text
+    CountingPattern.calls += 1
+    return compiled.sub(repl, text)
+
+
+def run(enabled: bool):
+    prefilter.PREFILTER_ENABLED = enabled
+    processor = MathSpeechProcessor()
+    expressions = [latex for latex, _ in PATTERN_EXAMPLES]
+    audience = AudienceLevel.UNDERGRADUATE
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        outputs = [processor.process(expression, audience) for expression in expressions]
+    elapsed = time.perf_counter() - start
+
+    instrument(processor)
+    original_sub = patterns_v2.guarded_sub
+    patterns_v2.guarded_sub = counting_guarded_sub
+    CountingPattern.calls = 0
+    try:
+        for expression in expressions:
+            processor.process(expression, audience)
+    finally:
+        patterns_v2.guarded_sub = original_sub
+        prefilter.PREFILTER_ENABLED = True
+
+    per_expression_us = elapsed / (ROUNDS * len(expressions)) * 1e6
+    return outputs, CountingPattern.calls / len(expressions), per_expression_us
+
+
+def main():
+    baseline_outputs, baseline_calls, baseline_us = run(enabled=False)
+    outputs, calls, micros = run(enabled=True)
+
+    assert outputs == baseline_outputs, "prefilter changed the output"
+
+    print(f"Prefilter benchmark: {len(PATTERN_EXAMPLES)} expressions, {ROUNDS} rounds")
+    print("-" * 60)
+    print(f"{'':<12} {'regex calls/expr':>18} {'us/expr':>12}")
+    print(f"{'disabled':<12} {baseline_calls:>18.1f} {baseline_us:>12.1f}")
+    print(f"{'enabled':<12} {calls:>18.1f} {micros:>12.1f}")
+    print("-" * 60)
+    print(f"Regex invocations reduced {baseline_calls / calls:.1f}x, "
+          f"latency reduced {baseline_us / micros:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
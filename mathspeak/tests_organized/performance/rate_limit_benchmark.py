@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter Benchmark
+======================
+
+Times one rate-limit check with many clients active, the way RateLimiter
+used to work (a list of timestamps per client, and the whole client dict
+rebuilt on every call) and with the token buckets, in memory and in a
+shared SQLite file, and checks how many clients each is still holding
+once the window has passed.
+
+    python rate_limit_benchmark.py [--calls 2000]
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add mathspeak to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from mathspeak.core.security import RateLimiter
+from mathspeak.utils.rate_limit_store import SQLiteRateLimitStore
+
+CLIENTS = [100, 1_000, 10_000, 50_000]
+
+
+class TimestampListLimiter:
+    """RateLimiter before token buckets: rebuilds the client dict per call"""
+
+    def __init__(self, max_requests=100, window_seconds=60, clock=time.time):
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self.requests = {}
+        self.lock = threading.Lock()
+        self.clock = clock
+
+    def is_allowed(self, client_id):
+        with self.lock:
+            now = self.clock()
+            cutoff = now - self.window_seconds
+            self.requests = {
+                cid: times for cid, times in self.requests.items()
+                if times and times[-1] > cutoff
+            }
+            client_requests = [t for t in self.requests.get(client_id, []) if t > cutoff]
+            if len(client_requests) >= self.max_requests:
+                return False
+            client_requests.append(now)
+            self.requests[client_id] = client_requests
+            return True
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def per_call(limiter, clients: int, calls: int) -> float:
+    """Seconds per check once `clients` clients are active"""
+    for i in range(clients):
+        limiter.is_allowed(f"client-{i}")
+    start = time.perf_counter()
+    for i in range(calls):
+        limiter.is_allowed(f"client-{i % clients}")
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-client rate limiting")
+    parser.add_argument('--calls', type=int, default=2000, help='Timed checks per row')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'clients':>8} {'timestamp lists':>16} {'memory buckets':>15} "
+              f"{'SQLite buckets':>15} {'held after window':>18}")
+        for clients in CLIENTS:
+            clock = Clock()
+            limiters = [
+                TimestampListLimiter(100, 60, clock=clock),
+                RateLimiter(100, 60, clock=clock),
+                RateLimiter(100, 60, clock=clock,
+                            store=SQLiteRateLimitStore(Path(tmp) / f"limits_{clients}.db")),
+            ]
+            timings = [per_call(limiter, clients, args.calls) for limiter in limiters]
+
+            # Every client goes idle for a window; one more check from anyone
+            clock.now += 61
+            for limiter in limiters:
+                limiter.is_allowed("late")
+            limiters[2].store.purge(clock.now)
+            held = (len(limiters[0].requests), len(limiters[1].store), len(limiters[2].store))
+
+            print(f"{clients:>8} " + ''.join(f"{t * 1e6:>14.1f}µs " for t in timings)
+                  + f"{'/'.join(map(str, held)):>17}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Real-time Stream Benchmark
+==========================
+
+Feeds --size MB of token-sized chunks (one word or expression each, as
+dictation or an LLM produces them) through the real-time stream buffer
+and reports throughput and the cost per chunk at each tenth of the
+stream, to check that the cost stays flat however long the stream runs.
+
+Three streams are fed: punctuated prose, the same words without any
+sentence end, and the unpunctuated words after a stray $. --processor
+runs RealtimeMathProcessor.process_stream over them instead, without
+audio.
+
+--synthesis runs a short lecture through process_stream with audio,
+one chunk synthesizing at a time and then pipelined, and reports the
+time to first audio and the steady-state real-time factor. Synthesis is
+simulated (a delay per character, audio sized for a speaking rate)
+unless --real-tts asks for the installed TTS engines.
+
+    python realtime_stream_benchmark.py [--size 1] [--processor]
+    python realtime_stream_benchmark.py --synthesis [--real-tts]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add mathspeak to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from mathspeak.streaming.realtime import AUDIO_BYTES_PER_SECOND, RealtimeMathProcessor, StreamBuffer
+
+WORDS = ['the', 'value', 'of', 'grows', 'and', 'then', 'where', 'für', 'with', 'bound']
+MATH = ['$x^2$', r'\(a_n\)', r'$\frac{1}{n}$', r'$$\sum_{k=1}^n k$$', r'\[ \int_0^1 f \]']
+
+
+def generate_tokens(megabytes: float, punctuated: bool, seed: int = 0):
+    """Token-sized chunks adding up to about megabytes"""
+    rng = random.Random(seed)
+    target = int(megabytes * 1024 * 1024)
+    tokens = []
+    size = 0
+    while size < target:
+        token = rng.choice(MATH) if rng.random() < 0.1 else rng.choice(WORDS)
+        token += '. ' if punctuated and rng.random() < 0.08 else ' '
+        tokens.append(token)
+        size += len(token)
+    return tokens
+
+
+LECTURE = [
+    "Let $f$ be continuous on $[a, b]$. ",
+    "Then $\\int_a^b f(x)\\,dx$ exists. ",
+    "By the mean value theorem there is $c$ with $f(c) = \\frac{1}{b-a}\\int_a^b f$. ",
+    "$$\\sum_{k=1}^n k = \\frac{n(n+1)}{2}$$ ",
+    "Hence the average of the first $n$ integers is $\\frac{n+1}{2}$. ",
+] * 6
+
+
+class SimulatedTTS:
+    """Takes 20 ms per 10 characters and returns audio of 12 characters a second"""
+
+    async def synthesize(self, text, output_file, voice=None, rate=None, engine_name=None):
+        await asyncio.sleep(0.002 * len(text))
+        seconds = len(text) / 12
+        Path(output_file).write_bytes(b'\0' * int(seconds * AUDIO_BYTES_PER_SECOND))
+        return True
+
+
+async def drive_processor(tokens, processor=None):
+    async def stream():
+        for token in tokens:
+            yield token
+
+    processor = processor or RealtimeMathProcessor()
+    chunks = 0
+    async for _ in processor.process_stream(stream()):
+        chunks += 1
+    return chunks
+
+
+def run_synthesis(real_tts: bool) -> None:
+    if real_tts:
+        from mathspeak.core.tts_engines import TTSEngineManager
+        tts_manager = TTSEngineManager()
+    else:
+        tts_manager = SimulatedTTS()
+
+    print(f"\nLecture of {len(LECTURE)} sentences, {'real' if real_tts else 'simulated'} TTS")
+    for label, in_flight in (("one at a time", 1), ("pipelined", 4)):
+        processor = RealtimeMathProcessor(tts_manager=tts_manager, max_in_flight=in_flight)
+        start = time.perf_counter()
+        asyncio.run(drive_processor(LECTURE, processor))
+        elapsed = time.perf_counter() - start
+        metrics = processor.metrics
+        if metrics.time_to_first_audio is None:
+            print(f"  {label}: no audio was synthesized")
+            continue
+        rtf = metrics.real_time_factor
+        rtf_text = f"{rtf:.3f}" if rtf is not None else "n/a"
+        print(f"  {label}: {metrics.audio_chunks} chunks in {elapsed:.2f}s, "
+              f"first audio after {metrics.time_to_first_audio * 1000:.0f} ms, "
+              f"real-time factor {rtf_text}")
+
+
+def drive_buffer(tokens):
+    """Feed tokens and take whatever completes; returns pieces and timings"""
+    buffer = StreamBuffer()
+    pieces = 0
+    tenths = []
+    step = max(len(tokens) // 10, 1)
+    last = time.perf_counter()
+    for i, token in enumerate(tokens, 1):
+        buffer.feed(token)
+        while buffer.take_math() is not None or buffer.take_sentence() is not None:
+            pieces += 1
+        if i % step == 0:
+            now = time.perf_counter()
+            tenths.append((now - last) / step * 1e6)
+            last = now
+    buffer.close()
+    while buffer.take_math() is not None or buffer.take_sentence() is not None:
+        pieces += 1
+    if buffer.take_rest().strip():
+        pieces += 1
+    return pieces, tenths
+
+
+def run(name: str, tokens, use_processor: bool) -> None:
+    size = sum(len(token) for token in tokens) / (1024 * 1024)
+    start = time.perf_counter()
+    if use_processor:
+        pieces = asyncio.run(drive_processor(tokens))
+        tenths = []
+    else:
+        pieces, tenths = drive_buffer(tokens)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{name}: {len(tokens)} chunks, {size:.1f} MB")
+    print(f"  {pieces} pieces in {elapsed:.2f}s ({size / elapsed:.2f} MB/s, "
+          f"{elapsed / len(tokens) * 1e6:.1f} µs/chunk)")
+    if tenths:
+        print("  µs/chunk by tenth: " + ", ".join(f"{cost:.1f}" for cost in tenths))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark real-time stream buffering")
+    parser.add_argument('--size', type=float, default=1, help='Stream size in MB')
+    parser.add_argument('--processor', action='store_true',
+                        help='Run the whole RealtimeMathProcessor')
+    parser.add_argument('--synthesis', action='store_true',
+                        help='Measure time to first audio and real-time factor')
+    parser.add_argument('--real-tts', action='store_true',
+                        help='Synthesize with the installed TTS engines')
+    args = parser.parse_args()
+
+    if args.synthesis:
+        run_synthesis(args.real_tts)
+        return
+
+    words = generate_tokens(args.size, punctuated=False)
+    run("punctuated prose", generate_tokens(args.size, punctuated=True), args.processor)
+    run("no sentence ends", words, args.processor)
+    run("stray $ then no sentence ends", ['costs $'] + words, args.processor)
+
+
+if __name__ == "__main__":
+    main()
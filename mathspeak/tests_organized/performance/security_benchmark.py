@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Security Validation Benchmark
+=============================
+
+Times validate_and_sanitize on the LaTeX strings of the test suite, on
+one long expression and on 100 KB built to make the old repeated-groups
+pattern backtrack, the way the validator used to work (one search per
+dangerous command and per rule, then two substitutions per dangerous
+command to sanitize) and with the single tokenizing pass, and checks both
+give the same verdicts.
+
+    python security_benchmark.py [--rounds 5]
+"""
+
+import argparse
+import ast
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add mathspeak to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from mathspeak.core.security import LaTeXSecurityValidator, SecurityScan, SecurityViolation
+
+TESTS = Path(__file__).parent.parent.parent / 'tests'
+
+
+class SeparateScansValidator(LaTeXSecurityValidator):
+    """The validator before its rules shared one pass: a scan per rule"""
+
+    def validate(self, latex_input):
+        if len(latex_input) > self.config.max_length:
+            return False, "Input too long"
+        for cmd in self.DANGEROUS_COMMANDS:
+            if re.search(cmd, latex_input, re.IGNORECASE):
+                return False, f"Dangerous command detected: {cmd}"
+        if not latex_input.strip():
+            return False, "Empty input"
+        depth = self._check_nesting_depth(latex_input)
+        if depth > self.config.max_depth:
+            return False, f"Expression too deeply nested ({depth} > {self.config.max_depth})"
+        # The structural checks, without the scan they now read the loop check from
+        if self._has_expansion_bomb(latex_input, SecurityScan()) \
+                or re.search(r'\\(expandafter|csname|endcsname){3,}', latex_input):
+            return False, "Potential expansion bomb detected"
+        if re.search(r'(.)\1{50,}', latex_input) \
+                or re.search(r'(\\[a-zA-Z]+\s*){10,}', latex_input) \
+                or re.search(r'(\{[^}]*\}){20,}', latex_input):
+            return False, "Excessive repetitions detected"
+        open_braces = latex_input.count('{') - latex_input.count(r'\{')
+        close_braces = latex_input.count('}') - latex_input.count(r'\}')
+        suspicious = sum(1 for char in latex_input
+                         if ord(char) > 127 and ord(char) not in range(0x0391, 0x03C9))
+        if abs(open_braces - close_braces) > 5 or suspicious > 10 \
+                or re.search(r'\\[a-zA-Z]+[0-9]{5,}', latex_input):
+            return False, "Malformed LaTeX commands detected"
+        return True, ""
+
+    def validate_and_sanitize(self, latex_input):
+        is_safe, error_msg = self.validate(latex_input)
+        if not is_safe:
+            raise SecurityViolation(error_msg)
+        sanitized = re.sub(r'%.*$', '', latex_input, flags=re.MULTILINE)
+        for cmd in self.DANGEROUS_COMMANDS:
+            sanitized = re.sub(cmd + r'\s*\{[^}]*\}', '', sanitized, flags=re.IGNORECASE)
+            sanitized = re.sub(cmd + r'(?=\s|$|\\\\)', '', sanitized, flags=re.IGNORECASE)
+        sanitized = re.sub(r'(\^|_){3,}', r'\1\1', sanitized)
+        sanitized = re.sub(r'\\{3,}', r'\\\\', sanitized)
+        sanitized = ''.join(c for c in sanitized if ord(c) >= 32 or c in '\n\r\t')
+        return re.sub(r'\s+', ' ', sanitized).strip()
+
+
+def expressions():
+    """LaTeX string constants from the test suite"""
+    found = set()
+    for path in sorted(TESTS.glob('test_*.py')):
+        for node in ast.walk(ast.parse(path.read_text())):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str) \
+                    and '\\' in node.value and len(node.value) < 300:
+                found.add(node.value)
+    return sorted(found)
+
+
+def verdict(validator, text):
+    try:
+        return validator.validate_and_sanitize(text)
+    except SecurityViolation as e:
+        return f"rejected: {e}"
+
+
+def timed(validator, texts, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            verdict(validator, text)
+    return (time.perf_counter() - start) / (rounds * len(texts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LaTeX security validation")
+    parser.add_argument('--rounds', type=int, default=5, help='Passes over each corpus')
+    args = parser.parse_args()
+
+    old, new = SeparateScansValidator(), LaTeXSecurityValidator()
+    long_expression = ' + '.join(r'\frac{\alpha_{%d}}{x^{2} + \sqrt{y_{%d}}}' % (i, i)
+                                 for i in range(150))
+    # Escaped braces leave the nesting depth at 0, but each one starts a
+    # match of the old (\{[^}]*\}){20,} that runs to the end of the input
+    adversarial = r'\{a' * 33_000 + '}'
+    corpora = [("test suite", expressions(), args.rounds),
+               ("one 6 KB expression", [long_expression], args.rounds),
+               ("adversarial 100 KB", [adversarial], 1)]
+
+    print(f"{'input':<22} {'texts':>6} {'separate scans':>15} {'one pass':>10} "
+          f"{'speed-up':>9} {'verdicts':>9}")
+    for label, texts, rounds in corpora:
+        # Also warms the shared structure cache the engine fills before validating
+        mismatches = sum(1 for text in texts
+                         if verdict(old, text).startswith('rejected')
+                         != verdict(new, text).startswith('rejected'))
+        before = timed(old, texts, rounds)
+        after = timed(new, texts, rounds)
+        print(f"{label:<22} {len(texts):>6} {before * 1e6:>13.1f}µs {after * 1e6:>8.1f}µs "
+              f"{before / after:>8.1f}x {'same' if not mismatches else f'{mismatches} differ':>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Structure Analysis Benchmark
+============================
+
+Times the complexity estimators on adversarial inputs (one structural
+unit such as ``\\frac{`` or ``|`` repeated up to 100 KB) the old way, with
+the backtracking patterns the voice manager and security validator used
+to search with, and through the single-pass analyze_structure.
+
+The old patterns grow polynomially with the input, so each is only run
+up to the first size that takes longer than --limit seconds; larger sizes
+are reported as skipped.
+
+    python structure_benchmark.py [--limit 2.0]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add mathspeak to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from mathspeak.core.structure import _analyze
+
+# What VoiceManager._estimate_complexity and LaTeXSecurityValidator searched for
+OLD_PATTERNS = [
+    (r'\\int.*\\int', 0),
+    (r'\\sum.*\\sum', 0),
+    (r'\\frac{.*\\frac{.*}{.*}.*}', 0),
+    (r'\\lim.*\\lim', 0),
+    (r'\\partial.*\\partial', 0),
+    (r'\|.*\|_.*\|.*\|', 0),
+    (r'\\forall.*\\exists', 0),
+    (r'\\begin{cases}', 0),
+    (r'\\def.*\\def.*\\def', re.IGNORECASE),
+    (r'\\newcommand.*\\newcommand.*\\newcommand', re.IGNORECASE),
+    (r'(\^|_){.*(\^|_){.*(\^|_){.*(\^|_){.*(\^|_)', re.IGNORECASE),
+    (r'\\frac{.*\\frac{.*\\frac{.*\\frac{.*\\frac{.*\\frac', re.IGNORECASE),
+]
+OLD_COMPILED = [re.compile(pattern, flags) for pattern, flags in OLD_PATTERNS]
+
+UNITS = {
+    'fractions': r'\frac{',
+    'bars': '|',
+    'norms': r'\|_',
+    'integrals': r'\int ',
+    'scripts': 'x^{',
+    'forall': r'\forall ',
+    'brackets': '{[(',
+}
+
+SIZES = [1_000, 4_000, 16_000, 100_000]
+
+
+def old_estimate(text: str) -> int:
+    return sum(1 for pattern in OLD_COMPILED if pattern.search(text))
+
+
+def timed(func, text: str) -> float:
+    start = time.perf_counter()
+    func(text)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark structural complexity analysis")
+    parser.add_argument('--limit', type=float, default=2.0,
+                        help='Stop running the old patterns past this many seconds')
+    args = parser.parse_args()
+
+    print(f"{'input':<11}" + ''.join(f"{size // 1000:>8}KB old {'new':>9}" for size in SIZES))
+    for name, unit in UNITS.items():
+        row = f"{name:<11}"
+        old_stopped = False
+        for size in SIZES:
+            text = unit * (size // len(unit))
+            if old_stopped:
+                old = "skipped"
+            else:
+                elapsed = timed(old_estimate, text)
+                old_stopped = elapsed > args.limit
+                old = f"{elapsed * 1000:.1f}ms"
+            new = timed(_analyze, text)
+            row += f"{old:>14} {new * 1000:>7.1f}ms"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Command Word Table Benchmark
+============================
+
+Compares the single-pass command tables used by GeneralizationEngine._cleanup
+with the previous one-scan-per-command sequence, both in isolation and as
+p50/p95 latency of MathSpeechProcessor.process over the 100-example corpus.
+"""
+
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add mathspeak to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from mathspeak.core import patterns_v2
+from mathspeak.core.patterns.prefilter import guarded_sub
+from mathspeak.core.patterns.symbol_tables import FUNCTION_TABLE, OPERATOR_TABLE, SYMBOL_TABLE
+from mathspeak.core.patterns_v2 import PATTERN_EXAMPLES, AudienceLevel, MathSpeechProcessor
+
+ROUNDS = 10
+TABLE_NAMES = ('FUNCTION_TABLE', 'OPERATOR_TABLE', 'SYMBOL_TABLE')
+
+
+class SequentialTable:
+    """The previous cleanup: one guarded re.sub per command"""
+
+    def __init__(self, table):
+        self.steps = [
+            (r'\\' + re.escape(name) + table.guards.get(name, ''), word)
+            for name, word in table.words.items()
+        ]
+
+    def apply(self, text):
+        for pattern, word in self.steps:
+            text = guarded_sub(pattern, word, text)
+        return text
+
+
+def time_tables(tables, expressions):
+    """Average microseconds to apply all tables to one expression"""
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for expression in expressions:
+            for table in tables:
+                expression = table.apply(expression)
+    elapsed = time.perf_counter() - start
+    return elapsed / (ROUNDS * len(expressions)) * 1e6
+
+
+def process_latencies(expressions):
+    """Per-call latencies in microseconds of MathSpeechProcessor.process"""
+    processor = MathSpeechProcessor()
+    audience = AudienceLevel.UNDERGRADUATE
+    latencies = []
+    for _ in range(ROUNDS):
+        for expression in expressions:
+            start = time.perf_counter()
+            processor.process(expression, audience)
+            latencies.append((time.perf_counter() - start) * 1e6)
+    return latencies
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    expressions = [latex for latex, _ in PATTERN_EXAMPLES]
+    tables = [FUNCTION_TABLE, OPERATOR_TABLE, SYMBOL_TABLE]
+    sequential = [SequentialTable(table) for table in tables]
+
+    single_us = time_tables(tables, expressions)
+    sequential_us = time_tables(sequential, expressions)
+
+    after = process_latencies(expressions)
+    for name, legacy in zip(TABLE_NAMES, sequential):
+        setattr(patterns_v2, name, legacy)
+    try:
+        before = process_latencies(expressions)
+    finally:
+        for name, table in zip(TABLE_NAMES, tables):
+            setattr(patterns_v2, name, table)
+
+    commands = sum(len(table) for table in tables)
+    print(f"Command table benchmark: {len(expressions)} expressions, "
+          f"{commands} commands in {len(tables)} tables, {ROUNDS} rounds")
+    print("-" * 60)
+    print(f"{'tables, one scan per command':<32} {sequential_us:>10.1f} us/expression")
+    print(f"{'tables, single pass':<32} {single_us:>10.1f} us/expression")
+    print(f"{'process p50 (before)':<32} {statistics.median(before):>10.1f} us")
+    print(f"{'process p50 (after)':<32} {statistics.median(after):>10.1f} us")
+    print(f"{'process p95 (before)':<32} {percentile(before, 0.95):>10.1f} us")
+    print(f"{'process p95 (after)':<32} {percentile(after, 0.95):>10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
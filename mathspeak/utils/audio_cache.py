@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Audio Cache
+===========
+
+Content-addressed on-disk cache of synthesized speech, shared by
+everything that goes through TTSEngineManager.synthesize. An entry is
+keyed by a hash of the final spoken text together with the voice, rate
+and TTS engine, so identical speech (a flashcard reviewed again, a
+repeated line in a lecture) is synthesized once and copied afterwards.
+
+Entries are files named by their key. They are written to a temporary
+file and renamed into place, so readers, including other processes
+sharing the directory, never see a partial file. The cache is kept under
+max_bytes by deleting the least recently used entries; each process
+orders entries by their file times when it starts and by its own lookups
+afterwards.
+"""
+
+import os
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Union
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AUDIO_CACHE_DIR = Path.home() / '.mathspeak' / 'audio'
+
+
+class AudioCache:
+    """Size-bounded, content-addressed store of synthesized audio files"""
+
+    def __init__(self, cache_dir: Optional[Path] = None,
+                 max_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir or DEFAULT_AUDIO_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0, 'errors': 0}
+
+        self._lock = threading.RLock()
+        # key -> file size, least recently used first
+        self._entries: 'OrderedDict[str, int]' = OrderedDict()
+        self._scan()
+
+    @staticmethod
+    def make_key(text: str, voice: Optional[str] = None, rate: Optional[str] = None,
+                 engine: Optional[str] = None) -> str:
+        """Hash of the spoken text and everything that changes how it sounds"""
+        combined = '\0'.join((text, voice or '', rate or '', (engine or '').lower()))
+        return hashlib.sha256(combined.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        # Fan out over subdirectories so no directory grows too large
+        return self.cache_dir / key[:2] / key
+
+    def _scan(self) -> None:
+        """Index the entries already on disk, oldest first"""
+        found = []
+        if self.cache_dir.is_dir():
+            for path in self.cache_dir.glob('??/*'):
+                if path.name.startswith('.'):
+                    continue
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                found.append((stat.st_mtime, path.name, stat.st_size))
+        found.sort()
+        with self._lock:
+            for _, key, size in found:
+                self._entries[key] = size
+                self.total_bytes += size
+            self._evict()
+
+    # ===========================
+    # Reads and Writes
+    # ===========================
+
+    def get(self, key: str, output_file: Union[str, Path]) -> bool:
+        """
+        Copy the audio cached under key to output_file.
+
+        Returns:
+            True on a hit, False if nothing is cached under key
+        """
+        path = self._path(key)
+        with self._lock:
+            known = key in self._entries
+        if not known and not path.exists():
+            return self._miss()
+
+        try:
+            shutil.copyfile(path, output_file)
+            # Mark the entry as recently used for other processes' scans
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted, possibly by another process sharing the directory
+            self._forget(key)
+            return self._miss()
+        except OSError as e:
+            logger.warning(f"Could not read cached audio {key[:12]}: {e}")
+            return self._miss(error=True)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            elif path.exists():
+                # Written by another process
+                size = path.stat().st_size
+                self._entries[key] = size
+                self.total_bytes += size
+                self._evict()
+            self.stats['hits'] += 1
+        return True
+
+    def put(self, key: str, audio_file: Union[str, Path]) -> None:
+        """Store a copy of audio_file under key"""
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix='.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as tmp, open(audio_file, 'rb') as source:
+                    shutil.copyfileobj(source, tmp)
+                size = os.path.getsize(tmp_name)
+                os.replace(tmp_name, path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+                raise
+        except OSError as e:
+            logger.warning(f"Could not cache audio {key[:12]}: {e}")
+            with self._lock:
+                self.stats['errors'] += 1
+            return
+
+        with self._lock:
+            self.total_bytes += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            self.stats['writes'] += 1
+            self._evict()
+
+    def _miss(self, error: bool = False) -> bool:
+        with self._lock:
+            self.stats['misses'] += 1
+            if error:
+                self.stats['errors'] += 1
+        return False
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self.total_bytes -= self._entries.pop(key, 0)
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits max_bytes"""
+        # Always keep the newest entry, even if it alone exceeds the bound
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            self.stats['evictions'] += 1
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not evict cached audio {key[:12]}: {e}")
+
+    def clear(self) -> None:
+        """Delete every cached entry"""
+        with self._lock:
+            for key in self._entries:
+                try:
+                    self._path(key).unlink()
+                except OSError:
+                    pass
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit rate, entries and size of the cache"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'size_mb': self.total_bytes / 1024 / 1024,
+                'max_mb': self.max_bytes / 1024 / 1024,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+
+# Global audio cache instance
+_audio_cache = None
+_audio_cache_lock = threading.Lock()
+
+
+def get_audio_cache() -> AudioCache:
+    """Get the global audio cache"""
+    global _audio_cache
+    with _audio_cache_lock:
+        if _audio_cache is None:
+            _audio_cache = AudioCache()
+        return _audio_cache
@@ -4,24 +4,110 @@ Advanced Caching System
 =======================
 
 High-performance caching with LRU eviction and statistics.
+
+ExpressionCache keeps an in-memory LRUCache as its first tier in front of
+a persistent SQLite store (see cache_store) shared by all processes.
 """
 
+import os
 import time
 import hashlib
 import pickle
 import json
+from enum import Enum
 from pathlib import Path
 from typing import Any, Dict, Optional, Tuple, Callable
 from collections import OrderedDict
-from dataclasses import dataclass, field
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
 import logging
 from functools import wraps
 import threading
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    from .cache_store import SQLiteCacheStore
+except ImportError:  # Python built without sqlite3
+    SQLiteCacheStore = None
+
 
 logger = logging.getLogger(__name__)
 
 
+@contextmanager
+def _file_lock(filepath: Path):
+    """Hold an exclusive inter-process lock while a cache file is updated"""
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    with open(filepath.with_name(filepath.name + '.lock'), 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# ===========================
+# Size Estimation
+# ===========================
+
+# Approximate bytes an object takes in the cache, on the scale of its
+# pickled size but without serializing anything. Values can size
+# themselves with a cache_size() method, or a sizer can be registered for
+# their type; otherwise leaf values cost their payload plus a small fixed
+# overhead, and containers and dataclasses the sum of their parts.
+_OBJECT_OVERHEAD = 16
+_MAX_SIZE_DEPTH = 8
+_DEFAULT_SIZE = 1000
+
+_SIZERS: Dict[type, Callable[[Any], int]] = {}
+_dataclass_fields: Dict[type, Tuple[str, ...]] = {}
+
+
+def register_sizer(cls: type, sizer: Callable[[Any], int]) -> None:
+    """Use sizer(obj) to estimate the cache size of cls instances (exact type)"""
+    _SIZERS[cls] = sizer
+
+
+def estimate_size(obj: Any, _depth: int = 0) -> int:
+    """Estimate the cache size of obj in bytes without serializing it"""
+    sizer = _SIZERS.get(type(obj))
+    if sizer is not None:
+        return sizer(obj)
+    if hasattr(obj, 'cache_size'):
+        return obj.cache_size()
+    if isinstance(obj, (str, bytes, bytearray)):
+        return len(obj) + _OBJECT_OVERHEAD
+    if obj is None or isinstance(obj, (bool, int, float, Enum)):
+        return _OBJECT_OVERHEAD
+    if _depth >= _MAX_SIZE_DEPTH:
+        return _DEFAULT_SIZE
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return _OBJECT_OVERHEAD + sum(estimate_size(item, _depth + 1) for item in obj)
+    if isinstance(obj, dict):
+        return _OBJECT_OVERHEAD + sum(
+            estimate_size(key, _depth + 1) + estimate_size(value, _depth + 1)
+            for key, value in obj.items()
+        )
+    
+    cls = type(obj)
+    names = _dataclass_fields.get(cls)
+    if names is None and hasattr(cls, '__dataclass_fields__'):
+        names = _dataclass_fields[cls] = tuple(f.name for f in fields(cls))
+    if names is not None:
+        return _OBJECT_OVERHEAD + sum(
+            estimate_size(getattr(obj, name, None), _depth + 1) for name in names
+        )
+    if hasattr(obj, '__dict__'):
+        return _OBJECT_OVERHEAD + estimate_size(vars(obj), _depth + 1)
+    return _DEFAULT_SIZE
+
+
 @dataclass
 class CacheEntry:
     """A single cache entry with metadata"""
@@ -58,9 +144,9 @@ class LRUCache:
     def _estimate_size(self, obj: Any) -> int:
         """Estimate memory size of an object"""
         try:
-            return len(pickle.dumps(obj))
-        except:
-            return 1000  # Default estimate
+            return estimate_size(obj)
+        except Exception:
+            return _DEFAULT_SIZE
     
     def get(self, key: str) -> Optional[Any]:
         """Get a value from cache"""
@@ -172,19 +258,39 @@ class LRUCache:
         """Property to get cache size"""
         return len(self)
     
-    def save_to_disk(self, filepath: Path) -> None:
-        """Save cache to disk"""
+    def save_to_disk(self, filepath: Path, merge: bool = False) -> None:
+        """Save cache to disk
+        
+        Args:
+            filepath: Cache file
+            merge: Keep entries other processes already saved to the file,
+                so several workers can share one cache file. Our own
+                entries win and count as most recently used.
+        """
         with self.lock:
-            data = {
-                'cache': {k: (v.value, v.computation_time) for k, v in self.cache.items()},
-                'stats': self.stats
-            }
-            
-            filepath.parent.mkdir(parents=True, exist_ok=True)
-            with open(filepath, 'wb') as f:
-                pickle.dump(data, f)
+            entries = {k: (v.value, v.computation_time) for k, v in self.cache.items()}
+            stats = dict(self.stats)
+        
+        with _file_lock(filepath):
+            if merge and filepath.exists():
+                try:
+                    with open(filepath, 'rb') as f:
+                        existing = pickle.load(f)['cache']
+                    for key in entries:
+                        existing.pop(key, None)
+                    existing.update(entries)
+                    # Keep the most recently used max_size entries
+                    entries = dict(list(existing.items())[-self.max_size:])
+                except Exception as e:
+                    logger.warning(f"Could not merge existing cache file: {e}")
             
-            logger.info(f"Cache saved to {filepath}")
+            # Write to a temporary file and rename, so readers never see a partial file
+            tmp_path = filepath.with_name(f"{filepath.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'cache': entries, 'stats': stats}, f)
+            os.replace(tmp_path, filepath)
+        
+        logger.info(f"Cache saved to {filepath}")
     
     def load_from_disk(self, filepath: Path) -> None:
         """Load cache from disk"""
@@ -208,12 +314,23 @@ class LRUCache:
 
 
 class ExpressionCache:
-    """Specialized cache for mathematical expressions"""
+    """Specialized cache for mathematical expressions
+    
+    Lookups try the in-memory LRUCache first, then the persistent store;
+    store hits are promoted into memory. Writes go to both tiers, and the
+    store persists them incrementally, so nothing has to be dumped at
+    shutdown. Without sqlite3 the cache falls back to a pickle file.
+    """
+    
+    WARM_ENTRIES = 1000  # most recently used entries loaded into memory at startup
     
-    def __init__(self, cache_dir: Optional[Path] = None):
+    def __init__(self, cache_dir: Optional[Path] = None, persistent: bool = True):
         self.cache = LRUCache(max_size=5000, max_memory_mb=200)
         self.cache_dir = cache_dir or Path.home() / '.mathspeak' / 'cache'
         self.cache_file = self.cache_dir / 'expressions.cache'
+        self.store = None
+        if persistent and SQLiteCacheStore is not None:
+            self.store = SQLiteCacheStore(self.cache_dir / 'expressions.db')
         
         # Load existing cache
         self.load()
@@ -237,29 +354,62 @@ class ExpressionCache:
         else:
             # It's an expression, compute the key
             key = self._make_key(key_or_expression, context or "")
-        return self.cache.get(key)
+        
+        value = self.cache.get(key)
+        if value is None and self.store is not None:
+            stored = self.store.get(key)
+            if stored is not None:
+                value, computation_time = stored
+                self.cache.put(key, value, computation_time)
+        return value
     
     def put(self, expression: str, result: Any, context: str = "", 
             computation_time: float = 0.0) -> None:
         """Cache a processed expression"""
         key = self._make_key(expression, context)
-        self.cache.put(key, result, computation_time)
+        self.set(key, result, computation_time)
     
     def set(self, key: str, value: Any, computation_time: float = 0.0) -> None:
         """Set a value directly by key (for compatibility)"""
         self.cache.put(key, value, computation_time)
+        if self.store is not None:
+            self.store.put(key, value, computation_time)
     
     def save(self) -> None:
-        """Save cache to disk"""
-        self.cache.save_to_disk(self.cache_file)
+        """Persist pending writes (merge into the pickle file without a store)"""
+        if self.store is not None:
+            self.store.flush()
+        else:
+            self.cache.save_to_disk(self.cache_file, merge=True)
     
     def load(self) -> None:
-        """Load cache from disk"""
-        self.cache.load_from_disk(self.cache_file)
+        """Load the most recently used entries into memory"""
+        if self.store is None:
+            self.cache.load_from_disk(self.cache_file)
+            return
+        
+        self._import_legacy_file()
+        for key, value, computation_time in self.store.most_recent(self.WARM_ENTRIES):
+            self.cache.put(key, value, computation_time)
+    
+    def _import_legacy_file(self) -> None:
+        """Copy entries from the old whole-file pickle into the store, once"""
+        if not self.cache_file.exists() or self.store.get_meta('legacy_imported'):
+            return
+        legacy = LRUCache(max_size=self.cache.max_size, max_memory_mb=200)
+        legacy.load_from_disk(self.cache_file)
+        self.store.import_entries(
+            [(key, entry.value, entry.computation_time) for key, entry in legacy.cache.items()]
+        )
+        self.store.set_meta('legacy_imported', str(time.time()))
+        logger.info(f"Imported {len(legacy)} entries from {self.cache_file}")
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
-        return self.cache.get_stats()
+        stats = self.cache.get_stats()
+        if self.store is not None:
+            stats['persistent'] = self.store.get_stats()
+        return stats
 
 
 def cached(cache: LRUCache, key_func: Optional[Callable] = None):
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Persistent Cache Store
+======================
+
+SQLite-backed second tier for the expression cache. Entries are written
+incrementally (batched, at most FLUSH_INTERVAL seconds behind), so a crash
+loses only the last few results instead of the whole cache, and there is
+no stop-the-world save at shutdown. Several processes can share one store:
+SQLite's WAL mode lets readers proceed while one writer commits.
+
+A daemon timer flushes writes that no later call picks up, so a burst of
+results followed by idling still reaches the disk.
+
+Each row carries a format version; rows written under another version are
+treated as misses and are removed first at compaction. The store is kept
+under max_entries / max_bytes by deleting the least recently used rows.
+"""
+
+import os
+import time
+import pickle
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the pickled value format (e.g. ProcessedExpression) or the
+# stages producing the cached speech change
+CACHE_FORMAT_VERSION = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    computation_time REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    last_accessed REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS entries_last_accessed ON entries (last_accessed);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class SQLiteCacheStore:
+    """Size-bounded persistent key/value store for cached results"""
+
+    FLUSH_BATCH = 32        # pending writes that trigger a flush
+    FLUSH_INTERVAL = 1.0    # seconds a write may stay pending
+    COMPACT_EVERY = 64      # flushes between size checks
+
+    def __init__(self, path: Path,
+                 max_entries: int = 100_000,
+                 max_bytes: int = 512 * 1024 * 1024,
+                 version: int = CACHE_FORMAT_VERSION):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version = version
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'compactions': 0, 'errors': 0}
+
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._inherited: List[sqlite3.Connection] = []
+        # key -> (value blob, computation_time); last write wins
+        self._pending: Dict[str, Tuple[bytes, float]] = {}
+        self._touched: Dict[str, float] = {}
+        self._last_flush = time.time()
+        self._flushes = 0
+        self._timer: Optional[threading.Timer] = None
+        self._timer_pid: Optional[int] = None
+
+    # ===========================
+    # Connection
+    # ===========================
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database, reopening after a fork"""
+        pid = os.getpid()
+        if self._conn is None or self._conn_pid != pid:
+            if self._conn is not None:
+                # A connection inherited across fork must be neither used
+                # nor closed here; keep it referenced so it is not collected
+                self._inherited.append(self._conn)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5.0,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn, self._conn_pid = conn, pid
+        return self._conn
+
+    def close(self) -> None:
+        """Flush pending writes and close the connection"""
+        with self._lock:
+            if self._timer is not None and self._timer_pid == os.getpid():
+                self._timer.cancel()
+            self._timer = None
+            self.flush()
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    # ===========================
+    # Reads and Writes
+    # ===========================
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        Look up a key.
+
+        Returns:
+            (value, computation_time), or None if the key is missing, was
+            written under another format version, or cannot be unpickled
+        """
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                blob, computation_time = pending
+            else:
+                try:
+                    row = self._connection().execute(
+                        "SELECT value, computation_time FROM entries WHERE key = ? AND version = ?",
+                        (key, self.version)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    self._error("read", e)
+                    return None
+                if row is None:
+                    self.stats['misses'] += 1
+                    return None
+                blob, computation_time = row
+                self._touched[key] = time.time()
+                self._schedule_flush()
+
+            try:
+                value = pickle.loads(blob)
+            except Exception as e:
+                logger.debug(f"Dropping unreadable cache entry {key[:20]}...: {e}")
+                self._pending.pop(key, None)
+                self._execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.stats['misses'] += 1
+                return None
+
+            self.stats['hits'] += 1
+            self._maybe_flush()
+            return value, computation_time
+
+    def put(self, key: str, value: Any, computation_time: float = 0.0) -> None:
+        """Queue a value for writing; it is flushed within FLUSH_INTERVAL"""
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug(f"Not persisting unpicklable value for {key[:20]}...: {e}")
+            return
+        with self._lock:
+            self._pending[key] = (blob, computation_time)
+            self._touched.pop(key, None)
+            self._schedule_flush()
+            self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        if (len(self._pending) >= self.FLUSH_BATCH
+                or (self._pending or self._touched)
+                and time.time() - self._last_flush >= self.FLUSH_INTERVAL):
+            self.flush()
+
+    def _schedule_flush(self) -> None:
+        """Start the flush timer unless one is already running"""
+        # Threads do not survive fork, so a timer started by the parent
+        # does not count in a child
+        pid = os.getpid()
+        if self._timer is not None and self._timer_pid == pid:
+            return
+        self._timer = threading.Timer(self.FLUSH_INTERVAL, self._timed_flush)
+        self._timer.daemon = True
+        self._timer_pid = pid
+        self._timer.start()
+
+    def _timed_flush(self) -> None:
+        with self._lock:
+            self._timer = None
+            self.flush()
+
+    def flush(self) -> None:
+        """Write pending entries and access times in one transaction"""
+        with self._lock:
+            self._last_flush = time.time()
+            if not self._pending and not self._touched:
+                return
+            now = time.time()
+            rows = [(key, self.version, blob, len(blob), computation_time, now, now)
+                    for key, (blob, computation_time) in self._pending.items()]
+            touches = [(accessed, key) for key, accessed in self._touched.items()]
+            try:
+                conn = self._connection()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO entries "
+                        "(key, version, value, size, computation_time, created_at, last_accessed, hits) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, 0)", rows
+                    )
+                    conn.executemany(
+                        "UPDATE entries SET last_accessed = ?, hits = hits + 1 WHERE key = ?",
+                        touches
+                    )
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            except sqlite3.Error as e:
+                # Keep the pending writes for the next attempt
+                self._error("write", e)
+                return
+
+            self.stats['writes'] += len(rows)
+            self._pending.clear()
+            self._touched.clear()
+            self._flushes += 1
+            if self._flushes % self.COMPACT_EVERY == 0:
+                self.compact()
+
+    # ===========================
+    # Maintenance
+    # ===========================
+
+    def compact(self) -> int:
+        """
+        Delete stale-version rows, then least recently used rows until the
+        store is within max_entries and max_bytes.
+
+        Returns:
+            Number of rows deleted
+        """
+        with self._lock:
+            try:
+                conn = self._connection()
+                deleted = conn.execute(
+                    "DELETE FROM entries WHERE version != ?", (self.version,)
+                ).rowcount
+                count, total = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+                ).fetchone()
+                if count > self.max_entries or total > self.max_bytes:
+                    # Shrink to 90% of the limits so compaction is not rerun at once
+                    keep_entries = int(self.max_entries * 0.9)
+                    keep_bytes = int(self.max_bytes * 0.9)
+                    deleted += conn.execute(
+                        "DELETE FROM entries WHERE key IN ("
+                        "  SELECT key FROM ("
+                        "    SELECT key,"
+                        "      ROW_NUMBER() OVER recency AS rank,"
+                        "      SUM(size) OVER recency AS running"
+                        "    FROM entries"
+                        "    WINDOW recency AS (ORDER BY last_accessed DESC, rowid DESC"
+                        "                       ROWS UNBOUNDED PRECEDING)"
+                        "  ) WHERE rank > ? OR running > ?"
+                        ")", (keep_entries, keep_bytes)
+                    ).rowcount
+            except sqlite3.Error as e:
+                self._error("compact", e)
+                return 0
+
+            self.stats['compactions'] += 1
+            if deleted:
+                logger.info(f"Compacted persistent cache: removed {deleted} entries")
+            return deleted
+
+    def most_recent(self, limit: int) -> Iterator[Tuple[str, Any, float]]:
+        """Yield (key, value, computation_time) for the most recently used entries"""
+        with self._lock:
+            self.flush()
+            try:
+                rows = self._connection().execute(
+                    "SELECT key, value, computation_time FROM entries WHERE version = ? "
+                    "ORDER BY last_accessed DESC LIMIT ?", (self.version, limit)
+                ).fetchall()
+            except sqlite3.Error as e:
+                self._error("read", e)
+                return
+        for key, blob, computation_time in rows:
+            try:
+                yield key, pickle.loads(blob), computation_time
+            except Exception:
+                continue
+
+    def import_entries(self, entries: List[Tuple[str, Any, float]]) -> None:
+        """Bulk-load (key, value, computation_time) entries, e.g. from a legacy pickle"""
+        with self._lock:
+            for key, value, computation_time in entries:
+                self.put(key, value, computation_time)
+            self.flush()
+
+    def get_meta(self, name: str) -> Optional[str]:
+        with self._lock:
+            try:
+                row = self._connection().execute(
+                    "SELECT value FROM meta WHERE name = ?", (name,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                self._error("read", e)
+                return None
+            return row[0] if row else None
+
+    def set_meta(self, name: str, value: str) -> None:
+        self._execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, value))
+
+    def __len__(self) -> int:
+        with self._lock:
+            self.flush()
+            try:
+                return self._connection().execute(
+                    "SELECT COUNT(*) FROM entries WHERE version = ?", (self.version,)
+                ).fetchone()[0]
+            except sqlite3.Error as e:
+                self._error("read", e)
+                return 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, 'pending': len(self._pending), 'path': str(self.path)}
+
+    def _execute(self, sql: str, params: tuple) -> None:
+        with self._lock:
+            try:
+                self._connection().execute(sql, params)
+            except sqlite3.Error as e:
+                self._error("write", e)
+
+    def _error(self, operation: str, error: Exception) -> None:
+        self.stats['errors'] += 1
+        logger.warning(f"Persistent cache {operation} failed: {error}")
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Rate Limit Stores
+=================
+
+Token-bucket state behind core.security.RateLimiter. A bucket holds up to
+`capacity` tokens and refills at `rate` tokens per second; a request takes
+one. Buckets refill lazily: a store keeps each bucket's tokens and when it
+last changed, and works out the refill when the bucket is next used.
+
+A bucket that has refilled completely behaves exactly like one that was
+never used, so stores only keep buckets that are not full, and drop each
+one once it would be full again:
+
+- MemoryRateLimitStore: buckets of one process, dropped through a timing
+  wheel as they fill up
+- SQLiteRateLimitStore: buckets in a SQLite file, shared by every process
+  using it (e.g. the pre-fork workers); filled buckets are deleted in
+  batches through an index on when they fill up
+
+A networked store (e.g. Redis running the refill as a script) implements
+RateLimitStore.take and peek the same way, atomically per key.
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+def refill(tokens: float, updated: float, capacity: float, rate: float, now: float) -> float:
+    """Tokens in a bucket that had `tokens` at time `updated`"""
+    return min(capacity, tokens + max(0.0, now - updated) * rate)
+
+
+class RateLimitStore(ABC):
+    """Where token buckets live; take and peek must be atomic per key"""
+
+    @abstractmethod
+    def take(self, key: str, capacity: float, rate: float, now: float,
+             cost: float = 1.0) -> Tuple[bool, float]:
+        """
+        Take `cost` tokens from the key's bucket if it has them.
+
+        Returns:
+            (taken, tokens left in the bucket)
+        """
+        pass
+
+    @abstractmethod
+    def peek(self, key: str, capacity: float, rate: float, now: float) -> float:
+        """Tokens in the key's bucket, without taking any"""
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Forget every bucket"""
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Buckets held (those not yet refilled)"""
+        pass
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """
+    Buckets of this process, in a dict.
+
+    Each bucket is also filed in a timing wheel under the tick in which it
+    will be full again. Every call first advances the wheel to the current
+    tick, dropping the buckets filed under the ticks it passes that have
+    not been used since, so expiry costs O(1) per bucket and a call never
+    looks at other clients' buckets. Buckets that fill up more than one
+    turn of the wheel ahead stay filed and are checked again next turn.
+    """
+
+    SLOTS = 64
+
+    def __init__(self, horizon: float = 60.0, slots: int = SLOTS):
+        # One turn of the wheel covers `horizon` seconds, which should be
+        # the longest a bucket takes to refill (the limiter's window)
+        self.slots = slots
+        self.tick = max(horizon, 0.001) / slots
+        # key -> (tokens, updated, full_at)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._wheel: List[Set[str]] = [set() for _ in range(slots)]
+        self._position: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _slot(self, when: float) -> int:
+        return int(when // self.tick) % self.slots
+
+    def _advance(self, now: float) -> None:
+        """Drop the refilled buckets filed under the ticks up to now"""
+        current = int(now // self.tick)
+        if self._position is None or current < self._position:
+            self._position = current
+            return
+        # After a long idle spell every slot is visited once
+        for position in range(max(self._position + 1, current - self.slots + 1), current + 1):
+            filed = self._wheel[position % self.slots]
+            if not filed:
+                continue
+            waiting = set()
+            for key in filed:
+                if self._buckets[key][2] <= now:
+                    del self._buckets[key]
+                else:
+                    waiting.add(key)
+            self._wheel[position % self.slots] = waiting
+        self._position = current
+
+    def take(self, key: str, capacity: float, rate: float, now: float,
+             cost: float = 1.0) -> Tuple[bool, float]:
+        with self._lock:
+            self._advance(now)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = capacity
+            else:
+                tokens = refill(bucket[0], bucket[1], capacity, rate, now)
+                self._wheel[self._slot(bucket[2])].discard(key)
+            taken = tokens >= cost
+            if taken:
+                tokens -= cost
+            if tokens < capacity:
+                full_at = now + (capacity - tokens) / rate
+                self._buckets[key] = (tokens, now, full_at)
+                self._wheel[self._slot(full_at)].add(key)
+            elif bucket is not None:
+                del self._buckets[key]
+            return taken, tokens
+
+    def peek(self, key: str, capacity: float, rate: float, now: float) -> float:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                return capacity
+            return refill(bucket[0], bucket[1], capacity, rate, now)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._wheel = [set() for _ in range(self.slots)]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._buckets)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL,
+    full_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS buckets_full_at ON buckets (full_at);
+"""
+
+
+class SQLiteRateLimitStore(RateLimitStore):
+    """
+    Buckets in a SQLite file, shared by every process that opens it.
+
+    Each take is one short write transaction (BEGIN IMMEDIATE), so
+    concurrent workers never both spend the same token. If the database
+    cannot be reached, or stays locked for `timeout` seconds, requests
+    are let through rather than rejected or held up.
+    """
+
+    PURGE_EVERY = 256   # takes between deletions of refilled buckets
+
+    def __init__(self, path: Path, timeout: float = 0.25):
+        self.path = Path(path)
+        self.timeout = timeout
+        self.stats = {'takes': 0, 'purged': 0, 'errors': 0}
+
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._inherited: List[sqlite3.Connection] = []
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database, reopening after a fork"""
+        pid = os.getpid()
+        if self._conn is None or self._conn_pid != pid:
+            if self._conn is not None:
+                # A connection inherited across fork must be neither used
+                # nor closed here; keep it referenced so it is not collected
+                self._inherited.append(self._conn)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Setting up waits for other processes doing the same; only
+            # takes give up after self.timeout
+            conn = sqlite3.connect(str(self.path), timeout=5.0,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+            self._conn, self._conn_pid = conn, pid
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    def take(self, key: str, capacity: float, rate: float, now: float,
+             cost: float = 1.0) -> Tuple[bool, float]:
+        with self._lock:
+            try:
+                conn = self._connection()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    row = conn.execute(
+                        "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+                    ).fetchone()
+                    tokens = capacity if row is None else refill(row[0], row[1], capacity, rate, now)
+                    taken = tokens >= cost
+                    if taken:
+                        tokens -= cost
+                    conn.execute(
+                        "INSERT OR REPLACE INTO buckets (key, tokens, updated, full_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (key, tokens, now, now + (capacity - tokens) / rate)
+                    )
+                    self.stats['takes'] += 1
+                    if self.stats['takes'] % self.PURGE_EVERY == 0:
+                        self.stats['purged'] += conn.execute(
+                            "DELETE FROM buckets WHERE full_at <= ?", (now,)
+                        ).rowcount
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            except sqlite3.Error as e:
+                self._error("take", e)
+                return True, float(capacity)
+            return taken, tokens
+
+    def peek(self, key: str, capacity: float, rate: float, now: float) -> float:
+        with self._lock:
+            try:
+                row = self._connection().execute(
+                    "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                self._error("read", e)
+                return float(capacity)
+            return capacity if row is None else refill(row[0], row[1], capacity, rate, now)
+
+    def purge(self, now: Optional[float] = None) -> int:
+        """Delete the buckets that have refilled; returns how many"""
+        with self._lock:
+            try:
+                deleted = self._connection().execute(
+                    "DELETE FROM buckets WHERE full_at <= ?",
+                    (time.time() if now is None else now,)
+                ).rowcount
+            except sqlite3.Error as e:
+                self._error("purge", e)
+                return 0
+            self.stats['purged'] += deleted
+            return deleted
+
+    def clear(self) -> None:
+        with self._lock:
+            try:
+                self._connection().execute("DELETE FROM buckets")
+            except sqlite3.Error as e:
+                self._error("clear", e)
+
+    def __len__(self) -> int:
+        with self._lock:
+            try:
+                return self._connection().execute("SELECT COUNT(*) FROM buckets").fetchone()[0]
+            except sqlite3.Error as e:
+                self._error("read", e)
+                return 0
+
+    def _error(self, operation: str, error: Exception) -> None:
+        self.stats['errors'] += 1
+        logger.warning(f"Rate limit store {operation} failed: {error}")
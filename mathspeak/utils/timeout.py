@@ -10,18 +10,118 @@ import signal
 import threading
 import functools
 import asyncio
-from typing import TypeVar, Callable, Any, Optional
+import logging
+import time
+from typing import TypeVar, Callable, Any, Optional, Union
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 
 
 T = TypeVar('T')
 
+logger = logging.getLogger(__name__)
+
+# Upper bound on threads used by the timeout() watchdog
+WATCHDOG_MAX_WORKERS = 4
+
+_watchdog_executor: Optional[ThreadPoolExecutor] = None
+_watchdog_lock = threading.Lock()
+
 
 class TimeoutError(Exception):
     """Raised when an operation times out"""
     pass
 
 
+def get_watchdog_executor() -> ThreadPoolExecutor:
+    """
+    Get the long-lived, bounded thread pool used by timeout().
+    
+    Created on first use and shared by every wrapped call, so timeouts do
+    not cost a thread pool per call.
+    """
+    global _watchdog_executor
+    if _watchdog_executor is None:
+        with _watchdog_lock:
+            if _watchdog_executor is None:
+                _watchdog_executor = ThreadPoolExecutor(
+                    max_workers=WATCHDOG_MAX_WORKERS,
+                    thread_name_prefix="mathspeak-watchdog"
+                )
+    return _watchdog_executor
+
+
+class Deadline:
+    """
+    Point in time by which a request must be finished.
+    
+    Created once per request and checked cooperatively between processing
+    stages and between pattern rules, so no extra threads are needed to
+    enforce it. Once it has passed it stays expired, and ``exhausted``
+    records that some work was skipped, so callers can flag the result as
+    partial. A deadline of None seconds never expires.
+    """
+    
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+        self.exhausted = False
+        self.exhausted_at: Optional[str] = None
+    
+    @classmethod
+    def coerce(cls, value: Union['Deadline', float, None],
+               default_seconds: Optional[float] = None) -> 'Deadline':
+        """Build a Deadline from seconds, or pass an existing one through"""
+        if value is None:
+            return cls(default_seconds)
+        if isinstance(value, (int, float)):
+            return cls(float(value))
+        return value
+    
+    def fork(self) -> 'Deadline':
+        """Same expiry with its own bookkeeping, for one request of a batch"""
+        forked = Deadline.__new__(Deadline)
+        forked.seconds = self.seconds
+        forked.expires_at = self.expires_at
+        forked.exhausted = False
+        forked.exhausted_at = None
+        return forked
+    
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None if the deadline never expires"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+    
+    @property
+    def expired(self) -> bool:
+        """Check the clock; marks the deadline exhausted once it has passed"""
+        if self.exhausted:
+            return True
+        if self.expires_at is not None and time.monotonic() >= self.expires_at:
+            self.exhausted = True
+        return self.exhausted
+    
+    def spent(self, stage: str) -> bool:
+        """Like expired, also remembering the first stage that was cut"""
+        if self.expired:
+            if self.exhausted_at is None:
+                self.exhausted_at = stage
+            return True
+        return False
+    
+    def clamp(self, seconds: float) -> float:
+        """Limit a stage timeout to the time left on the deadline"""
+        remaining = self.remaining()
+        return seconds if remaining is None else min(seconds, remaining)
+    
+    def check(self, operation: str = "operation") -> None:
+        """Raise TimeoutError if the deadline has passed"""
+        if self.expired:
+            raise TimeoutError(
+                f"{operation} exceeded the {self.seconds} second deadline"
+            )
+
+
 def timeout(seconds: float) -> Callable:
     """
     Decorator to add timeout to functions.
@@ -52,17 +152,16 @@ def timeout(seconds: float) -> Callable:
             # Sync function - use threading
             @functools.wraps(func)
             def sync_wrapper(*args, **kwargs) -> T:
-                # Use a thread pool to run with timeout
-                with ThreadPoolExecutor(max_workers=1) as executor:
-                    future = executor.submit(func, *args, **kwargs)
-                    try:
-                        return future.result(timeout=seconds)
-                    except FuturesTimeoutError:
-                        # Try to cancel the future
-                        future.cancel()
-                        raise TimeoutError(
-                            f"{func.__name__} timed out after {seconds} seconds"
-                        )
+                # Run on the shared watchdog pool with timeout
+                future = get_watchdog_executor().submit(func, *args, **kwargs)
+                try:
+                    return future.result(timeout=seconds)
+                except FuturesTimeoutError:
+                    # Cancel the call if it has not started yet
+                    future.cancel()
+                    raise TimeoutError(
+                        f"{func.__name__} timed out after {seconds} seconds"
+                    )
             return sync_wrapper
     
     return decorator
@@ -178,7 +277,8 @@ long_timeout = timeout(30.0)
 def timeout_with_fallback(func: Callable[..., T], 
                          timeout_seconds: float,
                          fallback: T,
-                         operation: str = "operation") -> T:
+                         operation: str = "operation",
+                         deadline: Optional[Deadline] = None) -> T:
     """
     Execute a function with timeout and fallback value.
     
@@ -187,12 +287,47 @@ def timeout_with_fallback(func: Callable[..., T],
         timeout_seconds: Timeout in seconds
         fallback: Value to return if timeout occurs
         operation: Name of operation for error logging
+        deadline: Optional request deadline that further limits the timeout
         
     Returns:
         Result of func or fallback if timeout
     """
+    if deadline is not None:
+        if deadline.expired:
+            return fallback
+        timeout_seconds = deadline.clamp(timeout_seconds)
     try:
         return with_timeout(func, timeout_seconds)
     except (TimeoutError, Exception):
         # Return fallback on any error
+        return fallback
+
+
+def run_with_deadline(func: Callable[[], T],
+                      deadline: Deadline,
+                      fallback: T,
+                      operation: str = "operation") -> T:
+    """
+    Run a processing stage inline, cooperatively bounded by a deadline.
+    
+    The stage is skipped (returning fallback) once the deadline has passed.
+    Unlike timeout_with_fallback no thread is involved, so a stage that
+    overruns is never left running in the background.
+    
+    Args:
+        func: Stage to execute
+        deadline: Request deadline
+        fallback: Value to return if the deadline has passed or func fails
+        operation: Name of operation for error logging
+        
+    Returns:
+        Result of func or fallback
+    """
+    if deadline.expired:
+        logger.warning(f"Skipping {operation}: deadline exceeded")
+        return fallback
+    try:
+        return func()
+    except Exception as e:
+        logger.warning(f"{operation} failed, using fallback: {e}")
         return fallback
\ No newline at end of file
@@ -0,0 +1,35 @@
+"""Adapter for the legacy single-pass structure analysis."""
+
+from typing import Any, Callable, Optional
+
+from mathspeak_clean.domain.interfaces.structure_analyzer import (
+    StructureAnalyzer,
+    StructureMeasures,
+)
+from mathspeak_clean.shared.types import LaTeXExpression
+
+
+class LegacyStructureAnalyzer(StructureAnalyzer):
+    """Structure analyzer backed by mathspeak.core.structure.
+    
+    The legacy package is imported on the first measurement, not when
+    the adapter is created.
+    """
+    
+    def __init__(self) -> None:
+        """Initialize adapter without loading the legacy package."""
+        self._analyze: Optional[Callable[[str], Any]] = None
+    
+    def measure(self, latex: LaTeXExpression) -> StructureMeasures:
+        """Measure an expression with the legacy analyze_structure."""
+        if self._analyze is None:
+            from mathspeak.core.structure import analyze_structure
+            self._analyze = analyze_structure
+        
+        structure = self._analyze(latex)
+        return StructureMeasures(
+            max_brace_depth=structure.max_brace_depth,
+            command_count=structure.command_count,
+            symbol_count=structure.scripts
+            + structure.count("int", "sum", "prod", "partial", "nabla"),
+        )
@@ -1,8 +1,10 @@
 """Mathematical expression entity."""
 
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import ClassVar, List, Optional
 
+from mathspeak_clean.domain.interfaces.structure_analyzer import StructureAnalyzer
+from mathspeak_clean.domain.services.structure_analyzer import BasicStructureAnalyzer
 from mathspeak_clean.shared.constants import DEFAULT_MAX_EXPRESSION_LENGTH
 from mathspeak_clean.shared.exceptions import ValidationError
 from mathspeak_clean.shared.types import AudienceLevel, LaTeXExpression, SpeechText
@@ -21,6 +23,18 @@ class MathExpression:
     _speech_text: Optional[SpeechText] = field(default=None, init=False)
     _validated: bool = field(default=False, init=False)
     
+    # Measures expressions for validation and complexity scoring
+    structure_analyzer: ClassVar[StructureAnalyzer] = BasicStructureAnalyzer()
+    
+    @classmethod
+    def use_structure_analyzer(cls, analyzer: StructureAnalyzer) -> None:
+        """Install the analyzer all expressions are measured with.
+        
+        Args:
+            analyzer: Structure analyzer, e.g. one provided by an adapter
+        """
+        cls.structure_analyzer = analyzer
+    
     def __post_init__(self) -> None:
         """Validate expression after initialization."""
         self.validate()
@@ -113,20 +127,17 @@ class MathExpression:
         Returns:
             Complexity score (0-100)
         """
+        measures = self.structure_analyzer.measure(self.latex)
         score = 0
         
         # Count nested structures
-        max_depth = self._calculate_nesting_depth()
-        score += min(max_depth * 10, 30)
+        score += min(measures.max_brace_depth * 10, 30)
         
         # Count special commands
-        command_count = self.latex.count("\\")
-        score += min(command_count * 2, 20)
+        score += min(measures.command_count * 2, 20)
         
-        # Count mathematical symbols
-        symbols = ["^", "_", "∫", "∑", "∏", "∂", "∇"]
-        symbol_count = sum(self.latex.count(s) for s in symbols)
-        score += min(symbol_count * 3, 20)
+        # Count scripts and big operators
+        score += min(measures.symbol_count * 3, 20)
         
         # Length factor
         length_factor = min(len(self.latex) // 50, 30)
@@ -136,17 +147,7 @@ class MathExpression:
     
     def _calculate_nesting_depth(self) -> int:
         """Calculate maximum nesting depth of braces."""
-        max_depth = 0
-        current_depth = 0
-        
-        for char in self.latex:
-            if char == "{":
-                current_depth += 1
-                max_depth = max(max_depth, current_depth)
-            elif char == "}":
-                current_depth -= 1
-        
-        return max_depth
+        return self.structure_analyzer.measure(self.latex).max_brace_depth
     
     def extract_commands(self) -> List[str]:
         """Extract all LaTeX commands from expression.
@@ -0,0 +1,36 @@
+"""Structure analyzer interface."""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+from mathspeak_clean.shared.types import LaTeXExpression
+
+
+@dataclass(frozen=True)
+class StructureMeasures:
+    """Structural measures of an expression used to score its complexity."""
+    
+    max_brace_depth: int
+    command_count: int
+    symbol_count: int  # Scripts and big operators
+
+
+class StructureAnalyzer(ABC):
+    """Abstract structure analyzer interface.
+    
+    MathExpression measures itself through the installed analyzer, so the
+    domain can use a fuller analysis provided by an adapter without
+    depending on it.
+    """
+    
+    @abstractmethod
+    def measure(self, latex: LaTeXExpression) -> StructureMeasures:
+        """Measure the structure of an expression.
+        
+        Args:
+            latex: LaTeX expression
+            
+        Returns:
+            Structural measures of the expression
+        """
+        pass
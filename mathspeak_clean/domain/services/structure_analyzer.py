@@ -0,0 +1,34 @@
+"""Dependency-free structure analyzer."""
+
+from mathspeak_clean.domain.interfaces.structure_analyzer import (
+    StructureAnalyzer,
+    StructureMeasures,
+)
+from mathspeak_clean.shared.types import LaTeXExpression
+
+SYMBOLS = ["^", "_", "∫", "∑", "∏", "∂", "∇"]
+
+
+class BasicStructureAnalyzer(StructureAnalyzer):
+    """Structure analyzer counting characters in single passes.
+    
+    This is the analyzer expressions use unless another one is installed.
+    """
+    
+    def measure(self, latex: LaTeXExpression) -> StructureMeasures:
+        """Measure brace depth, backslashes and symbol characters."""
+        max_depth = 0
+        current_depth = 0
+        
+        for char in latex:
+            if char == "{":
+                current_depth += 1
+                max_depth = max(max_depth, current_depth)
+            elif char == "}":
+                current_depth -= 1
+        
+        return StructureMeasures(
+            max_brace_depth=max_depth,
+            command_count=latex.count("\\"),
+            symbol_count=sum(latex.count(s) for s in SYMBOLS),
+        )
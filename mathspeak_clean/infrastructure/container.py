@@ -5,10 +5,13 @@ from typing import Any, Callable, Dict, Optional, Type, TypeVar
 
 from mathspeak_clean.adapters.legacy_pattern_adapter import LegacyPatternAdapter
 from mathspeak_clean.adapters.enhanced_pattern_adapter import EnhancedPatternAdapter
+from mathspeak_clean.adapters.structure_adapter import LegacyStructureAnalyzer
 from mathspeak_clean.application.use_cases.process_expression import (
     ProcessExpressionUseCase,
 )
+from mathspeak_clean.domain.entities.expression import MathExpression
 from mathspeak_clean.domain.interfaces.pattern_repository import PatternRepository
+from mathspeak_clean.domain.interfaces.structure_analyzer import StructureAnalyzer
 from mathspeak_clean.domain.services.pattern_processor import PatternProcessorService
 from mathspeak_clean.domain.services.enhanced_pattern_processor import EnhancedPatternProcessorService
 from mathspeak_clean.infrastructure.config.settings import Settings, get_settings
@@ -43,6 +46,9 @@ class Container:
         
         # Register default factories
         self._register_defaults()
+        
+        # Expressions measure themselves with the legacy single-pass analysis
+        MathExpression.use_structure_analyzer(self.get(StructureAnalyzer))
     
     def _register_defaults(self) -> None:
         """Register default component factories."""
@@ -61,6 +67,7 @@ class Container:
             PatternRepository,
             self._create_pattern_repository,
         )
+        self.register_factory(StructureAnalyzer, LegacyStructureAnalyzer)
         
         # Use enhanced processor if enabled
         use_enhanced = getattr(self.settings, 'use_enhanced_processor', True)
@@ -4,11 +4,16 @@ MathSpeak API Server CLI
 ========================
 
 Simple CLI to start the MathSpeak REST API server.
+
+With --workers other than 1 the server pre-forks worker processes that
+share warm state built in the parent (see mathspeak.api.prefork).
 """
 
+import os
 import argparse
 import logging
 from mathspeak.api import run_server
+from mathspeak.api.prefork import PreforkConfig, run_prefork
 
 def main():
     parser = argparse.ArgumentParser(description="MathSpeak REST API Server")
@@ -16,6 +21,16 @@ def main():
     parser.add_argument("--port", type=int, default=8000, help="Port to bind to")
     parser.add_argument("--reload", action="store_true", help="Enable auto-reload for development")
     parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("MATHSPEAK_WORKERS", 1)),
+                        help="Worker processes to pre-fork (0 = one per CPU, 1 = single process)")
+    parser.add_argument("--max-requests", type=int, default=None,
+                        help="Recycle a worker after this many requests (0 = never)")
+    parser.add_argument("--max-requests-jitter", type=int, default=None,
+                        help="Random extra requests before recycling, per worker")
+    parser.add_argument("--max-memory-mb", type=int, default=None,
+                        help="Recycle a worker whose peak RSS exceeds this many MB (0 = never)")
+    parser.add_argument("--graceful-timeout", type=float, default=None,
+                        help="Seconds workers get to finish requests on shutdown")
     
     args = parser.parse_args()
     
@@ -28,7 +43,21 @@ def main():
     print(f"Starting MathSpeak API server on {args.host}:{args.port}")
     print(f"API documentation will be available at http://{args.host}:{args.port}/docs")
     
-    run_server(host=args.host, port=args.port, reload=args.reload)
+    if args.workers == 1 or args.reload:
+        run_server(host=args.host, port=args.port, reload=args.reload)
+        return
+    
+    config = PreforkConfig.from_env(
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        max_requests=args.max_requests,
+        max_requests_jitter=args.max_requests_jitter,
+        max_memory_mb=args.max_memory_mb,
+        graceful_timeout=args.graceful_timeout,
+        log_level="debug" if args.debug else "info",
+    )
+    run_prefork(config)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file